@@ -0,0 +1,123 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+# Open-loop load generator for cntk.eval.BatchingEvaluator. Single-sample
+# requests arrive with exponentially distributed inter-arrival times at a
+# given rate and are served either by a thread pool (one blocking evaluate()
+# per request) or by an asyncio event loop. For every request rate the
+# achieved throughput and the median and 99th percentile latency are reported,
+# once with batching and once with max_batch_size=1 as the unbatched baseline.
+
+import argparse
+import time
+import numpy as np
+import cntk as C
+from concurrent.futures import ThreadPoolExecutor
+from cntk.eval import BatchingEvaluator
+
+
+def create_model(input_dim, hidden_dim, num_layers):
+    x = C.input_variable(input_dim)
+    with C.layers.default_options(activation=C.relu):
+        model = C.layers.Sequential([C.layers.Dense(hidden_dim) for _ in range(num_layers)] +
+                                    [C.layers.Dense(10, activation=None)])
+    return model(x)
+
+
+def run_threads(evaluator, samples, arrivals, num_threads):
+    latencies = np.zeros(len(samples))
+
+    def serve(i):
+        evaluator.evaluate(samples[i])
+        latencies[i] = time.time() - start - arrivals[i]
+
+    with ThreadPoolExecutor(max_workers=num_threads) as pool:
+        start = time.time()
+        for i in range(len(samples)):
+            delay = start + arrivals[i] - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(serve, i)
+
+    return latencies, time.time() - start
+
+
+def run_asyncio(evaluator, samples, arrivals):
+    import asyncio
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    latencies = np.zeros(len(samples))
+    all_done = loop.create_future()
+    remaining = [len(samples)]
+
+    def done(i):
+        latencies[i] = loop.time() - start - arrivals[i]
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            all_done.set_result(None)
+
+    def arrive(i):
+        f = evaluator.evaluate_async(samples[i])
+        f.add_done_callback(lambda _: done(i))
+
+    start = loop.time()
+    for i in range(len(samples)):
+        loop.call_at(start + arrivals[i], arrive, i)
+    loop.run_until_complete(all_done)
+    elapsed = loop.time() - start
+    loop.close()
+
+    return latencies, elapsed
+
+
+def measure(model, samples, rate, args, max_batch_size):
+    arrivals = np.cumsum(np.random.exponential(1.0 / rate, len(samples)))
+    with BatchingEvaluator(model, max_batch_size=max_batch_size,
+                           max_latency=args.max_latency) as evaluator:
+        # warm up, such that the first minibatch does not skew the latencies
+        evaluator.evaluate(samples[0])
+
+        if args.frontend == 'asyncio':
+            latencies, elapsed = run_asyncio(evaluator, samples, arrivals)
+        else:
+            latencies, elapsed = run_threads(evaluator, samples, arrivals,
+                                             args.threads)
+        stats = evaluator.statistics
+
+    return (len(samples) / elapsed,
+            np.percentile(latencies, 50) * 1000,
+            np.percentile(latencies, 99) * 1000,
+            stats['average_batch_size'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--model', help='model to evaluate (default: a randomly initialized MLP)', required=False, default=None)
+    parser.add_argument('-r', '--rates', help='comma separated request rates in requests/second', required=False, default='100,500,1000,2000,5000')
+    parser.add_argument('-n', '--requests', help='number of requests per rate', type=int, required=False, default=2000)
+    parser.add_argument('-b', '--max_batch_size', help='maximum number of requests per minibatch', type=int, required=False, default=64)
+    parser.add_argument('-l', '--max_latency', help='batching window in seconds', type=float, required=False, default=0.002)
+    parser.add_argument('-f', '--frontend', help='request front-end', choices=['threads', 'asyncio'], required=False, default='threads')
+    parser.add_argument('-t', '--threads', help='number of threads of the thread pool front-end', type=int, required=False, default=64)
+    parser.add_argument('-d', '--device', help='evaluate on the CPU', choices=['cpu', 'default'], required=False, default='default')
+    args = parser.parse_args()
+
+    if args.device == 'cpu':
+        C.device.try_set_default_device(C.device.cpu())
+
+    if args.model:
+        model = C.load_model(args.model)
+    else:
+        model = create_model(784, 512, 3)
+
+    shape = model.arguments[0].shape
+    samples = np.random.rand(args.requests, *shape).astype(np.float32)
+
+    print('%10s %10s %12s %10s %10s %10s' % ('mode', 'rate', 'throughput', 'p50 (ms)', 'p99 (ms)', 'batch'))
+    for rate in [float(r) for r in args.rates.split(',')]:
+        for mode, max_batch_size in [('unbatched', 1), ('batched', args.max_batch_size)]:
+            throughput, p50, p99, batch = measure(model, samples, rate, args, max_batch_size)
+            print('%10s %10.0f %12.1f %10.2f %10.2f %10.1f' % (mode, rate, throughput, p50, p99, batch))
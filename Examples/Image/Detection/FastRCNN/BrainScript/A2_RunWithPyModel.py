@@ -15,6 +15,7 @@ from cntk.learners import momentum_sgd, learning_rate_schedule, momentum_as_time
 from cntk.logging import log_number_of_parameters, ProgressPrinter
 from cntk.logging.graph import find_by_name, plot
 import PARAMETERS
+from cntk_helpers import svmPredictBatch
 import numpy as np
 import os, sys
 
@@ -175,7 +176,12 @@ def train_fast_rcnn(debug_output=False, model_path=model_file):
     return frcn_output
 
 # Evaluate a Fast R-CNN model
-def evaluate_fast_rcnn(model):
+# With binary_output=True the network output is written to a memory-mapped .npy file (one row per image),
+# otherwise to a text file (one line per image) as written by the BrainScript model.
+# If svm_model = (svmWeights, svmBias, svmFeatScale) is given (see cntk_helpers.loadSvm), the rois of all
+# images are scored with a single svmPredictBatch call on the binary output and the labels and scores are returned
+def evaluate_fast_rcnn(model, binary_output=True, svm_model=None):
+    assert binary_output or svm_model is None, "ERROR: svm scoring requires the binary output."
     test_minibatch_source = create_mb_source(image_height, image_width, num_channels,
                                              num_classes, num_rois, base_path, "test")
     input_map = {
@@ -185,17 +191,36 @@ def evaluate_fast_rcnn(model):
 
     # evaluate test images and write netwrok output to file
     print("Evaluating Fast R-CNN model for %s images." % num_test_images)
-    results_file_path = os.path.join(base_path, "test.z")
-    with open(results_file_path, 'wb') as results_file:
+    results = None
+    results_file = None if binary_output else open(os.path.join(base_path, "test.z"), 'wb')
+    try:
         for i in range(0, num_test_images):
             data = test_minibatch_source.next_minibatch(1, input_map=input_map)
             output = model.eval(data)
             out_values = output[0].flatten()
-            np.savetxt(results_file, out_values[np.newaxis], fmt="%.6f")
+            if results_file is not None:
+                np.savetxt(results_file, out_values[np.newaxis], fmt="%.6f")
+            else:
+                if results is None:
+                    results = np.lib.format.open_memmap(os.path.join(base_path, "test.npy"), mode='w+',
+                                                        dtype=np.float32, shape=(num_test_images, len(out_values)))
+                results[i] = out_values
             if (i+1) % 100 == 0:
                 print("Evaluated %s images.." % (i+1))
-
-    return True
+    finally:
+        if results_file is not None:
+            results_file.close()
+
+    if results is None:
+        return True
+    results.flush()
+    if svm_model is None:
+        del results
+        return True
+
+    svmWeights, svmBias, svmFeatScale = svm_model
+    return svmPredictBatch(results.reshape((num_test_images, num_rois, -1)),
+                           svmWeights, svmBias, svmFeatScale, num_classes)
 
 
 # The main method trains and evaluates a Fast R-CNN model.
@@ -11,7 +11,7 @@ import os
 from fastRCNN.test import test_net as evaluate_net
 from fastRCNN.timer import Timer
 from imdb_data import imdb_data
-from cntk_helpers import makeDirectory, parseCntkOutput, DummyNet, deleteAllFilesInDirectory
+from cntk_helpers import makeDirectory, parseCntkOutput, getCntkOutputPath, DummyNet, deleteAllFilesInDirectory
 import PARAMETERS
 
 
@@ -26,7 +26,7 @@ def evaluate_output():
     print ("Parsing CNTK output for image set: " + image_set)
     cntkImgsListPath = os.path.join(p.cntkFilesDir, image_set + ".txt")
     outParsedDir = os.path.join(p.cntkFilesDir, image_set + "_parsed")
-    cntkOutputPath = os.path.join(p.cntkFilesDir, image_set + ".z")
+    cntkOutputPath = getCntkOutputPath(p.cntkFilesDir, image_set)
 
     # write cntk output for each image to separate file
     makeDirectory(outParsedDir)
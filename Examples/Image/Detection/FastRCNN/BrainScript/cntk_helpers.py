@@ -67,48 +67,60 @@ def getGridRois(imgWidth, imgHeight, nrGridScales, aspectRatios = [1.0]):
     for iter in range(nrGridScales):
         cellWidth = 1.0 * min(imgHeight, imgWidth) / (2 ** iter)
         step = cellWidth / 2.0
+        wStarts = getGridStarts(imgWidth, step)
+        hStarts = getGridStarts(imgHeight, step)
 
         for aspectRatio in aspectRatios:
-            wStart = 0
-            while wStart < imgWidth:
-                hStart = 0
-                while hStart < imgHeight:
-                    if aspectRatio < 1:
-                        wEnd = wStart + cellWidth
-                        hEnd = hStart + cellWidth / aspectRatio
-                    else:
-                        wEnd = wStart + cellWidth * aspectRatio
-                        hEnd = hStart + cellWidth
-                    if wEnd < imgWidth-1 and hEnd < imgHeight-1:
-                        rects.append([wStart, hStart, wEnd, hEnd])
-                    hStart += step
-                wStart += step
+            if aspectRatio < 1:
+                wEnds = wStarts + cellWidth
+                hEnds = hStarts + cellWidth / aspectRatio
+            else:
+                wEnds = wStarts + cellWidth * aspectRatio
+                hEnds = hStarts + cellWidth
+
+            # all (wStart, hStart) combinations, ordered by wStart first
+            wKeep = wEnds < imgWidth-1
+            hKeep = hEnds < imgHeight-1
+            grid = np.empty((np.count_nonzero(wKeep), np.count_nonzero(hKeep), 4))
+            grid[:, :, 0] = wStarts[wKeep, np.newaxis]
+            grid[:, :, 1] = hStarts[hKeep]
+            grid[:, :, 2] = wEnds[wKeep, np.newaxis]
+            grid[:, :, 3] = hEnds[hKeep]
+            rects += grid.reshape((-1, 4)).tolist()
     return rects
 
 
+def getGridStarts(size, step):
+    # same values as accumulating 'start += step' while start < size
+    starts = np.cumsum(np.concatenate(([0.0], np.full(int(np.ceil(size / step)) + 1, step))))
+    return starts[starts < size]
+
+
 def filterRois(rects, maxWidth, maxHeight, roi_minNrPixels, roi_maxNrPixels,
                roi_minDim, roi_maxDim, roi_maxAspectRatio):
-    filteredRects = []
-    filteredRectsSet = set()
-    for rect in rects:
-        if tuple(rect) in filteredRectsSet: # excluding rectangles with same co-ordinates
-            continue
-
-        x, y, x2, y2 = rect
-        w = x2 - x
-        h = y2 - y
-        assert(w>=0 and h>=0)
-
-        # apply filters
-        if h == 0 or w == 0 or \
-           x2 > maxWidth or y2 > maxHeight or \
-           w < roi_minDim or h < roi_minDim or \
-           w > roi_maxDim or h > roi_maxDim or \
-           w * h < roi_minNrPixels or w * h > roi_maxNrPixels or \
-           w / h > roi_maxAspectRatio or h / w > roi_maxAspectRatio:
-               continue
-        filteredRects.append(rect)
-        filteredRectsSet.add(tuple(rect))
+    rects = np.asarray(rects).reshape((-1, 4))
+
+    # excluding rectangles with same co-ordinates, keeping the first occurrence
+    # (rows are compared as raw bytes, since np.unique has no axis argument before numpy 1.13)
+    rows = np.ascontiguousarray(rects).view(np.dtype((np.void, rects.dtype.itemsize * rects.shape[1])))
+    _, firstInds = np.unique(rows.ravel(), return_index=True)
+    rects = rects[np.sort(firstInds)]
+
+    x, y, x2, y2 = rects.T
+    w = x2 - x
+    h = y2 - y
+    assert(np.all(w >= 0) and np.all(h >= 0))
+
+    # apply filters
+    nrPixels = w * h
+    with np.errstate(divide='ignore', invalid='ignore'):
+        keep = (h != 0) & (w != 0) & \
+               (x2 <= maxWidth) & (y2 <= maxHeight) & \
+               (w >= roi_minDim) & (h >= roi_minDim) & \
+               (w <= roi_maxDim) & (h <= roi_maxDim) & \
+               (nrPixels >= roi_minNrPixels) & (nrPixels <= roi_maxNrPixels) & \
+               (w / h <= roi_maxAspectRatio) & (h / w <= roi_maxAspectRatio)
+    filteredRects = rects[keep]
 
     # could combine rectangles using non-maxima surpression or with similar co-ordinates
     # groupedRectangles, weights = cv2.groupRectangles(np.asanyarray(rectsInput, np.float).tolist(), 1, 0.3)
@@ -203,79 +215,102 @@ def checkCntkOutputFile(cntkImgsListPath, cntkOutputPath, cntkNrRois, outputDim)
                 assert (fp.readline() != "")
         assert (fp.readline() == "") # test if end-of-file is reached
 
-# parse the cntk output file and save the output for each image individually
+# returns the path of the cntk output for the given image set. The binary output (.npy) written by
+# A2_RunWithPyModel is preferred over the text output (.z) if it is not older than the text output.
+def getCntkOutputPath(cntkFilesDir, image_set):
+    textOutputPath = os.path.join(cntkFilesDir, image_set + ".z")
+    binaryOutputPath = os.path.join(cntkFilesDir, image_set + ".npy")
+    if os.path.exists(binaryOutputPath) and (not os.path.exists(textOutputPath) or
+                                             os.path.getmtime(binaryOutputPath) >= os.path.getmtime(textOutputPath)):
+        return binaryOutputPath
+    return textOutputPath
+
+# parse the cntk output file and save the output for each image individually.
+# cntkOutputPath is either a text file with one line per image or a .npy file with one row per image.
 def parseCntkOutput(cntkImgsListPath, cntkOutputPath, outParsedDir, cntkNrRois, outputDim,
                     saveCompressed = False, skipCheck = False, skip5Mod = None):
+    imgPaths = getColumn(readTable(cntkImgsListPath), 1)
+    if cntkOutputPath.endswith(".npy"):
+        # memory-map the binary output, only the rows of the parsed images are read from disk
+        binaryOutput = np.load(cntkOutputPath, mmap_mode='r')
+        assert binaryOutput.shape == (len(imgPaths), cntkNrRois * outputDim), \
+            "ERROR: expected shape {} but found {}".format((len(imgPaths), cntkNrRois * outputDim), binaryOutput.shape)
+        _saveParsedCntkOutput(binaryOutput, len(imgPaths), outParsedDir, cntkNrRois, outputDim, saveCompressed, skip5Mod)
+        return
+
     if not skipCheck and skip5Mod == None:
         checkCntkOutputFile(cntkImgsListPath, cntkOutputPath, cntkNrRois, outputDim)
 
     # parse cntk output and write file for each image
     # always read in data for each image to forward file pointer
-    imgPaths = getColumn(readTable(cntkImgsListPath), 1)
     with open(cntkOutputPath) as fp:
-        for imgIndex in range(len(imgPaths)):
-            line = fp.readline()
-            if skip5Mod != None and imgIndex % 5 != skip5Mod:
-                print ("Skipping image {} (skip5Mod = {})".format(imgIndex, skip5Mod))
-                continue
-            print ("Parsing cntk output file, image %d of %d" % (imgIndex, len(imgPaths)))
-
-            # convert to floats
-            data = []
-            values = np.fromstring(line, dtype=float, sep=" ")
-            assert len(values) == cntkNrRois * outputDim, "ERROR: expected dimension of {} but found {}".format(cntkNrRois * outputDim, len(values))
-            for i in range(cntkNrRois):
-                posStart = i * outputDim
-                posEnd = posStart + outputDim
-                currValues = values[posStart:posEnd]
-                data.append(currValues)
-
-            # save
-            data = np.array(data, np.float32)
-            outPath = os.path.join(outParsedDir, str(imgIndex) + ".dat")
-            if saveCompressed:
-                np.savez_compressed(outPath, data)
-            else:
-                np.savez(outPath, data)
+        lines = (fp.readline() for _ in range(len(imgPaths)))
+        textOutput = (np.fromstring(line, dtype=float, sep=" ") for line in lines)
+        _saveParsedCntkOutput(textOutput, len(imgPaths), outParsedDir, cntkNrRois, outputDim, saveCompressed, skip5Mod)
         assert (fp.readline() == "")  # test if end-of-file is reached
 
-# parse the cntk labels file and return the labels
-def readCntkRoiLabels(roiLabelsPath, nrRois, roiDim, stopAtImgIndex = None):
-    roiLabels = []
-    for imgIndex, line in enumerate(readFile(roiLabelsPath)):
+def _saveParsedCntkOutput(cntkOutput, nrImages, outParsedDir, cntkNrRois, outputDim, saveCompressed, skip5Mod):
+    for imgIndex, values in enumerate(cntkOutput):
+        if skip5Mod != None and imgIndex % 5 != skip5Mod:
+            print ("Skipping image {} (skip5Mod = {})".format(imgIndex, skip5Mod))
+            continue
+        print ("Parsing cntk output file, image %d of %d" % (imgIndex, nrImages))
+
+        # convert to floats
+        assert len(values) == cntkNrRois * outputDim, "ERROR: expected dimension of {} but found {}".format(cntkNrRois * outputDim, len(values))
+        data = np.array(values, np.float32).reshape((cntkNrRois, outputDim))
+
+        # save
+        outPath = os.path.join(outParsedDir, str(imgIndex) + ".dat")
+        if saveCompressed:
+            np.savez_compressed(outPath, data)
+        else:
+            np.savez(outPath, data)
+
+# parse the values following the given field name in each line of a cntk text format file
+def readCntkFieldValues(cntkFilePath, fieldName, nrValues, dtype, stopAtImgIndex = None):
+    allValues = []
+    for imgIndex, line in enumerate(readFile(cntkFilePath)):
         if stopAtImgIndex and imgIndex == stopAtImgIndex:
             break
-        roiLabels.append([])
-        pos = line.find(b'|roiLabels ')
-        valuesString = line[pos + 10:].strip().split(b' ')
-        assert (len(valuesString) == nrRois * roiDim)
+        pos = line.find(fieldName)
+        values = np.fromstring(line[pos + len(fieldName):].decode(), dtype=dtype, sep=" ")
+        assert (len(values) == nrValues)
+        allValues.append(values)
+    return np.array(allValues, dtype).reshape((-1, nrValues))
 
-        for boxIndex in range(nrRois):
-            oneHotLabels = [int(s) for s in valuesString[boxIndex*roiDim : (boxIndex+1)*roiDim]]
-            assert(sum(oneHotLabels) == 1)
-            roiLabels[imgIndex].append(np.argmax(oneHotLabels))
-    return roiLabels
+# parse the cntk labels file and return the labels
+def readCntkRoiLabels(roiLabelsPath, nrRois, roiDim, stopAtImgIndex = None):
+    oneHotLabels = readCntkFieldValues(roiLabelsPath, b'|roiLabels ', nrRois * roiDim, int, stopAtImgIndex)
+    oneHotLabels = oneHotLabels.reshape((-1, nrRois, roiDim))
+    assert(np.all(oneHotLabels.sum(axis=2) == 1))
+    return [list(roiLabels) for roiLabels in oneHotLabels.argmax(axis=2)]
 
 # parse the cntk rois file and return the co-ordinates
 def readCntkRoiCoordinates(imgPaths, cntkRoiCoordsPath, nrRois, padWidth, padHeight, stopAtImgIndex = None):
+    allRois = readCntkFieldValues(cntkRoiCoordsPath, b'|rois ', nrRois * 4, float, stopAtImgIndex)
     roiCoords = []
-    for imgIndex, line in enumerate(readFile(cntkRoiCoordsPath)):
-        if stopAtImgIndex and imgIndex == stopAtImgIndex:
-            break
-        roiCoords.append([])
-        pos = line.find(b'|rois ')
-        valuesString = line[pos + 5:].strip().split(b' ')
-        assert (len(valuesString) == nrRois * 4)
-
+    for imgIndex, rois in enumerate(allRois.reshape((-1, nrRois, 4))):
         imgWidth, imgHeight = imWidthHeight(imgPaths[imgIndex])
-        for boxIndex in range(nrRois):
-            rect = [float(s) for s in valuesString[boxIndex*4 : (boxIndex+1)*4]]
-            x1,y1,x2,y2 = rect
-            # convert back from padded-rois-co-ordinates to image co-ordinates
-            rect = getAbsoluteROICoordinates([x1,y1,x2,y2], imgWidth, imgHeight, padWidth, padHeight)
-            roiCoords[imgIndex].append(rect)
+        # convert back from padded-rois-co-ordinates to image co-ordinates
+        rects = getAbsoluteROICoordinatesArray(rois, imgWidth, imgHeight, padWidth, padHeight)
+        roiCoords.append(rects.tolist())
     return roiCoords
 
+# vectorized version of getAbsoluteROICoordinates for an (N, 4) array of rois
+def getAbsoluteROICoordinatesArray(rois, imgWidth, imgHeight, padWidth, padHeight):
+    scale = float(padWidth) / max(imgWidth, imgHeight)
+    imgWidthScaled  = int(round(imgWidth * scale))
+    imgHeightScaled = int(round(imgHeight * scale))
+    w_offset = float(padWidth - imgWidthScaled) / 2.0
+    h_offset = float(padHeight - imgHeightScaled) / 2.0
+    assert(w_offset == 0 or h_offset == 0)
+
+    rects = np.round((rois - [w_offset, h_offset, w_offset, h_offset]) / scale).astype(int)
+    rects[np.all(rois == 0, axis=1)] = 0 # padded rois
+    assert(rects.min() >= 0 and rects[:, [0,2]].max() <= imgWidth and rects[:, [1,3]].max() <= imgHeight)
+    return rects
+
 def getAbsoluteROICoordinates(roi, imgWidth, imgHeight, padWidth, padHeight, resizeMethod = 'padScale'):
     ''' 
         The input image are usually padded to a fixed size, this method compute back the original 
@@ -336,19 +371,22 @@ def svmPredict(imgIndex, cntkOutputIndividualFilesDir, svmWeights, svmBias, svmF
     assert(len(data) == roiSize)
 
     # get prediction for each roi
-    labels = []
-    maxScores = []
-    for roiIndex in range(roiSize):
-        feat = data[roiIndex]
-        scores = np.dot(svmWeights, feat * 1.0 / svmFeatScale) + svmBias.ravel()
-        assert (len(scores) == roiDim)
-        maxArg = np.argmax(scores[1:]) + 1
-        maxScore = scores[maxArg]
-        if maxScore < decisionThreshold:
-            maxArg = 0
-        labels.append(maxArg)
-        maxScores.append(maxScore)
-    return labels, maxScores
+    labels, maxScores = svmPredictBatch(data[np.newaxis], svmWeights, svmBias, svmFeatScale, roiDim, decisionThreshold)
+    return list(labels[0]), list(maxScores[0])
+
+# scores all rois of all images at once.
+# cntkOutput has shape (nrImages, nrRois, featDim), e.g. the memory-mapped binary output of A2_RunWithPyModel,
+# returns the labels and max scores as (nrImages, nrRois) arrays
+def svmPredictBatch(cntkOutput, svmWeights, svmBias, svmFeatScale, roiDim, decisionThreshold = 0):
+    nrImages, nrRois, featDim = cntkOutput.shape
+    feats = cntkOutput.reshape((nrImages * nrRois, featDim))
+    scores = np.dot(feats * 1.0 / svmFeatScale, svmWeights.T) + svmBias.ravel()
+    assert (scores.shape[1] == roiDim)
+
+    labels = np.argmax(scores[:, 1:], axis=1) + 1
+    maxScores = scores[np.arange(len(scores)), labels]
+    labels[maxScores < decisionThreshold] = 0
+    return labels.reshape((nrImages, nrRois)), maxScores.reshape((nrImages, nrRois))
 
 def nnPredict(imgIndex, cntkParsedOutputDir, roiSize, roiDim, decisionThreshold = None):
     cntkOutputPath = os.path.join(cntkParsedOutputDir,  str(imgIndex) + ".dat.npz")
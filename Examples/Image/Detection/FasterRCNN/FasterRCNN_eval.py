@@ -31,19 +31,34 @@ class FasterRCNN_Evaluator:
         return regressed_rois, out_cls_pred
 
     def process_image_detailed(self, img_path):
+        return self.process_prepared_images([self.prepare_image(img_path)])[0]
+
+    def prepare_image(self, img_path):
+        '''
+        Loads, resizes and pads the image.
+        Returns the prepared model inputs to be passed to 'process_prepared_images()'.
+        '''
         _, cntk_img_input, dims = load_resize_and_pad(img_path, self._img_shape[2], self._img_shape[1])
 
         cntk_dims_input = np.array(dims, dtype=np.float32)
         cntk_dims_input.shape = (1,) + cntk_dims_input.shape
-        output = self._eval_model.eval({self._eval_model.arguments[0]: [cntk_img_input],
-                                        self._eval_model.arguments[1]: cntk_dims_input})
+        return cntk_img_input, cntk_dims_input, dims
+
+    def process_prepared_images(self, prepared_images):
+        '''
+        Pushes a batch of images returned by 'prepare_image()' through the model in a single forward pass.
+        Returns a list with (out_cls_pred, out_rpn_rois, out_bbox_regr, dims) per image.
+        '''
+        output = self._eval_model.eval({self._eval_model.arguments[0]: [p[0] for p in prepared_images],
+                                        self._eval_model.arguments[1]: np.stack([p[1] for p in prepared_images])})
 
         out_dict = dict([(k.name, k) for k in output])
-        out_cls_pred = output[out_dict['cls_pred']][0]
-        out_rpn_rois = output[out_dict['rpn_rois']][0]
-        out_bbox_regr = output[out_dict['bbox_regr']][0]
+        out_cls_pred = output[out_dict['cls_pred']]
+        out_rpn_rois = output[out_dict['rpn_rois']]
+        out_bbox_regr = output[out_dict['bbox_regr']]
 
-        return out_cls_pred, out_rpn_rois, out_bbox_regr, dims
+        return [(out_cls_pred[i], out_rpn_rois[i], out_bbox_regr[i], dims)
+                for i, (_, _, dims) in enumerate(prepared_images)]
 
 def compute_test_set_aps(eval_model, cfg):
     num_test_images = cfg["DATA"].NUM_TEST_IMAGES
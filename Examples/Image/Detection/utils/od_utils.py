@@ -1,5 +1,7 @@
 import easydict
+import numpy as np
 from utils.nms_wrapper import apply_nms_to_single_image_results
+from utils.rpn.bbox_transform import regress_rois
 
 def train_object_detector(cfg):
     """
@@ -57,23 +59,99 @@ def evaluate_single_image(model, img_path, cfg):
         cls_probs - class probabilities per bounding box
     """
 
-    detector_name = _get_detector_name(cfg)
     regressed_rois = None
     cls_probs = None
     print("detecting objects in image {}".format(img_path))
-    if detector_name == 'FastRCNN':
-        from FastRCNN.FastRCNN_eval import FastRCNN_Evaluator
-        evaluator = FastRCNN_Evaluator(model, cfg)
+    evaluator = _get_evaluator(model, cfg)
+    if evaluator is not None:
         regressed_rois, cls_probs = evaluator.process_image(img_path)
-    elif detector_name == 'FasterRCNN':
-        from FasterRCNN.FasterRCNN_eval import FasterRCNN_Evaluator
-        evaluator = FasterRCNN_Evaluator(model, cfg)
-        regressed_rois, cls_probs = evaluator.process_image(img_path)
-    else:
-        print('Unknown detector: {}'.format(detector_name))
 
     return regressed_rois, cls_probs
 
+def evaluate_images(model, img_paths, cfg, batch_size=4, num_loader_threads=4, apply_nms=False):
+    """
+    Computes detection results for the given model on a list of images using a pipelined batch inference:
+    images are loaded, resized and padded in a thread pool, 'batch_size' images are pushed through the model
+    per forward pass, and box regression (and optionally NMS) for a batch runs on a worker thread while the
+    next batch is being computed.
+    :param model: the model
+    :param img_paths: the paths to the images
+    :param cfg: the configuration
+    :param batch_size: the number of images per forward pass
+    :param num_loader_threads: the number of threads for loading, resizing and padding images
+    :param apply_nms: if set to True the results are filtered using 'filter_results()'
+    :return:
+        results - per image (regressed_rois, cls_probs), or (bboxes, labels, scores) if apply_nms is set to True
+        stage_times - the latencies in seconds of the 'load' (per image), 'forward' (per batch) and
+                      'postprocess' (per batch) stages, see 'print_latency_percentiles()'
+    """
+
+    evaluator = _get_evaluator(model, cfg)
+    if evaluator is None:
+        return None, None
+
+    from concurrent.futures import ThreadPoolExecutor
+    from time import time
+    stage_times = {'load': [], 'forward': [], 'postprocess': []}
+
+    def load(img_path):
+        start = time()
+        prepared_image = evaluator.prepare_image(img_path)
+        stage_times['load'].append(time() - start)
+        return prepared_image
+
+    def postprocess(detailed_results):
+        start = time()
+        results = []
+        for out_cls_pred, out_rpn_rois, out_bbox_regr, dims in detailed_results:
+            labels = out_cls_pred.argmax(axis=1)
+            regressed_rois = regress_rois(out_rpn_rois, out_bbox_regr, labels, dims)
+            if apply_nms:
+                results.append(filter_results(regressed_rois, out_cls_pred, cfg))
+            else:
+                results.append((regressed_rois, out_cls_pred))
+        stage_times['postprocess'].append(time() - start)
+        return results
+
+    batches = [img_paths[i:i + batch_size] for i in range(0, len(img_paths), batch_size)]
+    results = []
+    with ThreadPoolExecutor(max_workers=num_loader_threads) as loader, \
+         ThreadPoolExecutor(max_workers=1) as post_processor:
+        # images of the next batch are loaded while the current batch is being processed
+        next_batch = [loader.submit(load, p) for p in batches[0]] if len(batches) > 0 else []
+        pending_results = None
+        for batch_index in range(len(batches)):
+            prepared_images = [f.result() for f in next_batch]
+            if batch_index + 1 < len(batches):
+                next_batch = [loader.submit(load, p) for p in batches[batch_index + 1]]
+
+            start = time()
+            detailed_results = evaluator.process_prepared_images(prepared_images)
+            stage_times['forward'].append(time() - start)
+
+            if pending_results is not None:
+                results.extend(pending_results.result())
+            pending_results = post_processor.submit(postprocess, detailed_results)
+
+        if pending_results is not None:
+            results.extend(pending_results.result())
+
+    return results, stage_times
+
+def print_latency_percentiles(stage_times, percentiles=(50, 90, 99)):
+    """
+    Prints mean and percentiles of the latencies per stage
+    :param stage_times: dictionary with a list of latencies in seconds per stage, e.g. as returned by 'evaluate_images()'
+    :param percentiles: the percentiles to print
+    """
+
+    for stage, times in stage_times.items():
+        if len(times) == 0:
+            continue
+        values = np.percentile(times, percentiles)
+        print("{:<12} mean: {:.4f}s, {} (n={})".format(stage, np.mean(times),
+              ", ".join(["p{}: {:.4f}s".format(p, v) for p, v in zip(percentiles, values)]), len(times)))
+
 def filter_results(regressed_rois, cls_probs, cfg):
     """
     Filters the provided results by performing NMS (non maximum suppression)
@@ -146,22 +224,29 @@ def measure_inference_time(model, img_path, cfg, num_repetitions=100):
         cls_probs - class probabilities per bounding box
     """
 
-    detector_name = _get_detector_name(cfg)
     print("Measuring inference time (seconds per image) as average over {} runs".format(num_repetitions))
-    if detector_name == 'FastRCNN':
-        from FastRCNN.FastRCNN_eval import FastRCNN_Evaluator
-        evaluator = FastRCNN_Evaluator(model, cfg)
-    elif detector_name == 'FasterRCNN':
-        from FasterRCNN.FasterRCNN_eval import FasterRCNN_Evaluator
-        evaluator = FasterRCNN_Evaluator(model, cfg)
-    else:
-        print('Unknown detector: {}'.format(detector_name))
+    evaluator = _get_evaluator(model, cfg)
+    if evaluator is None:
         return
 
     from time import time
-    start = time()
+    times = []
     for i in range(num_repetitions):
+        start = time()
         _,_ = evaluator.process_image(img_path)
-    total = time() - start
+        times.append(time() - start)
+    total = sum(times)
     print("seconds per image: {:2f} (total for {} images: {:2f})".format(total/num_repetitions, num_repetitions, total))
+    print_latency_percentiles({'per image': times})
+
+def _get_evaluator(model, cfg):
+    detector_name = _get_detector_name(cfg)
+    if detector_name == 'FastRCNN':
+        from FastRCNN.FastRCNN_eval import FastRCNN_Evaluator
+        return FastRCNN_Evaluator(model, cfg)
+    elif detector_name == 'FasterRCNN':
+        from FasterRCNN.FasterRCNN_eval import FasterRCNN_Evaluator
+        return FasterRCNN_Evaluator(model, cfg)
 
+    print('Unknown detector: {}'.format(detector_name))
+    return None
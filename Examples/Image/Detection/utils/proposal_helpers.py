@@ -44,27 +44,29 @@ def compute_image_stats(img_width, img_height, pad_width, pad_height):
     return [target_w, target_h, img_width, img_height, top, bottom, left, right, scale_factor]
 
 def filterRois(rects, img_w, img_h, roi_min_area, roi_max_area, roi_min_side, roi_max_side, roi_max_aspect_ratio):
-    filteredRects = []
-    filteredRectsSet = set()
-    for rect in rects:
-        if tuple(rect) in filteredRectsSet: # excluding rectangles with same co-ordinates
-            continue
-
-        x, y, x2, y2 = rect
-        w = x2 - x
-        h = y2 - y
-        assert(w>=0 and h>=0)
-
-        # apply filters
-        if h == 0 or w == 0 or \
-           x2 > img_w or y2 > img_h or \
-           w < roi_min_side or h < roi_min_side or \
-           w > roi_max_side or h > roi_max_side or \
-           w * h < roi_min_area or w * h > roi_max_area or \
-           w / h > roi_max_aspect_ratio or h / w > roi_max_aspect_ratio:
-               continue
-        filteredRects.append(rect)
-        filteredRectsSet.add(tuple(rect))
+    rects = np.asarray(rects).reshape((-1, 4))
+
+    # excluding rectangles with same co-ordinates, keeping the first occurrence
+    # (rows are compared as raw bytes, since np.unique has no axis argument before numpy 1.13)
+    rows = np.ascontiguousarray(rects).view(np.dtype((np.void, rects.dtype.itemsize * rects.shape[1])))
+    _, first_inds = np.unique(rows.ravel(), return_index=True)
+    rects = rects[np.sort(first_inds)]
+
+    x, y, x2, y2 = rects.T
+    w = x2 - x
+    h = y2 - y
+    assert(np.all(w >= 0) and np.all(h >= 0))
+
+    # apply filters
+    area = w * h
+    with np.errstate(divide='ignore', invalid='ignore'):
+        keep = (h != 0) & (w != 0) & \
+               (x2 <= img_w) & (y2 <= img_h) & \
+               (w >= roi_min_side) & (h >= roi_min_side) & \
+               (w <= roi_max_side) & (h <= roi_max_side) & \
+               (area >= roi_min_area) & (area <= roi_max_area) & \
+               (w / h <= roi_max_aspect_ratio) & (h / w <= roi_max_aspect_ratio)
+    filteredRects = rects[keep]
 
     # could combine rectangles using non-maximum surpression or with similar co-ordinates
     # groupedRectangles, weights = cv2.groupRectangles(np.asanyarray(rectsInput, np.float).tolist(), 1, 0.3)
@@ -129,8 +131,9 @@ def compute_proposals(img, num_proposals, cfg):
 
 def compute_grid_proposals(num_proposals, img_w, img_h, min_wh, max_wh, aspect_ratios = [1.0, 2.0, 0.5], shuffle=True):
     rects = []
+    num_rects = 0
     iter = 0
-    while len(rects) < num_proposals:
+    while num_rects < num_proposals:
         if iter == 0:
             new_ar = aspect_ratios
         else:
@@ -139,8 +142,8 @@ def compute_grid_proposals(num_proposals, img_w, img_h, min_wh, max_wh, aspect_r
                 new_ar.append(ar * (0.9 ** iter))
                 new_ar.append(ar * (1.1 ** iter))
 
-        new_rects = np.array(_compute_grid_proposals(img_w, img_h, min_wh, max_wh, new_ar))
-        take = min(num_proposals - len(rects), len(new_rects))
+        new_rects = _compute_grid_proposals(img_w, img_h, min_wh, max_wh, new_ar)
+        take = min(num_proposals - num_rects, len(new_rects))
 
         if shuffle and take < len(new_rects):
             keep_inds = range(len(new_rects))
@@ -149,36 +152,48 @@ def compute_grid_proposals(num_proposals, img_w, img_h, min_wh, max_wh, aspect_r
         else:
             new_rects = new_rects[:take]
 
-        rects.extend(new_rects)
+        rects.append(new_rects)
+        num_rects += len(new_rects)
         iter = iter + 1
 
-    np_rects = np.array(rects)
+    np_rects = np.vstack(rects)
     assert np_rects.shape[0] == num_proposals
     return np_rects
 
+def _grid_starts(size, step):
+    # same values as accumulating 'start += step' while start < size
+    starts = np.cumsum(np.concatenate(([0.0], np.full(int(np.ceil(size / step)) + 1, step))))
+    return starts[starts < size]
+
 def _compute_grid_proposals(img_w, img_h, min_wh, max_wh, aspect_ratios):
-    rects = []
+    rects = [np.zeros((0, 4), dtype=int)]
     cell_w = max_wh
     while cell_w >= min_wh:
         step = cell_w / 2.0
+        w_starts = _grid_starts(img_w, step)
+        h_starts = _grid_starts(img_h, step)
         for aspect_ratio in aspect_ratios:
-            w_start = 0
-            while w_start < img_w:
-                h_start = 0
-                while h_start < img_h:
-                    if aspect_ratio < 1:
-                        w_end = w_start + cell_w
-                        h_end = h_start + cell_w / aspect_ratio
-                    else:
-                        w_end = w_start + cell_w * aspect_ratio
-                        h_end = h_start + cell_w
-                    if w_end < img_w-1 and h_end < img_h-1:
-                        rects.append([int(w_start), int(h_start), int(w_end), int(h_end)])
-                    h_start += step
-                w_start += step
+            if aspect_ratio < 1:
+                w_ends = w_starts + cell_w
+                h_ends = h_starts + cell_w / aspect_ratio
+            else:
+                w_ends = w_starts + cell_w * aspect_ratio
+                h_ends = h_starts + cell_w
+
+            # all (w_start, h_start) combinations, ordered by w_start first
+            w_keep = w_ends < img_w-1
+            h_keep = h_ends < img_h-1
+            num_w = np.count_nonzero(w_keep)
+            num_h = np.count_nonzero(h_keep)
+            grid = np.empty((num_w, num_h, 4))
+            grid[:, :, 0] = w_starts[w_keep, np.newaxis]
+            grid[:, :, 1] = h_starts[h_keep]
+            grid[:, :, 2] = w_ends[w_keep, np.newaxis]
+            grid[:, :, 3] = h_ends[h_keep]
+            rects.append(grid.reshape((-1, 4)).astype(int))
         cell_w = cell_w / 2
 
-    return rects
+    return np.vstack(rects)
 
 def write_to_file(proposal_list, filename):
     with open(filename, 'w') as f:
@@ -5,14 +5,14 @@
 # ==============================================================================
 
 import os
+import time
 from cntk import output_variable
 from cntk.ops.functions import UserFunction
 import yaml
 import numpy as np
-import numpy.random as npr
 from utils.rpn.generate_anchors import generate_anchors
-from utils.rpn.bbox_transform import bbox_transform
-from utils.cython_modules.cython_bbox import bbox_overlaps
+from utils.rpn.bbox_transform import bbox_transform, bbox_overlaps
+from utils.rpn.sampling import IndexSampler
 
 DEBUG = False
 
@@ -29,7 +29,7 @@ class AnchorTargetLayer(UserFunction):
                  positive_overlap=0.7,
                  negative_overlap=0.3,
                  param_str=None,
-                 name='AnchorTargetLayer', cfm_shape=None, deterministic=False):
+                 name='AnchorTargetLayer', cfm_shape=None, deterministic=False, seed=None):
         super(AnchorTargetLayer, self).__init__([arg1, arg2, arg3], name=name)
         self._rpn_batch_size = rpn_batch_size
         self._rpn_fg_fraction = rpn_fg_fraction
@@ -46,6 +46,12 @@ class AnchorTargetLayer(UserFunction):
         self._feat_stride = layer_params['feat_stride']
         self._cfm_shape = cfm_shape
         self._determininistic_mode = deterministic
+        self._seed = seed
+        self._sampler = IndexSampler(seed=seed, deterministic=deterministic)
+
+        # forward() timing counters, see get_forward_timing()
+        self._forward_count = 0
+        self._forward_time = 0.0
 
         if DEBUG:
             print ('anchors:')
@@ -99,6 +105,7 @@ class AnchorTargetLayer(UserFunction):
         # filter out-of-image anchors
         # measure GT overlap
 
+        start_time = time.time()
         bottom = arguments
 
         # map of shape (..., H, W)
@@ -173,9 +180,7 @@ class AnchorTargetLayer(UserFunction):
 
         # overlaps between the anchors and the gt boxes
         # overlaps (ex, gt)
-        overlaps = bbox_overlaps(
-            np.ascontiguousarray(anchors, dtype=np.float),
-            np.ascontiguousarray(gt_boxes, dtype=np.float))
+        overlaps = bbox_overlaps(anchors, gt_boxes)
         argmax_overlaps = overlaps.argmax(axis=1)
         max_overlaps = overlaps[np.arange(len(inds_inside)), argmax_overlaps]
         gt_argmax_overlaps = overlaps.argmax(axis=0)
@@ -201,27 +206,20 @@ class AnchorTargetLayer(UserFunction):
         num_fg = int(self._rpn_fg_fraction * self._rpn_batch_size)
         fg_inds = np.where(labels == 1)[0]
         if len(fg_inds) > num_fg:
-            if self._determininistic_mode:
-                disable_inds = fg_inds[:(len(fg_inds) - num_fg)]
-            else:
-                disable_inds = npr.choice(fg_inds, size=(len(fg_inds) - num_fg), replace=False)
+            disable_inds = self._sampler.choose(fg_inds, len(fg_inds) - num_fg)
             labels[disable_inds] = -1
 
         # subsample negative labels if we have too many
         num_bg = self._rpn_batch_size - np.sum(labels == 1)
         bg_inds = np.where(labels == 0)[0]
         if len(bg_inds) > num_bg:
-            if self._determininistic_mode:
-                disable_inds = bg_inds[:(len(bg_inds) - num_bg)]
-            else:
-                disable_inds = npr.choice(bg_inds, size=(len(bg_inds) - num_bg), replace=False)
+            disable_inds = self._sampler.choose(bg_inds, len(bg_inds) - num_bg)
             labels[disable_inds] = -1
 
-        bbox_targets = np.zeros((len(inds_inside), 4), dtype=np.float32)
         bbox_targets = _compute_targets(anchors, gt_boxes[argmax_overlaps, :])
 
         bbox_inside_weights = np.zeros((len(inds_inside), 4), dtype=np.float32)
-        bbox_inside_weights[labels == 1, :] = np.array((1.0, 1.0, 1.0, 1.0))
+        bbox_inside_weights[labels == 1, :] = 1.0
 
         if DEBUG:
             self._sums += bbox_targets[labels == 1, :].sum(axis=0)
@@ -264,6 +262,9 @@ class AnchorTargetLayer(UserFunction):
         assert bbox_inside_weights.shape[3] == width
         outputs[self.outputs[2]] = np.ascontiguousarray(bbox_inside_weights)
 
+        self._forward_count += 1
+        self._forward_time += time.time() - start_time
+
         # No state needs to be passed to backward() so we just pass None
         return None
 
@@ -271,6 +272,10 @@ class AnchorTargetLayer(UserFunction):
         """This layer does not propagate gradients."""
         pass
 
+    def get_forward_timing(self):
+        '''Returns the number of forward() calls and the total time spent in them (in seconds).'''
+        return self._forward_count, self._forward_time
+
     def clone(self, cloned_inputs):
         return AnchorTargetLayer(cloned_inputs[0], cloned_inputs[1], cloned_inputs[2],
                                  rpn_batch_size = self._rpn_batch_size,
@@ -279,7 +284,8 @@ class AnchorTargetLayer(UserFunction):
                                  positive_overlap = self._positive_overlap,
                                  negative_overlap = self._negative_overlap,
                                  param_str=self._param_str,
-                                 cfm_shape=self._cfm_shape)
+                                 cfm_shape=self._cfm_shape,
+                                 seed=self._seed)
 
     def serialize(self):
         internal_state = {}
@@ -289,6 +295,8 @@ class AnchorTargetLayer(UserFunction):
         internal_state['clobber_positives'] = self._clobber_positives
         internal_state['positive_overlap'] = self._positive_overlap
         internal_state['negative_overlap'] = self._negative_overlap
+        if self._seed is not None:
+            internal_state['seed'] = self._seed
         return internal_state
 
     @staticmethod
@@ -300,7 +308,8 @@ class AnchorTargetLayer(UserFunction):
                                  positive_overlap=state['positive_overlap'],
                                  negative_overlap=state['negative_overlap'],
                                  param_str=state['param_str'],
-                                 name=name)
+                                 name=name,
+                                 seed=state.get('seed'))
 
 
 def _unmap(data, count, inds, fill=0):
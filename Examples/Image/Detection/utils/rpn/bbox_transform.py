@@ -28,6 +28,31 @@ def bbox_transform(ex_rois, gt_rois):
         (targets_dx, targets_dy, targets_dw, targets_dh)).transpose()
     return targets
 
+def bbox_overlaps(boxes, query_boxes):
+    '''
+    Vectorized intersection over union between two sets of boxes, computes the same values as
+    utils.cython_modules.cython_bbox.bbox_overlaps.
+    :param boxes: (n, 4) boxes as [x_low, y_low, x_high, y_high]
+    :param query_boxes: (k, 4) boxes as [x_low, y_low, x_high, y_high]
+    :return: (n, k) array of overlaps
+    '''
+    boxes = np.asarray(boxes, dtype=np.float64)[:, :4]
+    query_boxes = np.asarray(query_boxes, dtype=np.float64)[:, :4]
+
+    box_areas = (boxes[:, 2] - boxes[:, 0] + 1) * (boxes[:, 3] - boxes[:, 1] + 1)
+    query_areas = (query_boxes[:, 2] - query_boxes[:, 0] + 1) * (query_boxes[:, 3] - query_boxes[:, 1] + 1)
+
+    iw = np.minimum(boxes[:, 2:3], query_boxes[:, 2]) - np.maximum(boxes[:, 0:1], query_boxes[:, 0]) + 1
+    ih = np.minimum(boxes[:, 3:4], query_boxes[:, 3]) - np.maximum(boxes[:, 1:2], query_boxes[:, 1]) + 1
+    np.maximum(iw, 0, out=iw)
+    np.maximum(ih, 0, out=ih)
+
+    intersection = iw * ih
+    union = box_areas[:, np.newaxis] + query_areas
+    union -= intersection
+    # union is always positive for non-degenerate boxes, guard against the degenerate ones
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=intersection > 0)
+
 # gets
 # - boxes (n, 4) as [x_low, y_low, x_high, y_high]
 # - deltas (n, 4) as [dx, dy, dw, dh]
@@ -96,6 +121,46 @@ def clip_boxes(boxes, im_info):
     boxes[:, 3::4] = np.maximum(np.minimum(boxes[:, 3::4], xy_max[1] - 1), xy_min[1])
     return boxes
 
+def bbox_transform_inv_clip(boxes, deltas, im_info):
+    '''
+    Fused and in-place version of clip_boxes(bbox_transform_inv(boxes, deltas), im_info)
+    for single class deltas. The predicted boxes are decoded into a single output buffer
+    and clipped to the image boundaries without allocating intermediate (n, 4) arrays.
+    :param boxes: (n, 4) boxes as [x_low, y_low, x_high, y_high]
+    :param deltas: (n, 4) deltas as [dx, dy, dw, dh]
+    :param im_info: (pad_width, pad_height, scaled_image_width, scaled_image_height, orig_img_width, orig_img_height)
+    '''
+    if boxes.shape[0] == 0:
+        return np.zeros((0, 4), dtype=deltas.dtype)
+
+    boxes = boxes.astype(deltas.dtype, copy=False)
+    pred_boxes = np.empty((boxes.shape[0], 4), dtype=deltas.dtype)
+
+    im_info = im_info.reshape(6)
+    xy_min = (im_info[0:2] - im_info[2:4]) / 2
+    xy_max = xy_min + im_info[2:4]
+
+    for lo, hi, size_ind in ((0, 2, 0), (1, 3, 1)):
+        # width (resp. height) and center of the input boxes
+        sizes = boxes[:, hi] - boxes[:, lo] + 1.0
+        ctr = boxes[:, lo] + 0.5 * sizes
+
+        # pred_ctr = d * size + ctr, 0.5 * pred_size = 0.5 * exp(d_size) * size
+        pred_ctr = deltas[:, lo] * sizes
+        pred_ctr += ctr
+        half_pred_size = np.exp(deltas[:, hi])
+        half_pred_size *= sizes
+        half_pred_size *= 0.5
+
+        # decode and clip to [xy_min, xy_max - 1] directly in the output columns
+        for col, op in ((lo, np.subtract), (hi, np.add)):
+            out = pred_boxes[:, col]
+            op(pred_ctr, half_pred_size, out=out)
+            np.minimum(out, xy_max[size_ind] - 1, out=out)
+            np.maximum(out, xy_min[size_ind], out=out)
+
+    return pred_boxes
+
 def regress_rois(roi_proposals, roi_regression_factors, labels, dims_input):
     for i in range(len(labels)):
         label = labels[i]
@@ -4,12 +4,13 @@
 # for full license information.
 # ==============================================================================
 
+import time
 from cntk import output_variable, FreeDimension
 from cntk.ops.functions import UserFunction
 import numpy as np
 import yaml
 from utils.rpn.generate_anchors import generate_anchors
-from utils.rpn.bbox_transform import bbox_transform_inv, clip_boxes
+from utils.rpn.bbox_transform import bbox_transform_inv_clip
 from utils.nms_wrapper import nms
 
 DEBUG = False
@@ -30,6 +31,11 @@ class ProposalLayer(UserFunction):
         # parse the layer parameter string, which must be valid YAML
         self._anchors = generate_anchors(scales=np.array(anchor_scales))
         self._num_anchors = self._anchors.shape[0]
+        self._shifted_anchors_cache = {}
+
+        # forward() timing counters, see get_forward_timing()
+        self._forward_count = 0
+        self._forward_time = 0.0
 
         if DEBUG:
             print ('feat_stride: {}'.format(self._feat_stride))
@@ -60,6 +66,8 @@ class ProposalLayer(UserFunction):
         # take after_nms_topN proposals after NMS
         # return the top proposals (-> RoIs top, scores top)
 
+        start_time = time.time()
+
         # use potentially different number of proposals for training vs evaluation
         if len(outputs_to_retain) == 0:
             # print("EVAL")
@@ -74,68 +82,95 @@ class ProposalLayer(UserFunction):
             min_size = self._layer_config['train_min_size']
 
         bottom = arguments
-        assert bottom[0].shape[0] == 1, \
-            'Only single item batches are supported'
+        num_images = bottom[0].shape[0]
+        A = self._num_anchors
 
         # the first set of _num_anchors channels are bg probs
         # the second set are the fg probs, which we want
-        scores = bottom[0][:, self._num_anchors:, :, :]
-        bbox_deltas = bottom[1]
-        im_info = bottom[2][0]
-
-        if DEBUG:
-            # im_info = (pad_width, pad_height, scaled_image_width, scaled_image_height, orig_img_width, orig_img_height)
-            # e.g.(1000, 1000, 1000, 600, 500, 300) for an original image of 600x300 that is scaled and padded to 1000x1000
-            print ('im_size: ({}, {})'.format(im_info[0], im_info[1]))
-            print ('scaled im_size: ({}, {})'.format(im_info[2], im_info[3]))
-            print ('original im_size: ({}, {})'.format(im_info[4], im_info[5]))
-
-        # 1. Generate proposals from bbox deltas and shifted anchors
-        height, width = scores.shape[-2:]
-
+        height, width = bottom[0].shape[-2:]
         if DEBUG:
-            print ('score map size: {}'.format(scores.shape))
-
-        # Enumerate all shifts
-        shift_x = np.arange(0, width) * self._feat_stride
-        shift_y = np.arange(0, height) * self._feat_stride
-        shift_x, shift_y = np.meshgrid(shift_x, shift_y)
-        shifts = np.vstack((shift_x.ravel(), shift_y.ravel(),
-                            shift_x.ravel(), shift_y.ravel())).transpose()
+            print ('score map size: {}'.format(bottom[0][:, A:, :, :].shape))
 
-        # Enumerate all shifted anchors:
-        #
-        # add A anchors (1, A, 4) to
-        # cell K shifts (K, 1, 4) to get
-        # shift anchors (K, A, 4)
-        # reshape to (K*A, 4) shifted anchors
-        A = self._num_anchors
-        K = shifts.shape[0]
-        anchors = self._anchors.reshape((1, A, 4)) + \
-                  shifts.reshape((1, K, 4)).transpose((1, 0, 2))
-        anchors = anchors.reshape((K * A, 4))
+        # 1. Generate shifted anchors, only depends on the feature map size and is cached
+        anchors = self._get_shifted_anchors(height, width, bottom[1].dtype)
 
-        # Transpose and reshape predicted bbox transformations to get them
+        # Transpose and reshape predicted bbox transformations and scores to get them
         # into the same order as the anchors:
         #
-        # bbox deltas will be (1, 4 * A, H, W) format
-        # transpose to (1, H, W, 4 * A)
-        # reshape to (1 * H * W * A, 4) where rows are ordered by (h, w, a)
+        # bbox deltas will be (N, 4 * A, H, W) format
+        # transpose to (N, H, W, 4 * A)
+        # reshape to (N, H * W * A, 4) where rows are ordered by (h, w, a)
         # in slowest to fastest order
-        bbox_deltas = bbox_deltas.transpose((0, 2, 3, 1)).reshape((-1, 4))
-
-        # Same story for the scores:
         #
-        # scores are (1, A, H, W) format
-        # transpose to (1, H, W, A)
-        # reshape to (1 * H * W * A, 1) where rows are ordered by (h, w, a)
-        scores = scores.transpose((0, 2, 3, 1)).reshape((-1, 1))
+        # scores are (N, A, H, W) format
+        # transpose to (N, H, W, A)
+        # reshape to (N, H * W * A) where rows are ordered by (h, w, a)
+        all_bbox_deltas = bottom[1].transpose((0, 2, 3, 1)).reshape((num_images, -1, 4))
+        all_scores = bottom[0][:, A:, :, :].transpose((0, 2, 3, 1)).reshape((num_images, -1))
+        all_im_info = bottom[2].reshape((-1, 6))
+
+        all_proposals = [self._proposals_for_image(anchors, all_bbox_deltas[i], all_scores[i], all_im_info[i],
+                                                   pre_nms_topN, post_nms_topN, nms_thresh, min_size)
+                         for i in range(num_images)]
+
+        # pad with zeros if too few rois were found
+        num_rois = max([post_nms_topN] + [p.shape[0] for p in all_proposals])
+        proposals = np.zeros((num_images, num_rois, 4), dtype=all_bbox_deltas.dtype)
+        for i, image_proposals in enumerate(all_proposals):
+            num_found_proposals = image_proposals.shape[0]
+            if DEBUG and num_found_proposals < post_nms_topN:
+                print("Only {} proposals generated in ProposalLayer".format(num_found_proposals))
+            proposals[i, :num_found_proposals, :] = image_proposals
 
-        # Convert anchors into proposals via bbox transformations
-        proposals = bbox_transform_inv(anchors, bbox_deltas)
+        self._forward_count += 1
+        self._forward_time += time.time() - start_time
 
+        # Output rois blob, for CNTK the batch axis is the first axis of the output
+        return None, proposals
+
+    def _get_shifted_anchors(self, height, width, dtype):
+        '''
+        Returns the (K*A, 4) shifted anchors for a feature map of size (height, width).
+        The anchors only depend on the feature map size, hence they are computed once and cached.
+        '''
+        key = (height, width, np.dtype(dtype))
+        anchors = self._shifted_anchors_cache.get(key)
+        if anchors is None:
+            # Enumerate all shifts
+            shift_x = np.arange(0, width) * self._feat_stride
+            shift_y = np.arange(0, height) * self._feat_stride
+            shift_x, shift_y = np.meshgrid(shift_x, shift_y)
+            shifts = np.vstack((shift_x.ravel(), shift_y.ravel(),
+                                shift_x.ravel(), shift_y.ravel())).transpose()
+
+            # Enumerate all shifted anchors:
+            #
+            # add A anchors (1, A, 4) to
+            # cell K shifts (K, 1, 4) to get
+            # shift anchors (K, A, 4)
+            # reshape to (K*A, 4) shifted anchors
+            A = self._num_anchors
+            K = shifts.shape[0]
+            anchors = self._anchors.reshape((1, A, 4)) + \
+                      shifts.reshape((1, K, 4)).transpose((1, 0, 2))
+            anchors = anchors.reshape((K * A, 4)).astype(dtype)
+            anchors.flags.writeable = False
+            self._shifted_anchors_cache[key] = anchors
+
+        return anchors
+
+    def _proposals_for_image(self, anchors, bbox_deltas, scores, im_info,
+                             pre_nms_topN, post_nms_topN, nms_thresh, min_size):
+        if DEBUG:
+            # im_info = (pad_width, pad_height, scaled_image_width, scaled_image_height, orig_img_width, orig_img_height)
+            # e.g.(1000, 1000, 1000, 600, 500, 300) for an original image of 600x300 that is scaled and padded to 1000x1000
+            print ('im_size: ({}, {})'.format(im_info[0], im_info[1]))
+            print ('scaled im_size: ({}, {})'.format(im_info[2], im_info[3]))
+            print ('original im_size: ({}, {})'.format(im_info[4], im_info[5]))
+
+        # Convert anchors into proposals via bbox transformations and
         # 2. clip predicted boxes to image
-        proposals = clip_boxes(proposals, im_info)
+        proposals = bbox_transform_inv_clip(anchors, bbox_deltas, im_info)
 
         # 3. remove predicted boxes with either height or width < threshold
         # (NOTE: convert min_size to input image scale. Original size = im_info[4:6], scaled size = im_info[2:4])
@@ -146,42 +181,26 @@ class ProposalLayer(UserFunction):
 
         # 4. sort all (proposal, score) pairs by score from highest to lowest
         # 5. take top pre_nms_topN (e.g. 6000)
-        order = scores.ravel().argsort(kind='mergesort')[::-1]
-        if pre_nms_topN > 0:
-            order = order[:pre_nms_topN]
+        order = _top_k_order(scores, pre_nms_topN)
         proposals = proposals[order, :]
         scores = scores[order]
 
         # 6. apply nms (e.g. threshold = 0.7)
         # 7. take after_nms_topN (e.g. 300)
         # 8. return the top proposals (-> RoIs top)
-        keep = nms(np.hstack((proposals, scores)), nms_thresh)
+        keep = nms(np.hstack((proposals, scores[:, np.newaxis])), nms_thresh)
         if post_nms_topN > 0:
             keep = keep[:post_nms_topN]
-        proposals = proposals[keep, :]
-        scores = scores[keep]
-
-        # pad with zeros if too few rois were found
-        num_found_proposals = proposals.shape[0]
-        if num_found_proposals < post_nms_topN:
-            if DEBUG:
-                print("Only {} proposals generated in ProposalLayer".format(num_found_proposals))
-            proposals_padded = np.zeros(((post_nms_topN,) + proposals.shape[1:]), dtype=np.float32)
-            proposals_padded[:num_found_proposals, :] = proposals
-            proposals = proposals_padded
-
-        # Output rois blob
-        # Our RPN implementation only supports a single input image, so all
-        # batch inds are 0
-        # for CNTK: add batch axis to output shape
-        proposals.shape = (1,) + proposals.shape
-
-        return None, proposals
+        return proposals[keep, :]
 
     def backward(self, state, root_gradients, variables):
         """This layer does not propagate gradients."""
         pass
 
+    def get_forward_timing(self):
+        '''Returns the number of forward() calls and the total time spent in them (in seconds).'''
+        return self._forward_count, self._forward_time
+
     def clone(self, cloned_inputs):
         return ProposalLayer(cloned_inputs[0], cloned_inputs[1], cloned_inputs[2], layer_config=self._layer_config)
 
@@ -200,3 +219,21 @@ def _filter_boxes(boxes, min_size):
     hs = boxes[:, 3] - boxes[:, 1] + 1
     keep = np.where((ws >= min_size) & (hs >= min_size))[0]
     return keep
+
+def _top_k_order(scores, k):
+    """
+    Returns the indices of the k highest scores ordered from highest to lowest (all indices if k <= 0).
+    Uses a partial sort and yields the same order as scores.argsort(kind='mergesort')[::-1][:k],
+    i.e. ties are broken by preferring the higher index.
+    """
+    num_scores = scores.shape[0]
+    if k <= 0 or k >= num_scores:
+        return scores.argsort(kind='mergesort')[::-1]
+
+    # the k-th highest score splits the candidates into 'certainly in' and 'tied at the boundary'
+    kth_score = scores[np.argpartition(scores, num_scores - k)[num_scores - k]]
+    above = np.where(scores > kth_score)[0]
+    ties = np.where(scores == kth_score)[0]
+    candidates = np.concatenate((above, ties[len(ties) - (k - len(above)):]))
+    candidates.sort()
+    return candidates[scores[candidates].argsort(kind='mergesort')[::-1]]
@@ -4,13 +4,13 @@
 # for full license information.
 # ==============================================================================
 
+import time
 from cntk import output_variable, FreeDimension
 from cntk.ops.functions import UserFunction
 import yaml
 import numpy as np
-import numpy.random as npr
-from utils.rpn.bbox_transform import bbox_transform
-from utils.cython_modules.cython_bbox import bbox_overlaps
+from utils.rpn.bbox_transform import bbox_transform, bbox_overlaps
+from utils.rpn.sampling import IndexSampler
 
 DEBUG = False
 
@@ -30,7 +30,7 @@ class ProposalTargetLayer(UserFunction):
                  bg_thresh_hi=0.5,
                  bg_thresh_lo=0.0,
                  param_str=None,
-                 name='ProposalTargetLayer', deterministic=False):
+                 name='ProposalTargetLayer', deterministic=False, seed=None):
         super(ProposalTargetLayer, self).__init__([arg1, arg2], name=name)
         self._batch_size = batch_size
         self._fg_fraction = fg_fraction
@@ -46,6 +46,12 @@ class ProposalTargetLayer(UserFunction):
         layer_params = yaml.load(self._param_str)
         self._num_classes = layer_params['num_classes']
         self._determininistic_mode = deterministic
+        self._seed = seed
+        self._sampler = IndexSampler(seed=seed, deterministic=deterministic)
+
+        # forward() timing counters, see get_forward_timing()
+        self._forward_count = 0
+        self._forward_time = 0.0
 
         self._count = 0
         self._fg_num = 0
@@ -69,6 +75,7 @@ class ProposalTargetLayer(UserFunction):
                                 name="bbox_inside_w_raw", needs_gradient=False)]
 
     def forward(self, arguments, outputs, device=None, outputs_to_retain=None):
+        start_time = time.time()
         bottom = arguments
 
         # Proposal ROIs (0, x1, y1, x2, y2) coming from RPN
@@ -112,8 +119,7 @@ class ProposalTargetLayer(UserFunction):
         # targets
         labels, rois, bbox_targets, bbox_inside_weights = self._sample_rois(
             all_rois, gt_boxes, fg_rois_per_image,
-            rois_per_image, self._num_classes,
-            deterministic=self._determininistic_mode)
+            rois_per_image, self._num_classes)
 
         if DEBUG:
             print ('num rois: {}'.format(rois_per_image))
@@ -153,8 +159,7 @@ class ProposalTargetLayer(UserFunction):
         outputs[self.outputs[0]] = np.ascontiguousarray(rois)
 
         # classification labels
-        labels_as_int = [i.item() for i in labels.astype(int)]
-        labels_dense = np.eye(self._num_classes, dtype=np.float32)[labels_as_int]
+        labels_dense = np.eye(self._num_classes, dtype=np.float32)[labels.astype(int)]
         labels_dense.shape = (1,) + labels_dense.shape # batch axis
         outputs[self.outputs[1]] = labels_dense
 
@@ -166,10 +171,17 @@ class ProposalTargetLayer(UserFunction):
         bbox_inside_weights.shape = (1,) + bbox_inside_weights.shape # batch axis
         outputs[self.outputs[3]] = np.ascontiguousarray(bbox_inside_weights)
 
+        self._forward_count += 1
+        self._forward_time += time.time() - start_time
+
     def backward(self, state, root_gradients, variables):
         """This layer does not propagate gradients."""
         pass
 
+    def get_forward_timing(self):
+        '''Returns the number of forward() calls and the total time spent in them (in seconds).'''
+        return self._forward_count, self._forward_time
+
     def clone(self, cloned_inputs):
         return ProposalTargetLayer(cloned_inputs[0], cloned_inputs[1],
                                    batch_size=self._batch_size,
@@ -180,7 +192,8 @@ class ProposalTargetLayer(UserFunction):
                                    fg_thresh=self._fg_thresh,
                                    bg_thresh_hi=self._bg_thresh_hi,
                                    bg_thresh_lo=self._bg_thresh_lo,
-                                   param_str=self._param_str)
+                                   param_str=self._param_str,
+                                   seed=self._seed)
 
     def serialize(self):
         internal_state = {}
@@ -193,6 +206,8 @@ class ProposalTargetLayer(UserFunction):
         internal_state['fg_thresh'] = self._fg_thresh
         internal_state['bg_thresh_hi'] = self._bg_thresh_hi
         internal_state['bg_thresh_lo'] = self._bg_thresh_lo
+        if self._seed is not None:
+            internal_state['seed'] = self._seed
         return internal_state
 
     @staticmethod
@@ -207,7 +222,8 @@ class ProposalTargetLayer(UserFunction):
                                    bg_thresh_hi=state['bg_thresh_hi'],
                                    bg_thresh_lo=state['bg_thresh_lo'],
                                    param_str=state['param_str'],
-                                   name=name)
+                                   name=name,
+                                   seed=state.get('seed'))
 
     def _get_bbox_regression_labels(self, bbox_target_data, num_classes):
         """Bounding-box regression targets (bbox_target_data) are stored in a
@@ -225,12 +241,11 @@ class ProposalTargetLayer(UserFunction):
         bbox_targets = np.zeros((clss.size, 4 * num_classes), dtype=np.float32)
         bbox_inside_weights = np.zeros(bbox_targets.shape, dtype=np.float32)
         inds = np.where(clss > 0)[0]
-        for ind in inds:
-            cls = clss[ind]
-            start = 4 * cls
-            end = start + 4
-            bbox_targets[ind, start:end] = bbox_target_data[ind, 1:]
-            bbox_inside_weights[ind, start:end] = [1.0, 1.0, 1.0, 1.0]
+        # scatter the 4 targets of each foreground row into the columns of its class
+        rows = inds[:, np.newaxis]
+        cols = 4 * clss[inds, np.newaxis] + np.arange(4)
+        bbox_targets[rows, cols] = bbox_target_data[inds, 1:]
+        bbox_inside_weights[rows, cols] = 1.0
         return bbox_targets, bbox_inside_weights
 
 
@@ -249,14 +264,12 @@ class ProposalTargetLayer(UserFunction):
 
         return np.hstack((labels[:, np.newaxis], targets)).astype(np.float32, copy=False)
 
-    def _sample_rois(self, all_rois, gt_boxes, fg_rois_per_image, rois_per_image, num_classes, deterministic=False):
+    def _sample_rois(self, all_rois, gt_boxes, fg_rois_per_image, rois_per_image, num_classes):
         """Generate a random sample of RoIs comprising foreground and background
         examples.
         """
         # overlaps: (rois x gt_boxes)
-        overlaps = bbox_overlaps(
-            np.ascontiguousarray(all_rois[:, 1:5], dtype=np.float),
-            np.ascontiguousarray(gt_boxes[:, :4], dtype=np.float))
+        overlaps = bbox_overlaps(all_rois[:, 1:5], gt_boxes[:, :4])
         gt_assignment = overlaps.argmax(axis=1)
         max_overlaps = overlaps.max(axis=1)
         labels = gt_boxes[gt_assignment, 4]
@@ -268,11 +281,7 @@ class ProposalTargetLayer(UserFunction):
         fg_rois_per_this_image = min(fg_rois_per_image, fg_inds.size)
 
         # Sample foreground regions without replacement
-        if fg_inds.size > 0:
-            if deterministic:
-                fg_inds = fg_inds[:fg_rois_per_this_image]
-            else:
-                fg_inds = npr.choice(fg_inds, size=fg_rois_per_this_image, replace=False)
+        fg_inds = self._sampler.choose(fg_inds, fg_rois_per_this_image)
 
         # Select background RoIs as those within [BG_THRESH_LO, BG_THRESH_HI)
         bg_inds = np.where((max_overlaps < self._bg_thresh_hi) &
@@ -282,11 +291,7 @@ class ProposalTargetLayer(UserFunction):
         bg_rois_per_this_image = rois_per_image - fg_rois_per_this_image
         bg_rois_per_this_image = min(bg_rois_per_this_image, bg_inds.size)
         # Sample background regions without replacement
-        if bg_inds.size > 0:
-            if deterministic:
-                bg_inds = bg_inds[:bg_rois_per_this_image]
-            else:
-                bg_inds = npr.choice(bg_inds, size=bg_rois_per_this_image, replace=False)
+        bg_inds = self._sampler.choose(bg_inds, bg_rois_per_this_image)
 
         # The indices that we're selecting (both fg and bg)
         keep_inds = np.append(fg_inds, bg_inds)
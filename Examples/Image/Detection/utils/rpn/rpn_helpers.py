@@ -72,7 +72,8 @@ def create_rpn(conv_out, scaled_gt_boxes, im_info, cfg, add_loss_functions=True)
                                               clobber_positives=cfg["TRAIN"].RPN_CLOBBER_POSITIVES,
                                               positive_overlap=cfg["TRAIN"].RPN_POSITIVE_OVERLAP,
                                               negative_overlap=cfg["TRAIN"].RPN_NEGATIVE_OVERLAP,
-                                              param_str=proposal_layer_params))
+                                              param_str=proposal_layer_params,
+                                              seed=cfg.RND_SEED))
         rpn_labels = atl.outputs[0]
         rpn_bbox_targets = atl.outputs[1]
         rpn_bbox_inside_weights = atl.outputs[2]
@@ -173,7 +174,8 @@ def create_proposal_target_layer(rpn_rois, scaled_gt_boxes, cfg):
                                             fg_thresh=cfg["TRAIN"].FG_THRESH,
                                             bg_thresh_hi=cfg["TRAIN"].BG_THRESH_HI,
                                             bg_thresh_lo=cfg["TRAIN"].BG_THRESH_LO,
-                                            param_str=ptl_param_string))
+                                            param_str=ptl_param_string,
+                                            seed=cfg.RND_SEED))
 
     # use an alias if you need to access the outputs, e.g., when cloning a trained network
     rois = alias(ptl.outputs[0], name='rpn_target_rois')
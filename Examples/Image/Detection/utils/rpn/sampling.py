@@ -0,0 +1,34 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import numpy as np
+
+class IndexSampler(object):
+    '''
+    Draws random subsets of (fg or bg) indices without replacement from its own seeded
+    random number generator, such that sampling in the RPN layers is reproducible
+    and independent of other users of the global numpy random state.
+    '''
+
+    def __init__(self, seed=None, deterministic=False):
+        self._deterministic = deterministic
+        self._rng = np.random.RandomState(seed)
+
+    def choose(self, inds, size):
+        '''
+        Returns 'size' elements of 'inds' chosen uniformly at random without replacement.
+        In deterministic mode the first 'size' elements are returned.
+        '''
+        size = max(0, min(int(size), len(inds)))
+        if self._deterministic or size == len(inds):
+            return inds[:size]
+        if size == 0:
+            return inds[:0]
+
+        # the 'size' smallest of a set of uniform random keys form a uniform random subset,
+        # argpartition finds them in linear time without permuting all indices
+        keys = self._rng.random_sample(len(inds))
+        return inds[np.argpartition(keys, size - 1)[:size]]
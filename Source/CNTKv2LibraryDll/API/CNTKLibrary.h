@@ -1948,6 +1948,7 @@ private:
         static NDArrayViewPtr CreateValueFromParameterInitializer(const NDShape& shape, const ParameterInitializer& initConfig, const DeviceDescriptor& device);
 
         CNTK_API static Variable Deserialize(const Dictionary& dictionary, const ::CNTK::DeviceDescriptor& device = DeviceDescriptor::UseDefaultDevice());
+        static Variable Deserialize(const Dictionary& dictionary, const ::CNTK::DeviceDescriptor& device, const std::shared_ptr<const void>& valueOwner);
 
         void SetOwner(const std::weak_ptr<Function>& ownerFunction);
 
@@ -3413,10 +3414,13 @@ namespace CNTK
         CNTK_API void Restore(const std::wstring& filepath);
 
         ///
-        /// Load a Function from a model file
+        /// Load a Function from a model file.
+        /// If 'lazy' is true, the model file stays memory-mapped and the values of the Parameters and Constants
+        /// are only copied out of it to the compute device when first used. Ignored for legacy models.
         ///
         CNTK_API static FunctionPtr Load(const std::wstring& filepath,
-                                         const DeviceDescriptor& computeDevice = DeviceDescriptor::UseDefaultDevice());
+                                         const DeviceDescriptor& computeDevice = DeviceDescriptor::UseDefaultDevice(),
+                                         bool lazy = false);
 
         ///
         /// Load a Function from a memory buffer
@@ -4930,6 +4934,30 @@ namespace CNTK
             return 1;
         }
 
+        //
+        // Number of bytes of gradient data that this worker sent to the other workers during the last update.
+        //
+        virtual size_t BytesSent() const
+        {
+            return 0;
+        }
+
+        //
+        // Number of bytes of gradient data that this worker received from the other workers during the last update.
+        //
+        virtual size_t BytesReceived() const
+        {
+            return 0;
+        }
+
+        //
+        // Number of bytes the gradients exchanged during the last update occupy without compression.
+        //
+        virtual size_t UncompressedBytes() const
+        {
+            return 0;
+        }
+
     protected:
         DistributedLearner(DistributedCommunicatorPtr communicator, LearnerPtr learner, size_t distributeAfterSamples)
             : Learner(learner? learner->Parameters() : std::vector<Parameter>(),
@@ -4957,6 +4985,30 @@ namespace CNTK
 
     CNTK_API DistributedLearnerPtr CreateQuantizedDataParallelDistributedLearner(QuantizedDistributedCommunicatorPtr communicator, LearnerPtr learner, size_t distributeAfterSamples, bool useAsyncBufferedParameterUpdate = false);
 
+    ///
+    /// Compression of the gradients exchanged by a data parallel distributed learner.
+    ///
+    enum class GradientCompression
+    {
+        None,
+        Float16, // gradients are exchanged in half precision
+        TopK,    // only the largest gradient elements are exchanged, the rest is carried over to the next minibatch
+    };
+
+    ///
+    /// Creates a data parallel distributed learner that compresses the gradients before exchanging them.
+    /// 'topKRatio' is the fraction of the elements of every gradient exchanged with GradientCompression::TopK.
+    /// Gradients are exchanged in buckets of about 'bucketSizeInBytes' bytes, a bucket is exchanged while the
+    /// next one is compressed and the previous one decompressed; 0 exchanges all gradients at once.
+    ///
+    CNTK_API DistributedLearnerPtr CreateCompressedDataParallelDistributedLearner(
+        DistributedCommunicatorPtr communicator,
+        LearnerPtr learner,
+        size_t distributeAfterSamples,
+        GradientCompression compression,
+        double topKRatio = 0.01,
+        size_t bucketSizeInBytes = 0);
+
     CNTK_API DistributedLearnerPtr CreateBlockMomentumDistributedLearner(
         DistributedCommunicatorPtr communicator,
         LearnerPtr learner,
@@ -5041,6 +5093,9 @@ namespace CNTK
     protected:
         Evaluator(const FunctionPtr& evaluationFunction, const std::vector<ProgressWriterPtr>& progressWriters = {}, bool initializeCombined = true);
 
+        // Communicator used for aggregating distributed evaluation results.
+        virtual DistributedCommunicatorPtr GetCommunicator() const;
+
         // Helper functions.
         std::vector<Variable> GetCombinedEvalFunctionArgs() const;
         static size_t GetSampleCount(const Variable& var, const ValuePtr& value);
@@ -5113,7 +5168,24 @@ namespace CNTK
         CNTK_API void SaveCheckpoint(const std::wstring& filePath, Dictionary externalState = Dictionary());
 
         ///
-        /// Restore the model and trainer state from a previously saved model and checkpoint from the specified file location
+        /// Checkpoint the model and other Trainer state at the specified file location without waiting for the files to be written.
+        /// The model and trainer state are copied into host memory before the call returns, the files are written on a background thread
+        /// (in the order the checkpoints were taken) and atomically renamed into place once complete.
+        /// At most 'maxPendingCheckpoints' checkpoints are held in memory waiting to be written; if the limit is reached,
+        /// the call blocks until the oldest pending checkpoint has been written.
+        /// In distributed training the checkpoint is written synchronously.
+        ///
+        CNTK_API void SaveCheckpointAsync(const std::wstring& filePath, Dictionary externalState = Dictionary(), size_t maxPendingCheckpoints = 1);
+
+        ///
+        /// Block until all checkpoints started with SaveCheckpointAsync have been written.
+        /// Rethrows the first error that occured while writing a pending checkpoint.
+        ///
+        CNTK_API void WaitForPendingCheckpoints();
+
+        ///
+        /// Restore the model and trainer state from a previously saved model and checkpoint from the specified file location.
+        /// Waits for pending asynchronous checkpoints to be written first.
         ///
         CNTK_API Dictionary RestoreFromCheckpoint(const std::wstring& filePath);
 
@@ -5157,6 +5229,8 @@ namespace CNTK
         ///
         CNTK_API void SummarizeTrainingProgress();
 
+        CNTK_API virtual ~Trainer();
+
     private:
         template <typename T1, typename ...CtorArgTypes>
         friend std::shared_ptr<T1> MakeSharedObject(CtorArgTypes&& ...ctorArgs);
@@ -5177,8 +5251,12 @@ namespace CNTK
         bool TrainLocalMinibatch(const std::unordered_map<Variable, ValuePtr>& arguments, std::unordered_map<Variable, ValuePtr>& outputsToFetch, bool sweepEnd, const DeviceDescriptor& computeDevice);
         bool TrainDistributedMinibatch(const std::unordered_map<Variable, ValuePtr>& arguments, std::unordered_map<Variable, ValuePtr>& outputsToFetch, bool sweepEnd, const DeviceDescriptor& computeDevice);
 
+        void SaveCheckpoint(const std::wstring& filePath, Dictionary externalState, size_t maxPendingCheckpoints);
+
         void Save(const std::wstring& modelFilePath, const std::vector<DictionaryValue>& learnerState,
-            const Dictionary& externalState, const Dictionary& distributedState = {});
+            const Dictionary& externalState, const Dictionary& distributedState = {}, size_t maxPendingCheckpoints = 0);
+
+        DistributedCommunicatorPtr GetCommunicator() const override;
 
         void UpdateTrainingProgress(size_t numSamples, const ValuePtr& loss, const ValuePtr& evalCriterion, const DeviceDescriptor& computeDevice);
         void AddProgressWriters(const std::vector<ProgressWriterPtr>& progressWriters);
@@ -5202,6 +5280,9 @@ namespace CNTK
         AccumulatorPtr m_aggregatedTrainingEvalCriterionValue;
 
         size_t m_prevDistributedTotalNumSamples;
+
+        // Checkpoints being written in the background, oldest first.
+        std::vector<std::shared_future<void>> m_pendingCheckpoints;
     };
 
     ///
@@ -5702,6 +5783,15 @@ namespace CNTK
     ///
     CNTK_API QuantizedDistributedCommunicatorPtr QuantizedMPICommunicator(bool zeroThresholdFor1Bit, bool useQuantizationForSelfStripe, size_t numQuantizationBits);
 
+    ///
+    /// Communicator for worker processes on a single machine that does not need MPI. The workers exchange data through
+    /// shared memory. All 'numberOfWorkers' processes create the communicator with the same 'name', which must not be
+    /// in use by another training run at the same time, and each with its own 'workerRank'.
+    /// bufferSizeInBytes: size of the exchange buffer of each worker; larger values need fewer synchronizations.
+    /// Not supported on Windows.
+    ///
+    CNTK_API DistributedCommunicatorPtr SharedMemoryCommunicator(const std::wstring& name, size_t numberOfWorkers, size_t workerRank, size_t bufferSizeInBytes = 16 * 1024 * 1024);
+
     ///
     /// Cross validation configuration
     ///
@@ -5712,12 +5802,19 @@ namespace CNTK
         /// crossValidationSource: a minibatch source that will be used for cross validation.
         /// crossValidationSchedule : a minibatch size schedule for cross validation.
         /// crossValidationFrequencyInSamples: frequency in samples when to perform cross validation.
+        /// asyncCrossValidation: if flag is set, cross validation runs on a background thread against a copy of the
+        ///     current parameters while training continues. Results are passed to OnCrossValidationEnd on the training
+        ///     thread, between minibatches, in the order the cross validations were started.
+        /// maxPendingCrossValidations: maximum number of asynchronous cross validations whose result has not been delivered yet.
+        ///     If the limit is reached, training waits for the oldest one to finish.
         ///
         CNTK_API CrossValidationConfig(const MinibatchSourcePtr& crossValidationSource,
             const MinibatchSizeSchedule& crossValidationSchedule = MinibatchSizeSchedule(64),
             size_t crossValidationFrequencyInSamples = std::numeric_limits<size_t>::max(),
             size_t maxSamples = std::numeric_limits<size_t>::max(),
-            const std::unordered_map<Variable, StreamInformation>& inputVarToStream = {});
+            const std::unordered_map<Variable, StreamInformation>& inputVarToStream = {},
+            bool asyncCrossValidation = false,
+            size_t maxPendingCrossValidations = 1);
 
     private:
         friend class TrainingSession;
@@ -5726,6 +5823,8 @@ namespace CNTK
         const size_t m_frequency;
         const size_t m_maxSamples;
         const std::unordered_map<Variable, StreamInformation> m_varToStream;
+        const bool m_async;
+        const size_t m_maxPending;
     };
 
     ///
@@ -5740,12 +5839,16 @@ namespace CNTK
         /// checkpointFrequencyInSamples: frequency in samples when to perform checkpointing.
         /// restoreFromCheckpointIfExists: if flag is set, the training session will try to restore before training.
         /// preserveAllCheckpoints: if flag is set, all checkpoints will be preserved.
+        /// asyncCheckpoints: if flag is set, checkpoints are written on a background thread (see Trainer::SaveCheckpointAsync).
+        /// maxPendingCheckpoints: maximum number of asynchronous checkpoints waiting to be written.
         ///
         CNTK_API CheckpointConfig(
             const std::wstring& checkPointFileName,
             size_t checkpointFrequencyInSamples = std::numeric_limits<size_t>::max(),
             bool restoreFromCheckpointIfExists = true,
-            bool preserveAllCheckpoints = false);
+            bool preserveAllCheckpoints = false,
+            bool asyncCheckpoints = false,
+            size_t maxPendingCheckpoints = 1);
 
     private:
         friend class TrainingSession;
@@ -5753,6 +5856,8 @@ namespace CNTK
         const bool m_restore;
         const bool m_preserveAll;
         const size_t m_frequency;
+        const bool m_async;
+        const size_t m_maxPending;
     };
 
     ///
@@ -5890,7 +5995,18 @@ namespace CNTK
         void SaveCheckpoint(size_t currentIndex);
         void SaveFinalCheckpoint();
 
+        struct CrossValidationResult
+        {
+            size_t m_index;
+            double m_averageError;
+            size_t m_numberOfSamples;
+            size_t m_numberOfMinibatches;
+        };
+
         bool CrossValidate(size_t currentIndex, const DeviceDescriptor& computeDevice);
+        bool CrossValidateAsync(size_t currentIndex, const DeviceDescriptor& computeDevice);
+        bool DeliverCrossValidationResults(size_t maxPending);
+        CrossValidationResult RunCrossValidation(Evaluator& evaluator, size_t currentIndex, bool distributed, const DeviceDescriptor& computeDevice);
         void ReportProgress(size_t currentIndex);
         void Test(const DeviceDescriptor& computeDevice);
 
@@ -5915,6 +6031,10 @@ namespace CNTK
         CheckpointConfig m_checkpoint;
         CrossValidationConfig m_cv;
         TestConfig m_test;
+
+        // Asynchronous cross validations whose results have not been delivered yet, oldest first.
+        // Declared last, so that running passes finish before the state they use is destroyed.
+        std::vector<std::shared_future<CrossValidationResult>> m_pendingCrossValidations;
     };
 
     ///
@@ -260,6 +260,10 @@ namespace CNTK
 
         CNTK_API size_t GenerateRandomSeed(bool perWorkerLocalValue = false);
 
+        // Sets the number of workers and the rank of this worker that per-worker random seeds are derived from.
+        // Called by communicators that do not use MPI, otherwise the layout is taken from the MPI environment.
+        void SetRandomSeedWorkerLayout(size_t numberOfWorkers, size_t workerRank);
+
         // Internal hooks for testing and higher-level bindings
         // These should not be directly called by C++ API users
         CNTK_API void EnableReversingTensorShapesInErrorMessages();
@@ -52,6 +52,9 @@ namespace CNTK
         static std::mutex s_fixedSeedMutex;
         static bool s_fixedRandomSeed = false;
         static std::atomic_ullong s_currentRandomSeed = ATOMIC_VAR_INIT(0);
+        // Worker layout for per-worker seeds, protected by s_fixedSeedMutex.
+        static size_t s_numberOfWorkers = 1, s_workerRank = 0;
+        static bool s_workerLayoutInitialized = false;
 
         unsigned long GetRandomSeed()
         {
@@ -93,18 +96,24 @@ namespace CNTK
             if (!perWorkerLocalValue)
                 return s_currentRandomSeed++;
 
-            static size_t numWorkers = 1, rank = 0;
-            static bool initialized = false;
-            if (EnvironmentUtil::GetTotalNumberOfMPINodes() > 1 && !initialized)
+            if (EnvironmentUtil::GetTotalNumberOfMPINodes() > 1 && !s_workerLayoutInitialized)
             {
                 DistributedCommunicatorPtr communicator = MPICommunicator();
-                numWorkers = communicator->Workers().size();
-                rank = communicator->CurrentWorker().m_globalRank;
-                assert(numWorkers > 1);
+                s_numberOfWorkers = communicator->Workers().size();
+                s_workerRank = communicator->CurrentWorker().m_globalRank;
+                assert(s_numberOfWorkers > 1);
             }
 
-            initialized = true;
-            return (numWorkers * s_currentRandomSeed++) + rank;
+            s_workerLayoutInitialized = true;
+            return (s_numberOfWorkers * s_currentRandomSeed++) + s_workerRank;
+        }
+
+        void SetRandomSeedWorkerLayout(size_t numberOfWorkers, size_t workerRank)
+        {
+            std::unique_lock<std::mutex> lock(s_fixedSeedMutex);
+            s_numberOfWorkers = numberOfWorkers;
+            s_workerRank = workerRank;
+            s_workerLayoutInitialized = true;
         }
 
         std::atomic<bool> s_reverseTensorShapesInErrorMessages(false);
@@ -225,7 +225,7 @@ namespace CNTK
         return composite;
     }
 
-    /*static*/ FunctionPtr CompositeFunction::Deserialize(const Dictionary& dict, const CNTK::DeviceDescriptor& device)
+    /*static*/ FunctionPtr CompositeFunction::Deserialize(const Dictionary& dict, const CNTK::DeviceDescriptor& device, const std::shared_ptr<const void>& valueOwner)
     {
         static const vector<std::wstring> s_requiredDictionaryKeys = { inputsKey, functionsKey };
 
@@ -236,7 +236,7 @@ namespace CNTK
         for (const auto& dictionaryValue : inputs)
         {
             const auto& dictionary = dictionaryValue.Value<Dictionary>();
-            const auto& inputVar = Variable::Deserialize(dictionary, device);
+            const auto& inputVar = Variable::Deserialize(dictionary, device, valueOwner);
 
             if (uidToInputMap.find(inputVar.Uid()) != uidToInputMap.end())
             {
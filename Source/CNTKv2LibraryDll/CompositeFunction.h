@@ -119,7 +119,9 @@ namespace CNTK
                                                      const std::unordered_map<Variable, Variable>& allPlaceholderReplacements,
                                                      const CNTK::DeviceDescriptor& device);
 
-        static FunctionPtr Deserialize(const Dictionary& dictionary, const CNTK::DeviceDescriptor& device);
+        // If 'valueOwner' is given, the values of the Parameters and Constants in 'dictionary' are views of memory it keeps alive,
+        // and are only copied to 'device' when first used.
+        static FunctionPtr Deserialize(const Dictionary& dictionary, const CNTK::DeviceDescriptor& device, const std::shared_ptr<const void>& valueOwner = nullptr);
 
         virtual const std::wstring& OpName() const override
         {
@@ -8,6 +8,9 @@
 #include "DistributedCommunicator.h"
 #include "Learner.h"
 #include "PerformanceProfiler.h"
+#include <cmath>
+#include <future>
+#include <numeric>
 
 #ifdef CNTK_PARALLEL_TRAINING_SUPPORT
 #include "QuantizedDistributedCommunicator.h"
@@ -114,18 +117,49 @@ namespace CNTK
         return MakeSharedObject<DataParallelDistributedLearner>(communicator, learner, distributedAfterSamples, useAsyncBufferedParameterUpdate);
     }
 
+    DistributedLearnerPtr CreateCompressedDataParallelDistributedLearner(
+        DistributedCommunicatorPtr communicator,
+        LearnerPtr learner,
+        size_t distributedAfterSamples,
+        GradientCompression compression,
+        double topKRatio,
+        size_t bucketSizeInBytes)
+    {
+        return MakeSharedObject<DataParallelDistributedLearner>(communicator, learner, distributedAfterSamples, compression, topKRatio, bucketSizeInBytes);
+    }
+
     DataParallelDistributedLearner::DataParallelDistributedLearner(DistributedCommunicatorPtr communicator, LearnerPtr learner, size_t distributedAfterSamples, bool useAsyncBufferedParameterUpdate)
-        : DistributedLearnerBase(communicator, learner, distributedAfterSamples, !Internal::ShouldUseSparseGradientAggregationInDataParallelSGD())
+        : DistributedLearnerBase(communicator, learner, distributedAfterSamples, !Internal::ShouldUseSparseGradientAggregationInDataParallelSGD()),
+          m_compression(GradientCompression::None),
+          m_topKRatio(1),
+          m_bucketSizeInBytes(0),
+          m_bytesSent(0),
+          m_bytesReceived(0),
+          m_uncompressedBytes(0)
     {
         if (useAsyncBufferedParameterUpdate)
             LogicError("Asynchronous parameter update is not yet supported for the DataParallelDistributedLearner.");
     }
 
+    DataParallelDistributedLearner::DataParallelDistributedLearner(DistributedCommunicatorPtr communicator, LearnerPtr learner, size_t distributedAfterSamples, GradientCompression compression, double topKRatio, size_t bucketSizeInBytes)
+        : DistributedLearnerBase(communicator, learner, distributedAfterSamples, /*convertSparseToDense=*/true),
+          m_compression(compression),
+          m_topKRatio(topKRatio),
+          m_bucketSizeInBytes(bucketSizeInBytes),
+          m_bytesSent(0),
+          m_bytesReceived(0),
+          m_uncompressedBytes(0)
+    {
+        if (compression == GradientCompression::TopK && !(topKRatio > 0 && topKRatio <= 1))
+            InvalidArgument("The top-k ratio of the gradient compression must be in (0, 1], got %f.", topKRatio);
+    }
+
     bool DataParallelDistributedLearner::Update(std::unordered_map<Parameter, NDArrayViewPtr>& gradientValues, MinibatchInfo& info)
     {
         // sparse gradient may be converted to dense for aggregation
         std::unordered_map<Parameter, NDArrayViewPtr> convertedGradientValues = gradientValues;
 
+        m_bytesSent = m_bytesReceived = m_uncompressedBytes = 0;
         if (m_sampleCount >= m_distributeAfterSamples && m_communicator->Workers().size() > 1)
         {
 #ifndef  CNTK_UWP
@@ -139,40 +173,48 @@ namespace CNTK
             // if !UseSparseGradientAggregationInDataParallelSGD()
             ConvertToOrdered(gradientValues, m_gradientBuffer, &convertedGradientValues);
 
-            std::vector<NDArrayViewPtr> valuesToAggregate;
-            std::vector<NDArrayViewPtr> sparseValuesToAggregate;
-            for (const auto& i : m_gradientBuffer)
+            if (m_compression != GradientCompression::None || m_bucketSizeInBytes > 0)
+                AggregateBuckets(info);
+            else
             {
-                auto storageFormat = i.second->GetStorageFormat();
-                if (storageFormat == StorageFormat::Dense)
+                std::vector<NDArrayViewPtr> valuesToAggregate;
+                std::vector<NDArrayViewPtr> sparseValuesToAggregate;
+                for (const auto& i : m_gradientBuffer)
                 {
-                    valuesToAggregate.push_back(i.second);
-                }
-                else
-                {
-                    if (storageFormat != StorageFormat::SparseBlockCol)
-                        LogicError("Unsupported sparse gradient format");
+                    auto storageFormat = i.second->GetStorageFormat();
+                    if (storageFormat == StorageFormat::Dense)
+                    {
+                        valuesToAggregate.push_back(i.second);
+                        m_uncompressedBytes += i.second->Shape().TotalSize() * DataTypeSize(i.second->GetDataType());
+                    }
+                    else
+                    {
+                        if (storageFormat != StorageFormat::SparseBlockCol)
+                            LogicError("Unsupported sparse gradient format");
 
-                    // NOTE: CPU sparse block column stores block Ids in size_t and it's different from GPU SBC
-                    // We should refactor the CPU SBC code to align with GPU in future
-                    if (i.second->Device().Type() == DeviceKind::CPU)
-                        LogicError("Unsupported CPU sparse block column aggregation");
+                        // NOTE: CPU sparse block column stores block Ids in size_t and it's different from GPU SBC
+                        // We should refactor the CPU SBC code to align with GPU in future
+                        if (i.second->Device().Type() == DeviceKind::CPU)
+                            LogicError("Unsupported CPU sparse block column aggregation");
 
-                    sparseValuesToAggregate.push_back(i.second);
+                        sparseValuesToAggregate.push_back(i.second);
+                    }
                 }
-            }
-            valuesToAggregate.push_back(info.evalCriterionValue);
-            valuesToAggregate.push_back(info.trainingLossValue);
+                valuesToAggregate.push_back(info.evalCriterionValue);
+                valuesToAggregate.push_back(info.trainingLossValue);
 
-            auto value = MakeSharedObject<NDArrayView>(static_cast<double>(info.numberOfSamples), NDShape{}, DeviceDescriptor::CPUDevice());
-            valuesToAggregate.push_back(value);
+                auto value = MakeSharedObject<NDArrayView>(static_cast<double>(info.numberOfSamples), NDShape{}, DeviceDescriptor::CPUDevice());
+                valuesToAggregate.push_back(value);
 
-            m_communicator->AggregateInPlace(valuesToAggregate, m_communicator->Workers());
-            info.numberOfSamples = static_cast<size_t>(*valuesToAggregate.back()->WritableDataBuffer<double>());
+                m_communicator->AggregateInPlace(valuesToAggregate, m_communicator->Workers());
+                info.numberOfSamples = static_cast<size_t>(*valuesToAggregate.back()->WritableDataBuffer<double>());
 
-            if (!sparseValuesToAggregate.empty())
-            {
-                m_communicator->AllReduceSparseBlockColumn(sparseValuesToAggregate);
+                if (!sparseValuesToAggregate.empty())
+                {
+                    m_communicator->AllReduceSparseBlockColumn(sparseValuesToAggregate);
+                }
+
+                m_bytesSent = m_bytesReceived = m_uncompressedBytes;
             }
         }
 
@@ -188,4 +230,395 @@ namespace CNTK
 
         return m_learner->Update(convertedGradientValues, info.numberOfSamples, info.atEndOfSweep);
     }
+
+    static const std::wstring topKResidualsKey = L"topKResiduals";
+
+    // The residuals differ between workers, but only the main worker saves the learner state.
+    // They are therefore gathered from all workers, so this must be called on every worker.
+    Dictionary DataParallelDistributedLearner::CreateCheckpoint()
+    {
+        auto checkpoint = DistributedLearnerBase::CreateCheckpoint();
+        if (m_compression != GradientCompression::TopK)
+            return checkpoint;
+
+        std::vector<DictionaryValue> residuals;
+        for (const auto& parameter : m_learner->Parameters())
+        {
+            auto residual = m_residuals.find(parameter);
+            if (residual != m_residuals.end())
+                residuals.push_back(*residual->second);
+            else
+                residuals.push_back(NDArrayView(0, parameter.GetDataType(), parameter.Shape(), DeviceDescriptor::CPUDevice()));
+        }
+
+        Dictionary localState;
+        localState[topKResidualsKey] = residuals;
+
+        std::vector<DictionaryPtr> remoteState;
+        m_communicator->Gather(localState, remoteState, m_communicator->Workers());
+
+        Dictionary workerResiduals;
+        for (const auto& w : m_communicator->Workers())
+            workerResiduals[std::to_wstring(w.m_globalRank)] = *remoteState[w.m_globalRank];
+
+        checkpoint[topKResidualsKey] = workerResiduals;
+        return checkpoint;
+    }
+
+    void DataParallelDistributedLearner::RestoreFromCheckpoint(const Dictionary& checkpoint)
+    {
+        DistributedLearnerBase::RestoreFromCheckpoint(checkpoint);
+
+        m_residuals.clear();
+        if (m_compression != GradientCompression::TopK || !checkpoint.Contains(topKResidualsKey))
+            return;
+
+        // A worker that did not exist when the checkpoint was saved starts without residuals.
+        const auto& workerResiduals = checkpoint[topKResidualsKey].Value<Dictionary>();
+        auto localWorkerId = std::to_wstring(m_communicator->CurrentWorker().m_globalRank);
+        if (!workerResiduals.Contains(localWorkerId))
+            return;
+
+        const auto& residuals = workerResiduals[localWorkerId].Value<Dictionary>()[topKResidualsKey].Value<std::vector<DictionaryValue>>();
+        const auto& parameters = m_learner->Parameters();
+        if (residuals.size() != parameters.size())
+            LogicError("Checkpoint contains top-k residuals for %zu parameters, but the learner has %zu.", residuals.size(), parameters.size());
+
+        for (size_t i = 0; i < parameters.size(); ++i)
+        {
+            const auto& residual = residuals[i].Value<NDArrayView>();
+            if (residual.GetDataType() != parameters[i].GetDataType() || residual.Shape() != parameters[i].Shape())
+                LogicError("Top-k residual in the checkpoint does not match parameter '%S'.", parameters[i].AsString().c_str());
+
+            m_residuals[parameters[i]] = residual.DeepClone(DeviceDescriptor::CPUDevice());
+        }
+    }
+
+    // IEEE 754 half precision conversions, rounding to the nearest even value.
+    static uint16_t FloatToHalf(float value)
+    {
+        uint32_t bits;
+        memcpy(&bits, &value, sizeof(bits));
+        uint32_t sign = (bits >> 16) & 0x8000;
+        uint32_t exponent = (bits >> 23) & 0xff;
+        uint32_t mantissa = bits & 0x7fffff;
+
+        if (exponent == 0xff) // infinity or NaN
+            return static_cast<uint16_t>(sign | 0x7c00 | (mantissa ? 0x200 : 0));
+
+        int halfExponent = static_cast<int>(exponent) - 127 + 15;
+        if (halfExponent >= 0x1f) // overflow
+            return static_cast<uint16_t>(sign | 0x7c00);
+
+        if (halfExponent <= 0) // subnormal or zero
+        {
+            if (halfExponent < -10)
+                return static_cast<uint16_t>(sign);
+
+            mantissa |= 0x800000;
+            uint32_t shift = static_cast<uint32_t>(14 - halfExponent);
+            uint32_t half = mantissa >> shift;
+            uint32_t remainder = mantissa & ((1u << shift) - 1);
+            uint32_t halfway = 1u << (shift - 1);
+            if (remainder > halfway || (remainder == halfway && (half & 1)))
+                half++;
+            return static_cast<uint16_t>(sign | half);
+        }
+
+        uint32_t half = sign | (static_cast<uint32_t>(halfExponent) << 10) | (mantissa >> 13);
+        uint32_t remainder = mantissa & 0x1fff;
+        // a carry out of the mantissa correctly rounds up to the next exponent or to infinity
+        if (remainder > 0x1000 || (remainder == 0x1000 && (half & 1)))
+            half++;
+        return static_cast<uint16_t>(half);
+    }
+
+    static float HalfToFloat(uint16_t half)
+    {
+        uint32_t sign = static_cast<uint32_t>(half & 0x8000) << 16;
+        uint32_t exponent = (half >> 10) & 0x1f;
+        uint32_t mantissa = half & 0x3ff;
+
+        uint32_t bits;
+        if (exponent == 0x1f) // infinity or NaN
+            bits = sign | 0x7f800000 | (mantissa << 13);
+        else if (exponent != 0)
+            bits = sign | ((exponent + 127 - 15) << 23) | (mantissa << 13);
+        else if (mantissa == 0)
+            bits = sign;
+        else // subnormal
+        {
+            float value = std::ldexp(static_cast<float>(mantissa), -24);
+            return sign ? -value : value;
+        }
+
+        float value;
+        memcpy(&value, &bits, sizeof(value));
+        return value;
+    }
+
+    // Element indices of top-k payloads are stored bitwise in elements of the gradient type.
+    template <typename ElementType>
+    using TopKIndex = typename std::conditional<sizeof(ElementType) == sizeof(uint32_t), uint32_t, uint64_t>::type;
+
+    void DataParallelDistributedLearner::AggregateBuckets(MinibatchInfo& info)
+    {
+        // Criterion values and the sample count are aggregated uncompressed.
+        auto numberOfSamples = MakeSharedObject<NDArrayView>(static_cast<double>(info.numberOfSamples), NDShape{}, DeviceDescriptor::CPUDevice());
+        std::vector<NDArrayViewPtr> criteria = { info.evalCriterionValue, info.trainingLossValue, numberOfSamples };
+        m_communicator->AggregateInPlace(criteria, m_communicator->Workers());
+        info.numberOfSamples = static_cast<size_t>(*numberOfSamples->WritableDataBuffer<double>());
+
+        std::vector<std::vector<EncodedGradient>> buckets(1);
+        size_t bucketSizeInBytes = 0;
+        for (const auto& i : m_gradientBuffer)
+        {
+            if (i.second->GetStorageFormat() != StorageFormat::Dense)
+                LogicError("Gradient compression does not support sparse gradients.");
+
+            size_t sizeInBytes = i.second->Shape().TotalSize() * DataTypeSize(i.second->GetDataType());
+            if (m_bucketSizeInBytes > 0 && bucketSizeInBytes > 0 && bucketSizeInBytes + sizeInBytes > m_bucketSizeInBytes)
+            {
+                buckets.emplace_back();
+                bucketSizeInBytes = 0;
+            }
+            bucketSizeInBytes += sizeInBytes;
+
+            EncodedGradient encoded;
+            encoded.gradient = i.second;
+            if (m_compression == GradientCompression::TopK)
+            {
+                auto& residual = m_residuals[i.first];
+                if (!residual)
+                    residual = MakeSharedObject<NDArrayView>(0, i.second->GetDataType(), i.second->Shape(), DeviceDescriptor::CPUDevice());
+                encoded.residual = residual;
+            }
+            buckets.back().push_back(encoded);
+        }
+
+        // A bucket is exchanged on a separate thread while the next bucket is encoded and the previous one decoded.
+        // Exchanges are chained, so the communicator is only used by one thread at a time.
+        std::vector<std::shared_future<void>> exchanges;
+        for (size_t b = 0; b <= buckets.size(); ++b)
+        {
+            if (b < buckets.size())
+            {
+                auto& bucket = buckets[b];
+                for (auto& encoded : bucket)
+                    Encode(encoded);
+
+                std::shared_future<void> previous;
+                if (!exchanges.empty())
+                    previous = exchanges.back();
+
+                exchanges.push_back(std::async(std::launch::async, [this, &bucket, previous]()
+                {
+                    if (previous.valid())
+                        previous.wait();
+                    Exchange(bucket);
+                }).share());
+            }
+
+            if (b > 0)
+            {
+                exchanges[b - 1].get();
+                for (auto& encoded : buckets[b - 1])
+                    Decode(encoded);
+            }
+        }
+    }
+
+    void DataParallelDistributedLearner::Encode(EncodedGradient& encoded)
+    {
+        // Compression happens on the CPU, where the communicators exchange the data.
+        const auto& gradient = encoded.gradient;
+        auto dataType = gradient->GetDataType();
+        if (dataType != DataType::Float && dataType != DataType::Double)
+            LogicError("Gradient compression supports only float and double gradients.");
+
+        if (gradient->Device() == DeviceDescriptor::CPUDevice())
+            encoded.host = gradient;
+        else
+        {
+            encoded.host = MakeSharedObject<NDArrayView>(dataType, gradient->Shape(), DeviceDescriptor::CPUDevice());
+            encoded.host->CopyFrom(*gradient);
+        }
+
+        size_t sizeInBytes = gradient->Shape().TotalSize() * DataTypeSize(dataType);
+        m_uncompressedBytes += sizeInBytes;
+
+        switch (m_compression)
+        {
+        case GradientCompression::None:
+            encoded.payload = encoded.host;
+            m_bytesSent += sizeInBytes;
+            m_bytesReceived += sizeInBytes;
+            return;
+        case GradientCompression::Float16:
+            if (dataType == DataType::Float)
+                EncodeFloat16<float>(encoded);
+            else
+                EncodeFloat16<double>(encoded);
+            break;
+        case GradientCompression::TopK:
+            if (dataType == DataType::Float)
+                EncodeTopK<float>(encoded);
+            else
+                EncodeTopK<double>(encoded);
+            break;
+        default:
+            LogicError("Unsupported gradient compression.");
+        }
+
+        // Compressed payloads cannot be summed, every worker receives the payloads of all others.
+        const auto& payload = encoded.payload;
+        size_t numberOfWorkers = m_communicator->Workers().size();
+        size_t payloadSizeInBytes = payload->Shape().TotalSize() * DataTypeSize(payload->GetDataType());
+        m_bytesSent += payloadSizeInBytes;
+        m_bytesReceived += payloadSizeInBytes * (numberOfWorkers - 1);
+        encoded.gathered = MakeSharedObject<NDArrayView>(payload->GetDataType(), NDShape{ payload->Shape().TotalSize() * numberOfWorkers }, DeviceDescriptor::CPUDevice());
+    }
+
+    void DataParallelDistributedLearner::Exchange(std::vector<EncodedGradient>& bucket)
+    {
+        std::vector<NDArrayViewPtr> payloads, gathered;
+        for (const auto& encoded : bucket)
+        {
+            payloads.push_back(encoded.payload);
+            gathered.push_back(encoded.gathered);
+        }
+
+        if (m_compression == GradientCompression::None)
+        {
+            m_communicator->AggregateInPlace(payloads, m_communicator->Workers());
+            return;
+        }
+
+        m_communicator->Concatenate(payloads, gathered, m_communicator->Workers());
+        for (size_t i = 0; i < bucket.size(); ++i)
+            bucket[i].gathered = gathered[i];
+    }
+
+    void DataParallelDistributedLearner::Decode(EncodedGradient& encoded)
+    {
+        bool isFloat = encoded.host->GetDataType() == DataType::Float;
+        switch (m_compression)
+        {
+        case GradientCompression::None:
+            break;
+        case GradientCompression::Float16:
+            if (isFloat)
+                DecodeFloat16<float>(encoded);
+            else
+                DecodeFloat16<double>(encoded);
+            break;
+        case GradientCompression::TopK:
+            if (isFloat)
+                DecodeTopK<float>(encoded);
+            else
+                DecodeTopK<double>(encoded);
+            break;
+        default:
+            LogicError("Unsupported gradient compression.");
+        }
+
+        if (encoded.host != encoded.gradient)
+            encoded.gradient->CopyFrom(*encoded.host);
+    }
+
+    template <typename ElementType>
+    void DataParallelDistributedLearner::EncodeFloat16(EncodedGradient& encoded)
+    {
+        // Two half precision values are packed into every float of the payload.
+        size_t size = encoded.host->Shape().TotalSize();
+        encoded.payload = MakeSharedObject<NDArrayView>(DataType::Float, NDShape{ (size + 1) / 2 }, DeviceDescriptor::CPUDevice());
+
+        auto source = encoded.host->DataBuffer<ElementType>();
+        auto target = reinterpret_cast<uint16_t*>(encoded.payload->WritableDataBuffer<float>());
+        for (size_t i = 0; i < size; ++i)
+            target[i] = FloatToHalf(static_cast<float>(source[i]));
+        if (size % 2)
+            target[size] = 0;
+    }
+
+    template <typename ElementType>
+    void DataParallelDistributedLearner::DecodeFloat16(EncodedGradient& encoded)
+    {
+        size_t size = encoded.host->Shape().TotalSize();
+        size_t payloadSize = 2 * encoded.payload->Shape().TotalSize();
+        size_t numberOfWorkers = encoded.gathered->Shape().TotalSize() * 2 / payloadSize;
+
+        auto source = reinterpret_cast<const uint16_t*>(encoded.gathered->DataBuffer<float>());
+        auto target = encoded.host->WritableDataBuffer<ElementType>();
+        std::fill(target, target + size, static_cast<ElementType>(0));
+        for (size_t w = 0; w < numberOfWorkers; ++w, source += payloadSize)
+        {
+            for (size_t i = 0; i < size; ++i)
+                target[i] += static_cast<ElementType>(HalfToFloat(source[i]));
+        }
+    }
+
+    template <typename ElementType>
+    void DataParallelDistributedLearner::EncodeTopK(EncodedGradient& encoded)
+    {
+        typedef TopKIndex<ElementType> IndexType;
+        static_assert(sizeof(IndexType) == sizeof(ElementType), "Top-k indices must have the size of the gradient elements.");
+
+        size_t size = encoded.host->Shape().TotalSize();
+        if (size > std::numeric_limits<IndexType>::max())
+            LogicError("Gradient with %zu elements is too large for top-k compression.", size);
+
+        // Error feedback: elements that were not exchanged in earlier minibatches are added to the gradient.
+        auto gradient = encoded.host->DataBuffer<ElementType>();
+        auto residual = encoded.residual->WritableDataBuffer<ElementType>();
+        for (size_t i = 0; i < size; ++i)
+            residual[i] += gradient[i];
+
+        // The same number of elements is selected on all workers, so the payloads can be concatenated.
+        size_t k = std::min(size, std::max<size_t>(1, static_cast<size_t>(std::ceil(m_topKRatio * size))));
+        std::vector<size_t> indices(size);
+        std::iota(indices.begin(), indices.end(), 0);
+        if (k < size)
+        {
+            std::nth_element(indices.begin(), indices.begin() + k, indices.end(),
+                [residual](size_t a, size_t b) { return std::abs(residual[a]) > std::abs(residual[b]); });
+            indices.resize(k);
+            std::sort(indices.begin(), indices.end());
+        }
+
+        encoded.payload = MakeSharedObject<NDArrayView>(AsDataType<ElementType>(), NDShape{ 2 * k }, DeviceDescriptor::CPUDevice());
+        auto payload = encoded.payload->WritableDataBuffer<ElementType>();
+        for (size_t j = 0; j < k; ++j)
+        {
+            IndexType index = static_cast<IndexType>(indices[j]);
+            memcpy(payload + j, &index, sizeof(index));
+            payload[k + j] = residual[indices[j]];
+            residual[indices[j]] = 0;
+        }
+    }
+
+    template <typename ElementType>
+    void DataParallelDistributedLearner::DecodeTopK(EncodedGradient& encoded)
+    {
+        typedef TopKIndex<ElementType> IndexType;
+
+        size_t size = encoded.host->Shape().TotalSize();
+        size_t k = encoded.payload->Shape().TotalSize() / 2;
+        size_t numberOfWorkers = encoded.gathered->Shape().TotalSize() / (2 * k);
+
+        auto source = encoded.gathered->DataBuffer<ElementType>();
+        auto target = encoded.host->WritableDataBuffer<ElementType>();
+        std::fill(target, target + size, static_cast<ElementType>(0));
+        for (size_t w = 0; w < numberOfWorkers; ++w, source += 2 * k)
+        {
+            for (size_t j = 0; j < k; ++j)
+            {
+                IndexType index;
+                memcpy(&index, source + j, sizeof(index));
+                if (index >= size)
+                    LogicError("Invalid element index %zu in a top-k compressed gradient.", static_cast<size_t>(index));
+                target[index] += source[k + j];
+            }
+        }
+    }
 }
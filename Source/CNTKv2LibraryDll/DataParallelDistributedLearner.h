@@ -18,7 +18,53 @@ namespace CNTK
     public:
         DataParallelDistributedLearner(DistributedCommunicatorPtr communicator, LearnerPtr learner, size_t distributedAfterSamples, bool useAsyncBufferedParameterUpdate);
 
+        DataParallelDistributedLearner(DistributedCommunicatorPtr communicator, LearnerPtr learner, size_t distributedAfterSamples, GradientCompression compression, double topKRatio, size_t bucketSizeInBytes);
+
         // Optional override that gets called per minibatch after finishing gradient computation but before updating model parameters
         bool Update(std::unordered_map<Parameter, NDArrayViewPtr>& gradientValues, MinibatchInfo& trainingSampleCount) override;
+
+        Dictionary CreateCheckpoint() override;
+
+        void RestoreFromCheckpoint(const Dictionary& checkpoint) override;
+
+        size_t BytesSent() const override { return m_bytesSent; }
+        size_t BytesReceived() const override { return m_bytesReceived; }
+        size_t UncompressedBytes() const override { return m_uncompressedBytes; }
+
+    private:
+        // Gradient of one parameter prepared for the exchange.
+        struct EncodedGradient
+        {
+            NDArrayViewPtr gradient;
+            NDArrayViewPtr host;
+            NDArrayViewPtr payload;
+            NDArrayViewPtr gathered;
+            NDArrayViewPtr residual;
+        };
+
+        void AggregateBuckets(MinibatchInfo& info);
+        void Encode(EncodedGradient& encoded);
+        void Decode(EncodedGradient& encoded);
+        void Exchange(std::vector<EncodedGradient>& bucket);
+
+        template <typename ElementType>
+        void EncodeTopK(EncodedGradient& encoded);
+        template <typename ElementType>
+        void DecodeTopK(EncodedGradient& encoded);
+        template <typename ElementType>
+        void EncodeFloat16(EncodedGradient& encoded);
+        template <typename ElementType>
+        void DecodeFloat16(EncodedGradient& encoded);
+
+        GradientCompression m_compression;
+        double m_topKRatio;
+        size_t m_bucketSizeInBytes;
+
+        // Part of the gradients not exchanged yet with GradientCompression::TopK (error feedback).
+        std::unordered_map<Parameter, NDArrayViewPtr> m_residuals;
+
+        size_t m_bytesSent;
+        size_t m_bytesReceived;
+        size_t m_uncompressedBytes;
     };
 }
\ No newline at end of file
@@ -49,6 +49,11 @@ namespace CNTK
             m_combinedEvalFunction = Combine(GetCombinedEvalFunctionArgs());
     }
 
+    DistributedCommunicatorPtr Evaluator::GetCommunicator() const
+    {
+        return MPICommunicator();
+    }
+
     std::vector<Variable> Evaluator::GetCombinedEvalFunctionArgs() const
     {
         if (!m_evaluationFunction)
@@ -127,7 +132,7 @@ namespace CNTK
             double localSampleCount = static_cast<double>(result.second);
 
             auto values = std::vector<NDArrayViewPtr>{ result.first->Data(), MakeSharedObject<NDArrayView>(NDShape{}, &localSampleCount, 1, DeviceDescriptor::CPUDevice()) };
-            DistributedCommunicatorPtr communicator = MPICommunicator();
+            DistributedCommunicatorPtr communicator = GetCommunicator();
             communicator->AggregateInPlace(values, communicator->Workers());
             result.second = static_cast<size_t>(localSampleCount);
         }
@@ -475,19 +475,22 @@ namespace CNTK
         stream->flush();
     }
 
-    /*static*/ FunctionPtr Function::Load(const std::wstring& filepath, const DeviceDescriptor& computeDevice)
+    /*static*/ FunctionPtr Function::Load(const std::wstring& filepath, const DeviceDescriptor& computeDevice, bool lazy)
     {
-        auto stream = GetFstream(filepath, true);
-        if (!Internal::IsLegacyModel(*stream))
+        // The model is parsed in place from the mapped file. Unless loading lazily, the file is unmapped again
+        // before the parameters are created on the compute device. Otherwise the parameters refer to their values
+        // in the mapped file, which stays mapped until all of them have been copied out of it.
+        auto file = std::make_shared<MappedFile>(filepath, /*sequentialAccess =*/ !lazy);
+        if (Internal::IsLegacyModel(file->Data(), file->Size()))
+            return Internal::LoadLegacyModel(filepath, computeDevice); // throw an exception if deserializer != nullptr?
+
+        auto model = LoadDictionaryFromBuffer(file->Data(), file->Size(), /*referenceValues =*/ lazy);
+        if (!lazy)
         {
-            Dictionary model;
-            *stream >> model;
+            file = nullptr;
             return Function::Deserialize(model, computeDevice);
         }
-        else
-        {
-            return Internal::LoadLegacyModel(filepath, computeDevice); // throw an exception if deserializer != nullptr?
-        }
+        return CompositeFunction::Deserialize(model, computeDevice, file);
     }
 
     /*static*/ FunctionPtr Function::Load(const char *buffer, size_t length, const DeviceDescriptor& computeDevice)
@@ -495,24 +498,11 @@ namespace CNTK
         if ((buffer == nullptr) || (length <= 0))
             InvalidArgument("The model buffer should not be null and its length should be greater than 0");
 
-        struct modelStreamBuffer : std::streambuf
-        {
-            modelStreamBuffer(const char* start, size_t size) {
-                // std::streambuf::setg() requires char *
-                char* first = const_cast<char*>(start);
-                this->setg(first, first, first + size);
-            }
-        };
-
         if (Internal::IsLegacyModel(buffer, length))
             InvalidArgument("Loading a legacy model from byte array is not supported.");
-        else
-        {
-            modelStreamBuffer buf(buffer, length);
-            std::istream modelStream(&buf);
 
-            return Load(modelStream, computeDevice);
-        }
+        auto model = LoadDictionaryFromBuffer(buffer, length);
+        return Function::Deserialize(model, computeDevice);
     }
 
     /*static*/ FunctionPtr Function::Load(std::istream& inputStream, const DeviceDescriptor& computeDevice)
@@ -524,11 +514,17 @@ namespace CNTK
 
     void Function::Restore(const std::wstring& filepath)
     {
-        auto stream = GetFstream(filepath, true);
-        if (!Internal::IsLegacyModel(*stream))
+        bool isLegacyModel;
+        Dictionary model;
+        {
+            MappedFile file(filepath);
+            isLegacyModel = Internal::IsLegacyModel(file.Data(), file.Size());
+            if (!isLegacyModel)
+                model = LoadDictionaryFromBuffer(file.Data(), file.Size());
+        }
+
+        if (!isLegacyModel)
         {
-            Dictionary model;
-            *stream >> model;
             RestoreFromCheckpoint(model);
             return;
         }
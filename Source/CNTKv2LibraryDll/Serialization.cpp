@@ -6,11 +6,13 @@
 #include "stdafx.h"
 #include "CNTKLibrary.h"
 #include "Utils.h"
+#include "Serialization.h"
 #include <istream>
 #include <ostream>
 #include <string>
 #include <vector>
 #include <limits>
+#include <algorithm>
 
 #ifdef _MSC_VER
 #include <io.h>
@@ -113,6 +115,209 @@ namespace CNTK
     };
 
 
+    // Location of the values of an NDArrayView in a serialized message.
+    struct ValueReference
+    {
+        const char* data;
+        size_t size;
+        DataType dataType;
+    };
+
+    // Minimal reader of the protobuf wire format, used to cut the values of the Parameters and Constants
+    // out of a serialized model before it is parsed, see Serializer::ReadReferencingValues.
+    struct WireField
+    {
+        uint32 number;
+        const char* begin;     // start of the tag
+        const char* payload;   // start of the payload of a length-delimited field, nullptr otherwise
+        size_t payloadSize;
+        const char* end;
+    };
+
+    static bool ReadVarint(const char*& cursor, const char* end, uint64& value)
+    {
+        value = 0;
+        for (int shift = 0; shift < 64 && cursor < end; shift += 7)
+        {
+            auto byte = static_cast<uint8>(*cursor++);
+            value |= static_cast<uint64>(byte & 0x7F) << shift;
+            if ((byte & 0x80) == 0)
+                return true;
+        }
+        return false;
+    }
+
+    static void WriteVarint(uint64 value, std::string& out)
+    {
+        while (value >= 0x80)
+        {
+            out.push_back(static_cast<char>((value & 0x7F) | 0x80));
+            value >>= 7;
+        }
+        out.push_back(static_cast<char>(value));
+    }
+
+    static bool NextField(const char*& cursor, const char* end, WireField& field)
+    {
+        uint64 tag, value;
+        field.begin = cursor;
+        field.payload = nullptr;
+        field.payloadSize = 0;
+        if (!ReadVarint(cursor, end, tag))
+            return false;
+
+        field.number = static_cast<uint32>(tag >> 3);
+        switch (tag & 7)
+        {
+        case 0: // varint
+            if (!ReadVarint(cursor, end, value))
+                return false;
+            break;
+        case 1: // 64-bit
+            if (end - cursor < 8)
+                return false;
+            cursor += 8;
+            break;
+        case 2: // length-delimited
+            if (!ReadVarint(cursor, end, value) || value > static_cast<uint64>(end - cursor))
+                return false;
+            field.payload = cursor;
+            field.payloadSize = static_cast<size_t>(value);
+            cursor += field.payloadSize;
+            break;
+        case 5: // 32-bit
+            if (end - cursor < 4)
+                return false;
+            cursor += 4;
+            break;
+        default: // groups are not used by CNTK.proto
+            return false;
+        }
+        field.end = cursor;
+        return true;
+    }
+
+    typedef std::function<bool(const char* data, size_t size, std::string& out)> PayloadRewriter;
+
+    // Appends the fields of a message to 'out', passing the payloads of the length-delimited fields
+    // with the given number through 'rewrite'.
+    static bool RewriteFields(const char* data, size_t size, uint32 number, const PayloadRewriter& rewrite, std::string& out)
+    {
+        const char* cursor = data;
+        const char* end = data + size;
+        WireField field;
+        while (cursor < end)
+        {
+            if (!NextField(cursor, end, field))
+                return false;
+
+            if (field.number != number || field.payload == nullptr)
+            {
+                out.append(field.begin, field.end - field.begin);
+                continue;
+            }
+
+            std::string payload;
+            if (!rewrite(field.payload, field.payloadSize, payload))
+                return false;
+
+            uint64 tag;
+            const char* tagEnd = field.begin;
+            ReadVarint(tagEnd, end, tag);
+            out.append(field.begin, tagEnd - field.begin);
+            WriteVarint(payload.size(), out);
+            out.append(payload);
+        }
+        return true;
+    }
+
+    // Appends a map entry to 'out', passing its value through 'rewrite' if its key is 'key'.
+    static bool RewriteMapValue(const char* data, size_t size, const std::string& key, const PayloadRewriter& rewrite, std::string& out)
+    {
+        static const uint32 keyNumber = 1, valueNumber = 2;
+
+        const char* cursor = data;
+        const char* end = data + size;
+        WireField field;
+        bool matches = false;
+        while (cursor < end)
+        {
+            if (!NextField(cursor, end, field))
+                return false;
+            if (field.number == keyNumber && field.payload != nullptr)
+                matches = (key.compare(0, std::string::npos, field.payload, field.payloadSize) == 0);
+        }
+
+        if (!matches)
+        {
+            out.append(data, size);
+            return true;
+        }
+        return RewriteFields(data, size, valueNumber, rewrite, out);
+    }
+
+    // Appends a serialized NDArrayView to 'out' without its values, if they are stored as a single packed field,
+    // and records where they are in 'values'.
+    static bool CutValues(const char* data, size_t size, ValueReference& values, std::string& out)
+    {
+        const char* cursor = data;
+        const char* end = data + size;
+        WireField field;
+        while (cursor < end)
+        {
+            if (!NextField(cursor, end, field))
+                return false;
+
+            if ((field.number == proto::NDArrayView::kFloatValuesFieldNumber || field.number == proto::NDArrayView::kDoubleValuesFieldNumber) &&
+                field.payload != nullptr && values.data == nullptr)
+            {
+                const char* valuesCursor = field.payload;
+                const char* valuesEnd = field.payload + field.payloadSize;
+                WireField packed;
+                if (NextField(valuesCursor, valuesEnd, packed) && valuesCursor == valuesEnd &&
+                    packed.number == proto::NDArrayView_FloatValues::kValueFieldNumber && packed.payload != nullptr)
+                {
+                    values.data = packed.payload;
+                    values.size = packed.payloadSize;
+                    values.dataType = (field.number == proto::NDArrayView::kFloatValuesFieldNumber) ? DataType::Float : DataType::Double;
+                    continue;
+                }
+            }
+            out.append(field.begin, field.end - field.begin);
+        }
+        return true;
+    }
+
+    // Copies a serialized composite Function to 'message', cutting the values of its inputs (Parameters and Constants) out
+    // of it. 'values' receives one entry per input, with a null 'data' for inputs whose values were kept in the message.
+    static bool CutInputValues(const char* buffer, size_t length, std::string& message, std::vector<ValueReference>& values)
+    {
+        const auto inputsName = ToString(inputsKey);
+        const auto valueName = ToString(valueKey);
+
+        auto cutValue = [&values](const char* data, size_t size, std::string& out) {
+            return RewriteFields(data, size, proto::DictionaryValue::kNdArrayViewValueFieldNumber,
+                [&values](const char* data, size_t size, std::string& out) { return CutValues(data, size, values.back(), out); }, out);
+        };
+
+        auto cutInput = [&values, &valueName, &cutValue](const char* data, size_t size, std::string& out) {
+            values.push_back({ nullptr, 0, DataType::Unknown });
+            return RewriteFields(data, size, proto::DictionaryValue::kDictionaryValueFieldNumber,
+                [&valueName, &cutValue](const char* data, size_t size, std::string& out) {
+                    return RewriteFields(data, size, proto::Dictionary::kDataFieldNumber,
+                        [&valueName, &cutValue](const char* data, size_t size, std::string& out) { return RewriteMapValue(data, size, valueName, cutValue, out); }, out);
+                }, out);
+        };
+
+        auto cutInputs = [&cutInput](const char* data, size_t size, std::string& out) {
+            return RewriteFields(data, size, proto::DictionaryValue::kVectorValueFieldNumber,
+                [&cutInput](const char* data, size_t size, std::string& out) { return RewriteFields(data, size, proto::Vector::kValueFieldNumber, cutInput, out); }, out);
+        };
+
+        return RewriteFields(buffer, length, proto::Dictionary::kDataFieldNumber,
+            [&inputsName, &cutInputs](const char* data, size_t size, std::string& out) { return RewriteMapValue(data, size, inputsName, cutInputs, out); }, message);
+    }
+
     class Serializer
     {
         friend std::ostream& operator<<(std::ostream&, const Dictionary&);
@@ -124,6 +329,8 @@ namespace CNTK
         friend class Dictionary;
         friend class DictionaryValue;
 
+        friend Dictionary LoadDictionaryFromBuffer(const char* buffer, size_t length, bool referenceValues);
+
         Serializer(const Dictionary& dict);
         Serializer(const DictionaryValue& dict);
 
@@ -153,11 +360,18 @@ namespace CNTK
         bool Read(const std::wstring& filename, Dictionary& dict);
         bool Read(const std::wstring& filename, DictionaryValue& value);
 
+        bool Read(const char* buffer, size_t length, Dictionary& dict);
+        bool ReadReferencingValues(const char* buffer, size_t length, Dictionary& dict);
+
         bool Read(std::wstring filename, const std::function<bool(io::ZeroCopyInputStream& input)>& callback);
+        bool Read(const char* buffer, size_t length, const std::function<bool(io::ZeroCopyInputStream& input)>& callback);
         bool Read(std::istream& stream, const std::function<bool(io::ZeroCopyInputStream& input)>& callback);
 
         bool ReadNDArrayViewData(io::ZeroCopyInputStream& input);
 
+        void ReferenceInputValues(const proto::Dictionary& src, const std::vector<ValueReference>& values);
+        NDArrayView* CreateReferencingView(const proto::NDArrayView& src, DataType dataType, const NDShape& shape);
+
         size_t GetTotalByteSize() 
         {
             return m_byteSize + m_proto->ByteSizeLong();
@@ -285,6 +499,12 @@ namespace CNTK
         Message* m_proto;
         std::vector<std::pair<NDArrayView*, proto::NDArrayView*>> m_arrayViews;
         size_t m_byteSize {0};
+
+        // Set by ReadReferencingValues: values cut out of the parsed message and, for messages larger
+        // than 2GB, the rest of the buffer holding the values stored after the message.
+        std::unordered_map<const proto::NDArrayView*, ValueReference> m_valueReferences;
+        const char* m_valueData {nullptr};
+        const char* m_valueDataEnd {nullptr};
     };
 
 
@@ -430,6 +650,13 @@ namespace CNTK
         std::unique_ptr<NDShape> shape(CreateFromProto(src.shape()));
         auto dataType = FromProtoType(src.data_type());
         auto storageFormat = FromProtoType(src.storage_format());
+        if (storageFormat == StorageFormat::Dense)
+        {
+            auto view = CreateReferencingView(src, dataType, *shape);
+            if (view != nullptr)
+                return view;
+        }
+
         NDArrayView* dst = new NDArrayView(dataType, storageFormat, *shape, DeviceDescriptor::CPUDevice());
 
         if (dataType == DataType::Float)
@@ -449,6 +676,39 @@ namespace CNTK
         return dst;
     }
 
+    // Returns a read-only view of the values of 'src' in the input buffer if they were cut out of the message,
+    // or stored after a message larger than 2GB, when reading with ReadReferencingValues. Returns nullptr otherwise.
+    NDArrayView* Serializer::CreateReferencingView(const proto::NDArrayView& src, DataType dataType, const NDShape& shape)
+    {
+        auto sizeInBytes = shape.TotalSize() * DataTypeSize(dataType);
+        const char* data = nullptr;
+
+        auto reference = m_valueReferences.find(&src);
+        if (reference != m_valueReferences.end())
+        {
+            if (reference->second.dataType != dataType || reference->second.size != sizeInBytes)
+                RuntimeError("The size of the serialized NDArrayView values (%zu bytes) does not match its shape '%S'.",
+                             reference->second.size, shape.AsString().c_str());
+            data = reference->second.data;
+        }
+        else if (m_valueData != nullptr)
+        {
+            auto inlineValues = (dataType == DataType::Float) ? src.float_values().value().size() : src.double_values().value().size();
+            if (inlineValues == shape.TotalSize())
+                return nullptr;
+
+            if (sizeInBytes > static_cast<size_t>(m_valueDataEnd - m_valueData))
+                RuntimeError("The serialized NDArrayView values are truncated.");
+            data = m_valueData;
+            m_valueData += sizeInBytes;
+        }
+
+        if (data == nullptr || sizeInBytes == 0)
+            return nullptr;
+
+        return new NDArrayView(dataType, shape, data, sizeInBytes, DeviceDescriptor::CPUDevice());
+    }
+
     proto::Vector* Serializer::CreateProto(const std::vector<DictionaryValue>& src, Arena* arena)
     {
         proto::Vector* dst = (arena != nullptr) ? 
@@ -723,21 +983,96 @@ namespace CNTK
         });
     }
 
+    bool Serializer::Read(const char* buffer, size_t length, Dictionary& dict)
+    {
+        m_proto = Arena::CreateMessage<proto::Dictionary>(&m_arena);
+        return Read(buffer, length, [this, &dict](io::ZeroCopyInputStream& input) {
+            Copy(*dynamic_cast<proto::Dictionary*>(m_proto), dict);
+            return ReadNDArrayViewData(input);
+        });
+    }
+
+    bool Serializer::ReadReferencingValues(const char* buffer, size_t length, Dictionary& dict)
+    {
+        m_proto = Arena::CreateMessage<proto::Dictionary>(&m_arena);
+
+        uint32 prefix = 0;
+        if (length >= sizeof(prefix))
+            io::CodedInputStream::ReadLittleEndian32FromArray(reinterpret_cast<const uint8*>(buffer), &prefix);
+
+        if (prefix == MAGIC_NUMBER)
+        {
+            // The values of a message larger than 2GB follow it, in the order they are read.
+            return Read(buffer, length, [this, buffer, length, &dict](io::ZeroCopyInputStream& input) {
+                m_valueData = buffer + input.ByteCount();
+                m_valueDataEnd = buffer + length;
+                Copy(*dynamic_cast<proto::Dictionary*>(m_proto), dict);
+                return true;
+            });
+        }
+
+        // Otherwise the values of the inputs are cut out of the message, so that the parser does not copy them.
+        std::string message;
+        std::vector<ValueReference> values;
+        if (!CutInputValues(buffer, length, message, values))
+            return false;
+
+        return Read(message.data(), message.size(), [this, &values, &dict](io::ZeroCopyInputStream& input) {
+            ReferenceInputValues(*dynamic_cast<proto::Dictionary*>(m_proto), values);
+            Copy(*dynamic_cast<proto::Dictionary*>(m_proto), dict);
+            return ReadNDArrayViewData(input);
+        });
+    }
+
+    void Serializer::ReferenceInputValues(const proto::Dictionary& src, const std::vector<ValueReference>& values)
+    {
+        auto inputs = src.data().find(ToString(inputsKey));
+        if (inputs == src.data().end())
+            return;
+
+        const auto& vector = inputs->second.vector_value().value();
+        if (vector.size() != values.size())
+            RuntimeError("Unexpected number of serialized inputs (%d instead of %zu).", vector.size(), values.size());
+
+        for (int i = 0; i < vector.size(); i++)
+        {
+            if (values[i].data == nullptr)
+                continue;
+
+            const auto& input = vector.Get(i).dictionary_value().data();
+            auto value = input.find(ToString(valueKey));
+            if (value != input.end())
+                m_valueReferences[&value->second.nd_array_view_value()] = values[i];
+        }
+    }
+
     bool Serializer::Read(std::wstring filename, const std::function<bool(io::ZeroCopyInputStream& input)>& callback)
     {
-        bool result;
-        auto fd = GetFileDescriptor(filename, true);
+        // Parse straight out of the page cache instead of copying the file through a read buffer.
+        MappedFile file(filename);
+        return Read(file.Data(), file.Size(), callback);
+    }
+
+    bool Serializer::Read(const char* buffer, size_t length, const std::function<bool(io::ZeroCopyInputStream& input)>& callback)
+    {
+        // ArrayInputStream takes an int size, so buffers larger than that are split
+        // into chunks and read back to back.
+        static const size_t MAX_CHUNK_SIZE = 1 << 30;
+        std::vector<std::unique_ptr<io::ArrayInputStream>> chunks;
+        std::vector<io::ZeroCopyInputStream*> streams;
+        for (size_t offset = 0; offset < length; offset += MAX_CHUNK_SIZE)
         {
-            io::FileInputStream input(fd, BLOCK_SIZE);
-            result = ParseMessage(input, *m_proto);
-            result = result && callback(input);
+            auto size = std::min(MAX_CHUNK_SIZE, length - offset);
+            chunks.push_back(make_unique<io::ArrayInputStream>(buffer + offset, static_cast<int>(size)));
+            streams.push_back(chunks.back().get());
         }
-#ifdef _MSC_VER
-        _close(fd);
-#else
-        close(fd);
-#endif
-        return result;
+
+        io::ConcatenatingInputStream input(streams.data(), static_cast<int>(streams.size()));
+        if (ParseMessage(input, *m_proto))
+        {
+            return callback(input);
+        }
+        return false;
     }
 
     bool Serializer::Read(std::istream& stream, const std::function<bool(io::ZeroCopyInputStream& input)>& callback)
@@ -784,6 +1119,15 @@ namespace CNTK
         return stream;
     }
 
+    Dictionary LoadDictionaryFromBuffer(const char* buffer, size_t length, bool referenceValues)
+    {
+        Dictionary dictionary;
+        Serializer serializer;
+        if (!(referenceValues ? serializer.ReadReferencingValues(buffer, length, dictionary) : serializer.Read(buffer, length, dictionary)))
+            RuntimeError("Failed to parse Dictionary from the input buffer.");
+        return dictionary;
+    }
+
     /*static*/ Dictionary Dictionary::Load(const std::wstring& filename)
     {
         Dictionary dictionary;
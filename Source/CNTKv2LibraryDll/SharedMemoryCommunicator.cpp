@@ -0,0 +1,433 @@
+//
+// Copyright (c) Microsoft. All rights reserved.
+// Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+//
+
+#include "stdafx.h"
+#include "CNTKLibrary.h"
+#include "Utils.h"
+#include "SharedMemoryCommunicator.h"
+
+#ifndef _MSC_VER
+#include <algorithm>
+#include <atomic>
+#include <cerrno>
+#include <chrono>
+#include <cstring>
+#include <sstream>
+#include <thread>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+namespace CNTK
+{
+#ifdef _MSC_VER
+    DistributedCommunicatorPtr SharedMemoryCommunicator(const std::wstring&, size_t, size_t, size_t)
+    {
+        RuntimeError("SharedMemoryCommunicator is not supported on Windows, please use the MPI communicator.");
+    }
+#else
+    DistributedCommunicatorPtr SharedMemoryCommunicator(const std::wstring& name, size_t numberOfWorkers, size_t workerRank, size_t bufferSizeInBytes)
+    {
+        return std::make_shared<SharedMemoryCommunicatorImpl>(name, numberOfWorkers, workerRank, bufferSizeInBytes);
+    }
+
+    static const uint64_t SEGMENT_MAGIC = 0x636e746b73686d31ULL; // "cntkshm1"
+    static const size_t CACHE_LINE_SIZE = 64;
+    static const size_t HEADER_SIZE = 4096;
+    static const auto ATTACH_TIMEOUT = std::chrono::seconds(120);
+
+    struct SharedMemoryCommunicatorImpl::Header
+    {
+        // Set by worker 0 once the fields below are initialized.
+        std::atomic<uint64_t> m_magic;
+        uint64_t m_numberOfWorkers;
+        uint64_t m_halfBufferSize;
+
+        // Barrier state, on separate cache lines since all workers spin on them.
+        alignas(CACHE_LINE_SIZE) std::atomic<uint64_t> m_arrived;
+        alignas(CACHE_LINE_SIZE) std::atomic<uint64_t> m_generation;
+    };
+
+    SharedMemoryCommunicatorImpl::SharedMemoryCommunicatorImpl(const std::wstring& name, size_t numberOfWorkers, size_t workerRank, size_t bufferSizeInBytes)
+        : m_header(nullptr), m_buffers(nullptr), m_mappedSize(0), m_step(0)
+    {
+        static_assert(sizeof(Header) <= HEADER_SIZE, "Shared memory header does not fit into its page.");
+
+        if (name.empty() || name.find(L'/') != std::wstring::npos)
+            InvalidArgument("SharedMemoryCommunicator: name '%S' must be non-empty and must not contain '/'.", name.c_str());
+
+        if (numberOfWorkers == 0 || workerRank >= numberOfWorkers)
+            InvalidArgument("SharedMemoryCommunicator: worker rank %zu is out of range for %zu workers.", workerRank, numberOfWorkers);
+
+        if (bufferSizeInBytes < 2 * CACHE_LINE_SIZE)
+            InvalidArgument("SharedMemoryCommunicator: buffer size must be at least %zu bytes.", 2 * CACHE_LINE_SIZE);
+
+        m_segmentName = "/cntk-" + ToString(name);
+        m_halfBufferSize = (bufferSizeInBytes / 2) & ~(CACHE_LINE_SIZE - 1);
+        m_mappedSize = HEADER_SIZE + numberOfWorkers * 2 * m_halfBufferSize;
+
+        m_currentWorker.m_globalRank = workerRank;
+        m_currentWorker.m_hostId = L"";
+        for (size_t i = 0; i < numberOfWorkers; ++i)
+            m_workers.insert({ i, L"" });
+
+        // Worker 0 creates the segment, the others wait for it to appear. Creation fails if the segment
+        // already exists, so a name must not be reused by two runs at the same time.
+        int fd = -1;
+        auto deadline = std::chrono::steady_clock::now() + ATTACH_TIMEOUT;
+        if (workerRank == 0)
+        {
+            fd = shm_open(m_segmentName.c_str(), O_CREAT | O_EXCL | O_RDWR, 0600);
+            if (fd < 0)
+                RuntimeError("SharedMemoryCommunicator: cannot create shared memory segment '%s' (%s).", m_segmentName.c_str(), strerror(errno));
+
+            if (ftruncate(fd, m_mappedSize) != 0)
+            {
+                close(fd);
+                shm_unlink(m_segmentName.c_str());
+                RuntimeError("SharedMemoryCommunicator: cannot allocate %zu bytes of shared memory (%s).", m_mappedSize, strerror(errno));
+            }
+        }
+        else
+        {
+            struct stat st;
+            while ((fd = shm_open(m_segmentName.c_str(), O_RDWR, 0600)) < 0 || fstat(fd, &st) != 0 || (size_t)st.st_size < m_mappedSize)
+            {
+                if (fd >= 0)
+                    close(fd);
+                if (std::chrono::steady_clock::now() > deadline)
+                    RuntimeError("SharedMemoryCommunicator: timed out waiting for worker 0 to create shared memory segment '%s'.", m_segmentName.c_str());
+                std::this_thread::sleep_for(std::chrono::milliseconds(10));
+            }
+        }
+
+        auto data = mmap(nullptr, m_mappedSize, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd);
+        if (data == MAP_FAILED)
+            RuntimeError("SharedMemoryCommunicator: cannot map shared memory segment '%s' (%s).", m_segmentName.c_str(), strerror(errno));
+
+        m_header = static_cast<Header*>(data);
+        m_buffers = static_cast<char*>(data) + HEADER_SIZE;
+
+        if (workerRank == 0)
+        {
+            // The segment is zero filled, which is the initial barrier state.
+            m_header->m_numberOfWorkers = numberOfWorkers;
+            m_header->m_halfBufferSize = m_halfBufferSize;
+            m_header->m_magic.store(SEGMENT_MAGIC, std::memory_order_release);
+        }
+        else
+        {
+            while (m_header->m_magic.load(std::memory_order_acquire) != SEGMENT_MAGIC)
+            {
+                if (std::chrono::steady_clock::now() > deadline)
+                {
+                    munmap(data, m_mappedSize);
+                    RuntimeError("SharedMemoryCommunicator: timed out waiting for worker 0 to initialize shared memory segment '%s'.", m_segmentName.c_str());
+                }
+                std::this_thread::sleep_for(std::chrono::milliseconds(1));
+            }
+
+            if (m_header->m_numberOfWorkers != numberOfWorkers || m_header->m_halfBufferSize != m_halfBufferSize)
+            {
+                munmap(data, m_mappedSize);
+                RuntimeError("SharedMemoryCommunicator: workers of '%s' disagree on the number of workers or the buffer size.", m_segmentName.c_str());
+            }
+        }
+
+        // Once everybody has mapped the segment, its name is no longer needed. Removing it right away
+        // means nothing is left behind in /dev/shm, even if a worker crashes later on.
+        Barrier();
+        if (workerRank == 0)
+            shm_unlink(m_segmentName.c_str());
+
+        // Dropout and random sampling functions created from now on get a different seed on every worker.
+        Internal::SetRandomSeedWorkerLayout(numberOfWorkers, workerRank);
+    }
+
+    SharedMemoryCommunicatorImpl::~SharedMemoryCommunicatorImpl()
+    {
+        if (m_header != nullptr)
+            munmap(m_header, m_mappedSize);
+    }
+
+    const std::unordered_set<DistributedWorkerDescriptor>& SharedMemoryCommunicatorImpl::Workers() const
+    {
+        return m_workers;
+    }
+
+    const DistributedWorkerDescriptor& SharedMemoryCommunicatorImpl::CurrentWorker() const
+    {
+        return m_currentWorker;
+    }
+
+    void SharedMemoryCommunicatorImpl::CheckWorkers(const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers)
+    {
+        // Currently all operations should be executed on all workers, we do not support subgroups.
+        if (sendToWorkers != m_workers)
+            NOT_IMPLEMENTED;
+    }
+
+    DistributedCommunicatorPtr SharedMemoryCommunicatorImpl::SubGroup(const std::unordered_set<DistributedWorkerDescriptor>&) const
+    {
+        NOT_IMPLEMENTED;
+    }
+
+    void SharedMemoryCommunicatorImpl::Concatenate(const std::vector<ValuePtr>&, std::vector<ValuePtr>&, const std::unordered_set<DistributedWorkerDescriptor>&)
+    {
+        NOT_IMPLEMENTED;
+    }
+
+    char* SharedMemoryCommunicatorImpl::Buffer(size_t workerRank) const
+    {
+        return m_buffers + (2 * workerRank + m_step) * m_halfBufferSize;
+    }
+
+    void SharedMemoryCommunicatorImpl::Barrier()
+    {
+        auto generation = m_header->m_generation.load(std::memory_order_acquire);
+        if (m_header->m_arrived.fetch_add(1, std::memory_order_acq_rel) + 1 == m_workers.size())
+        {
+            m_header->m_arrived.store(0, std::memory_order_relaxed);
+            m_header->m_generation.fetch_add(1, std::memory_order_acq_rel);
+            return;
+        }
+
+        for (size_t spin = 0; m_header->m_generation.load(std::memory_order_acquire) == generation; ++spin)
+        {
+            if (spin > 1000)
+                std::this_thread::yield();
+        }
+    }
+
+    // Copies 'count' elements, starting at element 'offset' of the concatenation of 'values', to or from 'buffer'.
+    template <typename ElementType>
+    static void CopyRange(const std::vector<NDArrayViewPtr>& values, size_t offset, size_t count, ElementType* buffer, bool toBuffer)
+    {
+        size_t start = 0;
+        for (size_t i = 0; i < values.size() && count > 0; ++i)
+        {
+            auto size = values[i]->Shape().TotalSize();
+            if (offset < start + size)
+            {
+                auto begin = offset - start;
+                auto n = std::min(size - begin, count);
+                auto data = values[i]->WritableDataBuffer<ElementType>() + begin;
+                if (toBuffer)
+                    memcpy(buffer, data, n * sizeof(ElementType));
+                else
+                    memcpy(data, buffer, n * sizeof(ElementType));
+                buffer += n;
+                offset += n;
+                count -= n;
+            }
+            start += size;
+        }
+    }
+
+    // Reduce-scatter followed by all-gather through the shared buffers: the values are processed in chunks
+    // that fit into a buffer; every worker copies its chunk into its own buffer, sums one slice of the chunk
+    // over all workers into the buffer of worker 0, and then reads the whole result from there.
+    template <typename ElementType>
+    void SharedMemoryCommunicatorImpl::AllReduce(const std::vector<NDArrayViewPtr>& values)
+    {
+        size_t totalSize = 0;
+        for (const auto& value : values)
+            totalSize += value->Shape().TotalSize();
+
+        const size_t numberOfWorkers = m_workers.size();
+        const size_t rank = m_currentWorker.m_globalRank;
+        const size_t chunkSize = m_halfBufferSize / sizeof(ElementType);
+        for (size_t offset = 0; offset < totalSize; offset += chunkSize)
+        {
+            auto count = std::min(chunkSize, totalSize - offset);
+            CopyRange(values, offset, count, reinterpret_cast<ElementType*>(Buffer(rank)), true);
+            Barrier();
+
+            // Summing in rank order gives all workers bitwise identical results.
+            auto result = reinterpret_cast<ElementType*>(Buffer(0));
+            size_t begin = count * rank / numberOfWorkers, end = count * (rank + 1) / numberOfWorkers;
+            for (size_t w = 1; w < numberOfWorkers; ++w)
+            {
+                auto other = reinterpret_cast<const ElementType*>(Buffer(w));
+                for (size_t i = begin; i < end; ++i)
+                    result[i] += other[i];
+            }
+            Barrier();
+
+            CopyRange(values, offset, count, result, false);
+            NextStep();
+        }
+    }
+
+    void SharedMemoryCommunicatorImpl::AggregateInPlace(
+        const std::vector<NDArrayViewPtr>& values,
+        const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers)
+    {
+        CheckWorkers(sendToWorkers);
+
+        if (m_workers.size() == 1) // No need to aggregate anything.
+            return;
+
+        // Values that are not on the CPU are aggregated through a CPU copy.
+        std::vector<NDArrayViewPtr> floatValues, doubleValues;
+        std::vector<std::pair<NDArrayViewPtr, NDArrayViewPtr>> copies;
+        for (const auto& value : values)
+        {
+            if (value->GetStorageFormat() != StorageFormat::Dense)
+                RuntimeError("SharedMemoryCommunicator: Aggregation for sparse matrices is currently not supported.");
+
+            auto cpuValue = value;
+            if (value->Device().Type() != DeviceKind::CPU)
+            {
+                cpuValue = MakeSharedObject<NDArrayView>(value->GetDataType(), value->Shape(), DeviceDescriptor::CPUDevice());
+                cpuValue->CopyFrom(*value);
+                copies.push_back({ value, cpuValue });
+            }
+
+            if (value->GetDataType() == DataType::Float)
+                floatValues.push_back(cpuValue);
+            else if (value->GetDataType() == DataType::Double)
+                doubleValues.push_back(cpuValue);
+            else
+                LogicError("SharedMemoryCommunicator: value DataType is not supported.");
+        }
+
+        AllReduce<float>(floatValues);
+        AllReduce<double>(doubleValues);
+
+        for (const auto& copy : copies)
+            copy.first->CopyFrom(*copy.second);
+    }
+
+    void SharedMemoryCommunicatorImpl::Aggregate(const std::vector<NDArrayViewPtr>& values,
+        std::vector<NDArrayViewPtr>& outputValues,
+        const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers)
+    {
+        if (outputValues.empty())
+        {
+            outputValues.resize(values.size());
+            for (size_t i = 0; i < values.size(); ++i)
+                outputValues[i] = MakeSharedObject<NDArrayView>(values[i]->GetDataType(), values[i]->Shape(), values[i]->Device());
+        }
+        else if (outputValues.size() != values.size())
+        {
+            NOT_IMPLEMENTED;
+        }
+
+        for (size_t i = 0; i < values.size(); ++i)
+            outputValues[i]->CopyFrom(*values[i]);
+
+        AggregateInPlace(outputValues, sendToWorkers);
+    }
+
+    void SharedMemoryCommunicatorImpl::AllReduceSparseBlockColumn(std::vector<NDArrayViewPtr>&)
+    {
+        RuntimeError("SharedMemoryCommunicator: Aggregation of sparse block column gradients is not supported.");
+    }
+
+    std::vector<std::string> SharedMemoryCommunicatorImpl::AllGather(const std::string& data)
+    {
+        const size_t numberOfWorkers = m_workers.size();
+        const size_t rank = m_currentWorker.m_globalRank;
+
+        // Exchange the sizes first, then the data in as many steps as the largest one needs.
+        uint64_t size = data.size();
+        memcpy(Buffer(rank), &size, sizeof(size));
+        Barrier();
+
+        std::vector<uint64_t> sizes(numberOfWorkers);
+        for (size_t w = 0; w < numberOfWorkers; ++w)
+            memcpy(&sizes[w], Buffer(w), sizeof(uint64_t));
+        NextStep();
+
+        std::vector<std::string> result(numberOfWorkers);
+        for (size_t w = 0; w < numberOfWorkers; ++w)
+            result[w].reserve(sizes[w]);
+
+        auto maxSize = *std::max_element(sizes.begin(), sizes.end());
+        for (size_t offset = 0; offset < maxSize; offset += m_halfBufferSize)
+        {
+            if (offset < data.size())
+                memcpy(Buffer(rank), data.data() + offset, std::min<size_t>(m_halfBufferSize, data.size() - offset));
+            Barrier();
+
+            for (size_t w = 0; w < numberOfWorkers; ++w)
+            {
+                if (offset < sizes[w])
+                    result[w].append(Buffer(w), std::min<size_t>(m_halfBufferSize, sizes[w] - offset));
+            }
+            NextStep();
+        }
+        return result;
+    }
+
+    void SharedMemoryCommunicatorImpl::Gather(
+        const Dictionary& input,
+        std::vector<std::shared_ptr<Dictionary>>& output,
+        const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers)
+    {
+        CheckWorkers(sendToWorkers);
+
+        std::stringstream dict;
+        dict << input;
+        auto gathered = AllGather(dict.str());
+
+        output.resize(m_workers.size(), std::make_shared<Dictionary>());
+        if (!m_currentWorker.IsMain())
+            return;
+
+        for (size_t i = 0; i < gathered.size(); ++i)
+        {
+            std::stringstream ss(gathered[i]);
+            output[i] = std::make_shared<Dictionary>();
+            ss >> *output[i];
+        }
+    }
+
+    void SharedMemoryCommunicatorImpl::Concatenate(const std::vector<NDArrayViewPtr>& input, std::vector<NDArrayViewPtr>& output, const std::unordered_set<DistributedWorkerDescriptor>& workers)
+    {
+        // TODO: Currently we only support concatenation of inputs of the same size.
+        CheckWorkers(workers);
+
+        // Check inputs, currently we support only CPU
+        auto nonCpu = std::find_if(input.begin(), input.end(), [](const NDArrayViewPtr& v) { return v->Device() != DeviceDescriptor::CPUDevice(); });
+        if (nonCpu != input.end())
+            LogicError("SharedMemoryCommunicator: Currently only NDArrayViews located on CPU are supported for concatenation.");
+
+        const size_t numberOfWorkers = m_workers.size();
+        output.resize(input.size());
+        for (size_t i = 0; i < input.size(); ++i)
+        {
+            auto& in = input[i];
+            auto& out = output[i];
+            if (in->GetDataType() != DataType::Float && in->GetDataType() != DataType::Double)
+                LogicError("SharedMemoryCommunicator: input DataType is not supported.");
+
+            if (out == nullptr ||
+                out->Shape().TotalSize() != numberOfWorkers * in->Shape().TotalSize() ||
+                out->GetDataType() != in->GetDataType())
+            {
+                // Allocating flat array for all ranks.
+                out = std::make_shared<NDArrayView>(in->GetDataType(), NDShape{ in->Shape().TotalSize() * numberOfWorkers }, DeviceDescriptor::CPUDevice());
+            }
+
+            auto sizeInBytes = in->Shape().TotalSize() * DataTypeSize(in->GetDataType());
+            auto source = in->GetDataType() == DataType::Float ? (const char*)in->DataBuffer<float>() : (const char*)in->DataBuffer<double>();
+            auto target = in->GetDataType() == DataType::Float ? (char*)out->WritableDataBuffer<float>() : (char*)out->WritableDataBuffer<double>();
+
+            auto gathered = AllGather(std::string(source, sizeInBytes));
+            for (size_t w = 0; w < numberOfWorkers; ++w)
+            {
+                if (gathered[w].size() != sizeInBytes)
+                    LogicError("SharedMemoryCommunicator: Concatenation of inputs of different sizes is not supported.");
+                memcpy(target + w * sizeInBytes, gathered[w].data(), sizeInBytes);
+            }
+        }
+    }
+#endif
+}
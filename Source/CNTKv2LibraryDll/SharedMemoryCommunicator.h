@@ -0,0 +1,85 @@
+//
+// Copyright (c) Microsoft. All rights reserved.
+// Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+//
+
+#pragma once
+
+#include "CNTKLibrary.h"
+
+namespace CNTK
+{
+    ///
+    /// Communicator for worker processes on a single machine. The workers exchange data through a POSIX shared memory
+    /// segment (under /dev/shm) that holds a header with the synchronization state and one exchange buffer per worker.
+    /// No MPI installation is needed.
+    ///
+    class SharedMemoryCommunicatorImpl final : public DistributedCommunicator
+    {
+    public:
+        SharedMemoryCommunicatorImpl(const std::wstring& name, size_t numberOfWorkers, size_t workerRank, size_t bufferSizeInBytes);
+
+        virtual const std::unordered_set<DistributedWorkerDescriptor>& Workers() const override;
+
+        virtual const DistributedWorkerDescriptor& CurrentWorker() const override;
+
+        virtual DistributedCommunicatorPtr SubGroup(const std::unordered_set<DistributedWorkerDescriptor>& subGroupWorkers) const override;
+
+        virtual void Concatenate(
+            const std::vector<ValuePtr>& values,
+            std::vector<ValuePtr>& outValues,
+            const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers) override;
+
+        virtual void Concatenate(
+            const std::vector<NDArrayViewPtr>& input,
+            std::vector<NDArrayViewPtr>& output,
+            const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers) override;
+
+        virtual void Gather(
+            const Dictionary& input,
+            std::vector<DictionaryPtr>& output,
+            const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers) override;
+
+        virtual void AggregateInPlace(
+            const std::vector<NDArrayViewPtr>& values,
+            const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers) override;
+
+        virtual void AllReduceSparseBlockColumn(
+            std::vector<NDArrayViewPtr>& sbcValues) override;
+
+        virtual void Aggregate(
+            const std::vector<NDArrayViewPtr>& inValues,
+            std::vector<NDArrayViewPtr>& outValues,
+            const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers) override;
+
+        virtual void Barrier() override;
+
+        virtual ~SharedMemoryCommunicatorImpl();
+
+    private:
+        struct Header;
+
+        void CheckWorkers(const std::unordered_set<DistributedWorkerDescriptor>& sendToWorkers);
+
+        // Exchange buffer of a worker for the current step. Every buffer is split into two halves that
+        // consecutive steps alternate between, so a step can start filling its half while other workers
+        // are still reading the result of the previous step.
+        char* Buffer(size_t workerRank) const;
+        void NextStep() { m_step ^= 1; }
+
+        template <typename ElementType>
+        void AllReduce(const std::vector<NDArrayViewPtr>& values);
+
+        std::vector<std::string> AllGather(const std::string& data);
+
+        std::string m_segmentName;
+        Header* m_header;
+        char* m_buffers;
+        size_t m_mappedSize;
+        size_t m_halfBufferSize;
+        size_t m_step;
+
+        DistributedWorkerDescriptor m_currentWorker;
+        std::unordered_set<DistributedWorkerDescriptor> m_workers;
+    };
+}
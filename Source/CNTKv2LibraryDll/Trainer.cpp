@@ -367,12 +367,79 @@ namespace CNTK
         return modelFilePath + checkpointExt;
     }
 
+    // Writes the serialized model and trainer state to temporary files and renames them into place,
+    // so that a checkpoint is either complete or absent.
+    static void WriteCheckpointFiles(const std::wstring& modelFilePath, const Dictionary& model, const Dictionary& state)
+    {
+        std::wstring tempModelFile = modelFilePath + L".tmp";
+        {
+            auto stream = GetFstream(tempModelFile, false);
+            *stream << model;
+            stream->flush();
+        }
+
+        std::wstring trainerStateCheckpointFilePath = GetTrainerStateCheckpointFilePath(modelFilePath);
+        std::wstring tempCheckpointFile = trainerStateCheckpointFilePath + L".tmp";
+
+        {
+            auto stream = GetFstream(tempCheckpointFile, false);
+            *stream << state;
+            stream->flush();
+        }
+
+        // The return value is ignored here.
+        _wunlink(modelFilePath.c_str());
+        _wunlink(trainerStateCheckpointFilePath.c_str());
+
+        renameOrDie(tempModelFile, modelFilePath);
+        renameOrDie(tempCheckpointFile, trainerStateCheckpointFilePath);
+    }
+
+    DistributedCommunicatorPtr Trainer::GetCommunicator() const
+    {
+        // Distributed trainers use the communicator of their distributed learners.
+        auto communicator = m_parameterLearners->GetCommunicator();
+        return communicator ? communicator : Evaluator::GetCommunicator();
+    }
+
+    Trainer::~Trainer()
+    {
+        // Do not lose checkpoints that are still being written; errors cannot be reported from here.
+        for (auto& pending : m_pendingCheckpoints)
+            pending.wait();
+    }
+
     void Trainer::SaveCheckpoint(const std::wstring& modelFilePath, Dictionary externalState)
+    {
+        SaveCheckpoint(modelFilePath, externalState, 0);
+    }
+
+    void Trainer::SaveCheckpointAsync(const std::wstring& modelFilePath, Dictionary externalState, size_t maxPendingCheckpoints)
+    {
+        if (maxPendingCheckpoints == 0)
+            InvalidArgument("The maximum number of pending checkpoints must be positive.");
+
+        SaveCheckpoint(modelFilePath, externalState, maxPendingCheckpoints);
+    }
+
+    void Trainer::WaitForPendingCheckpoints()
+    {
+        auto pending = std::move(m_pendingCheckpoints);
+        m_pendingCheckpoints.clear();
+
+        // Wait for all writes before reporting the first error.
+        for (auto& checkpoint : pending)
+            checkpoint.wait();
+        for (auto& checkpoint : pending)
+            checkpoint.get();
+    }
+
+    void Trainer::SaveCheckpoint(const std::wstring& modelFilePath, Dictionary externalState, size_t maxPendingCheckpoints)
     {
         auto learnersState = m_parameterLearners->CreateCheckpoint();
 
         if (!m_distributed)
-            return Save(modelFilePath, learnersState, externalState);
+            return Save(modelFilePath, learnersState, externalState, {}, maxPendingCheckpoints);
 
         auto compositeFunction = dynamic_cast<CompositeFunction*>(m_combinedTrainingFunction.get());
 
@@ -381,7 +448,7 @@ namespace CNTK
         state[externalWorkerStateKey] = externalState;
 
         // Collect distrbuted external state.
-        DistributedCommunicatorPtr communicator = MPICommunicator();
+        DistributedCommunicatorPtr communicator = GetCommunicator();
         communicator->Barrier();
 
         std::vector<DictionaryPtr> remoteState;
@@ -401,31 +468,51 @@ namespace CNTK
         communicator->Barrier();
     }
 
-    void Trainer::Save(const std::wstring& modelFilePath, const std::vector<DictionaryValue>& learnerState, const Dictionary& externalState, const Dictionary& distributedState)
+    void Trainer::Save(const std::wstring& modelFilePath, const std::vector<DictionaryValue>& learnerState, const Dictionary& externalState, const Dictionary& distributedState, size_t maxPendingCheckpoints)
     {
-        std::wstring tempModelFile = modelFilePath + L".tmp";
-        Dictionary state;
-        state[versionPropertyName] = trainerCheckpointVersion;
-        state[learnersPropertyName] = learnerState;
-        state[externalStatePropertyName] = externalState;
-        state[distributedStatePropertyName] = distributedState;
+        auto state = std::make_shared<Dictionary>();
+        (*state)[versionPropertyName] = trainerCheckpointVersion;
+        (*state)[learnersPropertyName] = learnerState;
+        (*state)[externalStatePropertyName] = externalState;
+        (*state)[distributedStatePropertyName] = distributedState;
 
-        m_combinedTrainingFunction->Save(tempModelFile);
-        std::wstring trainerStateCheckpointFilePath = GetTrainerStateCheckpointFilePath(modelFilePath);
-        std::wstring tempCheckpointFile = trainerStateCheckpointFilePath + L".tmp";
+        // Serialization copies parameter values into host memory, so the snapshot
+        // is not affected by training that continues while it is being written.
+        auto model = std::make_shared<Dictionary>(m_combinedTrainingFunction->Serialize());
 
-        state.Save(tempCheckpointFile);
+        if (maxPendingCheckpoints == 0)
+        {
+            // Keep the order of writes to the same checkpoint files.
+            WaitForPendingCheckpoints();
+            WriteCheckpointFiles(modelFilePath, *model, *state);
+            return;
+        }
 
-        // The return value is ignored here.
-        _wunlink(modelFilePath.c_str());
-        _wunlink(trainerStateCheckpointFilePath.c_str());
+        while (m_pendingCheckpoints.size() >= maxPendingCheckpoints)
+        {
+            auto oldest = m_pendingCheckpoints.front();
+            m_pendingCheckpoints.erase(m_pendingCheckpoints.begin());
+            oldest.get();
+        }
 
-        renameOrDie(tempModelFile, modelFilePath);
-        renameOrDie(tempCheckpointFile, trainerStateCheckpointFilePath);
+        // Checkpoints are written one after another in the order they were taken.
+        std::shared_future<void> previous;
+        if (!m_pendingCheckpoints.empty())
+            previous = m_pendingCheckpoints.back();
+
+        m_pendingCheckpoints.push_back(std::async(std::launch::async, [modelFilePath, model, state, previous]()
+        {
+            if (previous.valid())
+                previous.wait();
+            WriteCheckpointFiles(modelFilePath, *model, *state);
+        }).share());
     }
 
     Dictionary Trainer::RestoreFromCheckpoint(const std::wstring& modelFilePath)
     {
+        // Restore from the last completed checkpoint.
+        WaitForPendingCheckpoints();
+
         // Restore the model's parameters
         m_combinedTrainingFunction->Restore(modelFilePath);
 
@@ -448,7 +535,7 @@ namespace CNTK
 
         // this ensures that nobody will start writing to the model/checkpoint files, until
         // everybody is done reading them.
-        DistributedCommunicatorPtr communicator = MPICommunicator();
+        DistributedCommunicatorPtr communicator = GetCommunicator();
         communicator->Barrier();
 
         auto mainWorkerId = std::to_wstring(0);
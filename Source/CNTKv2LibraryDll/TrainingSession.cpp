@@ -33,12 +33,19 @@ namespace CNTK
         const std::wstring& checkPointFileName,
         size_t checkpointFrequencyInSamples,
         bool restoreFromCheckpointIfExists,
-        bool preserveAllCheckpoints) :
+        bool preserveAllCheckpoints,
+        bool asyncCheckpoints,
+        size_t maxPendingCheckpoints) :
         m_preserveAll(preserveAllCheckpoints),
         m_restore(restoreFromCheckpointIfExists),
         m_fileName(checkPointFileName),
-        m_frequency(checkpointFrequencyInSamples)
+        m_frequency(checkpointFrequencyInSamples),
+        m_async(asyncCheckpoints),
+        m_maxPending(maxPendingCheckpoints)
     {
+        if (asyncCheckpoints && maxPendingCheckpoints == 0)
+            InvalidArgument("The maximum number of pending checkpoints must be positive for asynchronous checkpointing.");
+
         if (m_fileName.empty())
         {
             if (checkpointFrequencyInSamples != 0 && checkpointFrequencyInSamples != std::numeric_limits<size_t>::max())
@@ -56,13 +63,19 @@ namespace CNTK
         const MinibatchSizeSchedule& crossValidationSchedule,
         size_t crossValidationFrequencyInSamples,
         size_t maxSamples,
-        const std::unordered_map<Variable, StreamInformation>& inputVarToStream):
+        const std::unordered_map<Variable, StreamInformation>& inputVarToStream,
+        bool asyncCrossValidation,
+        size_t maxPendingCrossValidations):
         m_source(crossValidationSource),
         m_mbSize(crossValidationSchedule),
         m_frequency(crossValidationFrequencyInSamples),
         m_maxSamples(maxSamples),
-        m_varToStream(inputVarToStream)
+        m_varToStream(inputVarToStream),
+        m_async(asyncCrossValidation),
+        m_maxPending(maxPendingCrossValidations)
     {
+        if (asyncCrossValidation && maxPendingCrossValidations == 0)
+            InvalidArgument("The maximum number of pending cross validations must be positive for asynchronous cross validation.");
     }
 
     TestConfig::TestConfig(
@@ -147,6 +160,9 @@ namespace CNTK
             }
         }
 
+        if (m_cv.m_async && m_numberOfWorkers != 1)
+            InvalidArgument("Asynchronous cross validation is not supported in distributed training.");
+
         // Fill-in required actions.
         if (m_checkpoint.m_frequency != 0)
             m_actions.push_back({ m_checkpoint.m_frequency, 0, 0,
@@ -170,7 +186,10 @@ namespace CNTK
 
         if (m_cv.m_frequency != 0)
             m_actions.push_back({ m_cv.m_frequency , 0, 0,
-                [this](size_t currentIndex, const DeviceDescriptor& d) { return CrossValidate(currentIndex, d); } });
+                [this](size_t currentIndex, const DeviceDescriptor& d)
+                {
+                    return m_cv.m_async ? CrossValidateAsync(currentIndex, d) : CrossValidate(currentIndex, d);
+                } });
     }
 
     void TrainingSession::Train(const DeviceDescriptor& computeDevice)
@@ -207,6 +226,9 @@ namespace CNTK
             shouldTrain = Trainer()->TrainMinibatch(minibatch, computeDevice);
             earlyExit |= !OnMinibatchEnd(); // If the callback wants to have early exit - we stop training.
 
+            // Hand over results of asynchronous cross validations that have finished in the meantime.
+            earlyExit |= !DeliverCrossValidationResults(std::numeric_limits<size_t>::max());
+
 #ifndef CNTK_UWP
             auto profMisc = Microsoft::MSR::CNTK::ScopeProfile(Microsoft::MSR::CNTK::profilerEvtMainPost);
 #endif
@@ -238,6 +260,9 @@ namespace CNTK
             }
         }
 
+        // Training is over, so the remaining cross validation results are only reported.
+        DeliverCrossValidationResults(0);
+
         // In case of incremental - save final checkpoint.
         // This is required only when we keep all existing checkpoints, otherwise 
         // The checkpoint was already saved with the proper name.
@@ -246,6 +271,9 @@ namespace CNTK
             !fexists(m_checkpoint.m_fileName))
             SaveFinalCheckpoint();
 
+        // Make sure all asynchronous checkpoints are on disk before training is reported as done.
+        Trainer()->WaitForPendingCheckpoints();
+
         // Perform testing according to the test config.
         Test(computeDevice);
     }
@@ -268,33 +296,9 @@ namespace CNTK
             if (IsInfinite(m_cv.m_source, m_cv.m_maxSamples))
                 InvalidArgument("Cross validation minibatch source must have a limited number of samples or sweeps.");
 
-            std::unordered_map<Variable, ValuePtr> minibatch;
-            double accumulatedError = 0;
-            size_t totalNumberOfSamples = 0;
-            size_t numberOfMinibatches = 0;
-
-            std::pair<ValuePtr, size_t> errorAndCount;
-            auto checkpoint = m_cv.m_source->GetCheckpointState();
-            bool shouldCV = true;
-            while (shouldCV)
-            {
-                size_t samplesLeft = m_cv.m_maxSamples <= totalNumberOfSamples ? 0 : m_cv.m_maxSamples - totalNumberOfSamples;
-                GetCrossValidationMinibatch(minibatch, (std::min)(m_cv.m_mbSize[totalNumberOfSamples], samplesLeft), computeDevice);
-
-                // TODO: it may be slow to rely on TestMinibatch to return error each time, since it may require transfer
-                // of error from the GPU each time, accumulatedError can be allocated on GPU
-                shouldCV = m_trainer->TestMinibatch(minibatch, errorAndCount, computeDevice, m_numberOfWorkers != 1);
-                if (shouldCV)
-                {
-                    accumulatedError += errorAndCount.first->AsScalar<double>();
-                    totalNumberOfSamples += errorAndCount.second;
-                    numberOfMinibatches++;
-                }
-            }
-
-            m_cv.m_source->RestoreFromCheckpoint(checkpoint);
+            auto cv = RunCrossValidation(*m_trainer, currentIndex, m_numberOfWorkers != 1, computeDevice);
             Trainer()->SummarizeTestProgress();
-            result = OnCrossValidationEnd(currentIndex, accumulatedError / totalNumberOfSamples, totalNumberOfSamples, numberOfMinibatches);
+            result = OnCrossValidationEnd(currentIndex, cv.m_averageError, cv.m_numberOfSamples, cv.m_numberOfMinibatches);
         }
         else // Only invoking the callback.
         {
@@ -305,6 +309,93 @@ namespace CNTK
         return result;
     }
 
+    bool TrainingSession::CrossValidateAsync(size_t currentIndex, const DeviceDescriptor& computeDevice)
+    {
+        // Without a source there is nothing to evaluate, only the callback is invoked.
+        if (!m_cv.m_source)
+            return CrossValidate(currentIndex, computeDevice);
+
+        if (IsInfinite(m_cv.m_source, m_cv.m_maxSamples))
+            InvalidArgument("Cross validation minibatch source must have a limited number of samples or sweeps.");
+
+        if (!Trainer()->EvaluationFunction())
+            InvalidArgument("Asynchronous cross validation requires the trainer to have an evaluation function.");
+
+        bool result = DeliverCrossValidationResults(m_cv.m_maxPending - 1);
+
+        // The evaluation runs on its own copy of the current parameters, so training can keep updating
+        // the originals. It does not report to the trainer's progress writers, which training is using.
+        // The inputs are kept, so the clone can be fed minibatches keyed by the original input variables.
+        auto evaluationFunction = Trainer()->EvaluationFunction();
+        std::unordered_map<Variable, Variable> inputs;
+        for (const auto& argument : evaluationFunction->Arguments())
+            inputs[argument] = argument;
+        auto evaluator = CreateEvaluator(evaluationFunction->Clone(ParameterCloningMethod::Clone, inputs));
+
+        // All passes read the same cross validation source, so they run one after another.
+        std::shared_future<CrossValidationResult> previous;
+        if (!m_pendingCrossValidations.empty())
+            previous = m_pendingCrossValidations.back();
+
+        m_pendingCrossValidations.push_back(std::async(std::launch::async, [this, evaluator, currentIndex, computeDevice, previous]()
+        {
+            if (previous.valid())
+                previous.wait();
+            return RunCrossValidation(*evaluator, currentIndex, false, computeDevice);
+        }).share());
+
+        return result;
+    }
+
+    // Passes finished cross validation results to OnCrossValidationEnd in the order the cross validations
+    // were started. Waits for the oldest ones while more than maxPending are still running.
+    bool TrainingSession::DeliverCrossValidationResults(size_t maxPending)
+    {
+        bool result = true;
+        while (!m_pendingCrossValidations.empty())
+        {
+            auto oldest = m_pendingCrossValidations.front();
+            if (m_pendingCrossValidations.size() <= maxPending &&
+                oldest.wait_for(std::chrono::seconds(0)) != std::future_status::ready)
+                break;
+
+            m_pendingCrossValidations.erase(m_pendingCrossValidations.begin());
+            auto cv = oldest.get();
+            result &= OnCrossValidationEnd(cv.m_index, cv.m_averageError, cv.m_numberOfSamples, cv.m_numberOfMinibatches);
+        }
+        return result;
+    }
+
+    TrainingSession::CrossValidationResult TrainingSession::RunCrossValidation(Evaluator& evaluator, size_t currentIndex, bool distributed, const DeviceDescriptor& computeDevice)
+    {
+        std::unordered_map<Variable, ValuePtr> minibatch;
+        double accumulatedError = 0;
+        size_t totalNumberOfSamples = 0;
+        size_t numberOfMinibatches = 0;
+
+        std::pair<ValuePtr, size_t> errorAndCount;
+        auto checkpoint = m_cv.m_source->GetCheckpointState();
+        bool shouldCV = true;
+        while (shouldCV)
+        {
+            size_t samplesLeft = m_cv.m_maxSamples <= totalNumberOfSamples ? 0 : m_cv.m_maxSamples - totalNumberOfSamples;
+            GetCrossValidationMinibatch(minibatch, (std::min)(m_cv.m_mbSize[totalNumberOfSamples], samplesLeft), computeDevice);
+
+            // TODO: it may be slow to rely on TestMinibatch to return error each time, since it may require transfer
+            // of error from the GPU each time, accumulatedError can be allocated on GPU
+            shouldCV = evaluator.TestMinibatch(minibatch, errorAndCount, computeDevice, distributed);
+            if (shouldCV)
+            {
+                accumulatedError += errorAndCount.first->AsScalar<double>();
+                totalNumberOfSamples += errorAndCount.second;
+                numberOfMinibatches++;
+            }
+        }
+
+        m_cv.m_source->RestoreFromCheckpoint(checkpoint);
+        return { currentIndex, accumulatedError / totalNumberOfSamples, totalNumberOfSamples, numberOfMinibatches };
+    }
+
     void TrainingSession::Test(const DeviceDescriptor& computeDevice)
     {
         if (!m_test.m_source)
@@ -399,7 +490,11 @@ namespace CNTK
         wstring checkpointFile = m_checkpoint.m_fileName;
         if (m_checkpoint.m_preserveAll)
             checkpointFile += std::to_wstring(currentIndex);
-        Trainer()->SaveCheckpoint(checkpointFile, externalState);
+        if (m_checkpoint.m_async)
+            Trainer()->SaveCheckpointAsync(checkpointFile, externalState, m_checkpoint.m_maxPending);
+        else
+            Trainer()->SaveCheckpoint(checkpointFile, externalState);
+        // For asynchronous checkpoints the files may still be being written at this point.
         OnCheckpointEnd(currentIndex);
     }
 
@@ -14,6 +14,16 @@
 #include "Utils.h"
 #include "Serialization.h"
 #include <fcntl.h>
+#ifdef _MSC_VER
+#ifndef NOMINMAX
+#define NOMINMAX
+#endif
+#include <Windows.h>
+#else
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
 #include "PrimitiveFunction.h"
 #include "RecurrentNodes.h"
 #include "Value.h"
@@ -470,6 +480,78 @@ namespace CNTK
         return fd;
     }
 
+    MappedFile::MappedFile(const std::wstring& filePath, bool sequentialAccess)
+        : m_data(nullptr), m_size(0)
+    {
+#ifdef _MSC_VER
+        m_mapping = nullptr;
+        auto file = CreateFileW(filePath.c_str(), GENERIC_READ, FILE_SHARE_READ, nullptr, OPEN_EXISTING,
+                                sequentialAccess ? FILE_FLAG_SEQUENTIAL_SCAN : FILE_ATTRIBUTE_NORMAL, nullptr);
+        if (file == INVALID_HANDLE_VALUE)
+            RuntimeError("Cannot open file '%S' for reading.", filePath.c_str());
+
+        LARGE_INTEGER size;
+        if (!GetFileSizeEx(file, &size))
+        {
+            CloseHandle(file);
+            RuntimeError("Cannot determine the size of file '%S'.", filePath.c_str());
+        }
+
+        m_size = static_cast<size_t>(size.QuadPart);
+        if (m_size > 0)
+        {
+            m_mapping = CreateFileMappingW(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+            if (m_mapping != nullptr)
+                m_data = static_cast<const char*>(MapViewOfFile(m_mapping, FILE_MAP_READ, 0, 0, 0));
+        }
+        CloseHandle(file);
+
+        if (m_size > 0 && m_data == nullptr)
+        {
+            if (m_mapping != nullptr)
+                CloseHandle(m_mapping);
+            RuntimeError("Cannot map file '%S' into memory.", filePath.c_str());
+        }
+#else
+        auto fd = GetFileDescriptor(filePath, true);
+        struct stat st;
+        if (fstat(fd, &st) != 0)
+        {
+            close(fd);
+            RuntimeError("Cannot determine the size of file '%S'.", filePath.c_str());
+        }
+
+        m_size = static_cast<size_t>(st.st_size);
+        if (m_size > 0)
+        {
+            auto data = mmap(nullptr, m_size, PROT_READ, MAP_PRIVATE, fd, 0);
+            if (data == MAP_FAILED)
+            {
+                close(fd);
+                RuntimeError("Cannot map file '%S' into memory.", filePath.c_str());
+            }
+            if (sequentialAccess)
+                madvise(data, m_size, MADV_SEQUENTIAL);
+            m_data = static_cast<const char*>(data);
+        }
+        // The mapping stays valid after the descriptor is closed.
+        close(fd);
+#endif
+    }
+
+    MappedFile::~MappedFile()
+    {
+#ifdef _MSC_VER
+        if (m_data != nullptr)
+            UnmapViewOfFile(m_data);
+        if (m_mapping != nullptr)
+            CloseHandle(m_mapping);
+#else
+        if (m_data != nullptr)
+            munmap(const_cast<char*>(m_data), m_size);
+#endif
+    }
+
     std::string ToString(const std::wstring& wstring)
     {
 #ifdef _MSC_VER
@@ -1015,6 +1097,14 @@ namespace CNTK
             CheckDistributedLearners();
     }
 
+    DistributedCommunicatorPtr Learners::GetCommunicator() const
+    {
+        if (!m_isDistributed)
+            return nullptr;
+
+        return std::dynamic_pointer_cast<DistributedLearner>(m_learners.front())->GetCommunicator();
+    }
+
     void Learners::CheckDistributedLearners()
     {
         for (const auto& learner : m_learners)
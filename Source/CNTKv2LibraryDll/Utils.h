@@ -564,6 +564,34 @@ namespace CNTK
     std::shared_ptr<std::fstream> GetFstream(const std::wstring& filePath, bool readOnly);
     int GetFileDescriptor(const std::wstring& filePath, bool readOnly);
 
+    // Read-only memory mapping of a whole file. The mapped pages come straight from the OS page cache,
+    // so the file is parsed without being copied into a read buffer first.
+    // 'sequentialAccess' hints the OS to read ahead, for files that are about to be read front to back.
+    class MappedFile final
+    {
+    public:
+        explicit MappedFile(const std::wstring& filePath, bool sequentialAccess = true);
+        ~MappedFile();
+
+        const char* Data() const { return m_data; }
+        size_t Size() const { return m_size; }
+
+    private:
+        MappedFile(const MappedFile&) = delete;
+        MappedFile& operator=(const MappedFile&) = delete;
+
+        const char* m_data;
+        size_t m_size;
+#ifdef _MSC_VER
+        void* m_mapping;
+#endif
+    };
+
+    // Parses a serialized Dictionary in place from a memory buffer, without copying it into a stream first.
+    // If 'referenceValues' is true, the values of the Parameters and Constants of a serialized composite Function
+    // are not copied either: they are read-only views of the buffer, which must outlive them.
+    Dictionary LoadDictionaryFromBuffer(const char* buffer, size_t length, bool referenceValues = false);
+
     std::string ToString(const std::wstring& wstring);
     std::wstring ToWString(const std::string& string);
 
@@ -646,6 +674,9 @@ namespace CNTK
             return m_isDistributed;
         }
 
+        // Communicator of the distributed learners, null if the learners are not distributed.
+        DistributedCommunicatorPtr GetCommunicator() const;
+
     private:
         void GetLearnerGradients(LearnerPtr learner, const std::unordered_map<Parameter, NDArrayViewPtr>& allGradients, std::unordered_map<Parameter, NDArrayViewPtr>& learnerGradients);
         void CheckDistributedLearners();
@@ -120,10 +120,12 @@ namespace CNTK
         {
             std::call_once(*m_dataFields->m_initValueFlag, [=]{
                 assert(m_dataFields->m_value == nullptr);
-                assert(m_dataFields->m_valueInitializer);
+                assert(m_dataFields->m_valueInitializer || m_dataFields->m_valueSource);
                 assert(m_dataFields->m_valueInitializationDevice);
 
-                switch (GetDataType())
+                if (m_dataFields->m_valueSource)
+                    m_dataFields->m_value = m_dataFields->m_valueSource->DeepClone(*m_dataFields->m_valueInitializationDevice, false);
+                else switch (GetDataType())
                 {
                 case DataType::Float:
                 {
@@ -141,6 +143,8 @@ namespace CNTK
                 }
 
                 m_dataFields->m_valueInitializer = nullptr;
+                m_dataFields->m_valueSource = nullptr;
+                m_dataFields->m_valueSourceOwner = nullptr;
                 m_dataFields->m_valueInitializationDevice = nullptr;
             });
         }
@@ -166,6 +170,8 @@ namespace CNTK
                 // If the variable hasn't been initialized yet, clone the content of the supplied value and delete the initializer.
                 m_dataFields->m_value = value->DeepClone(*m_dataFields->m_valueInitializationDevice, false);
                 m_dataFields->m_valueInitializer = nullptr;
+                m_dataFields->m_valueSource = nullptr;
+                m_dataFields->m_valueSourceOwner = nullptr;
                 m_dataFields->m_valueInitializationDevice = nullptr;
                 alreadySet = true;
             });
@@ -241,6 +247,8 @@ namespace CNTK
 
         if (m_valueInitializer)
             clone->SetValueInitialization(*m_valueInitializer, *m_valueInitializationDevice);
+        else if (m_valueSource)
+            clone->SetValueSource(m_valueSource, m_valueSourceOwner, *m_valueInitializationDevice);
 
         return clone;
     }
@@ -265,6 +273,23 @@ namespace CNTK
         m_valueInitializationDevice.reset(new DeviceDescriptor(device));
     }
 
+    void VariableFields::SetValueSource(const NDArrayViewPtr& source, const std::shared_ptr<const void>& sourceOwner, const DeviceDescriptor& device)
+    {
+        if (m_value != nullptr)
+            LogicError("Variable '%S': Value source cannot be set if a value already exists", AsString().c_str());
+
+        if (source->GetDataType() != m_dataType)
+            InvalidArgument("The DataType of the Parameter/Constant Variable '%S' does not match the DataType of the associated Value", AsString().c_str());
+
+        assert(!m_valueInitializer);
+        assert(!m_valueInitializationDevice);
+
+        m_initValueFlag.reset(new std::once_flag());
+        m_valueSource = source;
+        m_valueSourceOwner = sourceOwner;
+        m_valueInitializationDevice.reset(new DeviceDescriptor(device));
+    }
+
     static ParameterInitializer CreateInitializer(const std::wstring& initializerTypeName, double scale, unsigned long seed) 
     {
         if (scale <= 0) 
@@ -474,6 +499,11 @@ namespace CNTK
     }
 
     /*static*/ Variable Variable::Deserialize(const Dictionary& dict, const CNTK::DeviceDescriptor& device)
+    {
+        return Deserialize(dict, device, nullptr);
+    }
+
+    /*static*/ Variable Variable::Deserialize(const Dictionary& dict, const CNTK::DeviceDescriptor& device, const std::shared_ptr<const void>& valueOwner)
     {
         static const vector<std::wstring> s_requiredDictionaryKeys = { typeKey, uidKey, kindKey, dataTypeKey, dynamicAxisKey, isSparseKey, needsGradientKey, shapeKey };
 
@@ -523,6 +553,17 @@ namespace CNTK
         {
             auto& value = dict[valueKey].Value<NDArrayView>();
 
+            if (valueOwner && !value.IsSparse())
+            {
+                // The value refers to memory kept alive by 'valueOwner', and is only copied to the device when first used.
+                Variable var(shape, kind, dataType, nullptr, needsGradient, dynamicAxis, isSparse, name, uid);
+                var.m_dataFields->SetValueSource(value.Alias(/*readOnly =*/ true), valueOwner, device);
+                if (var.IsParameter())
+                    return Parameter(var);
+                else
+                    return Constant(var);
+            }
+
             // TODO: this copying here is redundant, value should be moved from the dictionary to the variable.
             // Also, the correct device should be used upfront when deserializing NDArrayView.
             Variable var(shape, kind, dataType, value.DeepClone(device, value.IsReadOnly()), needsGradient, dynamicAxis, isSparse, name, uid);
@@ -23,6 +23,10 @@ namespace CNTK
         NDArrayViewPtr m_value;
         std::unique_ptr<ParameterInitializer> m_valueInitializer;
         std::unique_ptr<DeviceDescriptor> m_valueInitializationDevice;
+        // Value copied to m_valueInitializationDevice on first access instead of running m_valueInitializer,
+        // e.g. a view of a memory-mapped model file, and the object keeping the memory it refers to alive.
+        NDArrayViewPtr m_valueSource;
+        std::shared_ptr<const void> m_valueSourceOwner;
         bool m_needsGradient;
         std::wstring m_name;
         std::vector<Axis> m_dynamicAxes;
@@ -67,6 +71,7 @@ namespace CNTK
         FunctionPtr Owner() const;
 
         CNTK_API void SetValueInitialization(const ParameterInitializer& initializationConfig, const DeviceDescriptor& device);
+        void SetValueSource(const NDArrayViewPtr& source, const std::shared_ptr<const void>& sourceOwner, const DeviceDescriptor& device);
 
     private:
         // Disallow copy and move construction and assignment
@@ -95,9 +95,33 @@
 # In practice, TestDriver performs 1 pass through the output of run-test performing a real-time
 # matching against all test-cases/pattern simultaneously
 #
+# ----- Performance tracking ------
+# With --perf-history FILE the driver records for every successful run its duration, the sum of
+# epoch times (epochTime=... or "...s (... samples/s)" on "Finished Epoch" lines), the mean of
+# reported samples/sec and the peak resident memory of the test script. Each run is compared
+# against the median of the last --perf-window runs of the same configuration, metrics that got
+# worse by more than --perf-tolerance percent are reported at the end. --perf-gate turns them
+# into failures.
+#
+# ----- Parallel runs and result cache ------
+# With --jobs N up to N test runs (test x flavor x device x python version) execute concurrently.
+# Each run has its own run directory and environment, its output is captured in the output.txt
+# file of the run directory. GPU tests share the devices of the machine, so --jobs is mostly
+# useful for CPU-only validation.
+#
+# With --cache-dir DIR, successful runs are recorded in DIR and skipped on subsequent invocations
+# as long as the contents of the test directory, run-test-common, the run configuration and the
+# build (names, sizes and modification times of the files in the directory of the cntk binary,
+# of the shared libraries in the lib directory next to it and, for Python tests, of the files
+# of the cntk package found by the Python under test) are unchanged.
+#
+# Tests without test cases (which only check the exit code) have their output printed once
+# they finish, since with --jobs it cannot be shown while they run.
+#
 
 from __future__ import print_function
-import sys, os, argparse, traceback, yaml, subprocess, random, re, time, stat
+import sys, os, argparse, traceback, yaml, subprocess, random, re, time, stat, copy, hashlib, json, threading
+from multiprocessing.pool import ThreadPool
 
 thisDir = os.path.dirname(os.path.realpath(__file__))
 windows = os.getenv("OS")=="Windows_NT"
@@ -207,15 +231,16 @@ class Test:
   #   device - "cpu" or "gpu"
   #   pyVersion - Python version used (empty string for non-Python tests)
   #   args - command line arguments from argparse
+  #   pathPrefix - paths to prepend to PATH of the test script (e.g. location of the Python to test)
   # returns an instance of TestRunResult
-  def run(self, flavor, device, pyVersion, args):
+  def run(self, flavor, device, pyVersion, args, pathPrefix=''):
     # measuring the time of running of the test
     startTime = time.time()
-    result = self.runImpl(flavor, device, pyVersion, args)
+    result = self.runImpl(flavor, device, pyVersion, args, pathPrefix)
     result.duration = time.time() - startTime
     return result
 
-  def runImpl(self, flavor, device, pyVersion, args):
+  def runImpl(self, flavor, device, pyVersion, args, pathPrefix):
     result = TestRunResult()
     result.succeeded = True
 
@@ -249,41 +274,16 @@ class Test:
     if not os.path.isdir(runDir):
       os.makedirs(runDir)
 
-    # preparing environment for the test script
-    os.environ["TEST_FLAVOR"] = flavor
-    os.environ["TEST_DEVICE"] = device
-    os.environ["TEST_TAG"] = args.tag or ''
-    os.environ["TEST_BUILD_LOCATION"] = args.build_location
-    if windows:
-      if args.build_sku == "cpu":
-        os.environ["TEST_CNTK_BINARY"] = os.path.join(args.build_location, (flavor + "_CpuOnly"), "cntk.exe")
-      elif args.build_sku == "uwp":
-        os.environ["TEST_CNTK_BINARY"] = os.path.join(args.build_location, (flavor + "_UWP"), "cntk.exe")
-      else:
-        os.environ["TEST_CNTK_BINARY"] = os.path.join(args.build_location, flavor, "cntk.exe")
-      os.environ["MPI_BINARY"] = os.path.join(os.environ["MSMPI_BIN"], "mpiexec.exe")
-    else:
-      # No UWP on Linux
-      assert args.build_sku != "uwp"
-
-      tempPath = os.path.join(args.build_location, args.build_sku, flavor, "bin", "cntk")
-      if not os.path.isfile(tempPath):
-        for bsku in ["/build/gpu/", "/build/cpu/", "/build/1bitsgd/"]:
-          if tempPath.find(bsku) >= 0:
-            tempPath = tempPath.replace(bsku, "/build/")
-            break
-      os.environ["TEST_CNTK_BINARY"] = tempPath
-      os.environ["MPI_BINARY"] = "mpiexec"
-    os.environ["TEST_1BIT_SGD"] = ("1" if args.build_sku == "1bitsgd" else "0")
-    # N.B. no cntk.exe in UWP build
-    if args.build_sku != "uwp" and not os.path.exists(os.environ["TEST_CNTK_BINARY"]):
-      raise ValueError("the cntk executable does not exist at path '%s'"%os.environ["TEST_CNTK_BINARY"])
-    os.environ["TEST_BIN_DIR"] = os.path.dirname(os.environ["TEST_CNTK_BINARY"])
-    os.environ["TEST_DIR"] = self.testDir
-    os.environ["TEST_DATA_DIR"] = self.dataDir
-    os.environ["TEST_RUN_DIR"] = runDir
-    # WORKAROUND: changing current dir to the dataDir so relative paths in SCP files work as expected
-    os.chdir(self.dataDir)
+    # preparing environment for the test script. The environment of the driver
+    # itself is left untouched, so that several tests can run concurrently
+    env = dict(os.environ)
+    if pathPrefix:
+      env["PATH"] = pathPrefix + os.pathsep + env["PATH"]
+    env.update(self.buildEnvironment(flavor, args))
+    env["TEST_DEVICE"] = device
+    env["TEST_DIR"] = self.testDir
+    env["TEST_DATA_DIR"] = self.dataDir
+    env["TEST_RUN_DIR"] = runDir
     # Running test script
     #TODO:port this properly to windows
     # Writing standard output to the file and to the console (if --verbose)
@@ -297,7 +297,8 @@ class Test:
         st = os.stat(testScript)
         os.chmod(testScript, st.st_mode | stat.S_IEXEC | stat.S_IXOTH)
       cmdLine = ["bash", "-c", self.testDir + "/run-test 2>&1"]
-      process = subprocess.Popen(cmdLine, stdout=subprocess.PIPE)
+      # WORKAROUND: running in the dataDir so relative paths in SCP files work as expected
+      process = subprocess.Popen(cmdLine, stdout=subprocess.PIPE, env=env, cwd=self.dataDir)
 
       while True:
         line = process.stdout.readline()
@@ -323,8 +324,9 @@ class Test:
         output.flush()
         for testCaseRunResult in result.testCaseRunResults:
           testCaseRunResult.testCase.processLine(line, testCaseRunResult, args.verbose)
+        result.performance.processLine(line)
 
-    exitCode = process.wait()
+    exitCode, result.performance.peakRssKB = waitForProcess(process)
     success = True
 
     # saving log file path, so it can be reported later
@@ -369,6 +371,83 @@ class Test:
 
     return result
 
+  # Returns the environment variables describing the build under test
+  def buildEnvironment(self, flavor, args):
+    env = {}
+    env["TEST_FLAVOR"] = flavor
+    env["TEST_TAG"] = args.tag or ''
+    env["TEST_BUILD_LOCATION"] = args.build_location
+    if windows:
+      if args.build_sku == "cpu":
+        env["TEST_CNTK_BINARY"] = os.path.join(args.build_location, (flavor + "_CpuOnly"), "cntk.exe")
+      elif args.build_sku == "uwp":
+        env["TEST_CNTK_BINARY"] = os.path.join(args.build_location, (flavor + "_UWP"), "cntk.exe")
+      else:
+        env["TEST_CNTK_BINARY"] = os.path.join(args.build_location, flavor, "cntk.exe")
+      env["MPI_BINARY"] = os.path.join(os.environ["MSMPI_BIN"], "mpiexec.exe")
+    else:
+      # No UWP on Linux
+      assert args.build_sku != "uwp"
+
+      tempPath = os.path.join(args.build_location, args.build_sku, flavor, "bin", "cntk")
+      if not os.path.isfile(tempPath):
+        for bsku in ["/build/gpu/", "/build/cpu/", "/build/1bitsgd/"]:
+          if tempPath.find(bsku) >= 0:
+            tempPath = tempPath.replace(bsku, "/build/")
+            break
+      env["TEST_CNTK_BINARY"] = tempPath
+      env["MPI_BINARY"] = "mpiexec"
+    env["TEST_1BIT_SGD"] = ("1" if args.build_sku == "1bitsgd" else "0")
+    # N.B. no cntk.exe in UWP build
+    if args.build_sku != "uwp" and not os.path.exists(env["TEST_CNTK_BINARY"]):
+      raise ValueError("the cntk executable does not exist at path '%s'"%env["TEST_CNTK_BINARY"])
+    env["TEST_BIN_DIR"] = os.path.dirname(env["TEST_CNTK_BINARY"])
+    return env
+
+  # Computes the key of this test run in the result cache (see --cache-dir). The key
+  # covers the contents of the test directory, the shared test scripts, the
+  # configuration of the run and the identity of the build (names, sizes and
+  # modification times of the files next to the cntk binary, of the shared
+  # libraries and of the installed cntk Python package)
+  def cacheKey(self, flavor, device, pyVersion, pathPrefix, args):
+    h = hashlib.sha1()
+    def update(text):
+      h.update(text.encode("utf-8"))
+      h.update(b"\0")
+
+    update("{0}|{1}|{2}|{3}|{4}|{5}".format(self.fullName, flavor, device, args.build_sku, pyVersion, pathPrefix))
+
+    contents = []
+    for dirName, subdirList, fileList in os.walk(self.testDir):
+      subdirList.sort()
+      for fileName in sorted(fileList):
+        contents.append(os.path.join(dirName, fileName))
+    contents.append(os.path.join(thisDir, "run-test-common"))
+    for path in contents:
+      if os.path.isfile(path):
+        update(os.path.relpath(path, thisDir))
+        with open(path, "rb") as f:
+          h.update(f.read())
+
+    binDir = self.buildEnvironment(flavor, args)["TEST_BIN_DIR"]
+    update(os.path.realpath(binDir))
+    if os.path.isdir(binDir):
+      for fileName in sorted(os.listdir(binDir)):
+        st = os.stat(os.path.join(binDir, fileName))
+        update("{0}:{1}:{2}".format(fileName, st.st_size, int(st.st_mtime)))
+
+    # on Linux the shared libraries (libCntk*.so) live in the lib directory next to bin
+    libDir = os.path.join(os.path.dirname(binDir), "lib")
+    update(os.path.realpath(libDir))
+    updateWithFileStats(update, libDir)
+
+    if pyVersion:
+      packageDir = findPythonPackageDir("cntk", pathPrefix)
+      update(packageDir)
+      updateWithFileStats(update, packageDir)
+
+    return h.hexdigest()
+
   # Composes the full path of a new baseline file for a specified platform and device
   # Note this currently hardcodes the baseline file name to be baseline.<os>.<device>.txt
   # which is how the baselines currently exist for all CNTK E2E tests i.e. we have different
@@ -624,7 +703,10 @@ class TestRunResult:
   def __init__(self):
     self.succeeded = False;
     self.testCaseRunResults = [] # list of TestCaseRunResult
+    self.performance = PerformanceMetrics()
     self.duration = -1
+    self.logFile = None
+    self.cached = False # True if the result was taken from the result cache
 
   @staticmethod
   def fatalError(name, diagnostics, logFile = None):
@@ -640,6 +722,182 @@ class TestCaseRunResult:
     self.diagnostics = diagnostics
     self.expectedLines = [] # list of remaining unmatched expected lines from the baseline file for this test case run
 
+# Waits for the test script to finish
+# returns a tuple (exit code, peak resident set size of the script and its children in kB or None if unknown)
+def waitForProcess(process):
+  if not hasattr(os, "wait4"):
+    return process.wait(), None
+  pid, status, rusage = os.wait4(process.pid, 0)
+  if os.WIFSIGNALED(status):
+    process.returncode = -os.WTERMSIG(status)
+  else:
+    process.returncode = os.WEXITSTATUS(status)
+  # ru_maxrss is reported in bytes on macOS, in kilobytes elsewhere
+  peakRssKB = rusage.ru_maxrss // 1024 if sys.platform == "darwin" else rusage.ru_maxrss
+  return process.returncode, peakRssKB
+
+# Collects the speed and memory usage of a test run from its output, e.g.
+# Finished Epoch[ 5 of 5]: [Training] ce = 2.32253198 * 1000 err = 0.90000000 * 1000 totalSamplesSeen = 5000 learningRatePerSample = 2e-06 epochTime=0.175781s
+# Epoch[ 1 of 3]-Minibatch[   1-  10]: ce = 2.30112305 * 640; err = 0.87500000 * 640; time = 0.0585s; samplesPerSecond = 10941.9
+# Finished Epoch[1 of 10]: [Training] loss = 0.412500 * 6000, metric = 11.30% * 6000 1.233s (4866.2 samples/s);
+class PerformanceMetrics:
+  epochTimeRegexes = [re.compile(r".*Finished Epoch\[.*epochTime=([0-9.e+-]+)s?"),
+                      re.compile(r".*Finished Epoch\[.*\s([0-9.e+-]+)s \(\s*[0-9.e+-]+ samples/s\)")]
+  samplesPerSecondRegexes = [re.compile(r".*samplesPerSecond\s*=\s*([0-9.e+-]+)"),
+                             re.compile(r".*\(\s*([0-9.e+-]+) samples/s\)")]
+
+  def __init__(self):
+    self.epochTimes = []
+    self.samplesPerSecond = []
+    self.peakRssKB = None
+
+  def processLine(self, line):
+    if type(line) == bytes:
+      line = line.decode("utf-8", "replace")
+    if "Epoch" not in line and "samples" not in line:
+      return
+    for regexes, values in [(self.epochTimeRegexes, self.epochTimes), (self.samplesPerSecondRegexes, self.samplesPerSecond)]:
+      # the first matching regex wins, so that a line is counted at most once per metric
+      for regex in regexes:
+        m = regex.match(line)
+        if m:
+          try:
+            values.append(float(m.group(1)))
+          except ValueError:
+            pass
+          break
+
+  # returns a dictionary of the recorded metrics of a run with the given duration
+  def record(self, duration):
+    record = { "duration" : duration }
+    if self.epochTimes:
+      record["epochTime"] = sum(self.epochTimes)
+    if self.samplesPerSecond:
+      record["samplesPerSecond"] = sum(self.samplesPerSecond) / len(self.samplesPerSecond)
+    if self.peakRssKB:
+      record["peakRssKB"] = self.peakRssKB
+    return record
+
+# Local store of the performance records of past test runs (see --perf-history), which
+# serves as a rolling baseline to detect performance regressions
+class PerformanceHistory:
+  # metric => True if larger values are worse
+  metrics = { "duration" : True, "epochTime" : True, "samplesPerSecond" : False, "peakRssKB" : True }
+  # number of records kept per test run configuration
+  maxRecords = 50
+
+  def __init__(self, path, window, tolerance):
+    self.path = path
+    self.window = window
+    self.tolerance = tolerance
+    self.history = {}
+    if os.path.isfile(path):
+      with open(path, "r") as f:
+        self.history = json.load(f)
+
+  # returns the median of each metric over the last 'window' records of the given key
+  def baseline(self, key):
+    records = self.history.get(key, [])[-self.window:]
+    baseline = {}
+    for metric in self.metrics:
+      values = sorted([r[metric] for r in records if metric in r])
+      if values:
+        mid = len(values) // 2
+        baseline[metric] = values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2.0
+    return baseline
+
+  # compares a new record against the baseline and adds it to the history
+  # returns a list of (metric, baseline value, new value) tuples of the metrics that regressed
+  def add(self, key, record):
+    regressions = []
+    for metric, value in sorted(self.baseline(key).items()):
+      if metric not in record or value <= 0:
+        continue
+      change = (record[metric] - value) / value
+      if not self.metrics[metric]:
+        change = -change
+      if change * 100.0 > self.tolerance:
+        regressions.append((metric, value, record[metric]))
+
+    record = dict(record)
+    record["time"] = time.time()
+    self.history[key] = (self.history.get(key, []) + [record])[-self.maxRecords:]
+    return regressions
+
+  def save(self):
+    historyDir = os.path.dirname(os.path.abspath(self.path))
+    if not os.path.isdir(historyDir):
+      os.makedirs(historyDir)
+    tmpPath = self.path + ".tmp"
+    with open(tmpPath, "w") as f:
+      json.dump(self.history, f, indent=1, sort_keys=True)
+    if windows and os.path.exists(self.path):
+      os.remove(self.path)
+    os.rename(tmpPath, self.path)
+
+# Feeds the relative paths, sizes and modification times of all files below rootDir
+# to update (compiled Python files are skipped, since importing a package rewrites them)
+def updateWithFileStats(update, rootDir):
+  if not rootDir or not os.path.isdir(rootDir):
+    return
+  for dirName, subdirList, fileList in os.walk(rootDir):
+    subdirList[:] = sorted(d for d in subdirList if d != "__pycache__")
+    for fileName in sorted(fileList):
+      if fileName.endswith((".pyc", ".pyo")):
+        continue
+      path = os.path.join(dirName, fileName)
+      st = os.stat(path)
+      update("{0}:{1}:{2}".format(os.path.relpath(path, rootDir), st.st_size, int(st.st_mtime)))
+
+# Directory of the given package as found by the Python on PATH prefixed with pathPrefix
+# (without importing it), or '' if it is not installed. Results are memoized per pathPrefix.
+pythonPackageDirs = {}
+def findPythonPackageDir(packageName, pathPrefix):
+  key = (packageName, pathPrefix)
+  if key not in pythonPackageDirs:
+    env = dict(os.environ)
+    if pathPrefix:
+      env["PATH"] = pathPrefix + os.pathsep + env["PATH"]
+    script = "import pkgutil; l = pkgutil.find_loader('{0}'); print(l.get_filename() if l else '')".format(packageName)
+    try:
+      fileName = subprocess.check_output(["python", "-c", script], env=env).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+      fileName = ''
+    pythonPackageDirs[key] = os.path.dirname(fileName) if fileName else ''
+  return pythonPackageDirs[key]
+
+# Stores successful test run results by the key computed in Test.cacheKey,
+# one small JSON file per result
+class ResultCache:
+  def __init__(self, cacheDir):
+    self.cacheDir = cacheDir
+    if not os.path.isdir(cacheDir):
+      os.makedirs(cacheDir)
+
+  def get(self, key):
+    try:
+      with open(os.path.join(self.cacheDir, key + ".json"), "r") as f:
+        entry = json.load(f)
+    except (IOError, OSError, ValueError):
+      return None
+    result = TestRunResult()
+    result.succeeded = True
+    result.duration = entry["duration"]
+    result.logFile = entry.get("logFile")
+    result.cached = True
+    return result
+
+  def put(self, key, test, result):
+    entry = { "test" : test.fullName, "duration" : result.duration, "logFile" : result.logFile, "time" : time.time() }
+    # writing to a temporary file first, so concurrent readers never see partial entries
+    path = os.path.join(self.cacheDir, key + ".json")
+    tmpPath = "{0}.{1}.tmp".format(path, threading.current_thread().ident)
+    with open(tmpPath, "w") as f:
+      json.dump(entry, f)
+    if windows and os.path.exists(path):
+      os.remove(path)
+    os.rename(tmpPath, path)
+
 # Lists all available tests
 def listCommand(args):
   testsByTag = {}
@@ -696,8 +954,8 @@ def runCommand(args):
   if not pyPaths:
     pyPaths['py'] = ''
 
-  # Remember original PATH environment variable
-  originalPath = os.environ["PATH"]
+  # test scripts don't run in the current directory, so the run directory needs to be absolute
+  args.run_dir = os.path.abspath(args.run_dir)
 
   os.environ["TEST_ROOT_DIR"] = os.path.dirname(os.path.realpath(sys.argv[0]))
 
@@ -708,12 +966,18 @@ def runCommand(args):
   print("Run location:   " + args.run_dir)
   print("Flavors:        " + " ".join(flavors))
   print("Devices:        " + " ".join(devices))
+  if args.jobs > 1:
+    print("Jobs:           " + str(args.jobs))
+  if args.cache_dir:
+    print("Result cache:   " + args.cache_dir)
   if (args.update_baseline):
     print("*** Running in automatic baseline update mode ***")
   print("")
   if args.dry_run:
     os.environ["DRY_RUN"] = "1"
-  succeededCount, totalCount = 0, 0
+
+  # Collecting all test runs as (test, flavor, device, pyVersion, pathPrefix) tuples
+  testRuns = []
   for test in testsToRun:
     for flavor in flavors:
       for device in devices:
@@ -725,62 +989,146 @@ def runCommand(args):
               continue
             if build_sku=="cpu" and device=="gpu":
               continue
-            totalCount = totalCount + 1
-            if len(test.testCases)==0:
-              # forcing verbose mode (showing all output) for all test which are based on exit code (no pattern-based test cases)
-              args.verbose = True
-
-            pyTestLabel = " {0}".format(pyVersion) if pyVersion else ''
-
-            if testPyPaths[pyVersion]:
-              os.environ["PATH"] = testPyPaths[pyVersion] + os.pathsep + originalPath
+            testRuns.append((test, flavor, device, pyVersion, testPyPaths[pyVersion]))
+
+  # Results are only cached for plain verification runs
+  cache = None
+  if args.cache_dir and not (args.update_baseline or args.create_baseline or args.dry_run):
+    cache = ResultCache(args.cache_dir)
+
+  # Performance records are compared against the history before they are added to it
+  perfHistory = None
+  if args.perf_history and not (args.dry_run or args.update_baseline or args.create_baseline):
+    perfHistory = PerformanceHistory(args.perf_history, args.perf_window, args.perf_tolerance)
+  perfRegressions = []
+
+  succeededCount, totalCount = 0, len(testRuns)
+  if args.jobs > 1 and not args.dry_run:
+    # Test scripts run concurrently, their output is only captured in the log files
+    # of the (separate) run directories, and results are reported in order of completion
+    runArgs = copy.copy(args)
+    runArgs.verbose = False
+    pool = ThreadPool(args.jobs)
+    try:
+      for testRun, result in pool.imap_unordered(lambda testRun: (testRun, executeTestRun(testRun, runArgs, cache)), testRuns):
+        test, flavor, device, pyVersion, pathPrefix = testRun
+        reportArgs = runArgs
+        if len(test.testCases)==0:
+          # forcing verbose mode (showing all output) for all test which are based on exit code (no pattern-based test cases),
+          # the output is printed from the log file, since concurrent tests cannot write to the console while running
+          reportArgs = copy.copy(runArgs)
+          reportArgs.verbose = True
+          if not result.cached and result.logFile and os.path.isfile(result.logFile):
+            with open(result.logFile, "r") as f:
+              sys.stdout.write(f.read())
+        sys.stdout.write("Test {0} ({1} {2}{3}) - ".format(test.fullName, flavor, device, " " + pyVersion if pyVersion else ''))
+        if reportTestRunResult(result, reportArgs):
+          succeededCount = succeededCount + 1
+        perfRegressions += recordPerformance(perfHistory, testRun, result, runArgs)
+        sys.stdout.flush()
+    finally:
+      pool.close()
+      pool.join()
+  else:
+    for testRun in testRuns:
+      test, flavor, device, pyVersion, pathPrefix = testRun
+      if len(test.testCases)==0:
+        # forcing verbose mode (showing all output) for all test which are based on exit code (no pattern-based test cases)
+        args.verbose = True
 
-            # Printing the test which is about to run (without terminating the line)
-            sys.stdout.write("Running test {0} ({1} {2}{3}) - ".format(test.fullName, flavor, device, pyTestLabel));
-            if args.dry_run:
-              print("[SKIPPED] (dry-run)")
-            # in verbose mode, terminate the line, since there will be a lot of output
-            if args.verbose:
-              sys.stdout.write("\n");
-            sys.stdout.flush()
-            # Running the test and collecting a run results
-            result = test.run(flavor, device, pyVersion, args)
+      pyTestLabel = " {0}".format(pyVersion) if pyVersion else ''
 
-            if args.verbose:
-              # writing the test name one more time (after possibly long verbose output)
-              sys.stdout.write("Test finished {0} ({1} {2}{3}) - ".format(test.fullName, flavor, device, pyTestLabel));
-            if result.succeeded:
-              succeededCount = succeededCount + 1
-              # in no-verbose mode this will be printed in the same line as 'Running test...'
-              print("[OK] {0:.2f} sec".format(result.duration))
-            else:
-              print("[FAILED] {0:.2f} sec".format(result.duration))
-            # Showing per-test-case results:
-            for testCaseRunResult in result.testCaseRunResults:
-              if testCaseRunResult.succeeded:
-                # Printing 'OK' test cases only in verbose mode
-                if (args.verbose):
-                  print(" [OK] " + testCaseRunResult.testCaseName)
-              else:
-                # 'FAILED' + detailed diagnostics with proper indentation
-                print(" [FAILED] " + testCaseRunResult.testCaseName)
-                if testCaseRunResult.diagnostics:
-                  for line in testCaseRunResult.diagnostics.split('\n'):
-                    print("    " + line);
-                # In non-verbose mode log wasn't piped to the stdout, showing log file path for convenience
-
-            # Restore original path
-            os.environ["PATH"] = originalPath
-
-            if not result.succeeded and not args.verbose and result.logFile:
-              print("  See log file for details: " + result.logFile)
+      # Printing the test which is about to run (without terminating the line)
+      sys.stdout.write("Running test {0} ({1} {2}{3}) - ".format(test.fullName, flavor, device, pyTestLabel));
+      if args.dry_run:
+        print("[SKIPPED] (dry-run)")
+      # in verbose mode, terminate the line, since there will be a lot of output
+      if args.verbose:
+        sys.stdout.write("\n");
+      sys.stdout.flush()
+      # Running the test and collecting a run results
+      result = executeTestRun(testRun, args, cache)
+
+      if args.verbose:
+        # writing the test name one more time (after possibly long verbose output)
+        sys.stdout.write("Test finished {0} ({1} {2}{3}) - ".format(test.fullName, flavor, device, pyTestLabel));
+      if reportTestRunResult(result, args):
+        succeededCount = succeededCount + 1
+      perfRegressions += recordPerformance(perfHistory, testRun, result, args)
 
   if args.update_baseline:
     print("{0}/{1} baselines updated, {2} failed".format(succeededCount, totalCount, totalCount - succeededCount))
   else:
     print("{0}/{1} tests passed, {2} failed".format(succeededCount, totalCount, totalCount - succeededCount))
+
+  if perfHistory:
+    perfHistory.save()
+    if perfRegressions:
+      print("Performance regressions (tolerance {0}%, baseline: median of the last {1} runs):".format(args.perf_tolerance, args.perf_window))
+      for line in perfRegressions:
+        print("  " + line)
+    else:
+      print("No performance regressions")
+
   if succeededCount != totalCount:
     sys.exit(10)
+  if perfRegressions and args.perf_gate:
+    sys.exit(11)
+
+# Records the performance metrics of a successful (and not cached) test run in the history
+# returns a list of human-readable descriptions of regressed metrics
+def recordPerformance(perfHistory, testRun, result, args):
+  if not perfHistory or not result.succeeded or result.cached:
+    return []
+  test, flavor, device, pyVersion, pathPrefix = testRun
+  pyVersionLabel = "_{0}".format(pyVersion) if pyVersion else ''
+  key = "{0}@{1}_{2}_{3}{4}".format(test.fullName, flavor, device, args.build_sku, pyVersionLabel)
+  regressions = perfHistory.add(key, result.performance.record(result.duration))
+  return ["{0}: {1} {2:.6g} -> {3:.6g} ({4:+.1f}%)".format(key, metric, baseline, value, (value - baseline) * 100.0 / baseline)
+          for metric, baseline, value in regressions]
+
+# Runs a single (test, flavor, device, pyVersion, pathPrefix) tuple, unless the
+# result cache has a successful result for unchanged inputs
+# returns an instance of TestRunResult
+def executeTestRun(testRun, args, cache):
+  test, flavor, device, pyVersion, pathPrefix = testRun
+  key = None
+  if cache:
+    key = test.cacheKey(flavor, device, pyVersion, pathPrefix, args)
+    result = cache.get(key)
+    if result:
+      return result
+
+  result = test.run(flavor, device, pyVersion, args, pathPrefix)
+  if cache and result.succeeded:
+    cache.put(key, test, result)
+  return result
+
+# Prints the outcome of a test run and its test cases
+# returns True if the test run succeeded
+def reportTestRunResult(result, args):
+  if result.succeeded:
+    # in no-verbose mode this will be printed in the same line as 'Running test...'
+    print("[OK{0}] {1:.2f} sec".format(" (cached)" if result.cached else "", result.duration))
+  else:
+    print("[FAILED] {0:.2f} sec".format(result.duration))
+  # Showing per-test-case results:
+  for testCaseRunResult in result.testCaseRunResults:
+    if testCaseRunResult.succeeded:
+      # Printing 'OK' test cases only in verbose mode
+      if (args.verbose):
+        print(" [OK] " + testCaseRunResult.testCaseName)
+    else:
+      # 'FAILED' + detailed diagnostics with proper indentation
+      print(" [FAILED] " + testCaseRunResult.testCaseName)
+      if testCaseRunResult.diagnostics:
+        for line in testCaseRunResult.diagnostics.split('\n'):
+          print("    " + line);
+      # In non-verbose mode log wasn't piped to the stdout, showing log file path for convenience
+
+  if not result.succeeded and not args.verbose and result.logFile:
+    print("  See log file for details: " + result.logFile)
+  return result.succeeded
 
 # ======================= Entry point =======================
 if __name__ == "__main__":
@@ -810,6 +1158,12 @@ if __name__ == "__main__":
   runSubparser.add_argument("--create-baseline", action='store_true', help="create new baseline file(s) (named as baseline.<os>.<device>.txt) for tests that do not currently have baselines")
   runSubparser.add_argument("-v", "--verbose", action='store_true', help="verbose output - dump all output of test script")
   runSubparser.add_argument("-n", "--dry-run", action='store_true', help="do not run the tests, only print test names and configurations to be run along with full command lines")
+  runSubparser.add_argument("-j", "--jobs", type=int, default=1, help="number of test runs to execute concurrently, default: 1. With more than one job the output of the tests is only written to their log files")
+  runSubparser.add_argument("--perf-history", help="JSON file in which the duration, epoch times, samples/sec and peak memory of each test run are recorded, and against which they are compared")
+  runSubparser.add_argument("--perf-window", type=int, default=5, help="number of most recent runs in the performance history whose median forms the baseline, default: 5")
+  runSubparser.add_argument("--perf-tolerance", type=float, default=10.0, help="relative change in percent beyond which a metric is reported as a regression, default: 10")
+  runSubparser.add_argument("--perf-gate", action='store_true', help="fail (exit code 11) if any performance regression is detected")
+  runSubparser.add_argument("--cache-dir", help="directory of a result cache; test runs which succeeded before with unchanged test directory, configuration and build are skipped")
 
   runSubparser.set_defaults(func=runCommand)
 
@@ -858,6 +1212,10 @@ if __name__ == "__main__":
       print("Invalid combination: --build-sku cpu and --device gpu", file=sys.stderr)
       sys.exit(1)
 
+  if args.func == runCommand and args.jobs < 1:
+    print("--jobs must be positive", file=sys.stderr)
+    sys.exit(1)
+
   if args.func == runCommand and not args.build_location:
     args.build_location = os.path.realpath(os.path.join(thisDir, "../..", "x64" if windows else "build/"))
 
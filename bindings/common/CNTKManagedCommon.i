@@ -232,6 +232,8 @@ IGNORE_FUNCTION CNTK::Internal::UniversalLearner;
 IGNORE_CLASS CNTK::DistributedLearner;
 IGNORE_FUNCTION CNTK::CreateDataParallelDistributedLearner;
 IGNORE_FUNCTION CNTK::CreateQuantizedDataParallelDistributedLearner;
+IGNORE_FUNCTION CNTK::CreateCompressedDataParallelDistributedLearner;
+IGNORE_ENUM_CLASS CNTK::GradientCompression;
 IGNORE_FUNCTION CNTK::CreateBlockMomentumDistributedLearner;
 IGNORE_CLASS CNTK::Evaluator;
 IGNORE_FUNCTION CNTK::CreateEvaluator;
@@ -243,6 +245,7 @@ IGNORE_CLASS CNTK::DistributedCommunicator;
 IGNORE_CLASS CNTK::QuantizedDistributedCommunicator;
 IGNORE_FUNCTION CNTK::MPICommunicator;
 IGNORE_FUNCTION CNTK::QuantizedMPICommunicator;
+IGNORE_FUNCTION CNTK::SharedMemoryCommunicator;
 IGNORE_STRUCT CNTK::CrossValidationConfig;
 IGNORE_STRUCT CNTK::CheckpointConfig;
 IGNORE_STRUCT CNTK::TestConfig;
@@ -279,6 +282,7 @@ IGNORE_FUNCTION CNTK::Internal::EnableReversingTensorShapesInErrorMessages;
 IGNORE_FUNCTION CNTK::Internal::IsReversingTensorShapesInErrorMessagesEnabled;
 IGNORE_FUNCTION CNTK::Internal::AlwaysAllowSettingDefaultDevice;
 IGNORE_FUNCTION CNTK::Internal::IsSettingDefaultDeviceAlwaysAllowed;
+IGNORE_FUNCTION CNTK::Internal::SetRandomSeedWorkerLayout;
 IGNORE_FUNCTION CNTK::Internal::AllowRenamingFunctions;
 IGNORE_FUNCTION CNTK::Internal::IsRenamingFunctionsAllowed;
 IGNORE_FUNCTION CNTK::Internal::SetAutomaticUnpackingOfPackedValues;
@@ -258,6 +258,19 @@ namespace CNTK
             return _Load(filepath, computeDevice);
         }
 
+        /// <summary>
+        /// Loads a model from file. If lazy is true, the values of the parameters and constants
+        /// are copied out of the memory-mapped model file when first used instead of at load time.
+        /// </summary>
+        /// <param name="filepath"></param>
+        /// <param name="computeDevice"></param>
+        /// <param name="lazy"></param>
+        /// <returns></returns>
+        public static Function Load(string filepath, DeviceDescriptor computeDevice, bool lazy)
+        {
+            return _Load(filepath, computeDevice, lazy);
+        }
+
         /// <summary>
         /// Loads a model from memory buffer.
         /// </summary>
@@ -0,0 +1,12 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+"""
+Micro-benchmarks of the Python bindings, e.g. for comparing releases. Run
+``python -m cntk.benchmarks --output report.json`` to create a JSON report and
+``python -m cntk.benchmarks --baseline report.json`` to compare against it.
+With pytest-benchmark installed, the suite also runs as part of
+``cntk/benchmarks/tests``.
+"""
+from .runner import *
@@ -0,0 +1,11 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import sys
+from .runner import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+
+__doc__ = '''\
+Benchmark of single-node data parallel training that compares the shared
+memory communicator with MPI. Every worker trains an MLP with a data parallel
+distributed learner; the report contains the median time per minibatch.
+
+Shared memory (the benchmark starts the workers itself)::
+
+    python -m cntk.benchmarks.distributed --backend shm --workers 4
+
+MPI on localhost::
+
+    mpiexec -n 4 python -m cntk.benchmarks.distributed --backend mpi
+'''
+
+_BATCH_SIZE = 64
+
+
+def _create_trainer(communicator, input_dim, hidden_dim, num_layers):
+    import cntk as C
+    from cntk.train import distributed
+    x = C.input_variable(input_dim)
+    labels = C.input_variable(10)
+    with C.layers.default_options(activation=C.relu):
+        z = C.layers.Sequential([C.layers.Dense(hidden_dim) for _ in range(num_layers)] +
+                                [C.layers.Dense(10, activation=None)])(x)
+    loss = C.cross_entropy_with_softmax(z, labels)
+    learner = distributed.data_parallel_distributed_learner(
+        C.sgd(z.parameters, C.learning_rate_schedule(0.01, C.UnitType.minibatch)),
+        communicator=communicator)
+    return x, labels, C.Trainer(z, loss, [learner])
+
+
+def run_worker(backend, name, num_workers, rank, minibatches=50, input_dim=784,
+               hidden_dim=2048, num_layers=4):
+    '''
+    Trains on random data in one worker process and measures the time per
+    minibatch.
+
+    Args:
+        backend (str): ``'shm'`` or ``'mpi'``
+        name (str): name of the shared memory segment, ignored for MPI
+        num_workers (int): number of workers, ignored for MPI
+        rank (int): rank of this worker, ignored for MPI
+        minibatches (int): number of timed minibatches
+        input_dim (int): input dimension of the model
+        hidden_dim (int): dimension of the hidden layers
+        num_layers (int): number of hidden layers
+
+    Returns:
+        dict: the result of the main worker, None on the other workers
+    '''
+    from cntk.train import distributed
+    if backend == 'shm':
+        communicator = distributed.shared_memory_communicator(name, num_workers, rank)
+    else:
+        communicator = distributed.mpi_communicator()
+    num_workers = len(communicator.workers())
+
+    x, labels, trainer = _create_trainer(communicator, input_dim, hidden_dim, num_layers)
+    features = np.random.rand(_BATCH_SIZE, input_dim).astype(np.float32)
+    targets = np.eye(10, dtype=np.float32)[np.random.randint(0, 10, _BATCH_SIZE)]
+    train = lambda: trainer.train_minibatch({x: features, labels: targets})
+
+    train() # warm up
+    communicator.barrier()
+    times = sorted(timeit.repeat(train, number=1, repeat=minibatches))
+    communicator.barrier()
+
+    result = None
+    if communicator.is_main():
+        mid = len(times) // 2
+        result = {
+            'backend': backend,
+            'workers': num_workers,
+            'parameters': sum(p.value.size for p in trainer.model.parameters),
+            'min': times[0],
+            'median': times[mid] if len(times) % 2 else (times[mid - 1] + times[mid]) / 2,
+            'mean': sum(times) / len(times),
+            'minibatches': minibatches,
+        }
+    if backend == 'mpi':
+        distributed.Communicator.finalize()
+    return result
+
+
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='python -m cntk.benchmarks.distributed',
+        description='Compares data parallel training over shared memory and MPI on a single machine.')
+    parser.add_argument('--backend', choices=['shm', 'mpi'], default='shm',
+                        help='communicator to use (default: shm)')
+    parser.add_argument('-w', '--workers', type=int, default=2,
+                        help='number of shared memory workers to start (default: 2)')
+    parser.add_argument('-n', '--minibatches', type=int, default=50,
+                        help='number of timed minibatches (default: 50)')
+    parser.add_argument('--hidden-dim', type=int, default=2048,
+                        help='dimension of the hidden layers (default: 2048)')
+    parser.add_argument('--layers', type=int, default=4,
+                        help='number of hidden layers (default: 4)')
+    parser.add_argument('-o', '--output', metavar='FILE',
+                        help='write the result to a JSON file')
+    # set on the worker processes started for the shared memory backend
+    parser.add_argument('--rank', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--name', help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    '''
+    Command line entry point, see ``python -m cntk.benchmarks.distributed --help``.
+    '''
+    args = _parse_args(argv)
+
+    if args.backend == 'shm' and args.rank is None:
+        # start the workers and let them talk to each other
+        name = 'cntk-benchmark-%i' % os.getpid()
+        workers = [subprocess.Popen(
+            [sys.executable, '-m', 'cntk.benchmarks.distributed'] +
+            (argv if argv is not None else sys.argv[1:]) +
+            ['--rank', str(rank), '--name', name])
+            for rank in range(args.workers)]
+        return max(abs(w.wait()) for w in workers)
+
+    result = run_worker(args.backend, args.name, args.workers, args.rank or 0,
+                        args.minibatches, hidden_dim=args.hidden_dim,
+                        num_layers=args.layers)
+    if result is not None:
+        print(json.dumps(result, indent=2, sort_keys=True))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
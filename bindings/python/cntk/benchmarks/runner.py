@@ -0,0 +1,260 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import importlib
+import json
+import math
+import platform
+import time
+import timeit
+
+__doc__ = '''\
+Registry and timing harness of the micro-benchmarks, together with the
+creation and comparison of JSON reports.
+'''
+
+__all__ = ['benchmark', 'registered_benchmarks', 'create_benchmark',
+           'run_benchmarks', 'compare_reports', 'save_report', 'load_report',
+           'main']
+
+_registry = {}
+
+
+def benchmark(name):
+    '''
+    Decorator that registers a benchmark. The decorated function performs the
+    (untimed) setup and returns a callable without arguments that executes
+    the timed operation once.
+
+    Args:
+        name (str): unique name of the benchmark
+    '''
+    def register(setup):
+        if name in _registry:
+            raise ValueError('benchmark "%s" is already registered' % name)
+        _registry[name] = setup
+        return setup
+    return register
+
+
+def _load_suite():
+    # importing the suite registers its benchmarks
+    importlib.import_module('.suite', __package__)
+
+
+def registered_benchmarks():
+    '''
+    Returns:
+        sorted list of the names of all registered benchmarks
+    '''
+    _load_suite()
+    return sorted(_registry.keys())
+
+
+def create_benchmark(name):
+    '''
+    Performs the setup of a benchmark.
+
+    Args:
+        name (str): name of the benchmark
+
+    Returns:
+        callable without arguments that executes the benchmarked operation
+    '''
+    _load_suite()
+    if name not in _registry:
+        raise ValueError('unknown benchmark "%s", available benchmarks: %s' %
+                         (name, ', '.join(sorted(_registry.keys()))))
+    return _registry[name]()
+
+
+def _time_benchmark(func, rounds, min_round_time):
+    func() # warm up
+
+    # find the number of calls per round such that a round takes at least
+    # min_round_time seconds, so that the timer resolution does not matter
+    number = 1
+    while True:
+        elapsed = timeit.timeit(func, number=number)
+        if elapsed >= min_round_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, int(min_round_time / elapsed * 1.2))
+
+    times = sorted(timeit.repeat(func, number=number, repeat=rounds))
+    times = [t / number for t in times]
+    mean = sum(times) / len(times)
+    mid = len(times) // 2
+    return {
+        'min': times[0],
+        'max': times[-1],
+        'median': times[mid] if len(times) % 2 else (times[mid - 1] + times[mid]) / 2,
+        'mean': mean,
+        'stddev': math.sqrt(sum((t - mean) ** 2 for t in times) / len(times)),
+        'rounds': rounds,
+        'iterations': number,
+    }
+
+
+def run_benchmarks(names=None, rounds=5, min_round_time=0.1, verbose=False):
+    '''
+    Runs benchmarks and returns a report.
+
+    Args:
+        names (list, optional): names of the benchmarks to run. A name may
+         also be a prefix that ends with ``*`` (e.g. ``'value_create_*'``). If
+         not set, all registered benchmarks are run.
+        rounds (int, default 5): number of timed rounds per benchmark
+        min_round_time (float, default 0.1): minimum duration of a round in
+         seconds, which determines the number of calls per round
+        verbose (bool, default False): whether to print each result
+
+    Returns:
+        dict: the report with information about the environment
+        (``'environment'``) and, for every benchmark, the ``'min'``,
+        ``'max'``, ``'median'``, ``'mean'`` and ``'stddev'`` of the time in
+        seconds per call (``'benchmarks'``)
+    '''
+    available = registered_benchmarks()
+    if names is None:
+        selected = available
+    else:
+        selected = []
+        for name in names:
+            if name.endswith('*'):
+                matches = [n for n in available if n.startswith(name[:-1])]
+            else:
+                matches = [name] if name in available else []
+            if not matches:
+                raise ValueError('no benchmark matches "%s"' % name)
+            selected.extend(n for n in matches if n not in selected)
+
+    import cntk
+    import numpy as np
+    report = {
+        'environment': {
+            'cntk': cntk.__version__,
+            'numpy': np.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'device': str(cntk.use_default_device().type()),
+            'timestamp': time.time(),
+        },
+        'benchmarks': {},
+    }
+
+    for name in selected:
+        result = _time_benchmark(create_benchmark(name), rounds,
+                                 min_round_time)
+        report['benchmarks'][name] = result
+        if verbose:
+            print('%-40s %12.2f us (+- %.2f us, %i x %i calls)' %
+                  (name, result['median'] * 1e6, result['stddev'] * 1e6,
+                   rounds, result['iterations']))
+
+    return report
+
+
+def compare_reports(report, baseline, tolerance=0.1):
+    '''
+    Compares the median times of the benchmarks in a report against a
+    baseline report.
+
+    Args:
+        report (dict): report as returned by :func:`run_benchmarks`
+        baseline (dict): report to compare against
+        tolerance (float, default 0.1): relative slowdown beyond which a
+         benchmark counts as a regression
+
+    Returns:
+        list of tuples ``(name, baseline_time, time, ratio, regressed)`` for
+        all benchmarks that occur in both reports, sorted by name
+    '''
+    result = []
+    baseline = baseline['benchmarks']
+    for name, current in sorted(report['benchmarks'].items()):
+        if name not in baseline:
+            continue
+        baseline_time = baseline[name]['median']
+        ratio = current['median'] / baseline_time if baseline_time > 0 else float('inf')
+        result.append((name, baseline_time, current['median'], ratio,
+                       ratio > 1 + tolerance))
+    return result
+
+
+def save_report(report, filename):
+    '''
+    Writes a report to a JSON file.
+    '''
+    with open(filename, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(filename):
+    '''
+    Reads a report from a JSON file.
+    '''
+    with open(filename, 'r') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    '''
+    Command line entry point, run as ``python -m cntk.benchmarks --help``.
+
+    Returns:
+        int: exit code, 1 if a regression against the baseline was found
+        and ``--fail-on-regression`` was given, 0 otherwise
+    '''
+    import argparse
+    parser = argparse.ArgumentParser(description='CNTK Python micro-benchmarks')
+    parser.add_argument('benchmarks', nargs='*',
+                        help='names (or prefixes ending with *) of the '
+                             'benchmarks to run, default: all')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list the available benchmarks')
+    parser.add_argument('-o', '--output', help='write the report to this JSON file')
+    parser.add_argument('-b', '--baseline', help='compare against this JSON report')
+    parser.add_argument('-t', '--tolerance', type=float, default=10.0,
+                        help='slowdown in percent beyond which a benchmark '
+                             'counts as a regression, default: 10')
+    parser.add_argument('-r', '--rounds', type=int, default=5,
+                        help='number of timed rounds, default: 5')
+    parser.add_argument('--min-round-time', type=float, default=0.1,
+                        help='minimum duration of a round in seconds, default: 0.1')
+    parser.add_argument('-d', '--device', choices=['cpu', 'gpu'],
+                        help='device to run the benchmarks on, default: the '
+                             'default device')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='exit with code 1 if a benchmark regressed')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print('\n'.join(registered_benchmarks()))
+        return 0
+
+    if args.device:
+        import cntk
+        device = cntk.cpu() if args.device == 'cpu' else cntk.gpu(0)
+        if not cntk.try_set_default_device(device):
+            parser.error('cannot use device %s' % args.device)
+
+    report = run_benchmarks(args.benchmarks or None, args.rounds,
+                            args.min_round_time, verbose=True)
+    if args.output:
+        save_report(report, args.output)
+
+    regressed = False
+    if args.baseline:
+        print('')
+        print('%-40s %12s %12s %8s' % ('benchmark', 'baseline us', 'current us', 'ratio'))
+        for name, baseline_time, current_time, ratio, is_regression in \
+                compare_reports(report, load_report(args.baseline), args.tolerance / 100.0):
+            print('%-40s %12.2f %12.2f %8.2f%s' %
+                  (name, baseline_time * 1e6, current_time * 1e6, ratio,
+                   '  REGRESSION' if is_regression else ''))
+            regressed = regressed or is_regression
+
+    return 1 if regressed and args.fail_on_regression else 0
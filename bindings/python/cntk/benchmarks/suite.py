@@ -0,0 +1,151 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from scipy import sparse
+
+import cntk as C
+from cntk.internal import sanitize_var_map
+from cntk.ops.functions import UserFunction
+from .runner import benchmark
+
+__doc__ = '''\
+Micro-benchmarks of the hot paths of the Python bindings. Every benchmark
+returns the operation to time; model creation and data generation are part
+of the untimed setup.
+'''
+
+_BATCH_SIZE = 64
+
+
+def _random(*shape):
+    return np.random.rand(*shape).astype(np.float32)
+
+
+def _mlp(input_dim, hidden_dim, num_layers, output_dim=10):
+    x = C.input_variable(input_dim)
+    with C.layers.default_options(activation=C.relu):
+        model = C.layers.Sequential([C.layers.Dense(hidden_dim) for _ in range(num_layers)] +
+                                    [C.layers.Dense(output_dim, activation=None)])
+    return x, model(x)
+
+
+@benchmark('value_create_dense')
+def value_create_dense():
+    x = C.input_variable(100)
+    data = _random(_BATCH_SIZE, 100)
+    return lambda: C.Value.create(x, data)
+
+
+@benchmark('value_create_sparse')
+def value_create_sparse():
+    x = C.sequence.input_variable(10000, is_sparse=True)
+    data = [sparse.random(20, 10000, density=0.001, format='csr', dtype=np.float32)
+            for _ in range(_BATCH_SIZE)]
+    return lambda: C.Value.create(x, data)
+
+
+@benchmark('value_create_sequences')
+def value_create_sequences():
+    x = C.sequence.input_variable(100)
+    data = [_random(length, 100) for length in np.random.randint(10, 50, _BATCH_SIZE)]
+    return lambda: C.Value.create(x, data)
+
+
+@benchmark('sanitize_var_map')
+def sanitize_var_map_dense():
+    x = C.input_variable(100)
+    y = C.sequence.input_variable(20)
+    z = C.plus(C.reduce_sum(x), C.sequence.reduce_sum(C.reduce_sum(y)))
+    arguments = {x: _random(_BATCH_SIZE, 100),
+                 y: [_random(10, 20) for _ in range(_BATCH_SIZE)]}
+    return lambda: sanitize_var_map(z.arguments, arguments)
+
+
+@benchmark('eval_tiny')
+def eval_tiny():
+    x = C.input_variable(2)
+    z = C.plus(x, 1)
+    data = _random(1, 2)
+    return lambda: z.eval({x: data})
+
+
+@benchmark('eval_medium')
+def eval_medium():
+    x, z = _mlp(784, 512, 4)
+    data = _random(_BATCH_SIZE, 784)
+    return lambda: z.eval({x: data})
+
+
+@benchmark('trainer_train_minibatch')
+def trainer_train_minibatch():
+    x, z = _mlp(784, 256, 2)
+    labels = C.input_variable(10)
+    loss = C.cross_entropy_with_softmax(z, labels)
+    error = C.classification_error(z, labels)
+    learner = C.sgd(z.parameters, C.learning_rate_schedule(0.01, C.UnitType.minibatch))
+    trainer = C.Trainer(z, (loss, error), [learner])
+    features = _random(_BATCH_SIZE, 784)
+    targets = np.eye(10, dtype=np.float32)[np.random.randint(0, 10, _BATCH_SIZE)]
+    return lambda: trainer.train_minibatch({x: features, labels: targets})
+
+
+@benchmark('minibatch_source_from_data')
+def minibatch_source_from_data():
+    num_samples = 10000
+    features = _random(num_samples, 100)
+    labels = np.eye(10, dtype=np.float32)[np.random.randint(0, 10, num_samples)]
+    source = C.io.MinibatchSourceFromData(dict(features=features, labels=labels))
+    return lambda: source.next_minibatch(_BATCH_SIZE)
+
+
+class _Identity(UserFunction):
+    def __init__(self, arg, name='identity'):
+        super(_Identity, self).__init__([arg], name=name)
+
+    def infer_outputs(self):
+        return [C.output_variable(self.inputs[0].shape, self.inputs[0].dtype,
+                                  self.inputs[0].dynamic_axes)]
+
+    def forward(self, argument, device=None, outputs_to_retain=None):
+        return None, argument
+
+    def backward(self, state, root_gradients):
+        return root_gradients
+
+
+@benchmark('user_function_forward_backward')
+def user_function_forward_backward():
+    x = C.input_variable(100, needs_gradient=True)
+    z = C.user_function(_Identity(x * 2))
+    data = _random(_BATCH_SIZE, 100)
+    return lambda: z.grad({x: data})
+
+
+@benchmark('function_save_load')
+def function_save_load():
+    _, z = _mlp(784, 512, 4)
+    filename = os.path.join(tempfile.mkdtemp(), 'model.dnn')
+
+    def save_load():
+        z.save(filename)
+        C.Function.load(filename)
+
+    # clean up the temporary directory once the benchmark is garbage collected
+    save_load._cleanup = _TemporaryDirectory(os.path.dirname(filename))
+    return save_load
+
+
+class _TemporaryDirectory(object):
+    def __init__(self, path):
+        self.path = path
+
+    def __del__(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,50 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import json
+import pytest
+from cntk.benchmarks import registered_benchmarks, create_benchmark, \
+    run_benchmarks, compare_reports, main
+
+
+@pytest.mark.parametrize('name', registered_benchmarks())
+def test_benchmark_runs(name):
+    create_benchmark(name)()
+
+
+def test_benchmark_report_and_comparison(tmpdir):
+    report = run_benchmarks(['value_create_*', 'eval_tiny'], rounds=2,
+                            min_round_time=0.001)
+    assert set(report['benchmarks'].keys()) == set([
+        'value_create_dense', 'value_create_sparse', 'value_create_sequences',
+        'eval_tiny'])
+    for result in report['benchmarks'].values():
+        assert 0 < result['min'] <= result['median'] <= result['max']
+        assert result['rounds'] == 2
+
+    baseline = json.loads(json.dumps(report))
+    baseline['benchmarks']['eval_tiny']['median'] /= 2
+    del baseline['benchmarks']['value_create_dense']
+    comparison = compare_reports(report, baseline, tolerance=0.5)
+    assert [c[0] for c in comparison] == \
+        ['eval_tiny', 'value_create_sequences', 'value_create_sparse']
+    assert [c[4] for c in comparison] == [True, False, False]
+
+    with pytest.raises(ValueError):
+        run_benchmarks(['no_such_benchmark'])
+
+    report_file = str(tmpdir.join('report.json'))
+    assert main(['eval_tiny', '-r', '2', '--min-round-time', '0.001',
+                 '-o', report_file]) == 0
+    assert main(['eval_tiny', '-r', '2', '--min-round-time', '0.001',
+                 '-b', report_file, '-t', '-100', '--fail-on-regression']) == 1
+
+
+@pytest.mark.parametrize('name', registered_benchmarks())
+def test_pytest_benchmark(request, name):
+    pytest.importorskip('pytest_benchmark')
+    benchmark = request.getfixturevalue('benchmark')
+    benchmark(create_benchmark(name))
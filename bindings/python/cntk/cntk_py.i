@@ -13,10 +13,15 @@
 %threadallow CNTK::Trainer::TrainMinibatch;
 %threadallow CNTK::Trainer::TestMinibatch;
 %threadallow CNTK::Trainer::SaveCheckpoint;
+%threadallow CNTK::Trainer::SaveCheckpointAsync;
+%threadallow CNTK::Trainer::WaitForPendingCheckpoints;
 %threadallow CNTK::Trainer::RestoreFromCheckpoint;
 
 %threadallow CNTK::Evaluator::TestMinibatch;
 
+%threadallow CNTK::Function::Forward;
+%threadallow CNTK::Function::Evaluate;
+
 %threadallow CNTK::TrainingSession::Train;
 
 %include "stl.i"
@@ -186,6 +191,7 @@
 %ignore CNTK::Internal::IsRenamingFunctionsAllowed;
 %ignore CNTK::Internal::IsAutomaticUnpackingOfPackedValuesDisabled;
 %ignore CNTK::Internal::GetComputationNetworkTraceLevel;
+%ignore CNTK::Internal::SetRandomSeedWorkerLayout;
 %ignore CNTK::Internal::TensorBoardFileWriter::TensorBoardFileWriter(const std::wstring& dir, const ::Microsoft::MSR::CNTK::ComputationNetworkPtr& modelToVisualize = nullptr);
 %ignore CNTK::Internal::Convolution; 
 %ignore CNTK::Internal::UniversalLearner;
@@ -292,6 +298,84 @@ def dynamic_axes(self):
     }
 }
 
+%fragment("NDArrayViewToCSR", "header")
+{
+    template <typename ElementType>
+    PyObject* SparseCSCBuffersToCSR(const CNTK::NDArrayView& view, int numpyType)
+    {
+        auto buffers = view.SparseCSCDataBuffers<ElementType>();
+        const ElementType* nonZeroValues = std::get<0>(buffers);
+        const CNTK::SparseIndexType* colStarts = std::get<1>(buffers);
+        const CNTK::SparseIndexType* rowIndices = std::get<2>(buffers);
+
+        // Every column of the column-major CSC matrix is one row of the
+        // row-major CSR matrix, so the buffers can be taken over directly.
+        auto shape = view.Shape();
+        size_t numRows = (shape.Rank() > 0) ? shape[0] : 1;
+        size_t numCols = (numRows > 0) ? shape.TotalSize() / numRows : 0;
+
+        npy_intp numNonZeroValues = static_cast<npy_intp>(std::get<3>(buffers));
+        npy_intp numIndexPointers = static_cast<npy_intp>(numCols + 1);
+
+        PyObject* data = PyArray_SimpleNew(1, &numNonZeroValues, numpyType);
+        PyObject* indices = PyArray_SimpleNew(1, &numNonZeroValues, NPY_INT);
+        PyObject* indptr = PyArray_SimpleNew(1, &numIndexPointers, NPY_INT);
+
+        memcpy(PyArray_DATA((PyArrayObject*)data), nonZeroValues, sizeof(ElementType) * numNonZeroValues);
+        memcpy(PyArray_DATA((PyArrayObject*)indices), rowIndices, sizeof(CNTK::SparseIndexType) * numNonZeroValues);
+
+        // Slices of a sparse matrix keep the column starts of the full
+        // matrix, while the values and row indices start at the slice.
+        CNTK::SparseIndexType* indptrData = (CNTK::SparseIndexType*)PyArray_DATA((PyArrayObject*)indptr);
+        for (size_t i = 0; i <= numCols; ++i)
+            indptrData[i] = colStarts[i] - colStarts[0];
+
+        return Py_BuildValue("NNN", data, indices, indptr);
+    }
+
+    PyObject* NDArrayViewToCSR(const CNTK::NDArrayView* self)
+    {
+        if ((*self).GetStorageFormat() != StorageFormat::SparseCSC)
+            throw std::invalid_argument("only sparse data in CSC format can be converted to CSR");
+
+        CNTK::DataType cntk_type = (*self).GetDataType();
+
+        NDArrayView* cpuView;
+        if ((*self).Device() != DeviceDescriptor::CPUDevice())
+        {
+            cpuView = new NDArrayView(cntk_type, StorageFormat::SparseCSC, (*self).Shape(), DeviceDescriptor::CPUDevice());
+            cpuView->CopyFrom((*self));
+        }
+        else
+        {
+            cpuView = const_cast<NDArrayView*>(&(*self));
+        }
+
+        PyObject* result;
+        if (cntk_type == CNTK::DataType::Float)
+        {
+            result = SparseCSCBuffersToCSR<float>(*cpuView, NPY_FLOAT);
+        }
+        else if (cntk_type == CNTK::DataType::Double)
+        {
+            result = SparseCSCBuffersToCSR<double>(*cpuView, NPY_DOUBLE);
+        }
+        else
+        {
+            if ((*self).Device() != DeviceDescriptor::CPUDevice())
+                delete cpuView;
+            throw std::invalid_argument("unknown CNTK data type");
+        }
+
+        if ((*self).Device() != DeviceDescriptor::CPUDevice())
+        {
+            delete cpuView;
+        }
+
+        return result;
+    }
+}
+
 %fragment("pydict_insert", "header")
 {
      template<typename T> bool pydict_insert(PyObject* dictionary, const T& key, swig_type_info *swig_type, PyObject* item) {
@@ -1777,11 +1861,73 @@ extern "C" CNTKPYTHON_API bool CreateDeserializer(DataDeserializerPtr& deseriali
 
 // end NDMask
 
+%extend CNTK::Value {
+    //
+    // Creates a Value from a single padded NDArrayView of shape
+    // sampleShape x maxSequenceLength x numSequences without splitting it into
+    // per-sequence views. Only the mask is computed from the sequence lengths;
+    // on the CPU the data is used as is, otherwise it is copied to 'device'.
+    //
+    static CNTK::ValuePtr _create_from_padded(const CNTK::NDArrayViewPtr& data, const std::vector<size_t>& sequenceLengths,
+        const std::vector<bool>& sequenceStartFlags, const CNTK::DeviceDescriptor& device, bool readOnly)
+    {
+        auto dataShape = data->Shape();
+        if (dataShape.Rank() < 2)
+            InvalidArgument("Value::_create_from_padded: The data must have a sequence and a batch axis.");
+
+        size_t numSequences = dataShape[dataShape.Rank() - 1];
+        size_t maxSequenceLength = dataShape[dataShape.Rank() - 2];
+
+        if (sequenceLengths.size() != numSequences)
+            InvalidArgument("Value::_create_from_padded: The number (%zu) of sequence lengths does not match the number (%zu) of sequences.",
+                sequenceLengths.size(), numSequences);
+
+        if (!sequenceStartFlags.empty() && (sequenceStartFlags.size() != numSequences))
+            InvalidArgument("Value::_create_from_padded: The number (%zu) of sequence start flags does not match the number (%zu) of sequences.",
+                sequenceStartFlags.size(), numSequences);
+
+        bool needsMask = (std::find(sequenceStartFlags.begin(), sequenceStartFlags.end(), false) != sequenceStartFlags.end());
+        for (size_t i = 0; i < numSequences; ++i)
+        {
+            if ((sequenceLengths[i] == 0) || (sequenceLengths[i] > maxSequenceLength))
+                InvalidArgument("Value::_create_from_padded: The length (%zu) of sequence #%zu must be in [1, %zu].",
+                    sequenceLengths[i], i, maxSequenceLength);
+
+            needsMask = needsMask || (sequenceLengths[i] != maxSequenceLength);
+        }
+
+        CNTK::NDMaskPtr mask;
+        if (needsMask)
+        {
+            mask = CNTK::MakeSharedObject<CNTK::NDMask>(CNTK::NDShape({ maxSequenceLength, numSequences }), CNTK::DeviceDescriptor::CPUDevice());
+            for (size_t i = 0; i < numSequences; ++i)
+            {
+                if (sequenceStartFlags.empty() || sequenceStartFlags[i])
+                    mask->MarkSequenceBegin({ 0, i });
+                if (sequenceLengths[i] < maxSequenceLength)
+                    mask->InvalidateSection({ sequenceLengths[i], i }, { CNTK::NDShape::InferredDimension, 1 });
+            }
+        }
+
+        auto valueData = data;
+        if (data->Device() != device)
+        {
+            valueData = data->DeepClone(device, readOnly);
+            if (mask)
+                mask = mask->DeepClone(device);
+        }
+
+        return CNTK::MakeSharedObject<CNTK::Value>(valueData, mask);
+    }
+}
+
 %include "CNTKValueExtend.i"
 
 //
 // NDArrayView
 //
+%fragment("NDArrayViewToCSR");
+
 %extend CNTK::NDArrayView {
 
     NDArrayView(PyObject* numpyArrayObject, const CNTK::DeviceDescriptor& device, bool readOnly, bool borrow)
@@ -1936,6 +2082,15 @@ extern "C" CNTKPYTHON_API bool CreateDeserializer(DataDeserializerPtr& deseriali
         PyObject *NDArrayViewToNumPy(const CNTK::NDArrayView*);
         return NDArrayViewToNumPy(self);
     }
+
+    //
+    // Returns the (data, indices, indptr) buffers of a sparse view as a
+    // CSR matrix with one row per sample, without a dense intermediate.
+    //
+    PyObject* _to_csr_buffers() {
+        PyObject *NDArrayViewToCSR(const CNTK::NDArrayView*);
+        return NDArrayViewToCSR(self);
+    }
 }
 
 // end of NDArrayView
@@ -9,12 +9,16 @@ Crosstalk (Contrib) for debugging/conversion among toolkits
 It is the utility to manage variables for debugging/conversion across scripts in different toolkits.
 With crosstalk, user can define named watch points to variables or parameters, and setting up a work dir. 
 Then crosstalk can save/load variables to corresponding files from python debugger, and compare values using numpy. 
+Values can be saved either as one file per variable, or into a single snapshot file per pass (see :mod:`.snapshot`).
 '''
 
+import multiprocessing
 import os
 import pickle
 import numpy as np
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from .snapshot import SnapshotReader, SnapshotWriter, snapshot_path
 
 class _VarInfo(namedtuple('_VarInfo', 'var type attr')):
     ''' Variable information
@@ -112,21 +116,67 @@ class EmbedAttr(namedtuple('EmbedAttr', 'dict input_dim')):
         The input dimension of the embedding
     '''
 
-def _compare_list_to_ndarray(list_value, ndarray_value, rtol, atol, equal_nan):
-    if ndarray_value.shape[0] != len(list_value):
-        raise Exception('mismatch batch size')
-    if ndarray_value.shape[2:] != list_value[0].shape[1:]:
-        raise Exception('mismatch sample shape') # it's OK for sequence axis to be different
+class CompareResult(namedtuple('CompareResult', 'match max_abs_err max_rel_err')):
+    ''' Result of comparing a variable in :meth:`Crosstalk.compare_all`
+
+    match
+        True if all values are close, as in numpy.isclose()
+
+    max_abs_err
+        Maximum absolute difference to the saved value
+
+    max_rel_err
+        Maximum absolute difference relative to the saved value, over the non-zero saved values
+    '''
+
+def _value_pairs(raw_value, gt_value):
+    # pairs of (gt, raw) ndarrays to compare, used by Crosstalk.compare and Crosstalk.compare_all
+    if type(raw_value) == list and type(gt_value) == np.ndarray:
+        raw_value, gt_value = gt_value, raw_value
+        swap = True
+    else:
+        swap = False
+    if type(raw_value) == np.ndarray:
+        if type(gt_value) == np.ndarray:
+            pairs = [(gt_value, raw_value)]
+        elif type(gt_value) == list:
+            if raw_value.shape[0] != len(gt_value):
+                raise Exception('mismatch batch size')
+            if raw_value.shape[2:] != gt_value[0].shape[1:]:
+                raise Exception('mismatch sample shape')
+            pairs = [(gt, raw_value[batch][:gt.shape[0]]) for batch, gt in enumerate(gt_value)]
+        else:
+            raise Exception('mismatch length or type')
+    elif type(raw_value) == list and all([type(x) == np.ndarray for x in raw_value]):
+        if type(gt_value) != list or not all([type(x) == np.ndarray for x in gt_value]) or len(gt_value) != len(raw_value):
+            raise Exception('mismatch length or type')
+        pairs = list(zip(gt_value, raw_value))
+    elif type(raw_value) == dict:
+        if type(gt_value) != dict or not all([type(x) == np.ndarray for x in gt_value.values()]) or len(gt_value) != len(raw_value):
+            raise Exception('mismatch length or type')
+        if gt_value.keys() != raw_value.keys():
+            raise Exception('mismatch dict')
+        pairs = [(gt_value[w], raw_value[w]) for w in gt_value.keys()]
+    else:
+        raise Exception('can only compare numpy.ndarray, list of numpy.ndarray or dict of numpy.ndarray')
+    return [(raw, gt) for (gt, raw) in pairs] if swap else pairs
+
+def _compare_with_errors(raw_value, gt_value, rtol, atol, equal_nan):
     match = True
-    for batch, list_item in enumerate(list_value):
-        ndarray_item = ndarray_value[batch][:list_item.shape[0]] # note gt might be padded
-        if not np.isclose(ndarray_item, list_item, rtol, atol, equal_nan).all():
-            diff = (ndarray_item - list_item) ** 2
-            diff_sum = diff.sum(axis=tuple(range(1,len(diff.shape))))
-            print('mismatch found at item {} row {}'.format(batch, np.argmax(diff_sum)))
-            match = False
-            break
-    return match
+    max_abs_err = 0.0
+    max_rel_err = 0.0
+    with np.errstate(invalid='ignore'):
+        for gt, raw in _value_pairs(raw_value, gt_value):
+            match = match and bool(np.isclose(gt, raw, rtol, atol, equal_nan).all())
+            abs_err = np.abs(np.asarray(raw, dtype=np.float64) - gt)
+            if abs_err.size == 0:
+                continue
+            abs_gt = np.broadcast_to(np.abs(np.asarray(gt, dtype=np.float64)), abs_err.shape)
+            max_abs_err = max(max_abs_err, abs_err.max())
+            nonzero = abs_gt > 0
+            if nonzero.any():
+                max_rel_err = max(max_rel_err, (abs_err[nonzero] / abs_gt[nonzero]).max())
+    return CompareResult(match, float(max_abs_err), float(max_rel_err))
 
 class Crosstalk(object):
     '''
@@ -135,16 +185,27 @@ class Crosstalk(object):
     '''
     def __init__(self):
         self.funcs = {}
+        self.snapshot = False
+        self.compress = False
+        self._writer = None
+        self._readers = {}
+        self._batch_depth = 0
         self.reset()
 
-    def set_workdir(self, dir):
+    def set_workdir(self, dir, snapshot=False, compress=False):
         '''
         Set up a working directory for save/load numpy values(.npy) or python data (.pkl)
         
         Args:
             dir (`str`): Working directory
+            snapshot (`bool`): Save values of each pass into a single indexed snapshot file instead of one file per variable.
+             Loading always looks in the snapshot first and falls back to per-variable files
+            compress (`bool`): Compress values saved into snapshot files with zlib
         '''
+        self._close_snapshot()
         self.work_dir = dir
+        self.snapshot = snapshot
+        self.compress = compress
         if not os.path.exists(dir):
             os.makedirs(dir)
 
@@ -152,8 +213,30 @@ class Crosstalk(object):
         '''
         Bump up passes so save won't overwrite existing files
         '''
+        self._close_snapshot()
         self.passes += 1
 
+    def _close_snapshot(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._readers = {}
+
+    def _snapshot_writer(self):
+        path = snapshot_path(self.work_dir, self.passes)
+        if self._writer is None or self._writer.path != path:
+            self._close_snapshot()
+            self._writer = SnapshotWriter(path, self.compress)
+        return self._writer
+
+    def _snapshot_reader(self):
+        path = snapshot_path(self.work_dir, self.passes)
+        if path not in self._readers:
+            if self._writer is not None and self._writer.path == path:
+                self._writer.flush()
+            self._readers[path] = SnapshotReader(path) if os.path.exists(path + '.idx') else None
+        return self._readers[path]
+
     def watch(self, var, name, var_type=None, attr=None):
         '''
         Add variables to watch with a unique name.
@@ -192,6 +275,9 @@ class Crosstalk(object):
         Returns:
             loaded data in numpy ndarray or dict of numpy ndarray
         '''
+        reader = self._snapshot_reader()
+        if reader is not None and name in reader:
+            return reader.get(name)
         if os.path.exists(self._get_filename(name)+'.npy'):
             return np.load(self._get_filename(name)+'.npy')
         elif os.path.exists(self._get_filename(name)+'.pkl'):
@@ -231,7 +317,13 @@ class Crosstalk(object):
         '''
         var, var_type, attr = self.vars[name]
         raw_value = self.funcs[var_type].getter(var, attr)
-        if save:
+        if save and self.snapshot:
+            writer = self._snapshot_writer()
+            writer.put(name, raw_value)
+            self._readers.pop(writer.path, None)
+            if self._batch_depth == 0:
+                writer.flush()
+        elif save:
             if type(raw_value) == np.ndarray:
                 np.save(self._get_filename(name)+'.npy', raw_value)
             else:
@@ -253,26 +345,31 @@ class Crosstalk(object):
         var, var_type, attr = self.vars[name]
         raw_value = self.funcs[var_type].getter(var, attr)
         gt_value = self.load_raw_value(compare_name if compare_name else name)
-        if type(raw_value) == np.ndarray:
-            if type(gt_value) == np.ndarray:
-                return np.isclose(gt_value, raw_value, rtol, atol, equal_nan).all()
-            elif type(gt_value) == list:
-                return _compare_list_to_ndarray(gt_value, raw_value, rtol, atol, equal_nan)
-        elif type(raw_value) == list and all([type(x) == np.ndarray for x in raw_value]):
-            if type(gt_value) == np.ndarray: # handle batch axis in ndarray as well as in list
-                return _compare_list_to_ndarray(raw_value, gt_value, rtol, atol, equal_nan)
-            else:
-                if type(gt_value) != list or not all([type(x) == np.ndarray for x in gt_value]) or len(gt_value) != len(raw_value):
-                    raise Exception('mismatch length or type')
-                return all([np.isclose(gt, raw, rtol, atol, equal_nan).all() for (gt,raw) in zip(gt_value, raw_value)])
-        elif type(raw_value) == dict:
-            if type(gt_value) != dict or not all([type(x) == np.ndarray for x in gt_value.values()]) or len(gt_value) != len(raw_value):
-                raise Exception('mismatch length or type')
-            if gt_value.keys() != raw_value.keys():
-                raise Exception('mismatch dict')
-            return all([np.isclose(gt_value[w], raw_value[w], rtol, atol, equal_nan).all() for w in gt_value.keys()])
-        else:
-            raise Exception('can only compare numpy.ndarray, list of numpy.ndarray or dict of numpy.ndarray')
+        return all([np.isclose(gt, raw, rtol, atol, equal_nan).all() for gt, raw in _value_pairs(raw_value, gt_value)])
+
+    def compare_all(self, names=None, rtol=1e-05, atol=1e-08, equal_nan=False, num_workers=None):
+        '''
+        Compare watched variables to values saved in working directory.
+        Values are fetched one by one, the numeric comparisons run in parallel.
+
+        Args:
+            names : List of `str` of variable names to compare, None to compare all variables
+            rtol (`float`): The relative tolerance parameter, as in numpy.isclose()
+            atol (`float`): The absolute tolerance parameter, as in numpy.isclose()
+            equal_nan (`bool`): Whether to compare NaNs as equal, as in numpy.isclose()
+            num_workers (`int`): Number of comparison threads, None for min(32, cpu_count() + 4)
+
+        Returns:
+            dict of variable name to :class:`CompareResult`
+        '''
+        names = [n for n in (self.vars.keys() if names is None else names) if n in self.vars.keys()]
+        values = []
+        for n in names:
+            var, var_type, attr = self.vars[n]
+            values.append((self.funcs[var_type].getter(var, attr), self.load_raw_value(n)))
+        with ThreadPoolExecutor(max_workers=num_workers or min(32, multiprocessing.cpu_count() + 4)) as executor:
+            results = list(executor.map(lambda v: _compare_with_errors(v[0], v[1], rtol, atol, equal_nan), values))
+        return dict(zip(names, results))
 
     def load(self, names):
         '''
@@ -290,7 +387,13 @@ class Crosstalk(object):
         Args:
             names : List of `str` of variable names to save
         '''
-        [self.fetch(n, save=True) for n in names if n in self.vars.keys()]
+        self._batch_depth += 1
+        try:
+            [self.fetch(n, save=True) for n in names if n in self.vars.keys()]
+        finally:
+            self._batch_depth -= 1
+        if self._batch_depth == 0 and self._writer is not None:
+            self._writer.flush()
 
     def save_all(self):
         '''
@@ -302,5 +405,6 @@ class Crosstalk(object):
         '''
         Reset all variables and passes, setter/getter functions for variable types are kept
         '''
+        self._close_snapshot()
         self.vars = {}
         self.passes = 0
\ No newline at end of file
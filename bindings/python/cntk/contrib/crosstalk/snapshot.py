@@ -0,0 +1,203 @@
+# ==============================================================================
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+'''
+Snapshot container for crosstalk values.
+
+All values saved in one crosstalk pass go into a single data file
+(``<pass>.snapshot``) next to a small index (``<pass>.snapshot.idx``).
+Numpy arrays are stored as raw aligned bytes and read back lazily as
+read-only memory-mapped views; lists and dicts of arrays are stored as one
+record per array, everything else is pickled. Records can optionally be
+compressed with zlib, in which case they are decompressed on access instead
+of being memory-mapped.
+'''
+
+import os
+import pickle
+import zlib
+import numpy as np
+from cntk.internal.utils import replace_file
+
+_ALIGNMENT = 64
+_INDEX_VERSION = 1
+
+SNAPSHOT_SUFFIX = '.snapshot'
+
+
+def snapshot_path(work_dir, passes):
+    '''
+    Path of the snapshot data file for a given pass in a working directory
+    '''
+    return os.path.join(work_dir, '{}{}'.format(passes, SNAPSHOT_SUFFIX))
+
+
+def _is_array(value):
+    return type(value) == np.ndarray and value.dtype != np.object_
+
+
+class SnapshotWriter(object):
+    '''
+    Appends values to a snapshot file. Data is written as values are added,
+    the index is only written on :meth:`flush`, so a batch of values costs a
+    single index write.
+
+    Args:
+        path (`str`): Path of the snapshot data file
+        compress (`bool`): Compress records with zlib
+    '''
+    def __init__(self, path, compress=False):
+        self.path = path
+        self.compress = compress
+        self._dirty = False
+        self._entries = {}
+        if os.path.exists(path + '.idx'):
+            self._entries = _read_index(path + '.idx')
+        self._file = open(path, 'ab')
+        self._offset = self._file.tell()
+
+    def _write(self, data):
+        pad = -self._offset % _ALIGNMENT
+        if pad:
+            self._file.write(b'\0' * pad)
+            self._offset += pad
+        offset = self._offset
+        self._file.write(data)
+        self._offset += len(data)
+        return offset
+
+    def _put_bytes(self, data):
+        if self.compress:
+            data = zlib.compress(data)
+        return (self._write(data), len(data), self.compress)
+
+    def _put_array(self, value):
+        value = np.ascontiguousarray(value)
+        offset, size, compressed = self._put_bytes(value.tobytes())
+        return ('ndarray', offset, size, compressed, value.dtype.str, value.shape)
+
+    def _put_pickle(self, value):
+        offset, size, compressed = self._put_bytes(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        return ('pickle', offset, size, compressed)
+
+    def put(self, name, value):
+        '''
+        Add a value under name, replacing any earlier value with the same name
+
+        Args:
+            name (`str`): Name of the value
+            value: numpy ndarray, list or dict of numpy ndarray, or any picklable data
+        '''
+        if _is_array(value):
+            entry = self._put_array(value)
+        elif type(value) == list and value and all([_is_array(x) for x in value]):
+            entry = ('list', [self._put_array(x) for x in value])
+        elif type(value) == dict and value and all([_is_array(x) for x in value.values()]):
+            entry = ('dict', [(k, self._put_array(x)) for k, x in value.items()])
+        else:
+            entry = self._put_pickle(value)
+        self._entries[name] = entry
+        self._dirty = True
+
+    def flush(self):
+        '''
+        Flush data and write the index
+        '''
+        self._file.flush()
+        if self._dirty:
+            _write_index(self.path + '.idx', self._entries)
+            self._dirty = False
+
+    def close(self):
+        '''
+        Flush and close the snapshot file
+        '''
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+
+def _write_index(path, entries):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        pickle.dump((_INDEX_VERSION, entries), f, protocol=pickle.HIGHEST_PROTOCOL)
+    replace_file(tmp, path)
+
+
+def _read_index(path):
+    with open(path, 'rb') as f:
+        version, entries = pickle.load(f)
+    if version != _INDEX_VERSION:
+        raise Exception('unsupported snapshot index version {}'.format(version))
+    return entries
+
+
+class SnapshotReader(object):
+    '''
+    Reads values from a snapshot file. The data file is memory-mapped on first
+    access and uncompressed arrays are returned as read-only views into it.
+
+    Args:
+        path (`str`): Path of the snapshot data file
+    '''
+    def __init__(self, path):
+        self.path = path
+        self._entries = _read_index(path + '.idx')
+        self._data = None
+
+    def __contains__(self, name):
+        return name in self._entries
+
+    def names(self):
+        '''
+        Names of all values in the snapshot
+        '''
+        return list(self._entries.keys())
+
+    def _buffer(self):
+        if self._data is None:
+            if os.path.getsize(self.path) == 0:
+                self._data = np.zeros(0, dtype=np.uint8)
+            else:
+                # plain ndarray view so callers checking type(value) == np.ndarray keep working
+                self._data = np.memmap(self.path, dtype=np.uint8, mode='r').view(np.ndarray)
+        return self._data
+
+    def _get_bytes(self, offset, size, compressed):
+        raw = self._buffer()[offset:offset + size]
+        return zlib.decompress(raw.tobytes()) if compressed else raw
+
+    def _get_array(self, entry):
+        _, offset, size, compressed, dtype, shape = entry
+        raw = self._get_bytes(offset, size, compressed)
+        if compressed:
+            return np.frombuffer(raw, dtype=dtype).reshape(shape)
+        return raw.view(dtype).reshape(shape)
+
+    def get(self, name):
+        '''
+        Get the value saved under name
+
+        Args:
+            name (`str`): Name of the value
+
+        Returns:
+            numpy ndarray, list or dict of numpy ndarray, or the unpickled data
+        '''
+        if name not in self._entries:
+            raise Exception('snapshot {} has no value for name {}'.format(self.path, name))
+        entry = self._entries[name]
+        kind = entry[0]
+        if kind == 'ndarray':
+            return self._get_array(entry)
+        elif kind == 'list':
+            return [self._get_array(e) for e in entry[1]]
+        elif kind == 'dict':
+            return dict((k, self._get_array(e)) for k, e in entry[1])
+        _, offset, size, compressed = entry
+        raw = self._get_bytes(offset, size, compressed)
+        return pickle.loads(raw if compressed else raw.tobytes())
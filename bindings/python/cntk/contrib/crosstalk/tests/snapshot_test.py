@@ -0,0 +1,67 @@
+import os
+import tempfile
+import pytest
+import numpy as np
+from cntk.contrib import crosstalk as cstk
+from cntk.contrib.crosstalk.snapshot import SnapshotReader, SnapshotWriter
+
+shape1 = (100, 200,)
+param1 = np.random.random(shape1).astype(np.float32)
+param2 = np.random.random((10, 20,)).astype(np.float32)
+
+class _Holder(object):
+    def __init__(self, value):
+        self.value = value
+
+def _make_crosstalk():
+    ci = cstk.Crosstalk()
+    def setter(h, value, attr):
+        h.value = value
+    def getter(h, attr):
+        return h.value
+    ci.register_funcs(_Holder, setter=setter, getter=getter)
+    return ci
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_snapshot_roundtrip(compress):
+    path = os.path.join(tempfile.mkdtemp(), '0.snapshot')
+    writer = SnapshotWriter(path, compress=compress)
+    writer.put('p1', param1)
+    writer.put('seq', [param1[:3], param2])
+    writer.put('dict', {'param1':param1, 'param2':param2})
+    writer.put('misc', {'lr':0.1})
+    writer.close()
+
+    reader = SnapshotReader(path)
+    assert sorted(reader.names()) == ['dict', 'misc', 'p1', 'seq']
+    p1 = reader.get('p1')
+    assert type(p1) == np.ndarray and p1.dtype == np.float32
+    assert np.array_equal(p1, param1)
+    seq = reader.get('seq')
+    assert np.array_equal(seq[0], param1[:3]) and np.array_equal(seq[1], param2)
+    d = reader.get('dict')
+    assert np.array_equal(d['param1'], param1) and np.array_equal(d['param2'], param2)
+    assert reader.get('misc') == {'lr':0.1}
+
+def test_crosstalk_snapshot_compare_all():
+    workdir = tempfile.mkdtemp()
+    ci = _make_crosstalk()
+    ci.set_workdir(workdir, snapshot=True)
+    p1 = _Holder(param1)
+    p1_p2 = _Holder({'param1':param1, 'param2':param2})
+    ci.watch(p1, 'p1')
+    ci.watch(p1_p2, 'p1_p2')
+    ci.save_all()
+    assert sorted(os.listdir(workdir)) == ['0.snapshot', '0.snapshot.idx']
+
+    ci.assign('p1', value=np.zeros(shape1, dtype=np.float32))
+    ci.assign('p1', load=True)
+    assert np.array_equal(p1.value, param1)
+
+    p1.value = param1 + 1e-3
+    results = ci.compare_all(num_workers=2)
+    assert not results['p1'].match
+    assert np.isclose(results['p1'].max_abs_err, 1e-3, rtol=1e-2)
+    assert results['p1_p2'].match and results['p1_p2'].max_abs_err == 0
+    assert ci.compare('p1_p2')
+    ci.reset()
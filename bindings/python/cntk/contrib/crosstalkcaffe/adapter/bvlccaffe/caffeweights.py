@@ -0,0 +1,163 @@
+# ==============================================================================
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import mmap
+import os
+
+import numpy as np
+
+# field numbers of caffe.proto
+_NET_LAYER = 100            # NetParameter.layer (LayerParameter)
+_NET_LAYERS = 2             # NetParameter.layers (V1LayerParameter)
+_LAYER_NAME = 1             # LayerParameter.name
+_LAYER_BLOBS = 7            # LayerParameter.blobs
+_V1LAYER_NAME = 4           # V1LayerParameter.name
+_V1LAYER_BLOBS = 6          # V1LayerParameter.blobs
+_BLOB_LEGACY_SHAPE = (1, 2, 3, 4)   # BlobProto.num/channels/height/width
+_BLOB_DATA = 5              # BlobProto.data
+_BLOB_SHAPE = 7             # BlobProto.shape
+_BLOB_DOUBLE_DATA = 8       # BlobProto.double_data
+_SHAPE_DIM = 1              # BlobShape.dim
+
+# wire types of the protobuf encoding
+_VARINT = 0
+_FIXED64 = 1
+_LENGTH_DELIMITED = 2
+_FIXED32 = 5
+
+
+def _read_varint(buf, pos):
+    result = 0
+    shift = 0
+    while True:
+        byte = int(buf[pos])
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def _fields(buf, start, end):
+    '''
+     Iterates over the fields of an encoded message without decoding them
+
+    Args:
+        buf (`np.array`): the encoded message as an array of uint8
+        start (int): the offset of the first field
+        end (int): the offset behind the last field
+
+    Return:
+        iterator over tuples (field number, wire type, value, end) with the
+        decoded value for varints and the start offset of the payload otherwise
+    '''
+    pos = start
+    while pos < end:
+        key, pos = _read_varint(buf, pos)
+        number, wire_type = key >> 3, key & 7
+        if wire_type == _VARINT:
+            value, pos = _read_varint(buf, pos)
+            yield number, wire_type, value, pos
+        elif wire_type == _LENGTH_DELIMITED:
+            length, pos = _read_varint(buf, pos)
+            yield number, wire_type, pos, pos + length
+            pos += length
+        elif wire_type == _FIXED32:
+            yield number, wire_type, pos, pos + 4
+            pos += 4
+        elif wire_type == _FIXED64:
+            yield number, wire_type, pos, pos + 8
+            pos += 8
+        else:
+            raise ValueError('unsupported protobuf wire type %d at offset %d' % (wire_type, pos))
+
+
+def _read_blob(buf, start, end):
+    data = None
+    unpacked = []
+    dims = []
+    legacy_shape = [0] * 4
+    for number, wire_type, value, field_end in _fields(buf, start, end):
+        if number == _BLOB_DATA and wire_type == _LENGTH_DELIMITED:
+            # packed floats are mapped without copying
+            data = np.frombuffer(buf, dtype='<f4', count=(field_end - value) // 4, offset=value)
+        elif number == _BLOB_DATA and wire_type == _FIXED32:
+            unpacked.append(value)
+        elif number == _BLOB_DOUBLE_DATA and wire_type == _LENGTH_DELIMITED:
+            data = np.frombuffer(buf, dtype='<f8', count=(field_end - value) // 8, offset=value).astype(np.float32)
+        elif number == _BLOB_SHAPE and wire_type == _LENGTH_DELIMITED:
+            for dim_number, dim_wire_type, dim_value, dim_end in _fields(buf, value, field_end):
+                if dim_number != _SHAPE_DIM:
+                    continue
+                if dim_wire_type == _VARINT:
+                    dims.append(dim_value)
+                elif dim_wire_type == _LENGTH_DELIMITED:
+                    pos = dim_value
+                    while pos < dim_end:
+                        dim, pos = _read_varint(buf, pos)
+                        dims.append(dim)
+        elif number in _BLOB_LEGACY_SHAPE and wire_type == _VARINT:
+            legacy_shape[number - 1] = value
+
+    if data is None:
+        # blobs written without packed encoding store one tagged float per element
+        offsets = np.asarray(unpacked, dtype=np.int64).reshape(-1, 1) + np.arange(4)
+        data = buf[offsets].view('<f4').reshape(-1)
+
+    shape = dims or (legacy_shape if any(legacy_shape) else None)
+    if shape and int(np.prod(shape)) == data.size:
+        data = data.reshape(shape)
+    return data
+
+
+def _read_layer(buf, start, end, name_field, blobs_field):
+    name = ''
+    blobs = []
+    for number, wire_type, value, field_end in _fields(buf, start, end):
+        if wire_type != _LENGTH_DELIMITED:
+            continue
+        if number == name_field:
+            name = buf[value:field_end].tobytes().decode('utf-8')
+        elif number == blobs_field:
+            blobs.append(_read_blob(buf, value, field_end))
+    return name, blobs
+
+
+def read_caffemodel_blobs(weights_path):
+    '''
+     Reads the parameter blobs of all layers from a .caffemodel file without
+     the Caffe runtime and without decoding the whole NetParameter message.
+     The file is memory-mapped, and the float blobs of the file are returned
+     as read-only NumPy views into it.
+
+    Args:
+        weights_path (str): the path of the .caffemodel file
+
+    Return:
+        list: tuples of the layer name and the list of its blobs as
+        `np.array`, shaped as declared in the file, for all layers with blobs
+    '''
+    size = os.path.getsize(weights_path)
+    if not size:
+        return []
+    with open(weights_path, 'rb') as weights_file:
+        # the mapping stays alive as long as arrays refer to it
+        mapped = mmap.mmap(weights_file.fileno(), 0, access=mmap.ACCESS_READ)
+    buf = np.frombuffer(mapped, dtype=np.uint8)
+
+    layers = []
+    for number, wire_type, value, field_end in _fields(buf, 0, size):
+        if wire_type != _LENGTH_DELIMITED:
+            continue
+        if number == _NET_LAYER:
+            name, blobs = _read_layer(buf, value, field_end, _LAYER_NAME, _LAYER_BLOBS)
+        elif number == _NET_LAYERS:
+            name, blobs = _read_layer(buf, value, field_end, _V1LAYER_NAME, _V1LAYER_BLOBS)
+        else:
+            continue
+        if blobs:
+            layers.append((name, blobs))
+    return layers
@@ -0,0 +1,56 @@
+# ==============================================================================
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import struct
+import numpy as np
+from cntk.contrib.crosstalkcaffe.adapter.bvlccaffe.caffeweights import read_caffemodel_blobs
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _bytes_field(number, payload):
+    return _varint(number << 3 | 2) + _varint(len(payload)) + payload
+
+
+def _varint_field(number, value):
+    return _varint(number << 3) + _varint(value)
+
+
+def test_read_caffemodel_blobs(tmpdir):
+    kernel = np.arange(24, dtype='<f4')
+    shape = _bytes_field(1, b''.join(_varint(dim) for dim in (2, 3, 2, 2)))
+    packed_blob = _bytes_field(7, shape) + _bytes_field(5, kernel.tobytes())
+    # unpacked floats with the legacy num/channels/height/width shape
+    unpacked_blob = b''.join(_varint(5 << 3 | 5) + struct.pack('<f', v) for v in (1.5, 2.5)) + \
+        _varint_field(1, 1) + _varint_field(2, 2) + _varint_field(3, 1) + _varint_field(4, 1)
+    layer = _bytes_field(1, b'conv1') + _bytes_field(2, b'Convolution') + \
+        _bytes_field(7, packed_blob) + _bytes_field(7, unpacked_blob)
+    v1_layer = _bytes_field(4, b'ip1') + _bytes_field(6, _bytes_field(5, np.ones(3, '<f4').tobytes()))
+    net = _bytes_field(1, b'net') + _bytes_field(100, layer) + \
+        _bytes_field(100, _bytes_field(1, b'relu1')) + _bytes_field(2, v1_layer)
+
+    weights_path = str(tmpdir.join('test.caffemodel'))
+    with open(weights_path, 'wb') as weights_file:
+        weights_file.write(net)
+
+    blobs = read_caffemodel_blobs(weights_path)
+    assert [name for name, _ in blobs] == ['conv1', 'ip1']
+    conv_blobs = blobs[0][1]
+    assert conv_blobs[0].shape == (2, 3, 2, 2)
+    assert np.array_equal(conv_blobs[0].ravel(), kernel)
+    assert conv_blobs[1].shape == (1, 2, 1, 1)
+    assert np.array_equal(conv_blobs[1].ravel(), [1.5, 2.5])
+    assert np.array_equal(blobs[1][1][0], np.ones(3))
@@ -27,26 +27,49 @@ class BoxSpaceDiscretizer:
             self._state_resolutions = resolution + np.zeros(space.low.shape)
         else:
             self._state_resolutions = resolution
-        self.num_states = int(np.prod(self._state_resolutions))
+        dims = [int(r) for r in np.ravel(self._state_resolutions)]
+        self.num_states = int(np.prod(dims, dtype=object)) if dims else 1
+
+        # Flattened per-dimension constants used by discretize().
+        self._dims = tuple(dims)
+        self._flat_mins = np.ravel(self._state_mins).astype(np.float64)
+        self._flat_maxs = np.ravel(self._state_maxs).astype(np.float64)
+        self._flat_ranges = self._flat_maxs - self._flat_mins
+        self._flat_resolutions = np.asarray(dims, dtype=np.float64)
+        self._flat_max_indices = self._flat_resolutions - 1
+        # Python ints are used when the flat index does not fit in intp.
+        self._fits_intp = self.num_states <= np.iinfo(np.intp).max
 
     def discretize(self, value):
-        """Discretize box space observation."""
-        index = 0
-        for i, v in np.ndenumerate(value):
-            i_idx = self._get_index(
-                v,
-                self._state_mins[i],
-                self._state_maxs[i],
-                self._state_resolutions[i])
-            index = index * self._state_resolutions[i] + i_idx
-        return int(index)
-
-    def _get_index(self, value, minv, maxv, res):
-        """Convert a continuous value to a discrete number."""
-        if value >= maxv:
-            return res - 1
-        elif value <= minv:
-            return 0
+        """Discretize box space observation.
+
+        value is either a single observation, or a batch of observations
+        stacked along a new leading axis. Returns an int for a single
+        observation and an array of ints for a batch.
+        """
+        value = np.asarray(value, dtype=np.float64)
+        shape = np.shape(self._state_mins)
+        batched = value.shape != shape
+        if batched and value.shape[1:] != shape:
+            raise ValueError(
+                'Observation of shape {0} incompatible with space of shape '
+                '{1}'.format(value.shape, shape))
+        value = value.reshape(-1, len(self._dims))
+
+        # fmax/fmin map NaN (e.g. from unbounded dimensions) to index 0.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            indices = np.floor((value - self._flat_mins) *
+                               self._flat_resolutions / self._flat_ranges)
+        indices = np.fmin(np.fmax(indices, 0), self._flat_max_indices)
+        # Values at or above the upper bound go to the last bin, also for
+        # dimensions with an infinite range.
+        indices = np.where(value >= self._flat_maxs,
+                           self._flat_max_indices, indices)
+        indices = indices.astype(np.intp)
+        if self._fits_intp:
+            index = np.ravel_multi_index(tuple(indices.T), self._dims)
         else:
-            ind = np.floor((value - minv) * res / (maxv - minv))
-            return int(min(res - 1, max(0, ind)))
+            index = np.zeros(len(indices), dtype=object)
+            for i, res in enumerate(self._dims):
+                index = index * res + indices[:, i].astype(object)
+        return index if batched else int(index[0])
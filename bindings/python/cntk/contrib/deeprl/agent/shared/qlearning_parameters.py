@@ -78,6 +78,12 @@ class QLearningParameters:
         self.initial_q = self.config.getfloat(
             'QLearningAlgo', 'InitialQ', fallback=0.0)
 
+        # Store the Q table as a hash map that only allocates rows for visited
+        # states, instead of a dense (num_states, num_actions) array. Only
+        # used by tabular Q-learning.
+        self.sparse_q_table = self.config.getboolean(
+            'QLearningAlgo', 'SparseQTable', fallback=False)
+
         # Number of partitions for discretizing the continuous space. Either a
         # scalar which is applied to all dimensions, or a list specifying
         # different value for different dimension.
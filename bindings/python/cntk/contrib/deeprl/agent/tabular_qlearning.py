@@ -13,6 +13,46 @@ from .agent import AgentBaseClass
 from .shared.qlearning_parameters import QLearningParameters
 
 
+class _SparseQTable(object):
+    """Q table that only allocates rows for visited states.
+
+    Supports the indexing used by TabularQLearning: q[state] returns the row
+    of action values, q[state, action] gets or sets a single entry. Reading
+    a row of an unvisited state does not allocate it.
+    """
+
+    def __init__(self, num_actions, initial_q):
+        self._num_actions = num_actions
+        self._initial_q = initial_q
+        self._rows = {}
+
+    def __len__(self):
+        """Number of allocated states."""
+        return len(self._rows)
+
+    def states(self):
+        """Sorted list of allocated states."""
+        return sorted(self._rows.keys())
+
+    def _default_row(self):
+        return self._initial_q + np.zeros(self._num_actions)
+
+    def __getitem__(self, key):
+        if isinstance(key, tuple):
+            state, action = key
+            row = self._rows.get(state)
+            return self._initial_q if row is None else row[action]
+        row = self._rows.get(key)
+        return self._default_row() if row is None else row
+
+    def __setitem__(self, key, value):
+        state, action = key
+        row = self._rows.get(state)
+        if row is None:
+            row = self._rows[state] = self._default_row()
+        row[action] = value
+
+
 class TabularQLearning(AgentBaseClass):
     """Q-learning agent with tabular representation."""
 
@@ -31,10 +71,18 @@ class TabularQLearning(AgentBaseClass):
             self._discretize_observation_space(
                 o_space, self._parameters.discretization_resolution)
 
-        self._q = self._parameters.initial_q + \
-            np.zeros((self._num_states, self._num_actions))
+        if self._parameters.sparse_q_table:
+            self._q = _SparseQTable(
+                self._num_actions, self._parameters.initial_q)
+        else:
+            self._q = self._parameters.initial_q + \
+                np.zeros((self._num_states, self._num_actions))
         print('Initialized discrete Q-learning agent with {0} states and '
-              '{1} actions.'.format(self._num_states, self._num_actions))
+              '{1} actions{2}.'.format(
+                  self._num_states,
+                  self._num_actions,
+                  ' (sparse Q table)' if self._parameters.sparse_q_table
+                  else ''))
 
         self.episode_count = 0
         # step_count is incremented each time after receiving reward.
@@ -83,9 +131,16 @@ class TabularQLearning(AgentBaseClass):
         self._best_model = copy.deepcopy(self._q)
 
     def save(self, filename):
-        """Save best model to file."""
+        """Save best model to file.
+
+        A sparse Q table only saves the states that were visited.
+        """
+        if isinstance(self._best_model, _SparseQTable):
+            states = self._best_model.states()
+        else:
+            states = range(self._num_states)
         with open(filename, 'w') as f:
-            for s in range(self._num_states):
+            for s in states:
                 f.write('{0}\t{1}\n'.format(s, str(self._best_model[s])))
 
     def save_parameter_settings(self, filename):
@@ -63,3 +63,26 @@ class BoxSpaceDiscretizerTest(unittest.TestCase):
         self.assertEqual(sut.discretize([[0, 0], [0, 0.95]]), 1)
         self.assertEqual(sut.discretize([[0.1, 0.6], [0.5, 0.2]]), 6)
         self.assertEqual(sut.discretize([[1, 1], [1, 1]]), 15)
+
+    def test_batch(self):
+        s = spaces.Box(0, 1, (2,))
+        sut = BoxSpaceDiscretizer(s, np.array([10, 2]))
+
+        np.testing.assert_array_equal(
+            sut.discretize([[0, 0], [0.95, 0], [0.1, 0.2], [1, 1]]),
+            [0, 18, 2, 19])
+
+    def test_out_of_range(self):
+        s = spaces.Box(0, 1, (2,))
+        sut = BoxSpaceDiscretizer(s, 10)
+
+        self.assertEqual(sut.discretize([-5, 0.1]), 1)
+        self.assertEqual(sut.discretize([0.1, 5]), 19)
+
+    def test_unbounded(self):
+        s = spaces.Box(np.array([0, -np.inf]), np.array([np.inf, np.inf]))
+        sut = BoxSpaceDiscretizer(s, 10)
+
+        self.assertEqual(sut.discretize([5, 5]), 0)
+        self.assertEqual(sut.discretize([np.inf, 5]), 90)
+        self.assertEqual(sut.discretize([5, np.inf]), 9)
@@ -125,6 +125,30 @@ class TabularQLearningTest(unittest.TestCase):
         np.testing.assert_almost_equal(
             sut._q, [[0.1, 0], [0, 0.2274304], [0, 0]])
 
+    @patch('cntk.contrib.deeprl.agent.tabular_qlearning.QLearningParameters')
+    def test_update_sparse(self, mock_qlearn_parameters):
+        self._setup_qlearn_parameters(mock_qlearn_parameters.return_value)
+        mock_qlearn_parameters.return_value.sparse_q_table = True
+        action_space = spaces.Discrete(2)
+        observation_space = spaces.Discrete(3)
+        sut = FakeTabularQLearning('', observation_space, action_space)
+
+        sut.start(0)
+        self.assertEqual(len(sut._q), 0)
+        sut.step(1, 1)
+        sut.step(1, 1)
+        self.assertEqual(sut._q.states(), [0, 1])
+        np.testing.assert_array_equal(sut._q[0], [0.1, 0])
+        np.testing.assert_array_equal(sut._q[1], [0, 0.09])
+        # Reading an unvisited state does not allocate it.
+        np.testing.assert_array_equal(sut._q[2], [0, 0])
+        self.assertEqual(len(sut._q), 2)
+
+        sut.step(1, 1)
+        sut.end(1, 2)
+        np.testing.assert_almost_equal(sut._q[1], [0, 0.2274304])
+        self.assertEqual(sut._q.states(), [0, 1])
+
     def _setup_qlearn_parameters(self, qlearn_parameters):
         qlearn_parameters.q_representation = 'tabular'
         qlearn_parameters.initial_q = 0
@@ -135,3 +159,4 @@ class TabularQLearningTest(unittest.TestCase):
         qlearn_parameters.eta_decay_step_count = 9
         qlearn_parameters.eta_minimum = 0.01
         qlearn_parameters.gamma = 0.9
+        qlearn_parameters.sparse_q_table = False
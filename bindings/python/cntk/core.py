@@ -19,7 +19,6 @@ from . import cntk_py
 from .device import use_default_device, cpu, DeviceKind
 from cntk.internal import typemap
 from cntk.internal.sanitize import sanitize_batch,\
-                                   _sparse_to_dense_network_cache,\
                                    data_type_to_dtype
 
 
@@ -183,6 +182,32 @@ class NDArrayView(cntk_py.NDArrayView):
         '''
         return super(NDArrayView, self).shape().dimensions()
 
+    def to_csr(self):
+        '''
+        Converts a sparse NDArrayView to a SciPy CSR matrix directly from its
+        sparse buffers, i.e. without creating a dense intermediate.
+
+        Example:
+            >>> data = sparse.csr_matrix(np.asarray([[0, 1, 0], [2, 0, 3]], dtype=np.float32))
+            >>> nd = NDArrayView.from_csr(data)
+            >>> nd.to_csr().toarray()
+            array([[ 0.,  1.,  0.],
+                   [ 2.,  0.,  3.]], dtype=float32)
+
+        Returns:
+            scipy.sparse.csr_matrix: matrix that has the last axis of this
+            instance as columns and all preceding axes flattened into rows
+        '''
+        if not self.is_sparse:
+            raise ValueError('only sparse NDArrayViews can be converted '
+                             'to CSR')
+
+        data, indices, indptr = self._to_csr_buffers()
+        shape = self.shape
+        num_cols = shape[-1] if shape else 1
+        return sparse.csr_matrix((data, indices, indptr),
+                                 shape=(len(indptr) - 1, num_cols))
+
     @typemap
     def slice_view(self, start_offset, extent, read_only=True):
         '''
@@ -291,13 +316,7 @@ class Value(cntk_py.Value):
             if variable is None:
                 raise ValueError('cannot convert sparse value to sequences '
                                  'without the corresponding variable')
-            network = _sparse_to_dense_network_cache(variable.shape, True, self.device)
-
-            warnings.warn('converting Value object to CSR format might be slow')
-
-            # TODO: Add direct conversion, since creating an intermediate array might be slow
-            dense_data = network.eval(self, device=self.device)
-            return [sparse.csr_matrix(seq) for seq in dense_data]
+            return self._sparse_as_sequences(variable)
 
         else:
             # Checking for mask without retrieving
@@ -320,6 +339,27 @@ class Value(cntk_py.Value):
                 else:
                     return list(arr)
 
+    def _sparse_as_sequences(self, variable):
+        # The CSR export has one row per sample (per row of the sample, if
+        # it has more than one axis), laid out sequence by sequence with
+        # every sequence padded to the length of the longest one.
+        csr = self.data.to_csr()
+
+        shape = self.shape
+        dynamic_shape = shape[:len(shape) - len(variable.shape)]
+        num_sequences = dynamic_shape[0] if len(dynamic_shape) > 0 else 1
+        max_length = dynamic_shape[1] if len(dynamic_shape) > 1 else 1
+        rows_per_step = csr.shape[0] // (num_sequences * max_length)
+
+        if super(Value, self).mask() is not None:
+            lengths = np.count_nonzero(self.mask != cntk_py.MaskKind_Invalid, axis=1)
+        else:
+            lengths = [max_length] * num_sequences
+
+        rows_per_sequence = max_length * rows_per_step
+        return [csr[idx * rows_per_sequence:idx * rows_per_sequence + length * rows_per_step]
+                for idx, length in enumerate(lengths)]
+
     @staticmethod
     def _as_best_data_type(var, sample):
         convert_to_var_dtype = False
@@ -467,6 +507,96 @@ class Value(cntk_py.Value):
 
         return value
 
+    @staticmethod
+    @typemap
+    def create_from_padded(var, data, sequence_lengths=None, mask=None,
+                           seq_starts=None, device=None, read_only=False):
+        '''
+        Creates a :class:`~cntk.core.Value` object for a batch of sequences
+        that is given as one padded NumPy array. In contrast to :meth:`create`
+        with a list of sequences, no per-sequence arrays are created and the
+        data is not copied into a new buffer: on the CPU the Value borrows the
+        memory of ``data``, which therefore must not be modified while the
+        Value is in use.
+
+        Example:
+            >>> x = C.sequence.input_variable(2)
+            >>> data = np.asarray([[[1, 2], [3, 4]], [[5, 6], [0, 0]]], dtype=np.float32)
+            >>> value = C.Value.create_from_padded(x, data, sequence_lengths=[2, 1])
+            >>> value.mask
+            array([[2, 1],
+                   [2, 0]], dtype=int8)
+
+        Args:
+            var (:class:`~cntk.variables.Variable`): variable into which
+             ``data`` is passed. It must have a sequence axis.
+            data (numpy.ndarray): padded data of shape
+             ``(num_sequences, max_sequence_length) + var.shape``
+            sequence_lengths (list or NumPy array of ints, optional): the valid
+             length of every sequence. If neither this nor ``mask`` is given,
+             all sequences are assumed to span the full padded length.
+            mask (NumPy array, optional): alternatively to ``sequence_lengths``,
+             an array of shape ``(num_sequences, max_sequence_length)`` that is
+             non-zero for valid steps. Valid steps must precede the padding.
+            seq_starts (list of `bool`\ s or None): if None, every sequence is
+             treated as a new sequence. Otherwise, it is interpreted as a list of
+             Booleans that tell whether a sequence is a new sequence (`True`) or a
+             continuation of the sequence in the same slot of the previous
+             minibatch (`False`)
+            device (:class:`~cntk.device.DeviceDescriptor`, default None): device
+             this value should be put on
+            read_only (bool, default False): whether the data is read only
+
+        Returns:
+            :class:`~cntk.core.Value` object.
+        '''
+        if not isinstance(var, cntk_py.Variable):
+            raise TypeError('Variable expected, but got "%s"' % type(var))
+
+        if len(var.dynamic_axes) <= 1:
+            raise ValueError('padded sequence data requires an input variable '
+                             'with a sequence axis')
+
+        if not isinstance(data, np.ndarray) or data.ndim < 2:
+            raise ValueError('padded sequence data must be a NumPy array of '
+                             'shape (num_sequences, max_sequence_length, ...)')
+
+        data = Value._as_best_data_type(var, data)
+        num_sequences, max_sequence_length = data.shape[:2]
+
+        if sequence_lengths is not None and mask is not None:
+            raise ValueError('specify either sequence_lengths or mask, not both')
+
+        if mask is not None:
+            mask = np.asarray(mask) != 0
+            if mask.shape != (num_sequences, max_sequence_length):
+                raise ValueError('mask shape %s does not match the padded data '
+                                 'shape %s' % (mask.shape, data.shape[:2]))
+            sequence_lengths = mask.sum(axis=1)
+            # every row has to be a run of valid steps followed by padding
+            steps = np.arange(max_sequence_length)
+            if np.any(mask != (steps < sequence_lengths[:, None])):
+                raise ValueError('the mask must mark a prefix of every '
+                                 'sequence as valid')
+        elif sequence_lengths is None:
+            sequence_lengths = np.full(num_sequences, max_sequence_length)
+
+        sequence_lengths = [int(l) for l in sequence_lengths]
+
+        device = device or use_default_device()
+        borrow = device.type() == DeviceKind.CPU
+        ndav = NDArrayView.from_dense(data, device=cpu(), read_only=read_only,
+                                      borrow=borrow)
+
+        value = cntk_py.Value._create_from_padded(ndav, sequence_lengths,
+                                                  seq_starts or [], device,
+                                                  read_only)
+        if borrow:
+            # the Value aliases the NumPy buffer, which has to outlive it
+            value._padded_data = data
+
+        return value
+
     ONE_HOT_SKIP = cntk_py.Value.one_hot_skip
 
     @staticmethod
@@ -657,6 +787,62 @@ def user_function(user_func):
     return as_composite(user_func)
 
 
+class OutputBufferPool(object):
+    '''
+    Pool of preallocated output arrays, which can be passed as ``out`` to
+    :meth:`~cntk.ops.functions.Function.eval` and
+    :meth:`~cntk.ops.functions.Function.forward` when the batch size varies
+    between calls. For every output one array is kept, which is grown
+    geometrically, and views of its first ``batch_size`` rows are handed out.
+    The arrays returned by an evaluation are therefore overwritten by the next
+    evaluation that uses the same pool.
+
+    Example:
+        >>> x = C.input_variable(2)
+        >>> f = x * 2
+        >>> pool = C.OutputBufferPool()
+        >>> f.eval({x: np.ones((3, 2), dtype=np.float32)}, out=pool)
+        array([[ 2.,  2.],
+               [ 2.,  2.],
+               [ 2.,  2.]], dtype=float32)
+    '''
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, var, batch_size):
+        '''
+        Returns an array for the values of ``var`` for a batch of
+        ``batch_size`` samples.
+
+        Args:
+            var (:class:`~cntk.variables.Variable`): the output variable
+            batch_size (int): number of samples in the batch. It is ignored
+             if ``var`` has no batch axis.
+
+        Returns:
+            numpy.ndarray: C contiguous view into the pooled memory
+        '''
+        shape = tuple(var.shape)
+        if any(dim < 0 for dim in shape):
+            raise ValueError('cannot preallocate an output array for "%s", '
+                             'since its shape %s is not fully defined' %
+                             (var, shape))
+
+        if not var.dynamic_axes:
+            array = self._buffers.get(var)
+            if array is None:
+                array = self._buffers[var] = np.empty(shape, dtype=var.dtype)
+            return array
+
+        array = self._buffers.get(var)
+        if array is None or len(array) < batch_size:
+            capacity = batch_size if array is None else max(batch_size, 2 * len(array))
+            array = self._buffers[var] = np.empty((capacity,) + shape, dtype=var.dtype)
+
+        return array[:batch_size]
+
+
 def asarray(value, dtype=None):
     '''
     Converts a Value object to a sequence of NumPy arrays (if dense) or CSR arrays (if sparse).
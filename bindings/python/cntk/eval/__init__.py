@@ -9,4 +9,6 @@ Utilities for model evaluation.
 """
 
 
-from .evaluator import *
\ No newline at end of file
+from .evaluator import *
+from .batching import *
+from .pool import *
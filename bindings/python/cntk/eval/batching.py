@@ -0,0 +1,271 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+try:
+    import queue
+except ImportError: # Python 2
+    import Queue as queue
+
+__doc__ = '''\
+A batching evaluator serves many concurrent single-sample evaluation requests
+by coalescing them into minibatches, such that every forward pass of the model
+processes as many samples as possible within a given latency budget.
+'''
+
+__all__ = ['BatchingEvaluator']
+
+
+class _Request(object):
+    __slots__ = ['sample', 'future', 'arrival_time']
+
+    def __init__(self, sample):
+        self.sample = sample
+        self.future = Future()
+        self.arrival_time = time.time()
+
+
+_STOP = object()
+
+
+class BatchingEvaluator(object):
+    '''
+    Evaluates a model on individually submitted samples by collecting the
+    requests that arrive within ``max_latency`` seconds (or until
+    ``max_batch_size`` requests are pending) into one minibatch, running a
+    single forward pass on it and handing the results back to the callers.
+
+    The evaluator runs a background thread that owns the model. Requests can
+    be submitted from any thread through :meth:`submit` or :meth:`evaluate`
+    (e.g. from the handlers of a thread pool based server), or from asyncio
+    coroutines through :meth:`evaluate_async`.
+
+    Example:
+        >>> x = C.input_variable(2)
+        >>> model = C.plus(x, 1)
+        >>> with BatchingEvaluator(model, max_batch_size=8) as evaluator:
+        ...     futures = [evaluator.submit(np.asarray([i, i], dtype=np.float32)) for i in range(3)]
+        ...     results = [f.result() for f in futures]
+        >>> results[2]
+        array([ 3.,  3.], dtype=float32)
+
+    Args:
+        model (:class:`~cntk.ops.functions.Function`): the model to evaluate
+        max_batch_size (int, default 32): maximum number of requests that are
+         evaluated in one minibatch
+        max_latency (float, default 0.005): maximum time in seconds the oldest
+         pending request waits for further requests before its minibatch is
+         evaluated
+        inputs (list, optional): the arguments of ``model`` in the order in
+         which their samples are passed to :meth:`submit`. Defaults to
+         ``model.arguments``.
+        outputs (iterable, optional): outputs to fetch values for. If not
+         set, all outputs of the model will be fetched.
+        device (:class:`~cntk.device.DeviceDescriptor`, default `None`): the device
+         on which the model is evaluated. If `None`, the default device is used.
+    '''
+
+    def __init__(self, model, max_batch_size=32, max_latency=0.005,
+                 inputs=None, outputs=None, device=None):
+        if max_batch_size < 1:
+            raise ValueError('max_batch_size must be positive')
+        if max_latency < 0:
+            raise ValueError('max_latency must not be negative')
+
+        self._evaluate = model.prepare(inputs=inputs, outputs=outputs,
+                                       device=device)
+        self._is_sequence = [len(var.dynamic_axes) > 1
+                             for var in self._evaluate.inputs]
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._num_requests = 0
+        self._num_batches = 0
+
+        self._worker = threading.Thread(target=self._run,
+                                        name='BatchingEvaluator')
+        self._worker.daemon = True
+        self._worker.start()
+
+    def submit(self, *sample):
+        '''
+        Submits one sample for evaluation.
+
+        Args:
+            sample: one NumPy array per input of the model, holding a single
+             sample (or a single sequence for inputs with a sequence axis)
+
+        Returns:
+            :class:`concurrent.futures.Future`: future that receives the
+            model's output for this sample, i.e. a NumPy array for models with
+            a single output or a dict that maps the outputs to NumPy arrays.
+        '''
+        if len(sample) != len(self._is_sequence):
+            raise ValueError('model expects %i inputs, but got %i' %
+                             (len(self._is_sequence), len(sample)))
+
+        request = _Request(sample)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot submit requests to a closed '
+                                   'BatchingEvaluator')
+            self._queue.put(request)
+
+        return request.future
+
+    def evaluate(self, *sample, **kwargs):
+        '''
+        Evaluates one sample and blocks until its result is available.
+
+        Args:
+            sample: one NumPy array per input of the model
+            timeout (float, optional): maximum time in seconds to wait for
+             the result
+
+        Returns:
+            the model's output for this sample (see :meth:`submit`)
+        '''
+        timeout = kwargs.pop('timeout', None)
+        if kwargs:
+            raise TypeError('unexpected keyword arguments: %s' %
+                            ', '.join(kwargs))
+
+        return self.submit(*sample).result(timeout)
+
+    def evaluate_async(self, *sample):
+        '''
+        Evaluates one sample from an asyncio event loop.
+
+        Args:
+            sample: one NumPy array per input of the model
+
+        Returns:
+            an awaitable that yields the model's output for this sample (see
+            :meth:`submit`)
+        '''
+        import asyncio
+        return asyncio.wrap_future(self.submit(*sample))
+
+    @property
+    def statistics(self):
+        '''
+        Dict with the number of served ``requests``, the number of evaluated
+        ``batches``, the ``average_batch_size`` and the number of requests
+        currently waiting in the queue (``queue_size``).
+        '''
+        with self._lock:
+            requests, batches = self._num_requests, self._num_batches
+
+        return {
+            'requests': requests,
+            'batches': batches,
+            'average_batch_size': float(requests) / batches if batches else 0.0,
+            'queue_size': self._queue.qsize(),
+        }
+
+    def close(self):
+        '''
+        Evaluates all pending requests and stops the background thread.
+        '''
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            request = self._queue.get()
+            if request is _STOP:
+                break
+
+            batch = [request]
+            deadline = request.arrival_time + self.max_latency
+            while len(batch) < self.max_batch_size:
+                try:
+                    timeout = deadline - time.time()
+                    if timeout > 0:
+                        request = self._queue.get(timeout=timeout)
+                    else:
+                        # the latency budget is used up, but requests that
+                        # are already waiting can still join this batch
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if request is _STOP:
+                    stop = True
+                    break
+                batch.append(request)
+
+            self._evaluate_batch(batch)
+
+        # serve the requests that were queued before the evaluator was closed
+        pending = []
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not _STOP:
+                pending.append(request)
+        for start in range(0, len(pending), self.max_batch_size):
+            self._evaluate_batch(pending[start:start + self.max_batch_size])
+
+    def _evaluate_batch(self, batch):
+        batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            self._serve(batch)
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+
+            # a single bad request must not fail the other requests of its
+            # minibatch, so evaluate them one by one to isolate the error
+            for r in batch:
+                try:
+                    self._serve([r])
+                except Exception as e:
+                    r.future.set_exception(e)
+
+    def _serve(self, batch):
+        args = []
+        for i, is_sequence in enumerate(self._is_sequence):
+            samples = [r.sample[i] for r in batch]
+            args.append(samples if is_sequence else np.stack(samples))
+
+        result = self._evaluate(*args)
+
+        with self._lock:
+            self._num_requests += len(batch)
+            self._num_batches += 1
+
+        for idx, r in enumerate(batch):
+            if isinstance(result, dict):
+                r.future.set_result(dict((k, v[idx]) for k, v in result.items()))
+            else:
+                r.future.set_result(result[idx])
@@ -0,0 +1,252 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future
+
+from ..internal.sanitize import sanitize_argument_order, sanitize_variables_or_functions
+
+try:
+    import queue
+except ImportError: # Python 2
+    import Queue as queue
+
+__doc__ = '''\
+An evaluator pool evaluates one model from several threads in parallel. Every
+worker thread owns a clone of the model that shares its parameters with the
+original, so the weights are held in memory only once.
+'''
+
+__all__ = ['EvaluatorPool']
+
+
+_STOP = object()
+
+
+class EvaluatorPool(object):
+    '''
+    Dispatches evaluation calls of a model across a pool of worker threads.
+    Each worker evaluates its own clone of the model created with
+    :attr:`~cntk.ops.functions.CloneMethod.share`, and the native forward pass
+    runs with the GIL released, so that a single process can use all cores
+    of a CPU inference host.
+
+    Example:
+        >>> x = C.input_variable(2)
+        >>> model = C.times(x, C.parameter(init=np.eye(2, dtype=np.float32)))
+        >>> with EvaluatorPool(model, num_threads=2) as pool:
+        ...     futures = [pool.submit(np.asarray([[i, 1]], dtype=np.float32)) for i in range(4)]
+        ...     results = [f.result() for f in futures]
+        >>> results[3]
+        array([[ 3.,  1.]], dtype=float32)
+
+    Args:
+        model (:class:`~cntk.ops.functions.Function`): the model to evaluate
+        num_threads (int, optional): number of worker threads. Defaults to the
+         number of CPUs.
+        inputs (list, optional): the arguments of ``model`` (variables or
+         their names) in the order in which their batches are passed to
+         :meth:`submit`. Defaults to ``model.arguments``.
+        outputs (iterable, optional): outputs of ``model`` to fetch values
+         for. If not set, all outputs of the model will be fetched.
+        device (:class:`~cntk.device.DeviceDescriptor`, default `None`): the device
+         on which the model is evaluated. If `None`, the default device is used.
+    '''
+
+    def __init__(self, model, num_threads=None, inputs=None, outputs=None,
+                 device=None):
+        if num_threads is None:
+            num_threads = multiprocessing.cpu_count()
+        if num_threads < 1:
+            raise ValueError('num_threads must be positive')
+
+        input_indices = [model.arguments.index(var) for var in
+                         sanitize_argument_order(model.arguments, inputs)]
+
+        if outputs is None:
+            outputs = model.outputs
+        else:
+            outputs = sanitize_variables_or_functions(outputs)
+        output_indices = []
+        for var in outputs:
+            if var not in model.outputs:
+                raise ValueError('EvaluatorPool can only fetch outputs of the '
+                                 'model, but %s is not one of them' % var)
+            output_indices.append(model.outputs.index(var))
+        self.outputs = tuple(outputs)
+
+        from cntk.ops.functions import CloneMethod
+        self._evaluators = []
+        for i in range(num_threads):
+            clone = model if i == 0 else model.clone(CloneMethod.share)
+            self._evaluators.append(clone.prepare(
+                inputs=[clone.arguments[j] for j in input_indices],
+                outputs=[clone.outputs[j] for j in output_indices],
+                device=device))
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._start_time = None
+        self._num_submitted = 0
+        self._num_completed = 0
+        self._num_failed = 0
+        self._num_busy = 0
+        self._wait_time = 0.0
+        self._eval_time = 0.0
+
+        self._workers = []
+        for i, evaluator in enumerate(self._evaluators):
+            worker = threading.Thread(target=self._run, args=(evaluator,),
+                                      name='EvaluatorPool-%i' % i)
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    @property
+    def num_threads(self):
+        '''
+        The number of worker threads.
+        '''
+        return len(self._workers)
+
+    def submit(self, *args):
+        '''
+        Schedules the evaluation of one minibatch.
+
+        Args:
+            args: one batch (a NumPy array, a list of sequences or a
+             :class:`~cntk.core.Value`) per input of the model
+
+        Returns:
+            :class:`concurrent.futures.Future`: future that receives the same
+            result as :meth:`~cntk.ops.functions.Function.eval`, with the
+            outputs of the original model as keys if several outputs are
+            fetched.
+        '''
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('cannot submit work to a closed '
+                                   'EvaluatorPool')
+            if self._start_time is None:
+                self._start_time = time.time()
+            self._num_submitted += 1
+            self._queue.put((args, future, time.time()))
+
+        return future
+
+    def evaluate(self, *args):
+        '''
+        Evaluates one minibatch on a worker thread and blocks until its result
+        is available.
+
+        Args:
+            args: one batch per input of the model
+
+        Returns:
+            the same as :meth:`submit` yields
+        '''
+        return self.submit(*args).result()
+
+    def map(self, batches):
+        '''
+        Evaluates a sequence of minibatches in parallel.
+
+        Args:
+            batches (iterable): tuples with one batch per input of the model,
+             or single batches for models with one input
+
+        Returns:
+            list of the results, in the order of ``batches``
+        '''
+        futures = [self.submit(*(b if isinstance(b, tuple) else (b,)))
+                   for b in batches]
+        return [f.result() for f in futures]
+
+    @property
+    def statistics(self):
+        '''
+        Dict with the number of ``submitted``, ``completed`` and ``failed``
+        evaluations, the number of evaluations waiting in the queue
+        (``queue_size``), the number of ``busy_threads``, the ``throughput``
+        in completed evaluations per second since the first submission, and
+        the average time in seconds an evaluation waited in the queue
+        (``average_wait_time``) and ran on a worker (``average_eval_time``).
+        '''
+        with self._lock:
+            done = self._num_completed + self._num_failed
+            elapsed = time.time() - self._start_time \
+                if self._start_time is not None else 0.0
+            return {
+                'submitted': self._num_submitted,
+                'completed': self._num_completed,
+                'failed': self._num_failed,
+                'queue_size': self._queue.qsize(),
+                'busy_threads': self._num_busy,
+                'throughput': self._num_completed / elapsed if elapsed > 0 else 0.0,
+                'average_wait_time': self._wait_time / done if done else 0.0,
+                'average_eval_time': self._eval_time / done if done else 0.0,
+            }
+
+    def close(self):
+        '''
+        Finishes all submitted evaluations and stops the worker threads.
+        '''
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._workers:
+                self._queue.put(_STOP)
+
+        for worker in self._workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _run(self, evaluator):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+
+            args, future, submit_time = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            start_time = time.time()
+            with self._lock:
+                self._num_busy += 1
+                self._wait_time += start_time - submit_time
+
+            try:
+                result = evaluator(*args)
+                if isinstance(result, dict):
+                    result = dict((self.outputs[evaluator.outputs.index(k)], v)
+                                  for k, v in result.items())
+                error = None
+            except Exception as e:
+                error = e
+
+            with self._lock:
+                self._num_busy -= 1
+                self._eval_time += time.time() - start_time
+                if error is None:
+                    self._num_completed += 1
+                else:
+                    self._num_failed += 1
+
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
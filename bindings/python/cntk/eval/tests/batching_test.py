@@ -0,0 +1,77 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import threading
+import numpy as np
+import pytest
+import cntk as C
+from cntk.eval import BatchingEvaluator
+
+
+def test_batching_evaluator_coalesces_requests():
+    x = C.input_variable(3)
+    W = C.parameter(init=np.arange(6, dtype=np.float32).reshape(3, 2))
+    z = C.times(x, W)
+
+    samples = [np.random.rand(3).astype(np.float32) for _ in range(20)]
+    expected = z.eval({x: np.asarray(samples)})
+
+    results = [None] * len(samples)
+    with BatchingEvaluator(z, max_batch_size=8, max_latency=0.05) as evaluator:
+        def client(i):
+            results[i] = evaluator.evaluate(samples[i])
+
+        threads = [threading.Thread(target=client, args=(i,))
+                   for i in range(len(samples))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = evaluator.statistics
+
+    for i, result in enumerate(results):
+        assert np.allclose(result, expected[i])
+
+    assert stats['requests'] == len(samples)
+    assert stats['batches'] < len(samples)
+    assert stats['average_batch_size'] <= 8
+
+    with pytest.raises(RuntimeError):
+        evaluator.submit(samples[0])
+
+
+def test_batching_evaluator_sequences_and_errors():
+    x = C.sequence.input_variable(2)
+    z = C.sequence.reduce_sum(x)
+
+    with BatchingEvaluator(z, max_latency=0.01) as evaluator:
+        f1 = evaluator.submit(np.ones((3, 2), dtype=np.float32))
+        f2 = evaluator.submit(np.ones((1, 2), dtype=np.float32))
+        assert np.allclose(f1.result(), [[3, 3]])
+        assert np.allclose(f2.result(), [[1, 1]])
+
+        f3 = evaluator.submit(np.ones((2, 5), dtype=np.float32))
+        with pytest.raises(Exception):
+            f3.result()
+
+        with pytest.raises(ValueError):
+            evaluator.submit()
+
+
+def test_batching_evaluator_isolates_bad_requests():
+    x = C.input_variable(3)
+    z = C.plus(x, 1)
+
+    with BatchingEvaluator(z, max_batch_size=8, max_latency=0.5) as evaluator:
+        good = evaluator.submit(np.zeros(3, dtype=np.float32))
+        bad = evaluator.submit(np.zeros(5, dtype=np.float32))
+        other = evaluator.submit(np.ones(3, dtype=np.float32))
+
+        assert np.allclose(good.result(), [1, 1, 1])
+        assert np.allclose(other.result(), [2, 2, 2])
+        with pytest.raises(Exception):
+            bad.result()
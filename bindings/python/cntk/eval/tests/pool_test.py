@@ -0,0 +1,57 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import numpy as np
+import pytest
+import cntk as C
+from cntk.eval import EvaluatorPool
+
+
+def test_evaluator_pool_shares_parameters():
+    x = C.input_variable(3)
+    W = C.parameter(init=np.arange(6, dtype=np.float32).reshape(3, 2))
+    z = C.times(x, W, name='z')
+    model = C.combine([z, C.reduce_sum(z, name='s')])
+
+    batches = [np.random.rand(4, 3).astype(np.float32) for _ in range(16)]
+
+    with EvaluatorPool(model, num_threads=4) as pool:
+        assert pool.num_threads == 4
+        results = pool.map(batches)
+
+        # the clones see updates of the shared parameter
+        W.value = np.ones((3, 2), dtype=np.float32)
+        updated = pool.evaluate(batches[0])
+
+        stats = pool.statistics
+
+    for batch, result in zip(batches, results):
+        assert set(result.keys()) == set(model.outputs)
+        expected = model.eval({model.arguments[0]: batch})
+        for output in model.outputs:
+            assert np.allclose(result[output], expected[output])
+
+    assert np.allclose(updated[model.outputs[0]], batches[0].sum(axis=1, keepdims=True) * np.ones((1, 2)))
+    assert stats['completed'] == len(batches) + 1
+    assert stats['failed'] == 0
+    assert stats['queue_size'] == 0
+
+    with pytest.raises(RuntimeError):
+        pool.submit(batches[0])
+
+
+def test_evaluator_pool_errors():
+    x = C.input_variable(2)
+    z = C.plus(x, 1)
+
+    with pytest.raises(ValueError):
+        EvaluatorPool(z, outputs=[x])
+
+    with EvaluatorPool(z, num_threads=2) as pool:
+        future = pool.submit(np.ones((1, 5), dtype=np.float32))
+        with pytest.raises(Exception):
+            future.result()
+        assert pool.statistics['failed'] == 1
@@ -6,7 +6,6 @@
 import numbers
 import collections
 import numpy as np
-import cntk as C
 
 from .. import cntk_py
 from ..axis import Axis
@@ -435,6 +434,124 @@ def sanitize_var_map(op_arguments, arguments, precision=None,
     return var_map
 
 
+def sanitize_argument_order(op_arguments, inputs=None):
+    '''
+    Resolves the order in which positional input data is mapped to the
+    arguments of a graph, such that it only has to be done once for repeated
+    evaluation (see :meth:`~cntk.ops.functions.Function.prepare`).
+
+    Args:
+        op_arguments (list of :class:`~cntk.variables.Variable`): the
+         arguments of the root function
+        inputs (list of :class:`~cntk.variables.Variable` or `str`, default
+         None): the arguments or their names in the desired order. If None,
+         the order of ``op_arguments`` is used.
+
+    Returns:
+        `tuple` of the variables in ``op_arguments`` in the requested order
+    '''
+    op_arguments = tuple(op_arguments)
+    if inputs is None:
+        return op_arguments
+
+    if is_string(inputs) or isinstance(inputs, cntk_py.Variable):
+        inputs = [inputs]
+
+    name_counter = collections.Counter(var.name for var in op_arguments)
+    var_name_map = dict((var.name, var) for var in op_arguments)
+
+    ordered = []
+    for var in inputs:
+        if is_string(var):
+            if name_counter[var] == 0:
+                raise ValueError('variable with name "%s" does not exist in the network. Available variable names: %s' % (
+                    var, ", ".join(var_name_map)))
+            elif name_counter[var] > 1:
+                raise ValueError('node name "%s" is not unique' % var)
+            var = var_name_map[var]
+        elif var not in op_arguments:
+            raise ValueError('"%s" is not an argument of the network' % var)
+
+        if var in ordered:
+            raise ValueError('argument "%s" was specified more than once' % var)
+        ordered.append(var)
+
+    missing = [var for var in op_arguments if var not in ordered]
+    if missing:
+        raise ValueError('no position was specified for the argument(s) %s' %
+                         ", ".join(str(var) for var in missing))
+
+    return tuple(ordered)
+
+
+def sanitize_output_buffers(outputs, out, arguments=None):
+    '''
+    Resolves the preallocated arrays into which the values of ``outputs``
+    are written by :meth:`~cntk.ops.functions.Function.forward` and
+    :meth:`~cntk.ops.functions.Function.eval`.
+
+    Args:
+        outputs (list): the output variables that are computed
+        out: either a NumPy array (only if there is a single output), a dict
+         that maps output variables to NumPy arrays, or an
+         :class:`~cntk.core.OutputBufferPool` that supplies the arrays for
+         the batch size of ``arguments``
+        arguments (dict, default None): the sanitized argument map, which is
+         used to determine the batch size when ``out`` is a pool
+
+    Returns:
+        `dict` that maps output variables to the NumPy arrays
+    '''
+    batch_size = _batch_size_of_arguments(arguments)
+    if isinstance(out, np.ndarray):
+        if len(outputs) != 1:
+            raise ValueError('a single output array was given, but %i outputs '
+                             'are computed. Please pass a dictionary of '
+                             'output arrays instead' % len(outputs))
+        out = {outputs[0]: out}
+    elif not isinstance(out, dict):
+        # without arguments there is no batch size, so the outputs with a
+        # batch axis are allocated by the forward pass instead of the pool
+        out = dict((var, out.get(var, batch_size)) for var in outputs
+                   if batch_size is not None or not var.dynamic_axes)
+
+    for var, array in out.items():
+        if len(var.dynamic_axes) > 1:
+            raise ValueError('output arrays are not supported for output "%s", '
+                             'since it has a sequence axis' % var)
+        if not isinstance(array, np.ndarray):
+            raise TypeError('output array for "%s" must be a NumPy array, but '
+                            'got %s' % (var, type(array)))
+        if array.dtype != var.dtype:
+            raise ValueError('output array for "%s" is of type %s, but %s is '
+                             'expected' % (var, array.dtype, var.dtype))
+        expected_shape = tuple(var.shape)
+        if var.dynamic_axes:
+            expected_shape = (-1 if batch_size is None else batch_size,) + \
+                             expected_shape
+        if len(array.shape) != len(expected_shape) or \
+                any(e >= 0 and e != a for e, a in zip(expected_shape, array.shape)):
+            raise ValueError('output array for "%s" has shape %s, but shape '
+                             '%s is expected' % (var, array.shape,
+                                                 expected_shape))
+        if not (array.flags.c_contiguous and array.flags.writeable):
+            raise ValueError('output array for "%s" must be writeable and C '
+                             'contiguous' % var)
+
+    return out
+
+
+def _batch_size_of_arguments(arguments):
+    from ..io import MinibatchData
+
+    for value in (arguments or {}).values():
+        if isinstance(value, MinibatchData):
+            value = value.data
+        return value.shape[0]
+
+    return None
+
+
 def data_type_to_dtype(data_type):
     if data_type == cntk_py.DataType_Float:
         return np.float32
@@ -619,25 +736,3 @@ def sanitize_random_args(shape, dtype):
         dtype = np.float32
     dtype = sanitize_dtype_cntk(dtype)
     return shape, dtype
-
-# Workaround for Python 2.7 not having functools.lru_cache
-def memoize(func):
-    class memodict(dict):
-        def __init__(self, f):
-            self.f = f
-        def __call__(self, *args):
-            return self[args]
-        def __missing__(self, key):
-            self[key] = ret = func(*key)
-            return ret
-    return memodict(func)
-
-@memoize
-def _sparse_to_dense_network_cache(input_shape, is_sequence, device):
-    if is_sequence:
-        temp_input = C.sequence.input_variable(input_shape, is_sparse=True)
-    else:
-        temp_input = C.input_variable(input_shape, is_sparse=True)
-
-    eye_shape = input_shape[-1]
-    return C.times(temp_input, np.eye(eye_shape))
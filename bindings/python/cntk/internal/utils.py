@@ -4,6 +4,8 @@
 # for full license information.
 # ==============================================================================
 
+import os
+import sys
 from .. import cntk_py
 import numpy as np
 from cntk import NDArrayView
@@ -11,6 +13,16 @@ from ..cntk_py import DictionaryValueFromDict, DictionaryValue, Dictionary, Dict
 
 _VARIABLE_OR_FUNCTION = (cntk_py.Variable, cntk_py.Function)
 
+def replace_file(src, dst):
+    '''
+    Renames file ``src`` to ``dst``, replacing ``dst`` if it exists. Works like
+    ``os.replace``, which is not available on Python 2. On Windows the target
+    is removed first, so the replacement is not atomic there.
+    '''
+    if sys.platform == 'win32' and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
 def get_data_type(*args):
     """
     Calculates the highest precision numpy data type of the provided parameters.
@@ -6,8 +6,23 @@
 
 import os
 import sys
+import collections
 from cntk.variables import Variable
 
+# Version of the graphs in this process. It is incremented whenever a graph
+# is modified in place (e.g. by replace_placeholders), which invalidates the
+# name indices cached on Function objects.
+_graph_version = 0
+
+
+def _invalidate_name_indices():
+    '''
+    Invalidates all name indices built by :func:`find_all_with_name` and
+    :func:`find_by_name`. Has to be called whenever a graph is changed in place.
+    '''
+    global _graph_version
+    _graph_version += 1
+
 
 def depth_first_search(root, visitor, depth=0):
     '''
@@ -27,15 +42,15 @@ def depth_first_search(root, visitor, depth=0):
     if depth == -1:
         depth = sys.maxsize
 
-    stack = [(root.root_function, depth)] # node
+    from cntk import cntk_py
+    stack = collections.deque([(root.root_function, depth)]) # node
     accum = []         # final result (list of all unique nodes)
     visited = set()    # [node.uid]
     
     while stack:
-        node, depth = stack.pop(0)
+        node, depth = stack.popleft()
         if node.uid in visited:
             continue
-        from cntk import cntk_py
         dive_into_blocks = 0 < depth
         if isinstance(node, cntk_py.Function) and node.is_block and dive_into_blocks:
             composite = node.block_root
@@ -52,12 +67,12 @@ def depth_first_search(root, visitor, depth=0):
             # BlockFunctions are short-circuited, and not added to accum[]
         try:
             # Function node
-            stack = list((i, depth) for i in node.root_function.inputs) + stack
+            stack.extendleft(reversed([(i, depth) for i in node.root_function.inputs]))
         except AttributeError:
             # OutputVariable node
             try:
                 if node.is_output:
-                    stack.insert(0, (node.owner, depth))
+                    stack.appendleft((node.owner, depth))
                     visited.add(node.uid)
                     continue
             except AttributeError:
@@ -76,6 +91,30 @@ def depth_first_search(root, visitor, depth=0):
 
     return accum
 
+def _name_index(node, depth):
+    '''
+    Returns a dict that maps the names in the graph starting from ``node`` to
+    the list of nodes with that name in depth-first search order. The index
+    is cached on ``node`` until the graph is modified in place.
+    '''
+    from cntk import cntk_py
+    if not isinstance(node, cntk_py.Function):
+        return _build_name_index(node, depth)
+
+    cache = node.__dict__.setdefault('_name_indices', {})
+    version, index = cache.get(depth, (None, None))
+    if version != _graph_version:
+        index = _build_name_index(node, depth)
+        cache[depth] = (_graph_version, index)
+
+    return index
+
+def _build_name_index(node, depth):
+    index = {}
+    for n in depth_first_search(node, lambda x: True, depth):
+        index.setdefault(n.name, []).append(n)
+    return index
+
 def find_all_with_name(node, node_name, depth=0):
     '''
     Finds functions in the graph starting from ``node`` and doing a depth-first
@@ -94,8 +133,7 @@ def find_all_with_name(node, node_name, depth=0):
         :func:`~cntk.ops.functions.Function.find_all_with_name` in class
         :class:`~cntk.ops.functions.Function`.
     '''
-    return depth_first_search(node, lambda x: x.name == node_name,
-                              depth)
+    return list(_name_index(node, depth).get(node_name, []))
 
 def find_by_name(node, node_name, depth=0):
     '''
@@ -120,8 +158,7 @@ def find_by_name(node, node_name, depth=0):
         raise ValueError('node name has to be a string. You gave '
                          'a %s' % type(node_name))
 
-    result = depth_first_search(node, lambda x: x.name == node_name,
-                                depth)
+    result = _name_index(node, depth).get(node_name, [])
 
     if len(result) > 1:
         raise ValueError('found multiple functions matching "%s". '
@@ -198,3 +198,22 @@ def test_depth_first_search_blocks(depth, prefix_count):
     assert len(found) == sum(prefix_count.values())
     for prefix, count in prefix_count.items():
         assert sum(f.startswith(prefix) for f in found_str) == count
+
+
+def test_find_by_name_index_invalidation():
+    p = C.placeholder(shape=(2,))
+    op = C.plus(p, C.constant(1, shape=(2,), name='one'), name='op')
+
+    assert op.find_by_name('x') is None
+    assert op.find_by_name('one').name == 'one'
+    # repeated lookups are served from the cached index
+    assert op.find_by_name('one').name == 'one'
+
+    x = C.input_variable(2, name='x')
+    op.replace_placeholders({p: x})
+    assert op.find_by_name('x').name == 'x'
+    assert op.x.name == 'x'
+
+    cloned = op.clone(C.CloneMethod.share, {x: C.input_variable(2, name='y')})
+    assert cloned.find_by_name('x') is None
+    assert cloned.find_by_name('y').name == 'y'
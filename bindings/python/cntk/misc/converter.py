@@ -3,6 +3,7 @@
 # Licensed under the MIT license. See LICENSE.md file in the project root
 # for full license information.
 # ==============================================================================
+import time
 import cntk as C
 
 def convert(root_func, filter, converter):
@@ -17,45 +18,119 @@ def convert(root_func, filter, converter):
     Returns:
         Cloned and converted Function (graph)
     '''
-    # recursively convert for blocks in root_func
-    blocks = C.logging.graph.depth_first_search(root_func, lambda x : type(x) == C.Function and x.root_function.is_block, depth = 0)
-    for i in range(len(blocks)):
-        # search for blocks again in case block input/output has been modified
-        blocks1 = C.logging.graph.depth_first_search(root_func, lambda x : type(x) == C.Function and x.root_function.is_block, depth = 0)
-        block = blocks1[i] # assuming depth_first_search order to be stable, so use the old index on new search results
-        block_root = C.as_composite(block.block_root)
-        new_block_root = convert(block_root, filter, converter)
-        if new_block_root != block_root:
+    return GraphRewriter(filter, converter).rewrite(root_func)
+
+class GraphRewriter(object):
+    '''
+    Rewrites a graph by substituting all Functions that pass 'filter' with the
+    Function returned by 'converter' for them, see :func:`convert`.
+
+    All matches of one graph level (the graph itself, or the composite of a block)
+    are collected in a single traversal and substituted with a single clone. Blocks
+    that contain matches are rewritten recursively and substituted by new blocks
+    in the same clone. The number of rewrites and the time they took are available
+    after :meth:`rewrite` as ``rewrite_count``, ``block_count`` and ``rewrite_time``.
+
+    Args:
+        filter: a lambda for filtering out the Functions to be converted
+        converter: a lambda for obtaining the substitute for each of the Functions to be converted
+    '''
+    def __init__(self, filter, converter):
+        self.filter = filter
+        self.converter = converter
+        self.rewrite_count = 0
+        self.block_count = 0
+        self.rewrite_time = 0.0
+
+    def rewrite(self, root_func):
+        '''
+        Clones the graph underlying root_func, substituting all Functions that pass the filter
+
+        Args:
+            root_func: a root function of a graph to be cloned and converted
+        Returns:
+            Cloned and converted Function (graph), or root_func itself if nothing was converted
+        '''
+        start = time.time()
+        result = self._rewrite_level(root_func)
+        self.rewrite_time += time.time() - start
+        return result
+
+    def _rewrite_level(self, root_func):
+        matches = []
+        blocks = []
+        def collect(f):
+            if type(f) != C.Function:
+                return False
+            if self.filter(f):
+                matches.append(f)
+            elif f.root_function.is_block:
+                blocks.append(f)
+            return False
+        C.logging.graph.depth_first_search(root_func, collect, depth = 0)
+
+        # Substitutes are built on top of placeholders for the inputs of the functions they
+        # replace. These placeholders are bound to the clones of those inputs, which already
+        # include all the substitutions underneath, once the whole level has been cloned.
+        substitutions = {}
+        bindings = []   # (placeholder, input of the original graph)
+
+        def cut_inputs(func, inputs):
+            placeholders = {}
+            for x in inputs:
+                if not (x.is_parameter or x.is_constant) and x not in placeholders:
+                    placeholders[x] = C.placeholder(shape=x.shape, dynamic_axes=x.dynamic_axes)
+            if placeholders:
+                func = func.clone(C.CloneMethod.share, placeholders)
+            used = set(func.placeholders)
+            bindings.extend((p, x) for x, p in placeholders.items() if p in used)
+            return func
+
+        for block in blocks:
+            block_root = C.as_composite(block.block_root)
+            new_block_root = self._rewrite_level(block_root)
+            if new_block_root == block_root:
+                continue
             block_arguments_mapping = dict(block.block_arguments_mapping)
+            placeholders = {}
             new_block_arguments_mapping = []
             for arg, new_arg in zip(block_root.arguments, new_block_root.arguments):
-                new_block_arguments_mapping += [(new_arg, block_arguments_mapping[arg])]
+                outer = block_arguments_mapping[arg]
+                if outer not in placeholders:
+                    placeholders[outer] = C.placeholder(shape=outer.shape, dynamic_axes=outer.dynamic_axes)
+                    bindings.append((placeholders[outer], outer))
+                new_block_arguments_mapping += [(new_arg, placeholders[outer])]
             new_block = C.as_block(new_block_root, new_block_arguments_mapping, block.op_name, block.name)
-            if all([x not in root_func.outputs for x in block.outputs]) or all([x in block.outputs for x in root_func.outputs]):
-                root_func = root_func.clone(C.CloneMethod.share, dict(zip(block.outputs, new_block.outputs)))
-            else:
-                new_outputs = [new_block.outputs[block.outputs.index(x)] if x in block.outputs else None for x in root_func.outputs]
-                root_func_nonreplaced = C.combine([x for x in root_func.outputs if x not in block.outputs])
-                root_func_nonreplaced_clone = root_func_nonreplaced.clone(C.CloneMethod.share, dict(zip(block.outputs, new_block.outputs)))
-                idx = 0
-                for nonreplaced_output in root_func_nonreplaced_clone.outputs:
-                    while new_outputs[idx]:
-                        idx += 1
-                    new_outputs[idx] = nonreplaced_output
-                root_func = C.combine(new_outputs)
-
-    # replace all Function instances under root_func that pass the specified 'filter'
-    functions_to_convert = C.logging.graph.depth_first_search(root_func, filter, depth = 0)
-    for function_to_convert in functions_to_convert:
-        converted = converter(function_to_convert)
-
-        if not function_to_convert.output in root_func.outputs:            
-            root_func = root_func.clone(C.CloneMethod.share, {function_to_convert.output : converted.output})
-        else:
-            # if cudnn_rnn output is the root_func output, just use converted as root_func and no clone needed
-            if len(root_func.outputs) > 1:
-                root_func = C.combine([converted if x == function_to_convert.output else x for x in root_func.outputs])
-            else:
-                root_func = converted
-
-    return root_func
+            substitutions.update(zip(block.outputs, new_block.outputs))
+            self.block_count += 1
+
+        for function_to_convert in matches:
+            converted = self.converter(function_to_convert)
+            if len(converted.outputs) != len(function_to_convert.outputs):
+                raise ValueError('converter returned a Function with %i outputs to substitute a Function with %i outputs'
+                                 % (len(converted.outputs), len(function_to_convert.outputs)))
+            converted = cut_inputs(converted, function_to_convert.inputs)
+            substitutions.update(zip(function_to_convert.outputs, converted.outputs))
+            self.rewrite_count += 1
+
+        if not substitutions:
+            return root_func
+
+        # A single clone of the outputs together with the inputs the substitutes need. They are
+        # wrapped in aliases, so that the root outputs themselves can be substituted as well.
+        probed = list(root_func.outputs)
+        probe_index = {}
+        for placeholder, x in bindings:
+            if x not in probe_index:
+                probe_index[x] = len(probed)
+                probed.append(x)
+        probes = C.combine([C.alias(x) for x in probed])
+        cloned = [o.owner.inputs[0] for o in probes.clone(C.CloneMethod.share, substitutions).outputs]
+
+        num_outputs = len(root_func.outputs)
+        result = C.combine(cloned[:num_outputs])
+        if bindings:
+            result.replace_placeholders(dict((p, cloned[probe_index[x]]) for p, x in bindings))
+        if num_outputs == 1 and len(result.output.owner.outputs) == 1:
+            result = C.as_composite(result.output.owner)
+        return result
@@ -0,0 +1,32 @@
+import numpy as np
+import cntk as C
+from cntk.misc.converter import GraphRewriter
+
+def test_convert_nested_matches_and_blocks():
+    x = C.input_variable(2)
+    a = C.plus(x, 1)
+    b = C.plus(a * 2, 3) # its input depends on another match
+
+    @C.layers.BlockFunction('Blk', 'blk')
+    def blk(y):
+        return C.plus(y, 10) # match inside a block
+
+    model = C.combine([a, blk(b)])
+
+    rewriter = GraphRewriter(lambda f: type(f) == C.Function and f.op_name == 'Plus',
+                             lambda f: C.minus(*f.inputs))
+    converted = rewriter.rewrite(model)
+    assert rewriter.rewrite_count == 3
+    assert rewriter.block_count == 1
+
+    data = np.asarray([[1, 2]], dtype=np.float32)
+    out = converted.eval({converted.arguments[0]: data})
+    assert np.allclose(out[converted.outputs[0]], data - 1)
+    assert np.allclose(out[converted.outputs[1]], ((data - 1) * 2 - 3) - 10)
+
+    # the original model is intact
+    out = model.eval({x: data})
+    assert np.allclose(out[model.outputs[1]], ((data + 1) * 2 + 3) + 10)
+
+    # nothing to convert
+    assert C.misc.convert(model, lambda f: False, None) == model
@@ -11,12 +11,15 @@ import collections
 
 import cntk
 from cntk import cntk_py, Value
+from cntk.core import NDArrayView
 from cntk.device import DeviceDescriptor, cpu
 from cntk.internal import map_if_possible, typemap, sanitize_var_map,\
                           sanitize_batch, sanitize_dtype_cntk, _as_tuple,\
                           sanitize_variable_value_dict,\
                           sanitize_Function_attributes,\
                           sanitize_variables_or_functions,\
+                          sanitize_argument_order,\
+                          sanitize_output_buffers,\
                           _value_as_sequence_or_array
 from cntk.internal.utils import get_python_function_arguments, \
                                 map_function_arguments, _py_dict_to_cntk_dict, \
@@ -459,7 +462,13 @@ class Function(cntk_py.Function):
             # BUGBUG: That is a problem if, e.g., someone used a layer (=BlockFunction) twice
             # and then looks it up by name, as that will fail although both instances are identical.
             from cntk.logging.graph import find_by_name
-            root = self.block_root if self.is_block else self
+            # the name index is cached on the lookup root, so keep using the
+            # same block_root object for repeated lookups
+            root = self.__dict__.get('_lookup_root')
+            if root is None:
+                root = self.block_root if self.is_block else self
+                if root is not self:
+                    self.__dict__['_lookup_root'] = root
             item = typemap(find_by_name)(root, name, depth=1)
             if item:
                 return item
@@ -569,7 +578,7 @@ class Function(cntk_py.Function):
         '''
         return super(Function, self).constants()
 
-    def eval(self, arguments=None, outputs=None, device=None, as_numpy=True):
+    def eval(self, arguments=None, outputs=None, device=None, as_numpy=True, out=None):
         '''
         Evaluate the Function's outputs using the specified ``arguments`` as input.
 
@@ -616,6 +625,9 @@ class Function(cntk_py.Function):
              costly conversion but returns a somewhat opaque object. Also, the Value objects
              are temporary and only guaranteed to be valid until the next forward/eval/backward/grad call.
              You must explicitly clone the temporay Value objects if they need to be accessed later.
+            out (optional): preallocated NumPy arrays into which the output
+             values are written in place. See
+             :meth:`~cntk.ops.functions.Function.forward` for details.
 
         Note:
              See :meth:`~cntk.ops.functions.Function.forward` for examples on
@@ -628,11 +640,47 @@ class Function(cntk_py.Function):
         if outputs is None:
             outputs = self.outputs
 
-        _, output_map = self.forward(arguments, outputs, device=device, as_numpy=as_numpy)
+        _, output_map = self.forward(arguments, outputs, device=device, as_numpy=as_numpy, out=out)
         return sanitize_variable_value_dict(output_map)
 
+    def prepare(self, inputs=None, outputs=None, device=None, as_numpy=True):
+        '''
+        Resolves the input variables, outputs and device once and returns a
+        callable that evaluates this Function on positional input data. In
+        contrast to :meth:`eval`, the returned callable does not sanitize the
+        argument map on every call, which pays off when the same small model
+        is evaluated many times (e.g. when serving single requests).
+
+        Example:
+            >>> x = C.input_variable(2)
+            >>> y = C.input_variable(2)
+            >>> f = C.plus(x, 2 * y)
+            >>> evaluate = f.prepare(inputs=[y, x])
+            >>> evaluate(np.asarray([[1, 2]], dtype=np.float32), np.asarray([[3, 4]], dtype=np.float32))
+            array([[ 5.,  8.]], dtype=float32)
+
+        Args:
+            inputs (list, optional): the arguments of this Function (variables
+             or their names) in the order in which their data will be passed
+             to the returned callable. Defaults to :attr:`arguments`.
+            outputs (iterable, optional): outputs to fetch values for. If not
+             set, all outputs of the function will be fetched.
+            device (:class:`~cntk.device.DeviceDescriptor`, default `None`): the device
+             descriptor that contains the type and id of the device on which the
+             computation is to be performed. If `None`, the default device is used.
+            as_numpy (bool): whether to return the result as a NumPy array. Default True.
+             Specifying this as False returns a CNTK Value, with the same
+             lifetime restrictions as described in :meth:`eval`.
+
+        Returns:
+            :class:`PreparedFunction`: callable that takes one batch (a NumPy
+            array, a list of sequences or a :class:`~cntk.core.Value`) per input
+            and returns the same as :meth:`eval`.
+        '''
+        return PreparedFunction(self, inputs, outputs, device, as_numpy)
+
     @typemap
-    def forward(self, arguments, outputs=None, keep_for_backward=None, device=None, as_numpy=True):
+    def forward(self, arguments, outputs=None, keep_for_backward=None, device=None, as_numpy=True, out=None):
         '''
         Computes the values of speficied variables in ``outputs``, using values
         provided in ``arguments`` that correspond to each input `Variable` of
@@ -743,6 +791,14 @@ class Function(cntk_py.Function):
              costly conversion but returns a somewhat opaque object. Also, the Value objects
              are temporary and only guaranteed to be valid until the next forward/eval/backward/grad call.
              You must explicitly clone the temporay Value objects if they need to be accessed later.
+            out (optional): preallocated output arrays that are filled in
+             place instead of allocating new arrays on every call. It can be a
+             NumPy array (for a single output), a dict that maps (a subset of)
+             ``outputs`` to NumPy arrays, or a :class:`~cntk.core.OutputBufferPool`
+             that reuses its arrays across calls with varying batch sizes. The
+             arrays must be C contiguous, have the output's data type and the
+             shape ``(batch size,) + output.shape``. Outputs with a sequence
+             axis are not supported.
 
         Returns:
              A tuple (BackPropState, map of outputs to NumPy arrays). The
@@ -761,11 +817,19 @@ class Function(cntk_py.Function):
         output_map = {v: None for v in outputs}
         keep_for_backward = set(keep_for_backward or {})
 
+        out_buffers = {}
+        if out is not None:
+            out_buffers = sanitize_output_buffers(outputs, out, in_var_map)
+            _bind_output_buffers(output_map, out_buffers)
+
         state = super(Function, self)._forward(in_var_map, output_map, device,
                                                keep_for_backward)
         if as_numpy:
             for k, v in output_map.items():
-                output_map[k] = _value_as_sequence_or_array(v, k)
+                if k in out_buffers:
+                    output_map[k] = out_buffers[k]
+                else:
+                    output_map[k] = _value_as_sequence_or_array(v, k)
 
         return state, output_map
 
@@ -931,6 +995,8 @@ class Function(cntk_py.Function):
 
     @name.setter
     def name(self, function_name):
+        from cntk.logging.graph import _invalidate_name_indices
+        _invalidate_name_indices()
         super(Function, self).set_name(function_name)
 
     @property
@@ -1098,6 +1164,8 @@ class Function(cntk_py.Function):
         substitutions = substitutions or {}
         if not isinstance(substitutions, dict):
             raise TypeError("Variable substitution map must be a dictionary")
+        from cntk.logging.graph import _invalidate_name_indices
+        _invalidate_name_indices()
         return super(Function, self).replace_placeholders(substitutions)
 
     @typemap
@@ -1115,6 +1183,8 @@ class Function(cntk_py.Function):
 
         :raises Exception: when the function has multiple placeholders.
         '''
+        from cntk.logging.graph import _invalidate_name_indices
+        _invalidate_name_indices()
         return super(Function, self).replace_placeholder(substitution)
 
     @typemap
@@ -1489,15 +1559,26 @@ class Function(cntk_py.Function):
 
     @staticmethod
     @typemap
-    def load(model, device=None):
+    def load(model, device=None, lazy=False):
         '''
         Load the ``model``, that has been saved using :func:`~cntk.ops.functions.Function.save`.
 
+        Model files are memory-mapped and parsed in place rather than read
+        through an intermediate buffer, and byte buffers are parsed without
+        being copied. By default the parameter values are copied into memory
+        owned by the loaded model. With ``lazy=True`` the model file stays
+        mapped and each parameter or constant copies its value out of it on
+        first use, so loading a model only to inspect its graph does not read
+        the weights, and processes loading the same file share its pages until then.
+
         Args:
             model (str, bytes or bytearray): either a file path of a model file or a byte buffer
              containing the binary representation of a model.
             device (:class:`~cntk.device.DeviceDescriptor`, defaults to the current globally default device):
              specifies the device to allocate the model on.
+            lazy (bool, defaults to False): copy the parameter values out of
+             the model file on first use instead of at load time. Only
+             supported for model files; ignored for legacy models.
 
         Returns:
             root node
@@ -1515,10 +1596,12 @@ class Function(cntk_py.Function):
                 pass
 
         if is_buffer:
+            if lazy:
+                raise ValueError('lazy loading is only supported for model files, not byte buffers')
             return cntk_py.Function.load_from_buffer(model, device)
 
         if is_file:
-            return cntk_py.Function.load(str(model), device)
+            return cntk_py.Function.load(str(model), device, lazy)
 
         raise ValueError('Cannot load the model {} that is neither a file nor a byte buffer.'.format(model))
 
@@ -1599,12 +1682,92 @@ def native_user_function(op_id, operands, attributes=None, user_function_instanc
     attributes = _py_dict_to_cntk_dict(attributes)
     return cntk_py.Function_native_user_function(op_id, operands, attributes, user_function_instance_name)
 
+def _bind_output_buffers(output_map, out_buffers):
+    '''
+    Wraps preallocated output arrays into Values that borrow their memory,
+    such that the native forward pass writes the results into them.
+    '''
+    for var, array in out_buffers.items():
+        if var not in output_map:
+            raise ValueError('an output array was given for "%s", which is '
+                             'not among the requested outputs' % var)
+        ndav = NDArrayView.from_dense(array, device=cpu(), borrow=True)
+        output_map[var] = cntk_py.Value(ndav)
+
+
+class PreparedFunction(object):
+    '''
+    Evaluation handle of a :class:`Function` with its inputs, outputs and
+    device resolved up front. Use :meth:`Function.prepare` to create it.
+
+    Calling it with one batch per input is equivalent to calling
+    :meth:`Function.eval` with a dictionary that maps the prepared inputs to
+    these batches. Preallocated output arrays can be passed as keyword
+    argument ``out`` (see :meth:`Function.forward`).
+    '''
+
+    def __init__(self, function, inputs=None, outputs=None, device=None, as_numpy=True):
+        if device is None:
+            device = DeviceDescriptor.use_default_device()
+
+        if outputs is None:
+            outputs = function.outputs
+        else:
+            outputs = sanitize_variables_or_functions(outputs)
+
+        self.function = function
+        self.inputs = sanitize_argument_order(function.arguments, inputs)
+        self.outputs = tuple(outputs)
+        self.device = device
+        self.as_numpy = as_numpy
+        # bind the native forward once, bypassing the sanitizing Python layer
+        self._forward = super(Function, function)._forward
+        self._keep_for_backward = set()
+
+    def __call__(self, *args, **kwargs):
+        out = kwargs.pop('out', None)
+        if kwargs:
+            raise TypeError('unexpected keyword arguments: %s' %
+                            ', '.join(kwargs))
+
+        if len(args) != len(self.inputs):
+            raise ValueError('prepared function expects %i inputs, but got %i' %
+                             (len(self.inputs), len(args)))
+
+        in_var_map = {}
+        for var, batch in zip(self.inputs, args):
+            if not isinstance(batch, cntk_py.Value):
+                batch = Value.create(var, batch, device=self.device)
+            in_var_map[var] = batch
+
+        output_map = dict.fromkeys(self.outputs)
+
+        out_buffers = {}
+        if out is not None:
+            out_buffers = sanitize_output_buffers(self.outputs, out, in_var_map)
+            _bind_output_buffers(output_map, out_buffers)
+
+        self._forward(in_var_map, output_map, self.device,
+                      self._keep_for_backward)
+
+        if self.as_numpy:
+            for k, v in output_map.items():
+                if k in out_buffers:
+                    output_map[k] = out_buffers[k]
+                else:
+                    output_map[k] = _value_as_sequence_or_array(v, k)
+        else:
+            map_if_possible(output_map)
+
+        return sanitize_variable_value_dict(output_map)
+
+
 @typemap
-def load_model(model, device=None):
+def load_model(model, device=None, lazy=False):
     '''
     Alias for :func:`~cntk.ops.functions.Function.load`.
     '''
-    return Function.load(model, device)
+    return Function.load(model, device, lazy)
 
 class UserFunction(Function):
     '''
@@ -540,3 +540,95 @@ def test_clone_with_different_dynamic_axes():
 
     rnn = C.layers.Recurrence(C.layers.LSTM(5))(question_input)
     rnn_cloned = rnn.clone(C.CloneMethod.share, {question_input:answer_input})
+
+
+def test_prepared_function_matches_eval():
+    x = C.input_variable(2, name='x')
+    y = C.sequence.input_variable(2, name='y')
+    op = C.sequence.reduce_sum(y) + x
+
+    x_data = np.asarray([[1, 2], [3, 4]], dtype=np.float32)
+    y_data = [np.asarray([[1, 1], [2, 2]], dtype=np.float32),
+              np.asarray([[5, 5]], dtype=np.float32)]
+    expected = op.eval({x: x_data, y: y_data})
+
+    evaluate = op.prepare(inputs=['y', x])
+    assert evaluate.inputs == (y, x)
+    assert np.allclose(evaluate(y_data, x_data), expected)
+
+    # Values are passed through without conversion
+    x_value = C.Value.create(x, x_data)
+    assert np.allclose(evaluate(y_data, x_value), expected)
+
+    with pytest.raises(ValueError):
+        evaluate(y_data)
+    with pytest.raises(ValueError):
+        op.prepare(inputs=[x])
+    with pytest.raises(ValueError):
+        op.prepare(inputs=['z', x])
+
+
+def test_prepared_function_outputs():
+    x = C.input_variable(1)
+    a = C.plus(x, 1, name='a')
+    b = C.times(a, 2, name='b')
+
+    evaluate = b.prepare(outputs=[a.output, b.output])
+    result = evaluate(np.asarray([[1], [2]], dtype=np.float32))
+    assert np.allclose(result[a.output], [[2], [3]])
+    assert np.allclose(result[b.output], [[4], [6]])
+
+
+def test_eval_into_output_arrays():
+    x = C.input_variable(2)
+    a = C.plus(x, 1, name='a')
+    b = C.times(a, 2, name='b')
+    data = np.asarray([[1, 2], [3, 4], [5, 6]], dtype=np.float32)
+
+    out = np.zeros((3, 2), dtype=np.float32)
+    result = b.eval({x: data}, out=out)
+    assert result is out
+    assert np.allclose(out, (data + 1) * 2)
+
+    combined = C.combine([a, b])
+    out_a = np.zeros((3, 2), dtype=np.float32)
+    result = combined.eval({x: data}, out={a.output: out_a})
+    assert result[a.output] is out_a
+    assert np.allclose(out_a, data + 1)
+    assert np.allclose(result[b.output], (data + 1) * 2)
+
+    with pytest.raises(ValueError):
+        b.eval({x: data}, out=np.zeros((3, 2), dtype=np.float64))
+    with pytest.raises(ValueError):
+        b.eval({x: data}, out=np.zeros((4, 2), dtype=np.float32))
+    with pytest.raises(ValueError):
+        b.eval({x: data}, out=np.zeros((3, 3), dtype=np.float32))
+
+    s = C.sequence.input_variable(2)
+    with pytest.raises(ValueError):
+        (s + 1).eval({s: [data]}, out=np.zeros((1, 3, 2), dtype=np.float32))
+
+
+def test_eval_with_output_buffer_pool():
+    x = C.input_variable(2)
+    op = x * 3
+    pool = C.OutputBufferPool()
+
+    first = op.eval({x: np.ones((4, 2), dtype=np.float32)}, out=pool)
+    assert first.shape == (4, 2)
+    assert np.allclose(first, 3)
+
+    # a smaller batch reuses the memory of the larger one
+    second = op.eval({x: np.full((2, 2), 2, dtype=np.float32)}, out=pool)
+    assert second.shape == (2, 2)
+    assert np.allclose(second, 6)
+    assert np.shares_memory(first, second)
+
+    evaluate = op.prepare()
+    third = evaluate(np.ones((8, 2), dtype=np.float32), out=pool)
+    assert third.shape == (8, 2)
+    assert np.allclose(third, 3)
+
+    # functions without arguments have no batch size to take from the pool
+    c = C.constant(np.ones((2, 3), dtype=np.float32)) * 2
+    assert np.allclose(c.eval(out=C.OutputBufferPool()), 2)
@@ -9,7 +9,6 @@ Tensor operations.
 
 
 import warnings
-from scipy import sparse
 
 class TensorOpsMixin(object):
     '''
@@ -225,30 +224,16 @@ class ArrayMixin(object):
                               'conversion.')
 
         if is_sparse:
-            from cntk.internal.sanitize import _sparse_to_dense_network_cache
-
-            device = ndav.device
-            if callable(device):
-                device = device()
-
-            network = _sparse_to_dense_network_cache(ndav.shape[1:], False,
-                                                     device)
-            warnings.warn('converting Value object to CSR format might be slow')
-
-            dense_data = network.eval(self, device=device)
-
-            def to_csr(dense_data):
-                if len(dense_data.shape) > 2:
-                    warnings.warn('Cannot convert a sparse NDArrayView or Value object '
-                                     'with shape %s of rank > 2 to a scipy.csr matrix.'
-                                     ' Returning dense data.' % str(dense_data.shape))
-                    return dense_data
-                return sparse.csr_matrix(dense_data)
-
-            if isinstance(dense_data, list):
-                result = [to_csr(d) for d in dense_data]
-            else:
-                result = to_csr(dense_data)
+            from cntk.internal import map_if_possible
+            map_if_possible(ndav)
+
+            shape = ndav.shape
+            result = ndav.to_csr()
+            if len(shape) > 2:
+                warnings.warn('Cannot convert a sparse NDArrayView or Value object '
+                                 'with shape %s of rank > 2 to a scipy.csr matrix.'
+                                 ' Returning dense data.' % str(shape))
+                result = result.toarray().reshape(shape)
 
         else:
             result = ndav.to_ndarray()
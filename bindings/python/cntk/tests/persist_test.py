@@ -3,7 +3,9 @@
 # for full license information.
 # ==============================================================================
 
+import sys
 import numpy as np
+import pytest
 
 import cntk as C
 from cntk.debugging import save_as_legacy_model
@@ -218,4 +220,59 @@ def test_restore_constants(tmpdir):
     _checkall(f, 1)
 
     _setall(f2, 5)
-    _checkall(f2, 5)
\ No newline at end of file
+    _checkall(f2, 5)
+
+def _lazy_test_model(weights, bias):
+    x = C.input_variable(weights.shape[0], name='x')
+    w = C.parameter(init=weights, name='w')
+    b = C.constant(value=bias, name='b')
+    return C.times(x, w) + b
+
+def test_load_lazy(tmpdir):
+    weights = np.arange(6, dtype=np.float32).reshape(3, 2) + 0.5
+    bias = np.asarray([0.25, -0.5], dtype=np.float32)
+    filename = str(tmpdir / 'lazy.mod')
+    _lazy_test_model(weights, bias).save(filename)
+
+    data = np.asarray([[1, -1, 2]], dtype=np.float32)
+    eager = C.Function.load(filename)
+    lazy = C.load_model(filename, lazy=True)
+
+    assert np.allclose(lazy.eval({lazy.arguments[0]: data}), eager.eval({eager.arguments[0]: data}))
+    assert np.array_equal(lazy.parameters[0].value, weights)
+    assert np.array_equal(lazy.constants[0].value, bias)
+
+    with pytest.raises(ValueError):
+        C.Function.load(open(filename, 'rb').read(), lazy=True)
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'),
+                    reason='relies on in-place writes to the model file being visible through its mapping')
+def test_load_lazy_defers_values(tmpdir):
+    weights = np.arange(6, dtype=np.float32).reshape(3, 2) + 0.5
+    bias = np.asarray([0.25, -0.5], dtype=np.float32)
+    filename = str(tmpdir / 'lazy.mod')
+    _lazy_test_model(weights, bias).save(filename)
+
+    eager = C.Function.load(filename)
+    lazy = C.Function.load(filename, lazy=True)
+
+    # inspecting the graph does not copy the values
+    assert [p.name for p in lazy.parameters] == ['w']
+    assert lazy.parameters[0].shape == weights.shape
+    assert [c.name for c in lazy.constants] == ['b']
+
+    # so the lazily loaded model sees the weights overwritten in the file afterwards,
+    # while the eagerly loaded one keeps the values it copied
+    patched = weights * 10
+    with open(filename, 'r+b') as f:
+        content = f.read()
+        offset = content.find(weights.tobytes())
+        assert offset >= 0 and content.find(weights.tobytes(), offset + 1) < 0
+        f.seek(offset)
+        f.write(patched.tobytes())
+
+    data = np.asarray([[1, -1, 2]], dtype=np.float32)
+    reloaded = C.Function.load(filename)
+    assert np.allclose(lazy.eval({lazy.arguments[0]: data}), reloaded.eval({reloaded.arguments[0]: data}))
+    assert np.array_equal(lazy.parameters[0].value, patched)
+    assert np.array_equal(eager.parameters[0].value, weights)
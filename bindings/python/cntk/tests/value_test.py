@@ -257,3 +257,53 @@ def test_is_valid(device_id):
     g2 = b.grad({a:a0}, as_numpy=False)
     assert (g.is_valid == False)
     assert (g2.is_valid == True)
+
+
+def test_create_from_padded(device_id):
+    dev = cntk_device(device_id)
+    x = C.sequence.input_variable(2)
+    seqs = [AA([[1, 2], [3, 4], [5, 6]], dtype=np.float32),
+            AA([[7, 8]], dtype=np.float32),
+            AA([[9, 10], [11, 12]], dtype=np.float32)]
+    padded = np.zeros((3, 3, 2), dtype=np.float32)
+    for i, s in enumerate(seqs):
+        padded[i, :len(s)] = s
+
+    expected = C.Value.create(x, seqs, device=dev)
+    from_lengths = C.Value.create_from_padded(x, padded, sequence_lengths=[3, 1, 2], device=dev)
+    from_mask = C.Value.create_from_padded(x, padded, mask=padded[:, :, 0] != 0, device=dev)
+
+    for value in (from_lengths, from_mask):
+        assert np.array_equal(value.mask, expected.mask)
+        result = C.sequence.reduce_sum(x).eval({x: value}, device=dev)
+        assert np.allclose(result, [s.sum(axis=0) for s in seqs])
+
+    continued = C.Value.create_from_padded(x, padded, sequence_lengths=[3, 1, 2],
+                                           seq_starts=[True, False, True], device=dev)
+    assert np.array_equal(continued.mask[:, 0], [2, 1, 2])
+
+    with pytest.raises(ValueError):
+        C.Value.create_from_padded(x, padded, mask=[[1, 0, 1], [1, 0, 0], [1, 1, 0]])
+    with pytest.raises(ValueError):
+        C.Value.create_from_padded(C.input_variable(2), padded[0])
+
+
+def test_sparse_value_to_csr_without_dense_conversion(device_id):
+    dev = cntk_device(device_id)
+    vocab_size = 100000
+    x = C.sequence.input_variable(vocab_size, is_sparse=True)
+    seqs = [csr(([1., 2., 3.], ([0, 1, 2], [7, 99999, 7])), shape=(3, vocab_size), dtype=np.float32),
+            csr(([4.], ([0], [5])), shape=(1, vocab_size), dtype=np.float32)]
+
+    value = C.Value.create(x, seqs, device=dev)
+    result = value.as_sequences(x)
+
+    assert len(result) == 2
+    for expected, actual in zip(seqs, result):
+        assert sparse.isspmatrix_csr(actual)
+        assert actual.shape == expected.shape
+        assert (actual != expected).nnz == 0
+
+    full = value.data.to_csr()
+    assert full.shape == (2 * 3, vocab_size)
+    assert full.nnz == 4
@@ -6,6 +6,7 @@
 from .. import cntk_py
 from ..train import trainer
 from cntk.internal import typemap
+import warnings
 
 # Preload libmpi.so.12 for non-Windows platform to work around MPI_Init failure bug
 # https://xrunhprof.wordpress.com/2014/11/04/an-openmpi-python-and-dlopen-issue/
@@ -13,7 +14,11 @@ from cntk.internal import typemap
 import platform
 import ctypes
 if platform.system() == 'Linux':
-    ctypes.CDLL("libmpi.so.12", mode=ctypes.RTLD_GLOBAL)
+    try:
+        ctypes.CDLL("libmpi.so.12", mode=ctypes.RTLD_GLOBAL)
+    except OSError:
+        # MPI is not installed, only the shared memory communicator can be used
+        pass
 
 __doc__= '''\
 Distributed learners manage learners in distributed environment.
@@ -119,8 +124,43 @@ class DistributedLearner(cntk_py.DistributedLearner):
         '''
         return super(DistributedLearner, self).total_number_of_samples_seen()
 
+    @property
+    def bytes_sent(self):
+        '''
+        The number of bytes of gradient data this worker sent to the other
+        workers in the last update.
+        '''
+        return super(DistributedLearner, self).bytes_sent()
+
+    @property
+    def bytes_received(self):
+        '''
+        The number of bytes of gradient data this worker received from the
+        other workers in the last update.
+        '''
+        return super(DistributedLearner, self).bytes_received()
+
+    @property
+    def uncompressed_bytes(self):
+        '''
+        The number of bytes the gradients exchanged in the last update occupy
+        without compression.
+        '''
+        return super(DistributedLearner, self).uncompressed_bytes()
+
+_GRADIENT_COMPRESSIONS = {
+    'fp16': cntk_py.GradientCompression_Float16,
+    'top_k': cntk_py.GradientCompression_TopK,
+}
+
+# Gathering half precision gradients from N workers receives (N - 1) / 2 times
+# the gradient size, a ring allreduce of the full precision gradients about
+# 2 (N - 1) / N times. From 4 workers on fp16 compression saves no traffic.
+_MAX_FP16_WORKERS = 3
+
 @typemap
-def data_parallel_distributed_learner(learner, distributed_after=0, num_quantization_bits=32, use_async_buffered_parameter_update=False):
+def data_parallel_distributed_learner(learner, distributed_after=0, num_quantization_bits=32, use_async_buffered_parameter_update=False, communicator=None,
+                                      compression=None, top_k_ratio=0.01, bucket_size=0):
     '''
     Creates a data parallel distributed learner
 
@@ -129,10 +169,56 @@ def data_parallel_distributed_learner(learner, distributed_after=0, num_quantiza
         distributed_after (int): number of samples after which distributed training starts
         num_quantization_bits (int): number of bits for quantization (1 to 32)
         use_async_buffered_parameter_update (bool): use async buffered parameter update
+        communicator (:class:`Communicator`, optional): communicator that exchanges the gradients,
+         e.g. one created by :func:`shared_memory_communicator`. Defaults to the MPI communicator.
+         Cannot be combined with quantization.
+        compression (str, optional): compression of the exchanged gradients, ``'fp16'`` to exchange
+         them in half precision or ``'top_k'`` to exchange only the ``top_k_ratio`` largest elements
+         of every gradient and carry the rest over to the next minibatch. Compressed gradients are
+         gathered from all workers instead of being summed by the communicator, which pays off for
+         small numbers of workers; compare :attr:`DistributedLearner.bytes_received` to
+         :attr:`DistributedLearner.uncompressed_bytes`. ``'fp16'`` only reduces the traffic
+         for up to 3 workers and warns with more. With ``'top_k'`` the carried over residuals
+         are part of the checkpoint, so every worker has to save it. Cannot be combined with
+         quantization.
+        top_k_ratio (float): fraction of the elements of every gradient exchanged with ``'top_k'``
+        bucket_size (int): if greater than 0, the gradients are exchanged in buckets of about this
+         many bytes, and a bucket is exchanged while the next one is compressed and the previous
+         one decompressed
     Returns:
         a distributed learner instance
     '''
-    if (num_quantization_bits < 32):
+    if compression is not None and compression not in _GRADIENT_COMPRESSIONS:
+        raise ValueError('unknown gradient compression {!r}, expected one of {}'
+                         .format(compression, ', '.join(sorted(_GRADIENT_COMPRESSIONS))))
+
+    if compression is not None or bucket_size > 0:
+        if num_quantization_bits < 32:
+            raise ValueError('gradient compression and bucketing cannot be combined with quantization')
+        if use_async_buffered_parameter_update:
+            raise ValueError('gradient compression and bucketing do not support async buffered parameter update')
+        if communicator is None:
+            communicator = cntk_py.mpicommunicator()
+        if compression == 'fp16' and len(communicator.workers()) > _MAX_FP16_WORKERS:
+            warnings.warn('fp16 gradient compression gathers the gradients of all workers and '
+                          'does not exchange less data than uncompressed aggregation with more than {} '
+                          'workers'.format(_MAX_FP16_WORKERS))
+        return cntk_py.create_compressed_data_parallel_distributed_learner(
+            communicator,
+            learner,
+            distributed_after,
+            _GRADIENT_COMPRESSIONS.get(compression, cntk_py.GradientCompression_None),
+            top_k_ratio,
+            bucket_size)
+    elif communicator is not None:
+        if num_quantization_bits < 32:
+            raise ValueError('quantization requires the MPI communicator')
+        return cntk_py.create_data_parallel_distributed_learner(
+            communicator,
+            learner,
+            distributed_after,
+            use_async_buffered_parameter_update)
+    elif (num_quantization_bits < 32):
         return cntk_py.create_quantized_data_parallel_distributed_learner(
             cntk_py.quantized_mpicommunicator(True, True, num_quantization_bits),
             learner,
@@ -146,7 +232,7 @@ def data_parallel_distributed_learner(learner, distributed_after=0, num_quantiza
             use_async_buffered_parameter_update)
 
 @typemap
-def block_momentum_distributed_learner(learner, block_size, block_momentum_as_time_constant=None, use_nestrov_momentum=True, reset_sgd_momentum_after_aggregation=True, block_learning_rate=1.0, distributed_after=0):
+def block_momentum_distributed_learner(learner, block_size, block_momentum_as_time_constant=None, use_nestrov_momentum=True, reset_sgd_momentum_after_aggregation=True, block_learning_rate=1.0, distributed_after=0, communicator=None):
     '''
     Creates a block momentum distributed learner. See [1] for more
     information.
@@ -165,6 +251,8 @@ def block_momentum_distributed_learner(learner, block_size, block_momentum_as_ti
         reset_sgd_momentum_after_aggregation (bool): reset SGD momentum after aggregation
         block_learning_rate (float): block learning rate
         distributed_after (int): number of samples after which distributed training starts
+        communicator (:class:`Communicator`, optional): communicator that exchanges the models,
+         e.g. one created by :func:`shared_memory_communicator`. Defaults to the MPI communicator.
 
     Returns:
         a distributed learner instance
@@ -176,9 +264,12 @@ def block_momentum_distributed_learner(learner, block_size, block_momentum_as_ti
         <https://www.microsoft.com/en-us/research/wp-content/uploads/2016/08/0005880.pdf>`_. 
         Proceedings of ICASSP, 2016. 
     '''
+    if communicator is None:
+        communicator = cntk_py.mpicommunicator()
+
     if block_momentum_as_time_constant == None:
         return cntk_py.create_block_momentum_distributed_learner(
-            cntk_py.mpicommunicator(),
+            communicator,
             learner,
             distributed_after,
             block_size,
@@ -187,7 +278,7 @@ def block_momentum_distributed_learner(learner, block_size, block_momentum_as_ti
             block_learning_rate)
     else:
         return cntk_py.create_block_momentum_distributed_learner(
-            cntk_py.mpicommunicator(),
+            communicator,
             learner,
             distributed_after,
             block_size,
@@ -202,3 +293,30 @@ def mpi_communicator():
     Creates a non quantized MPI communicator.
     '''
     return cntk_py.mpicommunicator()
+
+@typemap
+def shared_memory_communicator(name, num_workers, rank, buffer_size=16 * 1024 * 1024):
+    '''
+    Creates a communicator for worker processes that run on the same machine
+    and exchange data through shared memory, without MPI. Each of the
+    ``num_workers`` processes creates it with the same ``name`` and its own
+    ``rank``; the call returns once all workers have joined. Only available on
+    Linux.
+
+    Quantization and sparse gradients are not supported. Pass the communicator
+    to :func:`data_parallel_distributed_learner` or
+    :func:`block_momentum_distributed_learner`. Create it before the model,
+    since stateful functions like :func:`~cntk.ops.dropout` only get a
+    different random seed on every worker when they are created afterwards.
+
+    Args:
+        name (str): name of the shared memory segment, unique per training run
+        num_workers (int): number of worker processes
+        rank (int): rank of this process, from 0 to ``num_workers - 1``
+        buffer_size (int): size in bytes of the exchange buffer of each
+         worker. Larger buffers need fewer synchronizations per aggregation.
+
+    Returns:
+        :class:`Communicator`: the shared memory communicator
+    '''
+    return cntk_py.shared_memory_communicator(name, num_workers, rank, buffer_size)
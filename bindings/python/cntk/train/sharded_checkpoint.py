@@ -0,0 +1,244 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+'''
+Incremental checkpoints that store every parameter and constant as a separate,
+content-addressed shard.
+
+A checkpoint directory contains a ``shards`` subdirectory with one ``.npy``
+file per distinct tensor value, named by the hash of its content, and one
+manifest per checkpoint that maps the model's variables to shards. Tensors
+that did not change between checkpoints (for example frozen layers in transfer
+learning) are written once and shared by all checkpoints in the directory.
+Learner state, which changes with every update, is saved per checkpoint.
+
+Restoring requires a model with the same structure as the one that was saved,
+just like :meth:`~cntk.train.trainer.Trainer.restore_from_checkpoint`.
+Shards are memory-mapped and read in parallel.
+
+Unlike :meth:`~cntk.train.trainer.Trainer.save_checkpoint`, a sharded
+checkpoint does not contain the random number generator state of stateful
+functions such as :func:`~cntk.ops.dropout` or :func:`~cntk.ops.random_sample`.
+After a restore these functions continue with their current state, so a
+resumed run is not bit-for-bit identical to an uninterrupted one.
+'''
+
+import hashlib
+import json
+import os
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .. import cntk_py
+from ..core import NDArrayView
+from ..internal.utils import replace_file
+
+_MANIFEST_VERSION = 1
+_SHARD_DIR = 'shards'
+_MANIFEST_SUFFIX = '.manifest.json'
+
+
+def _checkpoint_variables(model):
+    '''
+    Parameters and constants of a Function or Trainer, in a deterministic order.
+    '''
+    from .trainer import Trainer
+    if isinstance(model, Trainer):
+        functions = [f for f in (model.model, model.loss_function, model.evaluation_function) if f is not None]
+    else:
+        functions = [model]
+
+    variables = []
+    seen = set()
+    for f in functions:
+        for v in list(f.parameters) + list(f.constants):
+            if v.uid not in seen:
+                seen.add(v.uid)
+                variables.append(v)
+    return variables
+
+
+def _atomic_write(path, write):
+    tmp = path + '.tmp'
+    write(tmp)
+    replace_file(tmp, path)
+
+
+def _shard_key(value):
+    digest = hashlib.sha256()
+    digest.update(value.dtype.str.encode('ascii'))
+    digest.update(repr(value.shape).encode('ascii'))
+    digest.update(np.ascontiguousarray(value).data)
+    return digest.hexdigest()
+
+
+def _write_shard(shard_dir, key, value):
+    path = os.path.join(shard_dir, key + '.npy')
+    if os.path.exists(path):
+        return False
+
+    def write(tmp):
+        with open(tmp, 'wb') as f:
+            np.save(f, value)
+    _atomic_write(path, write)
+    return True
+
+
+def _executor(num_workers):
+    # max_workers=None is only accepted from Python 3.5 on
+    return ThreadPoolExecutor(max_workers=num_workers or min(32, multiprocessing.cpu_count() + 4))
+
+
+def _manifest_path(directory, name):
+    return os.path.join(directory, name + _MANIFEST_SUFFIX)
+
+
+def _learner_path(directory, name, index):
+    return os.path.join(directory, '{}.learner{}'.format(name, index))
+
+
+def save_sharded_checkpoint(model, directory, name='checkpoint', external_state={}, num_workers=None):
+    '''
+    Saves a sharded checkpoint of a :class:`~cntk.train.trainer.Trainer`
+    (model and learner state) or of a :class:`~cntk.ops.functions.Function`
+    (parameter and constant values only).
+
+    Shards that already exist in ``directory`` are not written again. The
+    manifest is written last, so a checkpoint either exists completely or
+    not at all.
+
+    Use distributed.Communicator.is_main() to gate your call in distributed
+    environment.
+
+    Args:
+        model (:class:`~cntk.train.trainer.Trainer` or :class:`~cntk.ops.functions.Function`):
+         trainer or function to checkpoint
+        directory (str): checkpoint directory, shared by all checkpoints of a run
+        name (str): name of this checkpoint within ``directory``
+        external_state (dict): additional JSON-serializable state, default is empty
+        num_workers (int): number of threads hashing and writing shards, None for min(32, cpu_count() + 4)
+
+    Returns:
+        dict with the number of ``shards`` referenced by the checkpoint and
+        the number of shards ``written`` by this call
+    '''
+    from .trainer import Trainer
+    shard_dir = os.path.join(directory, _SHARD_DIR)
+    if not os.path.exists(shard_dir):
+        os.makedirs(shard_dir)
+
+    variables = _checkpoint_variables(model)
+    values = [v.value for v in variables]
+    with _executor(num_workers) as executor:
+        keys = list(executor.map(_shard_key, values))
+        # equal tensors within one checkpoint are written once
+        unique = dict(zip(keys, values))
+        written = sum(executor.map(lambda key: _write_shard(shard_dir, key, unique[key]), unique))
+
+    learners = []
+    if isinstance(model, Trainer):
+        for i, learner in enumerate(model.parameter_learners):
+            path = _learner_path(directory, name, i)
+            _atomic_write(path, learner.create_checkpoint().save)
+            learners.append(os.path.basename(path))
+
+    manifest = {
+        'version': _MANIFEST_VERSION,
+        'variables': [{
+            'uid': v.uid,
+            'name': v.name,
+            'shape': list(value.shape),
+            'dtype': value.dtype.str,
+            'shard': key} for v, value, key in zip(variables, values, keys)],
+        'learners': learners,
+        'external_state': external_state,
+    }
+
+    def write(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1)
+    _atomic_write(_manifest_path(directory, name), write)
+
+    return {'shards': len(unique), 'written': written}
+
+
+def restore_from_sharded_checkpoint(model, directory, name='checkpoint', num_workers=None):
+    '''
+    Restores a checkpoint saved with :func:`save_sharded_checkpoint`.
+
+    Args:
+        model (:class:`~cntk.train.trainer.Trainer` or :class:`~cntk.ops.functions.Function`):
+         trainer or function to restore, with the same structure as the saved one
+        directory (str): checkpoint directory
+        name (str): name of the checkpoint within ``directory``
+        num_workers (int): number of threads reading shards, None for min(32, cpu_count() + 4)
+
+    Returns:
+        dict: the external state saved with the checkpoint
+    '''
+    from .trainer import Trainer
+    with open(_manifest_path(directory, name)) as f:
+        manifest = json.load(f)
+    if manifest['version'] != _MANIFEST_VERSION:
+        raise ValueError('unsupported sharded checkpoint version {}'.format(manifest['version']))
+
+    variables = _checkpoint_variables(model)
+    entries = manifest['variables']
+    if len(variables) != len(entries):
+        raise ValueError('the checkpoint has {} parameters and constants, the model has {}'
+                         .format(len(entries), len(variables)))
+    for v, entry in zip(variables, entries):
+        if tuple(v.shape) != tuple(entry['shape']):
+            raise ValueError("shape {} of '{}' does not match shape {} of '{}' in the checkpoint"
+                             .format(v.shape, v.name or v.uid, tuple(entry['shape']), entry['name'] or entry['uid']))
+
+    shard_dir = os.path.join(directory, _SHARD_DIR)
+
+    def read(args):
+        v, entry = args
+        # reading through the memory map and converting happens on the worker
+        shard = np.load(os.path.join(shard_dir, entry['shard'] + '.npy'), mmap_mode='r')
+        return np.array(shard, dtype=v.dtype)
+
+    with _executor(num_workers) as executor:
+        for v, value in zip(variables, executor.map(read, zip(variables, entries))):
+            v.value = NDArrayView.from_dense(value)
+
+    if isinstance(model, Trainer):
+        learners = model.parameter_learners
+        if len(learners) != len(manifest['learners']):
+            raise ValueError('the checkpoint has state for {} learners, the trainer has {}'
+                             .format(len(manifest['learners']), len(learners)))
+        for learner, filename in zip(learners, manifest['learners']):
+            learner.restore_from_checkpoint(cntk_py.Dictionary.load(os.path.join(directory, filename)))
+
+    return manifest['external_state']
+
+
+def remove_unreferenced_shards(directory):
+    '''
+    Deletes shards that are not referenced by any checkpoint manifest in ``directory``.
+
+    Args:
+        directory (str): checkpoint directory
+
+    Returns:
+        int: number of deleted shards
+    '''
+    referenced = set()
+    for f in os.listdir(directory):
+        if f.endswith(_MANIFEST_SUFFIX):
+            with open(os.path.join(directory, f)) as m:
+                referenced.update(entry['shard'] for entry in json.load(m)['variables'])
+
+    shard_dir = os.path.join(directory, _SHARD_DIR)
+    removed = 0
+    for f in os.listdir(shard_dir):
+        if f.endswith('.npy') and f[:-len('.npy')] not in referenced:
+            os.remove(os.path.join(shard_dir, f))
+            removed += 1
+    return removed
@@ -8,8 +8,15 @@ from cntk import Function, sequence
 from .. import distributed
 from cntk.losses import cross_entropy_with_softmax
 from cntk.metrics import classification_error
-from cntk import parameter, plus, reduce_sum
+from cntk import parameter, plus, reduce_sum, element_times
 import cntk as C
+import numpy as np
+import os
+import platform
+import pytest
+import traceback
+import warnings
+from multiprocessing import Process, Queue
 
 def create_data_parallel_distributed_learner(learner, quantized, distributed_after):
     return distributed.data_parallel_distributed_learner(
@@ -18,6 +25,12 @@ def create_data_parallel_distributed_learner(learner, quantized, distributed_aft
         use_async_buffered_parameter_update=False,
         num_quantization_bits=(1 if quantized else 32))
 
+def create_data_parallel_distributed_learner_with_communicator(learner, communicator, num_quantization_bits):
+    return distributed.data_parallel_distributed_learner(
+        learner=learner,
+        num_quantization_bits=num_quantization_bits,
+        communicator=communicator)
+
 def create_block_momentum_distributed_learner(learner, distributed_after):
     return distributed.block_momentum_distributed_learner(
         learner=learner,
@@ -226,6 +239,190 @@ def test_distributed_mb_source_again(tmpdir):
             assert(len(data) == 0 or data[features].num_samples == 3)
 
 
+@pytest.mark.skipif(platform.system() != 'Linux', reason='shared memory communicator requires Linux')
+def test_shared_memory_distributed(tmpdir):
+    communicator = distributed.shared_memory_communicator('cntk-test-%i' % os.getpid(), 1, 0)
+    assert communicator.is_main()
+    assert len(communicator.workers()) == 1
+
+    with pytest.raises(ValueError):
+        create_data_parallel_distributed_learner_with_communicator(
+            C.sgd([parameter(shape=1)], C.learning_parameter_schedule(0.1)), communicator, 1)
+
+    run_distributed_training(tmpdir, create_func=lambda learner:
+        create_data_parallel_distributed_learner_with_communicator(learner, communicator, 32))
+    run_distributed_training(tmpdir, create_func=lambda learner:
+        distributed.block_momentum_distributed_learner(learner, block_size=1024, communicator=communicator))
+
+def shared_memory_worker(queue, target, name, num_workers, rank, args):
+    try:
+        communicator = distributed.shared_memory_communicator(name, num_workers, rank)
+        queue.put((rank, target(communicator, *args), None))
+    except BaseException:
+        queue.put((rank, None, traceback.format_exc()))
+
+def run_shared_memory_workers(target, num_workers, *args):
+    # Runs target(communicator, *args) in num_workers processes and returns the results by rank.
+    name = 'cntk-test-%i-%s' % (os.getpid(), target.__name__)
+    queue = Queue()
+    processes = [Process(target=shared_memory_worker, args=(queue, target, name, num_workers, rank, args))
+                 for rank in range(num_workers)]
+    for p in processes:
+        p.start()
+    try:
+        results = {}
+        for _ in processes:
+            rank, result, error = queue.get(timeout=300)
+            assert error is None, 'worker %i failed:\n%s' % (rank, error)
+            results[rank] = result
+    finally:
+        # a failed worker leaves the others waiting for it in a collective operation
+        for p in processes:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+    return [results[rank] for rank in range(num_workers)]
+
+def train_shared_memory_worker(communicator, tmpdir):
+    rank = communicator.current_worker().global_rank
+    # stateful functions created after the communicator get a different seed on every worker
+    seed = C.dropout(C.input_variable(1), 0.5).root_function.attributes['rngSeed']
+
+    x = C.input_variable(2)
+    p = parameter(shape=2, init=0)
+    loss = reduce_sum(element_times(p, x))
+    lr_per_sample = C.learning_parameter_schedule(0.1, 1)
+    trainer = C.Trainer(loss, (loss, loss), [
+        create_data_parallel_distributed_learner_with_communicator(C.sgd(loss.parameters, lr_per_sample), communicator, 32)])
+    trainer.train_minibatch({x: np.asarray([[rank + 1, 2 * (rank + 1)]], dtype=np.float32)})
+    aggregated = p.value
+
+    # fp16 compression exchanges the gradients with Concatenate instead of AggregateInPlace
+    p.value = np.zeros(2, dtype=np.float32)
+    trainer = C.Trainer(loss, (loss, loss), [distributed.data_parallel_distributed_learner(
+        C.sgd(loss.parameters, lr_per_sample), communicator=communicator, compression='fp16')])
+    trainer.train_minibatch({x: np.asarray([[rank + 1, 2 * (rank + 1)]], dtype=np.float32)})
+    concatenated = p.value
+
+    # the per-worker state of a checkpoint is collected with Gather
+    path = str(tmpdir / 'checkpoint.dat')
+    trainer.save_checkpoint(path, {'rank': rank})
+    external_state = trainer.restore_from_checkpoint(path)
+    communicator.barrier()
+
+    return seed, aggregated, concatenated, external_state['rank']
+
+@pytest.mark.skipif(platform.system() != 'Linux', reason='shared memory communicator requires Linux')
+@pytest.mark.parametrize('num_workers', [2, 3])
+def test_shared_memory_distributed_multiple_workers(tmpdir, num_workers):
+    results = run_shared_memory_workers(train_shared_memory_worker, num_workers, tmpdir)
+
+    seeds = [seed for seed, _, _, _ in results]
+    assert len(set(seeds)) == num_workers
+
+    # the gradient of every worker is its input, the sum over all workers is applied everywhere
+    expected = -0.1 * sum(range(1, num_workers + 1)) * np.asarray([1, 2], dtype=np.float32)
+    for rank, (_, aggregated, concatenated, external_rank) in enumerate(results):
+        assert np.allclose(aggregated, expected)
+        assert np.allclose(concatenated, expected)
+        assert external_rank == rank
+
+@pytest.mark.skipif(platform.system() != 'Linux', reason='shared memory communicator requires Linux')
+@pytest.mark.parametrize('compression, bucket_size', [('fp16', 0), ('top_k', 0), (None, 1024), ('top_k', 16)])
+def test_compressed_distributed(tmpdir, compression, bucket_size):
+    communicator = distributed.shared_memory_communicator('cntk-test-%i' % os.getpid(), 1, 0)
+    create_func = lambda learner: distributed.data_parallel_distributed_learner(
+        learner, communicator=communicator, compression=compression, top_k_ratio=0.5, bucket_size=bucket_size)
+    run_distributed_training(tmpdir, create_func=create_func)
+
+    learner = create_func(C.sgd([parameter(shape=1)], C.learning_parameter_schedule(0.1)))
+    # a single worker does not exchange gradients
+    assert learner.bytes_sent == learner.bytes_received == learner.uncompressed_bytes == 0
+
+COMPRESSION_OPTIONS = {
+    'none': {},
+    'bucketed': dict(bucket_size=256),
+    'fp16': dict(compression='fp16'),
+    'top_k': dict(compression='top_k', top_k_ratio=1),
+    'top_k_bucketed': dict(compression='top_k', top_k_ratio=1, bucket_size=256),
+}
+
+def train_compressed_worker(communicator, tmpdir):
+    rank = communicator.current_worker().global_rank
+    # multiples of 1/4096 are summed exactly in single precision in any order, but not in half precision
+    random = np.random.RandomState(rank)
+    data = [random.randint(-4096, 4096, size=(1, shape)).astype(np.float32) / 4096 for shape in (64, 32)]
+
+    x1 = C.input_variable(64)
+    x2 = C.input_variable(32)
+    p1 = parameter(shape=64, init=0)
+    p2 = parameter(shape=32, init=0)
+    loss = plus(reduce_sum(element_times(p1, x1)), reduce_sum(element_times(p2, x2)))
+    lr_per_sample = C.learning_parameter_schedule(1, 1)
+
+    def create_trainer(**options):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            learner = distributed.data_parallel_distributed_learner(
+                C.sgd(loss.parameters, lr_per_sample), communicator=communicator, **options)
+        return C.Trainer(loss, (loss, loss), [learner]), learner, len(caught)
+
+    results = {}
+    for mode, options in COMPRESSION_OPTIONS.items():
+        p1.value = np.zeros(64, dtype=np.float32)
+        p2.value = np.zeros(32, dtype=np.float32)
+        trainer, learner, num_warnings = create_trainer(**options)
+        trainer.train_minibatch({x1: data[0], x2: data[1]})
+        results[mode] = (np.concatenate([p1.value, p2.value]),
+                         learner.bytes_sent, learner.bytes_received, learner.uncompressed_bytes, num_warnings)
+
+    # the residuals of top-k compression are restored from a checkpoint
+    trainer, _, _ = create_trainer(compression='top_k', top_k_ratio=0.25)
+    trainer.train_minibatch({x1: data[0], x2: data[1]})
+    path = str(tmpdir / 'checkpoint.dat')
+    trainer.save_checkpoint(path)
+    trainer.train_minibatch({x1: data[0], x2: data[1]})
+    expected = np.concatenate([p1.value, p2.value])
+    trainer.restore_from_checkpoint(path)
+    trainer.train_minibatch({x1: data[0], x2: data[1]})
+    restored = np.concatenate([p1.value, p2.value])
+
+    return results, expected, restored
+
+@pytest.mark.skipif(platform.system() != 'Linux', reason='shared memory communicator requires Linux')
+@pytest.mark.parametrize('num_workers', [2, 4])
+def test_compressed_distributed_multiple_workers(tmpdir, num_workers):
+    uncompressed_bytes = (64 + 32) * 4
+    for results, expected, restored in run_shared_memory_workers(train_compressed_worker, num_workers, tmpdir):
+        reference = results['none'][0]
+        assert np.array_equal(results['bucketed'][0], reference)
+        assert np.array_equal(results['top_k'][0], reference)
+        assert np.array_equal(results['top_k_bucketed'][0], reference)
+        assert np.allclose(results['fp16'][0], reference, rtol=0, atol=1e-2)
+        assert not np.array_equal(results['fp16'][0], reference)
+
+        for mode in ('none', 'bucketed'):
+            assert results[mode][1:4] == (uncompressed_bytes, uncompressed_bytes, uncompressed_bytes)
+        # half precision values are packed in pairs, every other worker sends its payload
+        assert results['fp16'][1:4] == (uncompressed_bytes // 2, uncompressed_bytes // 2 * (num_workers - 1), uncompressed_bytes)
+        # with a ratio of 1, every element is sent with its index
+        for mode in ('top_k', 'top_k_bucketed'):
+            assert results[mode][1:4] == (2 * uncompressed_bytes, 2 * uncompressed_bytes * (num_workers - 1), uncompressed_bytes)
+
+        for mode, result in results.items():
+            assert result[4] == (1 if mode == 'fp16' and num_workers > 3 else 0)
+
+        assert np.array_equal(restored, expected)
+
+def test_compressed_distributed_invalid_options():
+    learner = C.sgd([parameter(shape=1)], C.learning_parameter_schedule(0.1))
+    with pytest.raises(ValueError):
+        distributed.data_parallel_distributed_learner(learner, compression='int8')
+    with pytest.raises(ValueError):
+        distributed.data_parallel_distributed_learner(learner, compression='fp16', num_quantization_bits=1)
+    with pytest.raises(ValueError):
+        distributed.data_parallel_distributed_learner(learner, bucket_size=1024, use_async_buffered_parameter_update=True)
+
 def test_distributed(tmpdir, is_1bit_sgd):
     quantized=(True if is_1bit_sgd==1 else False)
 
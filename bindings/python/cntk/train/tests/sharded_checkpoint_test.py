@@ -0,0 +1,66 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+# Licensed under the MIT license. See LICENSE.md file in the project root
+# for full license information.
+# ==============================================================================
+
+import os
+import numpy as np
+import cntk as C
+from cntk.train.sharded_checkpoint import save_sharded_checkpoint, \
+    restore_from_sharded_checkpoint, remove_unreferenced_shards
+
+
+def _create_trainer():
+    x = C.input_variable(shape=(3,))
+    labels = C.input_variable(shape=(2,))
+    frozen = C.parameter(shape=(3, 4), init=C.glorot_uniform(seed=1), name='frozen')
+    trained = C.parameter(shape=(4, 2), init=C.glorot_uniform(seed=2), name='trained')
+    z = C.times(C.times(x, frozen), trained)
+    ce = C.cross_entropy_with_softmax(z, labels)
+    trainer = C.Trainer(z, ce, [C.sgd([trained], C.learning_parameter_schedule(0.1))])
+    arguments = {x: np.ones((2, 3), dtype=np.float32), labels: np.eye(2, dtype=np.float32)}
+    return trainer, frozen, trained, arguments
+
+
+def test_sharded_checkpoint_shares_unchanged_shards(tmpdir):
+    trainer, frozen, trained, arguments = _create_trainer()
+    directory = str(tmpdir)
+
+    trainer.train_minibatch(arguments)
+    first = save_sharded_checkpoint(trainer, directory, 'epoch0', {'epoch': 0})
+    assert first == {'shards': 2, 'written': 2}
+    saved_trained = trained.value
+
+    # only the trained parameter changes, the frozen one is not written again
+    trainer.train_minibatch(arguments)
+    second = trainer.save_sharded_checkpoint(directory, 'epoch1', {'epoch': 1})
+    assert second == {'shards': 2, 'written': 1}
+    assert len(os.listdir(os.path.join(directory, 'shards'))) == 3
+
+    samples_seen = trainer.total_number_of_samples_seen
+    trainer.train_minibatch(arguments)
+    frozen_value = frozen.value
+
+    assert trainer.restore_from_sharded_checkpoint(directory, 'epoch0') == {'epoch': 0}
+    assert np.allclose(trained.value, saved_trained)
+    assert np.allclose(frozen.value, frozen_value)
+
+    assert restore_from_sharded_checkpoint(trainer, directory, 'epoch1') == {'epoch': 1}
+    assert trainer.total_number_of_samples_seen == samples_seen
+
+    os.remove(os.path.join(directory, 'epoch0.manifest.json'))
+    assert remove_unreferenced_shards(directory) == 1
+    restore_from_sharded_checkpoint(trainer, directory, 'epoch1')
+
+
+def test_sharded_checkpoint_function(tmpdir):
+    p = C.parameter(shape=(2, 2), init=np.arange(4, dtype=np.float32).reshape(2, 2))
+    c = C.constant(value=np.ones((2,), dtype=np.float32))
+    f = C.plus(C.times(C.input_variable(2), p), c)
+    directory = str(tmpdir)
+
+    save_sharded_checkpoint(f, directory)
+    p.value = np.zeros((2, 2), dtype=np.float32)
+    restore_from_sharded_checkpoint(f, directory)
+    assert np.array_equal(p.value, np.arange(4, dtype=np.float32).reshape(2, 2))
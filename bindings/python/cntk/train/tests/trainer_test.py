@@ -51,6 +51,33 @@ def test_trainer(tmpdir, no_eval_function):
     assert trainer.model.__doc__
     assert isinstance(trainer.parameter_learners[0], C.Learner)
 
+def test_trainer_async_checkpoint(tmpdir):
+    in1 = C.input_variable(shape=(1,))
+    labels = C.input_variable(shape=(1,))
+    p = parameter(shape=(2,), init=10)
+    z = plus(in1, reduce_sum(p), name='z')
+    ce = cross_entropy_with_softmax(z, labels)
+    trainer = C.Trainer(z, ce, [C.sgd(z.parameters, C.learning_parameter_schedule(0.1))])
+    arguments = {in1: [[1], [2]], labels: [[0], [1]]}
+    trainer.train_minibatch(arguments)
+
+    filename = str(tmpdir / 'checkpoint.dat')
+    trainer.save_checkpoint_async(filename, {'step': 1})
+    saved_value = p.value
+
+    # training continues while the checkpoint is written, the checkpoint keeps the snapshot
+    trainer.train_minibatch(arguments)
+    assert not np.allclose(p.value, saved_value)
+
+    restored_state = trainer.restore_from_checkpoint(filename)
+    assert restored_state == {'step': 1}
+    assert np.allclose(p.value, saved_value)
+
+    trainer.save_checkpoint_async(filename, {'step': 2}, max_pending=2)
+    trainer.save_checkpoint_async(filename, {'step': 3}, max_pending=2)
+    trainer.wait_for_pending_checkpoints()
+    assert trainer.restore_from_checkpoint(filename) == {'step': 3}
+
 def test_output_to_retain():
     in1 = C.input_variable(shape=(1,))
     labels = C.input_variable(shape=(1,))
@@ -337,3 +364,27 @@ def test_scalar_loss_function():
     assert trainer.total_number_of_samples_seen == 2
 
 
+def test_prepared_trainer():
+    x = C.input_variable((1,))
+    l = C.input_variable((2,))
+    z = C.layers.Dense(2)(x)
+    ce = cross_entropy_with_softmax(z, l)
+    errs = classification_error(z, l)
+    lr_per_sample = C.learning_parameter_schedule(0.1,  minibatch_size =1)
+    trainer = C.Trainer(z, (ce, errs), C.sgd(z.parameters, lr_per_sample))
+
+    train = trainer.prepare(inputs=[l, x], outputs=[z.output])
+    assert train.inputs == (l, x)
+
+    x_data = np.asarray([[.1], [-.1]], dtype=np.float32)
+    l_data = np.asarray([[0, 1], [1, 0]], dtype=np.float32)
+    updated, var_map = train(l_data, x_data)
+    assert updated
+    assert var_map[z.output].shape == (2, 2)
+    assert trainer.total_number_of_samples_seen == 2
+
+    assert trainer.prepare()(x_data, l_data)
+    assert trainer.total_number_of_samples_seen == 4
+
+    with pytest.raises(ValueError):
+        train(x_data)
@@ -211,6 +211,35 @@ def test_session_cross_validation_3_times(tmpdir, device_id):
     assert(writer.test_summary_counter == 3)
 
 
+def test_session_cross_validation_async(tmpdir, device_id):
+    device = cntk_device(device_id)
+    t, feature, label = create_sample_model(device)
+    mbs = mb_source(tmpdir, "training", max_samples=INFINITELY_REPEAT)
+    mbs1 = mb_source(tmpdir, "cv")
+
+    input_map = {
+        feature: mbs.streams.features,
+        label: mbs.streams.labels
+    }
+
+    results = []
+    def cv_callback(index, average_error, num_samples, num_mb):
+        assert num_mb > 0
+        results.append((index, round(average_error * 100), num_samples))
+        return True
+
+    C.training_session(
+        trainer=t, mb_source=mbs,
+        mb_size=4, model_inputs_to_streams=input_map,
+        max_samples=60,
+        cv_config = C.CrossValidationConfig(mbs1, frequency=20, minibatch_size=2,
+                                            callback=cv_callback, async_eval=True, max_pending=2),
+    ).train(device)
+
+    assert(t.total_number_of_samples_seen == 61)
+    assert results == [(0, 92, 25), (1, 92, 25), (2, 92, 25)]
+
+
 def test_session_cross_validation_3_times_checkpoints_2_save_all(tmpdir, device_id):
     device = cntk_device(device_id)
     writer = MockProgressWriter(expected_test_summary=[[92, 25], [92, 25], [92, 25]])
@@ -318,6 +347,52 @@ def test_session_restart_from_end_checkpoint(tmpdir, device_id):
     assert(writer.testing_summary_counter == 0)
 
 
+def test_session_async_checkpoints(tmpdir, device_id):
+    device = cntk_device(device_id)
+    writer = MockProgressWriter()
+    t, feature, label = create_sample_model(device, writer)
+    mbs = mb_source(tmpdir, "training", max_samples=INFINITELY_REPEAT)
+
+    input_map = {
+        feature: mbs.streams.features,
+        label: mbs.streams.labels
+    }
+
+    test_dir = str(tmpdir)
+
+    C.training_session(trainer=t, mb_source=mbs,
+        mb_size=4, model_inputs_to_streams=input_map,
+        max_samples=60, progress_frequency=20,
+        checkpoint_config = C.CheckpointConfig(frequency=20, preserve_all=True,
+                                             async_write=True, max_pending=2,
+                                             filename=str(tmpdir / "async_checkpoint"))
+    ).train(device)
+
+    # all checkpoints are written by the time training returns
+    candidates = [f for f in listdir(test_dir) if isfile(
+        join(test_dir, f)) and f.startswith("async_checkpoint")]
+
+    for i in range(3):
+        assert("async_checkpoint%d" % i in candidates)
+        assert("async_checkpoint%d.ckp" % i in candidates)
+    assert(not [f for f in candidates if f.endswith(".tmp")])
+
+    # restoring from the last checkpoint should not cause any training
+    writer.minibatch_info = []
+    writer.training_summary_counter = 0
+    mbs = mb_source(tmpdir, "training", max_samples=INFINITELY_REPEAT)
+    C.training_session(trainer=t, mb_source=mbs,
+        mb_size=4, model_inputs_to_streams=input_map,
+        max_samples=60, progress_frequency=20,
+        checkpoint_config = C.CheckpointConfig(frequency=20, restore=True,
+                                             async_write=True,
+                                             filename=str(tmpdir / "async_checkpoint"))
+    ).train(device)
+
+    assert(len(writer.minibatch_info) == 0)
+    assert(writer.training_summary_counter == 0)
+
+
 def test_session_restart_from_checkpoint_preserve_all(tmpdir, device_id):
     device = cntk_device(device_id)
     writer = MockProgressWriter()
@@ -7,9 +7,10 @@
 from .. import cntk_py
 from ..device import use_default_device
 from cntk.internal import sanitize_var_map, sanitize_function, typemap, \
-                          _value_as_sequence_or_array
+                          sanitize_argument_order, _value_as_sequence_or_array
 from cntk.internal.utils import _py_dict_to_cntk_dict
 from ..io import MinibatchData
+from ..core import Value
 
 
 __doc__ = '''\
@@ -93,6 +94,61 @@ class Trainer(cntk_py.Trainer):
                     raise ValueError("evaluation function must have the same signature and inputs as the loss function")
         return args
 
+    def _all_arguments(self):
+        '''
+        Arguments of all parts (loss, model, eval) in a stable order: the loss
+        function's arguments first, followed by the ones only the model or
+        the evaluation function consume.
+        '''
+        # computed once, since the functions of a trainer do not change
+        all_args = getattr(self, '_all_args', None)
+        if all_args is None:
+            all_args = list(self.loss_function.arguments)
+            seen = set(all_args)
+            for f in (self.model, self.evaluation_function):
+                if f:
+                    for a in f.arguments:
+                        if a not in seen:
+                            seen.add(a)
+                            all_args.append(a)
+            all_args = self._all_args = tuple(all_args)
+        return all_args
+
+    def prepare(self, inputs=None, outputs=None, device=None):
+        '''
+        Resolves the inputs of the model, loss and evaluation functions as well
+        as the outputs and device once, and returns a callable that trains on
+        one minibatch passed positionally. This avoids the per-call argument
+        sanitization of :meth:`train_minibatch`.
+
+        Example:
+            >>> x = C.input_variable(1)
+            >>> t = C.input_variable(1)
+            >>> z = C.layers.Dense(1)(x)
+            >>> trainer = C.Trainer(z, C.squared_error(z, t), C.sgd(z.parameters, C.learning_parameter_schedule(0.1)))
+            >>> train = trainer.prepare(inputs=[x, t])
+            >>> train(np.ones((4, 1), dtype=np.float32), np.zeros((4, 1), dtype=np.float32))
+            True
+
+        Args:
+            inputs (list, optional): the arguments of the loss, model and
+             evaluation functions (variables or their names) in the order in
+             which their data will be passed. Defaults to the loss function's
+             arguments followed by any further model or evaluation function
+             arguments.
+            outputs (iterable, optional): outputs to fetch values for.
+            device (:class:`~cntk.device.DeviceDescriptor`): the device descriptor that
+             contains the type and id of the device on which the computation is
+             to be performed.
+
+        Returns:
+            :class:`PreparedTrainer`: callable that takes one batch (NumPy
+            array, list of sequences, :class:`~cntk.core.Value` or
+            :class:`~cntk.io.MinibatchData`) per input and returns the same as
+            :meth:`train_minibatch`.
+        '''
+        return PreparedTrainer(self, inputs, outputs, device)
+
     def train_minibatch(self, arguments, outputs=None, device=None):
         '''
         Optimize model parameters using the specified 'arguments' minibatch of training samples.
@@ -136,12 +192,7 @@ class Trainer(cntk_py.Trainer):
             device = use_default_device()
 
         if arguments: # arguments must feed all inputs (model, loss, eval)
-            all_args = set(self.loss_function.arguments)
-            if self.model:
-                all_args |= set(self.model.arguments)
-            if self.evaluation_function:
-                all_args |= set(self.evaluation_function.arguments)
-            arguments = sanitize_var_map(tuple(all_args), arguments,
+            arguments = sanitize_var_map(self._all_arguments(), arguments,
                 extract_values_from_minibatch_data = False, device=device)
 
         contains_minibatch_data = False
@@ -213,12 +264,7 @@ class Trainer(cntk_py.Trainer):
             device = use_default_device()
 
         # pass all args of all parts (model, loss, eval)
-        all_args = set(self.loss_function.arguments)
-        if self.model:
-            all_args |= set(self.model.arguments)
-        if self.evaluation_function:
-            all_args |= set(self.evaluation_function.arguments)
-        arguments = sanitize_var_map(tuple(all_args), arguments)
+        arguments = sanitize_var_map(self._all_arguments(), arguments)
 
         return super(Trainer, self).test_minibatch(arguments, device)
 
@@ -237,10 +283,40 @@ class Trainer(cntk_py.Trainer):
 
         super(Trainer, self).save_checkpoint(filename, _py_dict_to_cntk_dict(external_state))
 
+    def save_checkpoint_async(self, filename, external_state={}, max_pending=1):
+        '''
+        Saves a checkpoint of the model and other Trainer state at the
+        specified file location without waiting for the files to be written.
+
+        The model and Trainer state are copied into host memory before the
+        call returns, the files are written on a background thread and
+        atomically renamed into place. At most ``max_pending`` checkpoints
+        wait to be written; further calls block until the oldest one is
+        written. In distributed environment the checkpoint is written
+        synchronously by the main worker.
+
+        Args:
+            filename (str): filename to store the checkpoint.
+            external_state (dict): additional external state, default is empty.
+            max_pending (int): maximum number of checkpoints waiting to be written.
+        '''
+
+        super(Trainer, self).save_checkpoint_async(filename, _py_dict_to_cntk_dict(external_state), max_pending)
+
+    def wait_for_pending_checkpoints(self):
+        '''
+        Blocks until all checkpoints started with :meth:`save_checkpoint_async`
+        have been written, and raises the first error that occurred while
+        writing them.
+        '''
+
+        super(Trainer, self).wait_for_pending_checkpoints()
+
     def restore_from_checkpoint(self, filename):
         '''
         Restores a checkpoint of the model and Trainer state from the
-        specified file location.
+        specified file location. Pending asynchronous checkpoints are
+        written first.
 
         Args:
             filename (str): filename to restore the checkpoint from
@@ -248,6 +324,41 @@ class Trainer(cntk_py.Trainer):
 
         return super(Trainer, self).restore_from_checkpoint(filename)
 
+    def save_sharded_checkpoint(self, directory, name='checkpoint', external_state={}):
+        '''
+        Saves a checkpoint of the model and learner state in which every
+        parameter and constant is stored as a content-addressed shard in
+        ``directory``. Shards that are already there from earlier
+        checkpoints, such as frozen layers, are not written again.
+        See :mod:`~cntk.train.sharded_checkpoint`.
+
+        Args:
+            directory (str): checkpoint directory, shared by all checkpoints of a run
+            name (str): name of this checkpoint within ``directory``
+            external_state (dict): additional JSON-serializable state, default is empty.
+
+        Returns:
+            dict with the number of ``shards`` referenced by the checkpoint and
+            the number of shards ``written`` by this call
+        '''
+        from .sharded_checkpoint import save_sharded_checkpoint
+        return save_sharded_checkpoint(self, directory, name, external_state)
+
+    def restore_from_sharded_checkpoint(self, directory, name='checkpoint'):
+        '''
+        Restores a checkpoint saved with :meth:`save_sharded_checkpoint`.
+        Shards are memory-mapped and read in parallel.
+
+        Args:
+            directory (str): checkpoint directory
+            name (str): name of the checkpoint within ``directory``
+
+        Returns:
+            dict: the external state saved with the checkpoint
+        '''
+        from .sharded_checkpoint import restore_from_sharded_checkpoint
+        return restore_from_sharded_checkpoint(self, directory, name)
+
     @property
     @typemap
     def model(self):
@@ -321,3 +432,49 @@ class Trainer(cntk_py.Trainer):
         accumulators.
         '''
         return super(Trainer, self).summarize_test_progress()
+
+
+class PreparedTrainer(object):
+    '''
+    Training handle of a :class:`Trainer` with its inputs, outputs and device
+    resolved up front. Use :meth:`Trainer.prepare` to create it.
+    '''
+
+    def __init__(self, trainer, inputs=None, outputs=None, device=None):
+        if not device:
+            device = use_default_device()
+
+        self.trainer = trainer
+        self.inputs = sanitize_argument_order(trainer._all_arguments(), inputs)
+        self.outputs = tuple(outputs) if outputs else ()
+        self.device = device
+
+    def __call__(self, *args):
+        if len(args) != len(self.inputs):
+            raise ValueError('prepared trainer expects %i inputs, but got %i' %
+                             (len(self.inputs), len(args)))
+
+        arguments = {}
+        contains_minibatch_data = False
+        for var, batch in zip(self.inputs, args):
+            if isinstance(batch, MinibatchData):
+                contains_minibatch_data = True
+            elif not isinstance(batch, cntk_py.Value):
+                batch = Value.create(var, batch, device=self.device)
+            arguments[var] = batch
+
+        if contains_minibatch_data:
+            # the native overload expects all of the batches as MinibatchData
+            train = super(Trainer, self.trainer).train_minibatch_overload_for_minibatchdata
+        else:
+            train = super(Trainer, self.trainer).train_minibatch
+
+        if not self.outputs:
+            return train(arguments, self.device)
+
+        output_map = dict.fromkeys(self.outputs)
+        updated = train(arguments, output_map, self.device)
+        for k, v in output_map.items():
+            output_map[k] = _value_as_sequence_or_array(v, k)
+
+        return updated, output_map
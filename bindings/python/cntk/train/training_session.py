@@ -21,9 +21,14 @@ class CheckpointConfig(cntk_py.CheckpointConfig):
           If ``sys.maxsize``, a single checkpoint is taken at the end of the training.
         restore (bool): flag, indicating whether to restore from available checkpoint before the start of the training
         preserve_all (bool): saves all checkpoints, using ``filename`` as prefix and checkpoint index as a suffix.
+        async_write (bool): snapshots the model and trainer state into host memory and writes the checkpoint
+          on a background thread, so that training does not wait for the write.
+        max_pending (int): maximum number of asynchronous checkpoints waiting to be written. If the limit is
+          reached, training waits for the oldest one to be written.
     '''
     def __init__(self, filename, frequency=None,
-                 restore=True, preserve_all=False):
+                 restore=True, preserve_all=False,
+                 async_write=False, max_pending=1):
         '''Sets configuration of checkpointing behavior.
 
         Args:
@@ -32,6 +37,10 @@ class CheckpointConfig(cntk_py.CheckpointConfig):
               If ``sys.maxsize``, a single checkpoint is taken at the end of the training.
             restore (bool): flag, indicating whether to restore from available checkpoint before the start of the training
             preserve_all (bool): saves all checkpoints, using ``filename`` as prefix and checkpoint index as a suffix.
+            async_write (bool): snapshots the model and trainer state into host memory and writes the checkpoint
+              on a background thread, so that training does not wait for the write.
+            max_pending (int): maximum number of asynchronous checkpoints waiting to be written. If the limit is
+              reached, training waits for the oldest one to be written.
 
         Returns:
             Reconfigured self.
@@ -46,8 +55,12 @@ class CheckpointConfig(cntk_py.CheckpointConfig):
         if frequency is None:
             frequency = sys.maxsize
 
+        if async_write and max_pending < 1:
+            raise ValueError("max_pending must be positive for asynchronous checkpointing")
+
         super(CheckpointConfig, self).__init__(filename, frequency,
-                                               restore, preserve_all)
+                                               restore, preserve_all,
+                                               async_write, max_pending)
 
 class CrossValidationConfig(cntk_py.CrossValidationConfig):
     '''
@@ -70,9 +83,16 @@ class CrossValidationConfig(cntk_py.CrossValidationConfig):
           Must be specified if `minibatch_source` is a tuple of numpy/scipy arrays.
         source (:class:`~cntk.io.MinibatchSource`): DEPRECATED, use minibatch_source instead
         mb_size(int or :class:`~cntk.cntk_py.minibatch_size_schedule`, defaults to 32): DEPRECATED, use minibatch_size instead
+        async_eval (bool): runs cross validation on a background thread against a copy of the current
+          parameters while training continues. The results are passed to ``callback`` between training
+          minibatches, in order, and are not reported to the trainer's progress writers.
+          Requires a trainer with an evaluation function and is not supported in distributed training.
+        max_pending (int): maximum number of asynchronous cross validations whose result has not been
+          delivered yet. If the limit is reached, training waits for the oldest one to finish.
     '''
     def __init__(self, minibatch_source=None, frequency=None, minibatch_size=32,
-            callback=None, max_samples=None, model_inputs_to_streams=None, criterion=None, source=None, mb_size=None):
+            callback=None, max_samples=None, model_inputs_to_streams=None, criterion=None, source=None, mb_size=None,
+            async_eval=False, max_pending=1):
         self.callback = callback
 
         if source is not None:
@@ -107,16 +127,19 @@ class CrossValidationConfig(cntk_py.CrossValidationConfig):
         if max_samples is None:
             max_samples = sys.maxsize
 
+        if async_eval and max_pending < 1:
+            raise ValueError("max_pending must be positive for asynchronous cross validation")
+
         minibatch_source, model_inputs_to_streams = TrainingSession._sanitize_minibatch_source(minibatch_source, model_inputs_to_streams, criterion, infinitely_repeat=False)
 
         self._source_reference = minibatch_source # keep a Python-side strong reference so that SWIG finds the correct type upon callback (otherwise Python will crash)
 
-        if model_inputs_to_streams is not None:
-            super(CrossValidationConfig, self).__init__(
-                minibatch_source, schedule, frequency, max_samples, model_inputs_to_streams)
-        else:
-            super(CrossValidationConfig, self).__init__(
-                minibatch_source, schedule, frequency, max_samples)
+        if model_inputs_to_streams is None:
+            model_inputs_to_streams = {}
+
+        super(CrossValidationConfig, self).__init__(
+            minibatch_source, schedule, frequency, max_samples, model_inputs_to_streams,
+            async_eval, max_pending)
 
     def _warn_deprecated(self, message):
         from warnings import warn
@@ -176,6 +176,7 @@ cntk_install_requires = [
 
 if IS_PY2:
     cntk_install_requires.append('enum34>=1.1.6')
+    cntk_install_requires.append('futures>=3.0.5')
 
 setup(name="cntk",
       version="2.1",